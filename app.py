@@ -2,11 +2,21 @@
 
 from flask import Flask, render_template, request, jsonify, redirect, url_for
 from config import DATABASES, DATABASE_DIR, METADATA_FILE, load_databases
+from utils.llm_provider import LLMError
 import os
 import json
 
 app = Flask(__name__)
 
+@app.errorhandler(LLMError)
+def handle_llm_error(e):
+    """LLM 호출 실패를 타입별 JSON 응답으로 변환 (429 / 502 / 503)"""
+    response = jsonify(e.to_dict())
+    response.status_code = e.http_status
+    if e.retry_after is not None:
+        response.headers['Retry-After'] = str(max(1, int(round(e.retry_after))))
+    return response
+
 @app.route('/')
 def home():
     """메인 페이지 - DB 선택 화면"""
@@ -33,10 +43,13 @@ def delete_db(db_name):
         return jsonify({'success': False, 'message': 'DB not found'}), 404
     
     try:
-        # .db 파일 삭제
+        # .db 파일 삭제 (WAL 모드의 -wal/-shm 파일 포함)
+        from utils.sqlite_tuning import release
         db_file = databases[db_name]['file']
-        if os.path.exists(db_file):
-            os.remove(db_file)
+        release(db_file)
+        for path in (db_file, db_file + '-wal', db_file + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
         
         # metadata.json에서 제거
         if os.path.exists(METADATA_FILE):
@@ -78,30 +91,82 @@ def add_db():
     
     try:
         # 빈 SQLite DB 생성
-        import sqlite3
-        conn = sqlite3.connect(db_file)
+        from utils.sqlite_tuning import connect
+        conn = connect(db_file)
         conn.close()
         
-        # metadata.json 업데이트
-        if os.path.exists(METADATA_FILE):
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-        else:
-            metadata = {}
-        
-        metadata[db_key] = {
-            'name': db_name,
-            'description': db_description,
-            'icon': db_icon
-        }
-        
-        with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        _save_db_metadata(db_key, db_name, db_description, db_icon)
         
         return jsonify({'success': True, 'message': f'{db_name} DB가 생성되었습니다.'})
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
+
+def _save_db_metadata(db_key, db_name, db_description, db_icon):
+    """metadata.json에 DB 정보 추가"""
+    if os.path.exists(METADATA_FILE):
+        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    else:
+        metadata = {}
+    
+    metadata[db_key] = {
+        'name': db_name,
+        'description': db_description,
+        'icon': db_icon
+    }
+    
+    with open(METADATA_FILE, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+@app.route('/api/import/<db_key>', methods=['POST'])
+def import_data(db_key):
+    """
+    CSV/TSV/XLSX 파일을 DB 테이블로 가져오기 (multipart/form-data)
+    
+    폼 필드:
+        file: 업로드 파일 (필수)
+        table: 테이블명 (기본값: 파일명)
+        if_exists: 테이블이 있을 때 'fail' | 'append' | 'replace' (기본값 fail)
+        indexes: 적재 후 인덱스를 만들 컬럼 (쉼표 구분)
+        sheet: 엑셀 시트명 (기본값: 첫 시트)
+        db_name, db_description, db_icon: DB를 새로 만들 때의 메타데이터
+    
+    DB가 없으면 새로 만들고, 응답에 적재 행 수와 초당 행 수(rows_per_sec)를 포함
+    """
+    from utils.data_importer import import_file
+    
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'success': False, 'message': '가져올 파일을 첨부해주세요.'}), 400
+    
+    databases = load_databases()
+    if db_key in databases:
+        db_file = databases[db_key]['file']
+    elif db_key.replace('_', '').isalnum():
+        db_file = os.path.join(DATABASE_DIR, f'{db_key}.db')
+    else:
+        return jsonify({'success': False, 'message': 'DB key는 영문, 숫자, _만 사용 가능합니다.'}), 400
+    
+    form = request.form
+    indexes = [c.strip() for c in form.get('indexes', '').split(',') if c.strip()]
+    
+    try:
+        # 업로드는 werkzeug가 임시 파일로 받아 두므로 스트림에서 행 단위로 읽음
+        result = import_file(db_file, upload.stream, upload.filename,
+                             table=form.get('table', '').strip() or None,
+                             if_exists=form.get('if_exists', 'fail'),
+                             indexes=indexes, sheet=form.get('sheet') or None)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'가져오기 실패: {e}'}), 500
+    
+    if result['created_db']:
+        _save_db_metadata(db_key, form.get('db_name', '').strip() or db_key.replace('_', ' ').title(),
+                          form.get('db_description', '').strip(), form.get('db_icon', '📁').strip())
+    
+    return jsonify({'success': True, 'db': db_key, **result})
     
 @app.route('/api/analyze_schema/<db_name>')
 def analyze_schema(db_name):
@@ -119,17 +184,21 @@ def analyze_schema(db_name):
 
 @app.route('/api/suggest_queries/<db_name>')
 def suggest_queries(db_name):
-    """추천 질문 생성"""
-    from utils.schema_analyzer import suggest_queries_with_llm
+    """
+    추천 질문 (자주 실행/북마크된 히스토리 질문 우선, 부족하면 LLM 추천으로 채움)
+    
+    queries: 질문 문자열 목록, suggestions: 질문별 출처('history' | 'llm')와 실행 횟수/북마크 여부
+    """
+    from utils.suggestions import suggest_questions
     
     databases = load_databases()
     if db_name not in databases:
         return jsonify({'success': False, 'message': 'DB not found'}), 404
     
     db_path = databases[db_name]['file']
-    queries = suggest_queries_with_llm(db_path)
+    suggestions = suggest_questions(db_name, db_path)
     
-    return jsonify({'success': True, 'queries': queries})
+    return jsonify({'success': True, 'queries': [s['question'] for s in suggestions], 'suggestions': suggestions})
 
 @app.route('/api/generate_sql/<db_name>', methods=['POST'])
 def generate_sql(db_name):
@@ -147,19 +216,87 @@ def generate_sql(db_name):
     if not user_question:
         return jsonify({'success': False, 'message': '질문을 입력해주세요.'}), 400
     
+    # 헤징: 요청의 hedge 값 우선, 없으면 LLM_HEDGE 환경 변수
+    from utils.llm_hedging import HEDGE_ENABLED
+    hedge = bool(data.get('hedge', HEDGE_ENABLED))
+    
     db_path = databases[db_name]['file']
-    result = generate_sql_from_question(db_path, user_question, model_name)
+    result = generate_sql_from_question(db_path, user_question, model_name, hedge=hedge)
     
     return jsonify({
         'success': True,
         'reasoning': result['reasoning'],
-        'sql': result['sql']
+        'sql': result['sql'],
+        'model': result.get('model', model_name),
+        'hedged': result.get('hedged', False)
     })
 
+@app.route('/api/generate_sql_batch/<db_name>', methods=['POST'])
+def generate_sql_batch(db_name):
+    """
+    여러 질문의 SQL을 동시에 생성 (NDJSON 스트리밍)
+    
+    요청: {"questions": [...], "model": "...", "execute": false, "concurrency": 4}
+    응답: 완료 순서대로 질문별 결과 한 줄씩 (index 포함), 마지막 줄은 요약
+    """
+    from flask import Response, stream_with_context
+    from utils.batch_generator import validate_questions, resolve_concurrency, generate_batch
+    from utils.batch_executor import stream_ndjson
+    from utils.query_generator import save_to_history
+    
+    databases = load_databases()
+    if db_name not in databases:
+        return jsonify({'success': False, 'message': 'DB not found'}), 404
+    
+    data = request.get_json() or {}
+    questions = data.get('questions')
+    model_name = data.get('model', 'gemini-2.0-flash-lite')
+    execute = bool(data.get('execute', False))
+    
+    error = validate_questions(questions)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    try:
+        concurrency = resolve_concurrency(data.get('concurrency'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    db_path = databases[db_name]['file']
+    
+    def record_history(result):
+        if execute and result['success']:
+            save_to_history(db_name, result['question'], result['sql'], len(result['executed']['rows']))
+    
+    results = generate_batch(db_path, questions, model_name, execute=execute, concurrency=concurrency)
+    return Response(
+        stream_with_context(stream_ndjson(results, on_result=record_history)),
+        mimetype='application/x-ndjson'
+    )
+
 @app.route('/api/execute_sql/<db_name>', methods=['POST'])
 def execute_sql_api(db_name):
-    """SQL 실행"""
-    from utils.query_generator import execute_sql, save_to_history
+    """
+    SQL 실행
+
+    응답 포맷은 요청 본문의 format ('rows' | 'columnar' | 'arrow') 또는
+    Accept 헤더로 선택하며, Accept-Encoding에 따라 gzip/deflate 압축
+
+    profile=true이면 전체 행 대신 미리보기(preview_rows개 샘플)와
+    컬럼 프로파일(count/nulls/min/max/mean/분위수/top-k)을 반환
+    
+    SQL은 쿼리 실행기 워커 프로세스에서 읽기 전용으로 실행 (interactive 우선순위)
+    자주 실행되는 무거운 쿼리는 자동 구체화된 결과에서 응답 (materialized: true)
+    
+    approximate=true이면 가장 큰 테이블의 표본으로 집계를 추정하고 신뢰구간을 함께 반환
+    (approximate: true, sample_method: 'block' | 'bernoulli', sample_fraction 선택).
+    근사할 수 없는 쿼리는 정확히 실행하고 approximation_skipped에 이유를 담음
+    """
+    import time
+    from utils.query_generator import save_to_history
+    from utils.materializer import execute_with_materialization
+    from utils.approximate import plan_approximation, execute_approximate
+    from utils.result_encoding import negotiate_format, encoded_response
+    from utils.query_executor import resolve_preview_rows
     
     databases = load_databases()
     if db_name not in databases:
@@ -172,16 +309,139 @@ def execute_sql_api(db_name):
     if not sql_query:
         return jsonify({'success': False, 'message': 'SQL을 입력해주세요.'}), 400
     
+    try:
+        result_format = negotiate_format(data.get('format'), request.headers.get('Accept', ''))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
     db_path = databases[db_name]['file']
-    result = execute_sql(db_path, sql_query)
+    profile = bool(data.get('profile'))
+    try:
+        preview_rows = resolve_preview_rows(data.get('preview_rows'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    start = time.perf_counter()
+    result, skipped = None, None
+    if data.get('approximate') and not profile:
+        try:
+            plan = plan_approximation(db_path, sql_query, method=data.get('sample_method', 'block'),
+                                      fraction=data.get('sample_fraction'))
+            result = execute_approximate(db_path, sql_query, plan)
+        except ValueError as e:
+            skipped = str(e)
+    if result is None:
+        result = execute_with_materialization(db_name, db_path, sql_query, profile=profile,
+                                              preview_rows=preview_rows)
+        if skipped:
+            result['approximation_skipped'] = skipped
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    
+    if not result['success']:
+        return jsonify(result)
+    
+    # 히스토리 저장 (구체화/근사 결과로 응답한 경우 원래 실행 비용이 아니므로 시간은 기록하지 않음)
+    save_to_history(db_name, question, sql_query, result.get('row_count', len(result['rows'])),
+                    elapsed_ms=None if result.get('materialized') or result.get('approximate') else elapsed_ms)
+    
+    try:
+        return encoded_response(result, result_format, request.accept_encodings)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 406
+
+
+@app.route('/api/execute_batch', methods=['POST'])
+def execute_batch_api():
+    """
+    배치 SQL 실행 (NDJSON 스트리밍)
+    
+    요청: {"items": [{"db": "ecommerce", "sql": "...", "question": "..."}, ...]}
+    응답: 항목별 결과 한 줄씩 (요청 순서), 마지막 줄은 {"done": true, ...} 요약
+    """
+    from flask import Response, stream_with_context
+    from utils.batch_executor import validate_items, run_batch, stream_ndjson
+    from utils.query_generator import save_to_history
+    
+    data = request.get_json() or {}
+    items = data.get('items')
+    
+    error = validate_items(items)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    
+    databases = load_databases()
+    
+    def record_history(result):
+        if result['success']:
+            item = items[result['index']]
+            save_to_history(item['db'], item.get('question', '').strip(), item['sql'].strip(), len(result['rows']),
+                            elapsed_ms=result['elapsed_ms'])
+    
+    return Response(
+        stream_with_context(stream_ndjson(run_batch(items, databases), on_result=record_history)),
+        mimetype='application/x-ndjson'
+    )
+
+@app.route('/api/federated/generate_sql', methods=['POST'])
+def generate_federated_sql():
+    """여러 DB를 ATTACH한 연합 스키마 기준 자연어 → SQL 생성"""
+    from utils.federation import validate_keys, get_federated_schema
+    from utils.query_generator import generate_sql_from_schema
+    
+    data = request.get_json() or {}
+    db_keys = data.get('dbs')
+    user_question = data.get('question', '').strip()
+    model_name = data.get('model', 'gemini-2.0-flash-lite')
+    
+    databases = load_databases()
+    error = validate_keys(db_keys, databases)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    
+    if not user_question:
+        return jsonify({'success': False, 'message': '질문을 입력해주세요.'}), 400
     
-    # 히스토리 저장
+    schema_info = get_federated_schema(db_keys, databases)
+    result = generate_sql_from_schema(schema_info['schema_text'], user_question, model_name,
+                                      cache_scope='federated:' + '+'.join(sorted(db_keys)))
+    
+    return jsonify({
+        'success': True,
+        'reasoning': result['reasoning'],
+        'sql': result['sql'],
+        'tables': schema_info['tables']
+    })
+
+@app.route('/api/federated/execute_sql', methods=['POST'])
+def execute_federated_sql():
+    """
+    연합 SQL 실행 (dbs의 각 DB가 키 이름으로 ATTACH됨)
+    
+    예: SELECT ... FROM hr_management.Employees e JOIN finance.Transactions t ...
+    """
+    from utils.federation import validate_keys, execute_federated
+    from utils.query_generator import save_to_history
+    
+    data = request.get_json() or {}
+    db_keys = data.get('dbs')
+    sql_query = data.get('sql', '').strip()
+    question = data.get('question', '').strip()
+    
+    databases = load_databases()
+    error = validate_keys(db_keys, databases)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    
+    if not sql_query:
+        return jsonify({'success': False, 'message': 'SQL을 입력해주세요.'}), 400
+    
+    result = execute_federated(db_keys, sql_query, databases)
+    
+    # 히스토리 저장 (db_name은 'ecommerce+finance' 형태)
     if result['success']:
-        save_to_history(db_name, question, sql_query, len(result['rows']))
+        save_to_history('+'.join(sorted(set(db_keys))), question, sql_query, len(result['rows']))
     
     return jsonify(result)
 
-
 @app.route('/api/history/<db_name>')
 def get_history_api(db_name):
     """쿼리 히스토리 조회"""
@@ -201,14 +461,14 @@ def toggle_bookmark_api(history_id):
 @app.route('/api/export/<format>/<db_name>', methods=['POST'])
 def export_data(format, db_name):
     """
-    쿼리 결과를 CSV 또는 Excel로 내보내기
+    쿼리 결과를 CSV 또는 Excel로 내보내기 (요청 안에서 바로 생성, 큰 결과는 /api/export_jobs 사용)
     
     Args:
         format: 'csv' 또는 'excel'
         db_name: DB 이름
     """
     from flask import send_file
-    from utils.query_generator import execute_sql
+    from utils.query_executor import run_query
     import csv
     import io
     from openpyxl import Workbook
@@ -225,7 +485,7 @@ def export_data(format, db_name):
         return jsonify({'success': False, 'message': 'SQL을 입력해주세요.'}), 400
     
     db_path = databases[db_name]['file']
-    result = execute_sql(db_path, sql_query)
+    result = run_query(db_path, sql_query, priority='export')
     
     if not result['success']:
         return jsonify({'success': False, 'message': result['error']}), 400
@@ -285,33 +545,210 @@ def export_data(format, db_name):
         return jsonify({'success': False, 'message': 'Invalid format'}), 400
 
 
+@app.route('/api/export_jobs/<format>/<db_name>', methods=['POST'])
+def submit_export_job(format, db_name):
+    """
+    백그라운드 내보내기 작업 등록 (큰 결과용)
+    
+    워커 프로세스가 결과를 임시 파일로 스트리밍하며, 진행 상황은 GET /api/export_jobs/<job_id>,
+    완료된 파일은 GET /api/export_jobs/<job_id>/download 로 받습니다.
+    같은 DB/SQL/형식의 작업이 진행 중이면 그 작업을 반환합니다 (deduplicated: true).
+    """
+    from utils.export_jobs import submit_export, FORMATS
+    
+    databases = load_databases()
+    if db_name not in databases:
+        return jsonify({'success': False, 'message': 'DB not found'}), 404
+    if format not in FORMATS:
+        return jsonify({'success': False, 'message': 'Invalid format'}), 400
+    
+    data = request.get_json() or {}
+    sql_query = data.get('sql', '').strip()
+    if not sql_query:
+        return jsonify({'success': False, 'message': 'SQL을 입력해주세요.'}), 400
+    
+    job, deduplicated = submit_export(db_name, databases[db_name]['file'], sql_query, format)
+    return jsonify({'success': True, 'deduplicated': deduplicated, **job}), 202
+
+@app.route('/api/export_jobs/<job_id>', methods=['GET', 'DELETE'])
+def export_job_status(job_id):
+    """내보내기 작업 상태 (쓴 행 수, 전체 행 수, 예상 남은 시간) / DELETE: 취소 또는 파일 삭제"""
+    from utils.export_jobs import get_export_job, cancel_export_job
+    
+    if request.method == 'DELETE':
+        if not cancel_export_job(job_id):
+            return jsonify({'success': False, 'message': 'Job not found'}), 404
+        return jsonify({'success': True})
+    
+    job = get_export_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify({'success': True, **job})
+
+@app.route('/api/export_jobs/<job_id>/download')
+def download_export_job(job_id):
+    """완료된 내보내기 파일 다운로드 (EXPORT_JOB_TTL 동안 보관)"""
+    from flask import send_file
+    from utils.export_jobs import get_export_job, get_export_file
+    
+    artifact = get_export_file(job_id)
+    if artifact is None:
+        job = get_export_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'message': 'Job not found'}), 404
+        return jsonify({'success': False, 'message': f"아직 다운로드할 수 없습니다 ({job['status']})"}), 409
+    
+    return send_file(artifact['path'], mimetype=artifact['mimetype'], as_attachment=True,
+                     download_name=artifact['download_name'])
+
 @app.route('/api/schema_diagram/<db_name>')
 def get_schema_diagram(db_name):
-    """스키마 다이어그램 (Mermaid)"""
-    from utils.schema_analyzer import generate_schema_diagram
+    """
+    스키마 다이어그램 (Mermaid)
+    ?table=Orders&hops=1 이면 해당 테이블과 FK 이웃만 포함한 부분 다이어그램
+    (table 없이 테이블이 DIAGRAM_MAX_FULL_TABLES개를 넘으면 FK 중심 테이블 기준으로 자동 축소)
+    """
+    from utils.schema_analyzer import generate_schema_diagram, DIAGRAM_DEFAULT_HOPS, DIAGRAM_MAX_FULL_TABLES
     
     databases = load_databases()
     if db_name not in databases:
         return jsonify({'success': False, 'message': 'DB not found'}), 404
     
     db_path = databases[db_name]['file']
-    diagram = generate_schema_diagram(db_path)
+    table = request.args.get('table', '').strip() or None
+    hops = request.args.get('hops', DIAGRAM_DEFAULT_HOPS, type=int)
+    
+    try:
+        result = generate_schema_diagram(db_path, table=table, hops=hops,
+                                         max_tables=DIAGRAM_MAX_FULL_TABLES)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 404
+    
+    return jsonify({
+        'success': True,
+        'diagram': result['diagram'],
+        'tables': result['tables'],
+        'all_tables': result['all_tables'],
+        'table_count': result['table_count'],
+        'focus': result['focus']
+    })
+
+@app.route('/api/column_stats/<db_name>')
+def get_db_column_stats(db_name):
+    """
+    테이블/컬럼 통계 (행 수, 고유값 수, NULL 비율, 최소/최대, 상위 값)
+    데이터가 바뀐 경우에만 변경된 테이블을 다시 계산 (?refresh=1이면 강제 재계산)
+    """
+    from utils.column_stats import get_column_stats
     
-    return jsonify({'success': True, 'diagram': diagram})
+    databases = load_databases()
+    if db_name not in databases:
+        return jsonify({'success': False, 'message': 'DB not found'}), 404
+    
+    stats = get_column_stats(databases[db_name]['file'], refresh=request.args.get('refresh') == '1')
+    return jsonify({
+        'success': True,
+        'computed_at': stats['computed_at'],
+        'tables': {
+            table: {'row_count': t['row_count'], 'columns': t['columns']}
+            for table, t in stats['tables'].items()
+        }
+    })
+
 @app.route('/api/clear_cache/<db_name>', methods=['POST'])
 def clear_schema_cache(db_name):
-    """스키마 캐시 초기화"""
+    """스키마 캐시 초기화 (컬럼 통계, 구체화 결과 포함)"""
     from utils.schema_analyzer import clear_cache
+    from utils.column_stats import clear_stats
+    from utils.materializer import clear_materializations
     
     try:
         clear_cache(db_name)
+        clear_materializations(db_name)
+        databases = load_databases()
+        if db_name in databases:
+            clear_stats(databases[db_name]['file'])
         return jsonify({'success': True, 'message': f'{db_name} 캐시가 초기화되었습니다.'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
+@app.route('/api/tuning/<db_name>', methods=['GET', 'PUT'])
+def db_tuning(db_name):
+    """
+    DB별 SQLite 튜닝 프로필 조회/변경 (metadata.json의 tuning 항목)
+    
+    PUT 요청: {"tuning": {"journal_mode": "wal", "mmap_size": 268435456, "cache_size": -16000,
+                          "temp_store": "memory", "mode": "rw"}}  (일부만 지정 가능, null이면 기본값으로)
+    변경은 이후 새로 여는 연결부터 적용
+    """
+    from utils.sqlite_tuning import tuning_status, save_tuning_profile, run_optimize
+    
+    databases = load_databases()
+    if db_name not in databases:
+        return jsonify({'success': False, 'message': 'DB not found'}), 404
+    db_path = databases[db_name]['file']
+    
+    if request.method == 'PUT':
+        data = request.get_json() or {}
+        try:
+            save_tuning_profile(db_name, data.get('tuning'))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        if data.get('optimize'):
+            run_optimize(db_path)
+    
+    return jsonify({'success': True, **tuning_status(db_path)})
+
 @app.route('/api/models')
 def get_models():
     """사용 가능한 모델 목록"""
     from utils.gemini_client import get_available_models
     return jsonify({'success': True, 'models': get_available_models()})
+
+@app.route('/api/metrics')
+def get_metrics():
+    """서비스 지표 (LLM 호출/재시도/에러, 지연 시간 분포, 서킷 상태 등)"""
+    from utils import metrics
+    from utils.llm_provider import provider_status
+    from utils.llm_hedging import hedge_status
+    from utils.query_executor import executor_status
+    from utils.context_cache import context_cache_status
+    from utils.materializer import materializer_status
+    from utils.export_jobs import export_jobs_status
+    from utils.sqlite_tuning import tuning_status
+    from utils.suggestions import suggestions_status
+    from utils.parallel_aggregate import parallel_status
+    
+    snapshot = metrics.snapshot()
+    snapshot['llm_circuits'] = provider_status()
+    snapshot['llm_hedge'] = hedge_status()
+    snapshot['query_executor'] = executor_status()
+    snapshot['llm_context_cache'] = context_cache_status()
+    materialized = materializer_status()
+    materialized.pop('entries')
+    snapshot['materializer'] = materialized
+    snapshot['export_jobs'] = export_jobs_status()
+    snapshot['sqlite_tuning'] = tuning_status()
+    snapshot['suggestions'] = suggestions_status()
+    snapshot['parallel_aggregate'] = parallel_status()
+    return jsonify({'success': True, 'metrics': snapshot})
+
+@app.route('/api/materializations/<db_name>')
+def get_materializations(db_name):
+    """DB의 자동 구체화 현황 (대상 쿼리, 행 수, 마지막 갱신 시각/비용, 적중률)"""
+    from utils.materializer import materializer_status, find_hot_queries
+    
+    databases = load_databases()
+    if db_name not in databases:
+        return jsonify({'success': False, 'message': 'DB not found'}), 404
+    
+    status = materializer_status(db_name)
+    status['candidates'] = [
+        {'sql': q['sql'], 'runs': q['runs'], 'avg_ms': q['avg_ms']} for q in find_hot_queries(db_name)
+    ]
+    return jsonify({'success': True, **status})
+
 if __name__ == '__main__':
+    from utils.sqlite_tuning import start_optimizer
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':  # 디버그 리로더의 실제 서버 프로세스에서만
+        start_optimizer()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,319 @@
+# asgi.py
+
+"""
+ASGI 진입점 (비동기 서빙 모드)
+
+LLM을 기다리는 라우트(/api/generate_sql, /api/analyze_schema, /api/suggest_queries)는
+코루틴으로 처리해 응답을 기다리는 동안 스레드를 점유하지 않고,
+나머지 라우트는 기존 Flask 앱을 스레드 풀에서 실행합니다 (SQLite 작업 포함).
+
+실행:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    python asgi.py
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+from app import app as flask_app
+from config import load_databases
+from utils import metrics
+from utils.llm_provider import LLMError
+
+# 블로킹 작업(Flask 라우트, SQLite, 캐시 파일 I/O)용 스레드 수
+# LLM 대기는 스레드를 쓰지 않으므로 동시 LLM 요청 수와 무관
+ASGI_BLOCKING_THREADS = int(os.getenv('ASGI_BLOCKING_THREADS', '32'))
+
+# Flask 스트리밍 응답을 이벤트 루프로 넘길 때 버퍼링할 최대 청크 수
+WSGI_STREAM_BUFFER = 16
+
+# Flask 라우트로 넘기는 요청 본문을 메모리에 둘 최대 크기 (넘으면 임시 파일로, 업로드 크기와 무관하게 메모리 일정)
+WSGI_BODY_SPOOL_BYTES = int(os.getenv('WSGI_BODY_SPOOL_BYTES', str(1024 * 1024)))
+
+_DEFAULT_MODEL = 'gemini-2.0-flash-lite'
+_inflight = 0
+
+# ========== 응답 헬퍼 ==========
+
+async def _send_json(send, payload, status=200, headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json; charset=utf-8'),
+                    (b'content-length', str(len(body)).encode())] + list(headers),
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+async def _spool_body(receive):
+    """
+    요청 본문을 SpooledTemporaryFile로 받기 (WSGI_BODY_SPOOL_BYTES를 넘으면 디스크로, 쓰기는 스레드에서)
+
+    Returns:
+        tuple: (처음으로 되감은 파일, 본문 크기)
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=WSGI_BODY_SPOOL_BYTES)
+    size = 0
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > WSGI_BODY_SPOOL_BYTES:
+                await asyncio.to_thread(spool.write, chunk)
+            else:
+                spool.write(chunk)
+            if not message.get('more_body'):
+                break
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool, size
+
+async def _db_path(db_name):
+    databases = await asyncio.to_thread(load_databases)
+    if db_name not in databases:
+        return None
+    return databases[db_name]['file']
+
+# ========== 비동기 라우트 ==========
+
+async def generate_sql(scope, receive, send, db_name):
+    """자연어 → SQL 생성 (app.generate_sql과 같은 요청/응답 형식)"""
+    from utils.llm_hedging import HEDGE_ENABLED
+    from utils.query_generator import generate_sql_from_question_async
+
+    db_path = await _db_path(db_name)
+    if db_path is None:
+        return await _send_json(send, {'success': False, 'message': 'DB not found'}, 404)
+
+    try:
+        data = json.loads(await _read_body(receive) or b'{}')
+    except ValueError:
+        return await _send_json(send, {'success': False, 'message': '잘못된 JSON 요청입니다.'}, 400)
+    if not isinstance(data, dict):
+        return await _send_json(send, {'success': False, 'message': '요청 본문은 JSON 객체여야 합니다.'}, 400)
+
+    user_question = data.get('question') or ''
+    model_name = data.get('model', _DEFAULT_MODEL)
+    if not isinstance(user_question, str) or not user_question.strip():
+        return await _send_json(send, {'success': False, 'message': '질문을 입력해주세요.'}, 400)
+    user_question = user_question.strip()
+
+    hedge = bool(data.get('hedge', HEDGE_ENABLED))
+    result = await generate_sql_from_question_async(db_path, user_question, model_name, hedge=hedge)
+
+    await _send_json(send, {
+        'success': True,
+        'reasoning': result['reasoning'],
+        'sql': result['sql'],
+        'model': result.get('model', model_name),
+        'hedged': result.get('hedged', False)
+    })
+
+async def analyze_schema(scope, receive, send, db_name):
+    """DB 스키마 분석"""
+    from utils.schema_analyzer import analyze_schema_with_llm_async
+
+    db_path = await _db_path(db_name)
+    if db_path is None:
+        return await _send_json(send, {'success': False, 'message': 'DB not found'}, 404)
+
+    analysis = await analyze_schema_with_llm_async(db_path)
+    await _send_json(send, {'success': True, 'analysis': analysis})
+
+async def suggest_queries(scope, receive, send, db_name):
+    """추천 질문 (히스토리 우선, 부족하면 LLM 추천으로 채움)"""
+    from utils.suggestions import suggest_questions_async
+
+    db_path = await _db_path(db_name)
+    if db_path is None:
+        return await _send_json(send, {'success': False, 'message': 'DB not found'}, 404)
+
+    suggestions = await suggest_questions_async(db_name, db_path)
+    await _send_json(send, {'success': True, 'queries': [s['question'] for s in suggestions],
+                            'suggestions': suggestions})
+
+ASYNC_ROUTES = [
+    ('POST', re.compile(r'^/api/generate_sql/([^/]+)$'), generate_sql),
+    ('GET', re.compile(r'^/api/analyze_schema/([^/]+)$'), analyze_schema),
+    ('GET', re.compile(r'^/api/suggest_queries/([^/]+)$'), suggest_queries),
+]
+
+async def _handle_async_route(handler, scope, receive, send, db_name):
+    """비동기 라우트 실행 (LLMError는 Flask 에러 핸들러와 같은 JSON/상태 코드로 변환)"""
+    global _inflight
+    _inflight += 1
+    metrics.set_gauge('asgi.llm_inflight', _inflight)
+    try:
+        await handler(scope, receive, send, db_name)
+    except LLMError as e:
+        headers = []
+        if e.retry_after is not None:
+            headers.append((b'retry-after', str(max(1, int(round(e.retry_after)))).encode()))
+        await _send_json(send, e.to_dict(), e.http_status, headers)
+    finally:
+        _inflight -= 1
+        metrics.set_gauge('asgi.llm_inflight', _inflight)
+
+# ========== WSGI(Flask) 연결 ==========
+
+def _build_environ(scope, body, content_length):
+    """ASGI scope → WSGI environ (body: 읽기용 파일 객체)"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(content_length),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+async def _call_flask(scope, receive, send):
+    """
+    Flask 앱을 스레드 풀에서 실행
+
+    요청 본문은 메모리에 모두 올리지 않고 임시 파일로 받아 넘기며(/api/import 대용량 업로드),
+    스트리밍 응답(NDJSON 등)은 같은 스레드에서 끝까지 순회하며(요청 컨텍스트 유지)
+    청크를 제한된 크기의 큐로 이벤트 루프에 넘깁니다.
+    """
+    body, content_length = await _spool_body(receive)
+    environ = _build_environ(scope, body, content_length)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=WSGI_STREAM_BUFFER)
+    closed = threading.Event()
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def start_response(status, headers, exc_info=None):
+        put(('start', int(status.split(' ', 1)[0]),
+             [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]))
+        return lambda data: put(('body', data))
+
+    def run():
+        try:
+            result = flask_app(environ, start_response)
+            try:
+                for chunk in result:
+                    if closed.is_set():
+                        break
+                    if chunk:
+                        put(('body', chunk))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        except BaseException as e:
+            put(('error', e))
+        finally:
+            put(('end',))
+
+    worker = loop.run_in_executor(None, run)
+    started = False
+    try:
+        while True:
+            item = await queue.get()
+            if item[0] == 'start':
+                await send({'type': 'http.response.start', 'status': item[1], 'headers': item[2]})
+                started = True
+            elif item[0] == 'body':
+                await send({'type': 'http.response.body', 'body': item[1], 'more_body': True})
+            elif item[0] == 'error':
+                if started:
+                    raise item[1]
+                print(f"[ASGI] Flask 라우트 오류: {item[1]}")
+                await _send_json(send, {'success': False, 'message': '서버 오류'}, 500)
+                started = True
+            else:
+                break
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        # 클라이언트 연결 종료 시 워커 스레드가 큐에서 막히지 않도록 남은 청크를 비움
+        closed.set()
+        while not worker.done():
+            try:
+                await asyncio.wait_for(queue.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                pass
+        body.close()
+
+# ========== ASGI 애플리케이션 ==========
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # asyncio.to_thread / run_in_executor가 쓰는 기본 스레드 풀 크기 지정
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=ASGI_BLOCKING_THREADS, thread_name_prefix='asgi-blocking')
+            )
+            from utils.query_executor import start_executor
+            from utils.sqlite_tuning import start_optimizer
+            start_executor()
+            start_optimizer()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            from utils.query_executor import configure_executor
+            configure_executor()  # 쿼리 워커 프로세스 종료
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI 애플리케이션 (uvicorn asgi:app)"""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    for method, pattern, handler in ASYNC_ROUTES:
+        match = pattern.match(scope['path'])
+        if match and scope['method'] == method:
+            return await _handle_async_route(handler, scope, receive, send, unquote(match.group(1)))
+
+    await _call_flask(scope, receive, send)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run('asgi:app', host=os.getenv('HOST', '127.0.0.1'), port=int(os.getenv('PORT', '5000')))
@@ -0,0 +1,204 @@
+# benchmarks/bench_api.py
+
+"""
+오프라인 엔드투엔드 API 벤치마크
+
+Gemini 대신 결정적 스텁 LLM을 사용해 Flask 엔드포인트를 실행하고
+엔드포인트별 p50/p95/p99 지연 시간, 처리량, 최대 RSS를 측정합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_api                      # 측정 + 베이스라인 비교
+    python -m benchmarks.bench_api --save-baseline      # 베이스라인 갱신
+    python -m benchmarks.bench_api --llm-latency-ms 300 --iterations 50
+"""
+
+import argparse
+import sys
+
+from benchmarks.common import (
+    compare_to_baseline, ensure_sample_databases, measure,
+    print_table, save_baseline, use_stub_llm,
+)
+
+BASELINE_NAME = 'api'
+
+# 샘플 DB별 실행 SQL (init_dbs.py 스키마 기준)
+EXECUTE_CASES = {
+    'ecommerce': {
+        'point': "SELECT * FROM Users WHERE user_id = 42",
+        'aggregate': """
+            SELECT p.category, strftime('%Y-%m', o.order_date) AS month,
+                   SUM(o.quantity * p.price) AS revenue
+            FROM Orders o JOIN Products p ON o.product_id = p.product_id
+            WHERE o.status = 'Completed'
+            GROUP BY p.category, month
+            ORDER BY month, revenue DESC
+        """,
+        'wide': "SELECT * FROM Orders",
+    },
+    'hr_management': {
+        'aggregate': """
+            SELECT d.dept_name, AVG(e.salary) AS avg_salary, COUNT(*) AS headcount
+            FROM Employees e JOIN Departments d ON e.dept_id = d.dept_id
+            GROUP BY d.dept_name
+        """,
+    },
+    'finance': {
+        'aggregate': """
+            SELECT account_id, SUM(amount) AS total, COUNT(*) AS cnt
+            FROM Transactions GROUP BY account_id
+        """,
+        'wide': "SELECT * FROM Transactions",
+    },
+}
+
+QUESTIONS = [
+    '카테고리별 월간 매출은?',
+    'VIP 고객의 평균 주문 수량은?',
+    '가장 많이 팔린 상품 TOP 5는?',
+]
+
+def _check(response):
+    """응답이 성공인지 확인 (실패 시 예외)"""
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    if response.mimetype == 'application/json':
+        payload = response.get_json()
+        if payload.get('success') is False:
+            raise RuntimeError(payload.get('error') or payload.get('message'))
+    return response
+
+def build_scenarios(client, db_names, export_sql_db='ecommerce'):
+    """
+    (이름, 호출 함수, 반복 배수) 리스트 생성
+
+    반복 배수는 무거운 엔드포인트(전체 내보내기 등)의 반복 횟수를 줄이는 데 사용
+    """
+    scenarios = []
+
+    for db in db_names:
+        scenarios.append((f'analyze_schema[{db}]',
+                          lambda db=db: _check(client.get(f'/api/analyze_schema/{db}')), 1))
+        scenarios.append((f'suggest_queries[{db}]',
+                          lambda db=db: _check(client.get(f'/api/suggest_queries/{db}')), 1))
+        scenarios.append((f'schema_diagram[{db}]',
+                          lambda db=db: _check(client.get(f'/api/schema_diagram/{db}')), 1))
+
+    for db in db_names:
+        counter = {'i': 0}
+
+        def generate(db=db, counter=counter):
+            question = QUESTIONS[counter['i'] % len(QUESTIONS)]
+            counter['i'] += 1
+            _check(client.post(f'/api/generate_sql/{db}', json={'question': question}))
+
+        scenarios.append((f'generate_sql[{db}]', generate, 1))
+
+    for db, cases in EXECUTE_CASES.items():
+        if db not in db_names:
+            continue
+        for case, sql in cases.items():
+            weight = 0.2 if case == 'wide' else 1
+            scenarios.append((
+                f'execute_sql[{db}:{case}]',
+                lambda db=db, sql=sql: _check(client.post(
+                    f'/api/execute_sql/{db}', json={'sql': sql, 'question': '[bench]'})),
+                weight,
+            ))
+
+    batch_items = [
+        {'db': db, 'sql': sql}
+        for db, cases in EXECUTE_CASES.items() if db in db_names
+        for case, sql in cases.items() if case != 'wide'
+    ]
+    scenarios.append((
+        'execute_batch[aggregates]',
+        lambda: _check(client.post('/api/execute_batch', json={'items': batch_items})),
+        1,
+    ))
+
+    if export_sql_db in db_names:
+        sql = EXECUTE_CASES[export_sql_db]['wide']
+        for fmt in ('csv', 'excel'):
+            scenarios.append((
+                f'export[{fmt}:{export_sql_db}]',
+                lambda fmt=fmt, sql=sql: _check(client.post(
+                    f'/api/export/{fmt}/{export_sql_db}', json={'sql': sql})),
+                0.1,
+            ))
+
+    for db in db_names:
+        scenarios.append((f'history[{db}]',
+                          lambda db=db: _check(client.get(f'/api/history/{db}')), 1))
+
+    return scenarios
+
+def run(iterations=30, warmup=2, only=None):
+    """
+    전체 시나리오 실행
+
+    Returns:
+        dict: {시나리오명: 통계}
+    """
+    from app import app
+    from config import load_databases
+
+    databases = load_databases()
+    db_names = [db for db in EXECUTE_CASES if db in databases]
+    if not db_names:
+        raise RuntimeError("샘플 DB가 없습니다. database/init_dbs.py를 먼저 실행하세요.")
+
+    client = app.test_client()
+    results = {}
+
+    # 서버 시작 시처럼 쿼리 워커를 미리 기동 (기동 비용은 측정에서 제외)
+    from utils.query_executor import start_executor
+    start_executor(wait=True)
+
+    for name, fn, weight in build_scenarios(client, db_names):
+        if only and only not in name:
+            continue
+        n = max(3, int(iterations * weight))
+        results[name] = measure(fn, n, warmup=warmup)
+        s = results[name]
+        print(f"   ✔ {name:<40} p50 {s['p50_ms']:.2f}ms  p95 {s['p95_ms']:.2f}ms")
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='오프라인 API 벤치마크 (스텁 LLM)')
+    parser.add_argument('--iterations', type=int, default=30, help='엔드포인트별 측정 횟수')
+    parser.add_argument('--warmup', type=int, default=2, help='워밍업 횟수')
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help='스텁 LLM 기본 지연')
+    parser.add_argument('--llm-jitter-ms', type=float, default=0, help='스텁 LLM 지연 편차')
+    parser.add_argument('--only', help='이름에 이 문자열이 포함된 시나리오만 실행')
+    parser.add_argument('--save-baseline', action='store_true', help='결과를 베이스라인으로 저장')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='회귀 판정 허용치 (비율)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='회귀 시 종료 코드 1')
+    args = parser.parse_args(argv)
+
+    use_stub_llm(args.llm_latency_ms, args.llm_jitter_ms)
+    ensure_sample_databases()
+
+    print(f"🚀 API 벤치마크 시작 (iterations={args.iterations}, llm_latency={args.llm_latency_ms}ms)")
+    results = run(args.iterations, args.warmup, args.only)
+
+    print()
+    print_table(results)
+
+    if args.save_baseline:
+        save_baseline(BASELINE_NAME, results, meta={
+            'iterations': args.iterations,
+            'llm_latency_ms': args.llm_latency_ms,
+            'llm_jitter_ms': args.llm_jitter_ms,
+            'python': sys.version.split()[0],
+        })
+        return 0
+
+    regressions = compare_to_baseline(BASELINE_NAME, results, tolerance=args.tolerance)
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# benchmarks/bench_approximate.py
+
+"""
+근사 실행(표본 집계) 벤치마크
+
+샘플 finance DB의 Transactions를 --rows행으로 늘린 복사본을 임시 폴더에 만들고
+대표 집계 쿼리를
+    exact     : 원래 쿼리 그대로
+    block     : rowid 범위 블록 표본
+    bernoulli : rowid 해시 행 단위 표본
+로 실행해 지연 시간, 추정치 상대 오차(중앙값), 95% 신뢰구간 적중률을 비교합니다.
+표본은 시행마다 다른 시드로 뽑습니다 (적중률이 0.95 근처면 신뢰구간이 제대로 된 것).
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_approximate
+    python -m benchmarks.bench_approximate --rows 5000000 --trials 20
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.common import ensure_sample_databases, percentile
+
+QUERIES = {
+    'by_account': "SELECT account_id, SUM(amount) AS total, COUNT(*) AS cnt FROM Transactions GROUP BY account_id",
+    'by_type_vendor': ("SELECT a.account_type, t.vendor, SUM(t.amount) AS total, AVG(t.amount) AS avg_amount "
+                       "FROM Transactions t JOIN Accounts a ON t.account_id = a.account_id GROUP BY 1, 2"),
+    'monthly_filtered': ("SELECT substr(transaction_date, 1, 7) AS month, COUNT(*) AS cnt, AVG(amount) AS avg_amount "
+                         "FROM Transactions WHERE amount > 100000 GROUP BY month"),
+}
+
+METHODS = ('block', 'bernoulli')
+
+def build_database(workdir, rows):
+    """finance 복사본의 Transactions를 rows행으로 늘림 (금액에 잡음을 섞어 복제)"""
+    from config import DATABASE_DIR
+
+    path = os.path.join(workdir, 'finance_big.db')
+    shutil.copy(os.path.join(DATABASE_DIR, 'finance.db'), path)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    base = conn.execute('SELECT COUNT(*) FROM Transactions').fetchone()[0]
+    while base and conn.execute('SELECT COUNT(*) FROM Transactions').fetchone()[0] < rows:
+        conn.execute("""
+            INSERT INTO Transactions (account_id, amount, transaction_date, description, vendor)
+            SELECT account_id, amount * (0.5 + (abs(random()) % 1000) / 1000.0), transaction_date, description, vendor
+            FROM Transactions WHERE rowid <= ?
+        """, (base,))
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_transactions_account ON Transactions(account_id)')
+    conn.execute('ANALYZE')
+    conn.commit()
+    total = conn.execute('SELECT COUNT(*) FROM Transactions').fetchone()[0]
+    conn.close()
+    return path, total
+
+def run_exact(path, sql_query):
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    cursor = conn.execute(sql_query)
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed, columns, rows
+
+def run_approximate(path, sql_query, method):
+    """쿼리 실행기를 거치지 않고 표본 실행 + 추정 (계획 수립 포함)"""
+    from utils.approximate import plan_approximation, run_sample, finalize_estimates
+    from utils.sql_aggregates import parse_aggregate_query
+
+    start = time.perf_counter()
+    plan = plan_approximation(path, sql_query, method=method)
+    sample = run_sample(path, sql_query, plan, timeout=600)
+    if not sample['success']:
+        raise RuntimeError(sample['error'])
+    result = finalize_estimates(parse_aggregate_query(sql_query), plan, sample)
+    return time.perf_counter() - start, result
+
+def compare(exact_columns, exact_rows, result):
+    """추정 컬럼별 (상대 오차 목록, 신뢰구간 적중 수, 비교 수) — 그룹 키가 같은 행끼리 비교"""
+    estimated = [c for c in result['approximation']['estimated_columns'] if f'{c} ±' in result['columns']]
+    keys = [c for c in exact_columns if c not in result['approximation']['estimated_columns']]
+    exact_index = {c: i for i, c in enumerate(exact_columns)}
+    approx_index = {c: i for i, c in enumerate(result['columns'])}
+    exact_by_key = {tuple(row[exact_index[k]] for k in keys): row for row in exact_rows}
+
+    errors, covered, compared = [], 0, 0
+    for row in result['rows']:
+        exact_row = exact_by_key.get(tuple(row[approx_index[k]] for k in keys))
+        if exact_row is None:
+            continue
+        for column in estimated:
+            truth, estimate = exact_row[exact_index[column]], row[approx_index[column]]
+            margin = row[approx_index[f'{column} ±']]
+            if truth is None or estimate is None or margin is None:
+                continue
+            compared += 1
+            covered += abs(estimate - truth) <= margin
+            if truth:
+                errors.append(abs(estimate - truth) / abs(truth))
+    return errors, covered, compared
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='근사 실행(표본 집계) 벤치마크')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Transactions 행 수')
+    parser.add_argument('--trials', type=int, default=10, help='쿼리/방식별 반복 횟수 (시행마다 다른 표본)')
+    args = parser.parse_args(argv)
+
+    ensure_sample_databases()
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"📦 Transactions {args.rows:,}행 DB 생성 중...")
+        path, total = build_database(workdir, args.rows)
+        print(f"🎯 근사 실행 ({total:,}행, 쿼리/방식별 {args.trials}회)\n")
+        print(f"{'query':<18} {'mode':<10} {'p50 ms':>9} {'speedup':>8} {'median err':>11} {'CI hit':>8}")
+
+        for label, sql_query in QUERIES.items():
+            exact_times = []
+            for _ in range(args.trials):
+                elapsed, exact_columns, exact_rows = run_exact(path, sql_query)
+                exact_times.append(elapsed)
+            exact_p50 = percentile(exact_times, 50)
+            print(f"{label:<18} {'exact':<10} {exact_p50 * 1000:>9.1f} {'':>8} {'':>11} {'':>8}")
+
+            for method in METHODS:
+                times, errors, covered, compared = [], [], 0, 0
+                for _ in range(args.trials):
+                    elapsed, result = run_approximate(path, sql_query, method)
+                    times.append(elapsed)
+                    e, c, n = compare(exact_columns, exact_rows, result)
+                    errors += e
+                    covered += c
+                    compared += n
+                p50 = percentile(times, 50)
+                error = f'{percentile(errors, 50):.2%}' if errors else '-'
+                hit = f'{covered / compared:.1%}' if compared else '-'
+                print(f"{'':<18} {method:<10} {p50 * 1000:>9.1f} {exact_p50 / p50:>7.1f}x {error:>11} {hit:>8}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# benchmarks/bench_async.py
+
+"""
+비동기 서빙 모드 벤치마크 (지연이 큰 스텁 LLM 대상)
+
+느린 LLM(기본 1초)에 대한 /api/generate_sql 요청을 한꺼번에 보내
+    wsgi : Flask 앱을 고정 크기 스레드 풀(일반적인 WSGI 스레드 수)에서 처리
+    asgi : asgi.app을 이벤트 루프에서 처리 (LLM 대기 중 스레드 미점유)
+의 완료 시간, 지연 시간 분포, 최대 스레드 수를 비교합니다.
+ASGI 앱은 서버 없이 프로세스 안에서 직접 호출합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_async
+    python -m benchmarks.bench_async --requests 500 --llm-latency-ms 2000 --wsgi-threads 64
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import ensure_sample_databases, percentile, use_stub_llm
+
+DB_NAME = 'ecommerce'
+
+class ThreadSampler:
+    """측정 중 최대 활성 스레드 수 기록"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(0.02):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def run_wsgi(requests, threads):
+    from app import app
+    client = app.test_client()
+
+    # 지연 시간은 모든 요청을 보낸 시점부터 (스레드를 기다린 시간 포함)
+    def one(i):
+        r = client.post(f'/api/generate_sql/{DB_NAME}', json={'question': f'질문 {i}'})
+        assert r.status_code == 200 and r.get_json()['success'], r.data[:200]
+        return time.perf_counter() - wall_start
+
+    with ThreadSampler() as sampler:
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(one, range(requests)))
+        wall = time.perf_counter() - wall_start
+    return latencies, wall, sampler.peak
+
+async def asgi_request(app, method, path, payload=None):
+    """서버 없이 ASGI 앱 호출 → (status, body bytes)"""
+    body = json.dumps(payload).encode() if payload is not None else b''
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+        'headers': [(b'content-type', b'application/json')], 'http_version': '1.1',
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    status = sent[0]['status']
+    return status, b''.join(m.get('body', b'') for m in sent[1:])
+
+async def _asgi_lifespan(app, event):
+    messages = [{'type': f'lifespan.{event}'}]
+    done = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()  # 다음 이벤트까지 대기 (이 벤치마크에서는 오지 않음)
+
+    async def send(message):
+        done.set()
+
+    task = asyncio.ensure_future(app({'type': 'lifespan'}, receive, send))
+    await done.wait()
+    task.cancel()
+
+async def _run_asgi(requests):
+    from asgi import app
+
+    await _asgi_lifespan(app, 'startup')
+
+    async def one(i):
+        status, body = await asgi_request(app, 'POST', f'/api/generate_sql/{DB_NAME}', {'question': f'질문 {i}'})
+        assert status == 200 and json.loads(body)['success'], body[:200]
+        return time.perf_counter() - wall_start
+
+    with ThreadSampler() as sampler:
+        wall_start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+        wall = time.perf_counter() - wall_start
+    return latencies, wall, sampler.peak
+
+def run_asgi(requests):
+    return asyncio.run(_run_asgi(requests))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='비동기 서빙 모드 벤치마크')
+    parser.add_argument('--requests', type=int, default=300, help='동시에 보낼 요청 수')
+    parser.add_argument('--llm-latency-ms', type=float, default=1000)
+    parser.add_argument('--wsgi-threads', type=int, default=32, help='wsgi 모드 스레드 수')
+    args = parser.parse_args(argv)
+
+    use_stub_llm(args.llm_latency_ms)
+    ensure_sample_databases()
+
+    # 스키마/통계 캐시 워밍업 (측정에서 제외)
+    from utils.schema_analyzer import get_database_schema
+    from config import load_databases
+    get_database_schema(load_databases()[DB_NAME]['file'])
+
+    print(f"🧵 LLM 지연 {args.llm_latency_ms:g}ms, 동시 요청 {args.requests}건 (/api/generate_sql)\n")
+    print(f"{'mode':<16} {'wall(s)':>8} {'req/s':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'max(ms)':>9} {'peak threads':>13}")
+    for label, run in ((f'wsgi x{args.wsgi_threads}', lambda: run_wsgi(args.requests, args.wsgi_threads)),
+                       ('asgi', lambda: run_asgi(args.requests))):
+        latencies, wall, peak = run()
+        print(f"{label:<16} {wall:>8.2f} {len(latencies) / wall:>8.1f} "
+              f"{percentile(latencies, 50) * 1000:>9.0f} {percentile(latencies, 95) * 1000:>9.0f} "
+              f"{max(latencies) * 1000:>9.0f} {peak:>13}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# benchmarks/bench_context_cache.py
+
+"""
+스키마 접두부 컨텍스트 캐시 벤치마크 (프리필 비용을 모사한 스텁 대상)
+
+큰 스키마(합성 테이블 N개)에 대해 질문을 연속으로 보내면서
+컨텍스트 캐시를 끈 경우/켠 경우의 질문당 전송 토큰 수와
+응답 지연(스텁은 비스트리밍이므로 첫 토큰까지의 시간과 같음)을 비교합니다.
+중간에 테이블을 하나 추가해 스키마 지문 변경 시 캐시가 다시 등록되는지도 확인합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_context_cache
+    python -m benchmarks.bench_context_cache --tables 120 --prefill-ms-per-1k 60
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.common import percentile, use_stub_llm
+
+MODEL = 'gemini-2.5-flash'
+SCOPE = 'bench:synthetic'
+
+def synthetic_schema(tables, extra_table=False):
+    """테이블 tables개 (컬럼 8개, 이웃 테이블 FK)의 CREATE 구문"""
+    statements = []
+    for i in range(tables):
+        statements.append(
+            f"CREATE TABLE Table{i} (\n"
+            f"    id INTEGER PRIMARY KEY,\n"
+            f"    name TEXT NOT NULL,\n"
+            f"    category TEXT,\n"
+            f"    amount REAL,\n"
+            f"    quantity INTEGER,\n"
+            f"    created_at TEXT,\n"
+            f"    status TEXT,\n"
+            f"    parent_id INTEGER REFERENCES Table{max(0, i - 1)}(id)\n"
+            f");"
+        )
+    if extra_table:
+        statements.append("CREATE TABLE AuditLog (id INTEGER PRIMARY KEY, table_name TEXT, changed_at TEXT);")
+    return '\n'.join(statements) + '\n'
+
+def run_mode(enabled, requests, tables):
+    from utils import metrics
+    from utils.context_cache import configure_context_cache
+    from utils.query_generator import generate_sql_from_schema
+
+    configure_context_cache(enabled=enabled)
+    metrics.reset()
+
+    latencies = []
+    for i in range(requests):
+        # 절반 지점에서 스키마 변경 → 새 지문으로 재등록
+        schema = synthetic_schema(tables, extra_table=i >= requests // 2)
+        start = time.perf_counter()
+        result = generate_sql_from_schema(schema, f"Table{i % tables}의 상태별 합계는? ({i})", MODEL,
+                                          cache_scope=SCOPE)
+        latencies.append(time.perf_counter() - start)
+        assert result['sql'].startswith('SELECT'), result
+
+    return {
+        'prompt_tokens_p50': metrics.percentile('llm.prompt_tokens', 50),
+        'cached_tokens': int(metrics.counter('llm.prompt_tokens_cached')),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'creates': int(metrics.counter('llm.context_cache.creates')),
+        'hits': int(metrics.counter('llm.context_cache.hits')),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='스키마 접두부 컨텍스트 캐시 벤치마크')
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--tables', type=int, default=60, help='합성 스키마 테이블 수')
+    parser.add_argument('--llm-latency-ms', type=float, default=80, help='스텁 기본 지연 (디코딩)')
+    parser.add_argument('--prefill-ms-per-1k', type=float, default=40, help='캐시되지 않은 입력 1K 토큰당 지연')
+    args = parser.parse_args(argv)
+
+    use_stub_llm(args.llm_latency_ms)
+    from utils.llm_stub import configure_stub
+    configure_stub(prefill_ms_per_1k=args.prefill_ms_per_1k)
+
+    from utils.llm_provider import estimate_tokens
+    from utils.query_generator import build_sql_prefix
+    prefix_tokens = estimate_tokens(build_sql_prefix(synthetic_schema(args.tables)))
+
+    print(f"🧩 합성 스키마 {args.tables}개 테이블 (접두부 약 {prefix_tokens} 토큰), 질문 {args.requests}건, "
+          f"프리필 {args.prefill_ms_per_1k:g}ms/1K 토큰\n")
+    print(f"{'mode':<10} {'tokens/질문':>11} {'cached tok':>11} {'p50(ms)':>9} {'p95(ms)':>9} {'creates':>8} {'hits':>6}")
+    for enabled in (False, True):
+        r = run_mode(enabled, args.requests, args.tables)
+        print(f"{'cached' if enabled else 'full':<10} {r['prompt_tokens_p50']:>11.0f} {r['cached_tokens']:>11} "
+              f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['creates']:>8} {r['hits']:>6}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# benchmarks/bench_encoding.py
+
+"""
+execute_sql 결과 인코딩 벤치마크
+
+기존 형식(jsonify된 행 배열)과 columnar JSON / Arrow IPC 포맷, 그리고
+gzip/deflate 압축 조합별로 페이로드 크기와 인코딩 시간을 비교합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_encoding
+    python -m benchmarks.bench_encoding --save-baseline
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+
+from benchmarks.common import (
+    compare_to_baseline, ensure_sample_databases, percentile,
+    save_baseline, use_stub_llm,
+)
+
+BASELINE_NAME = 'encoding'
+
+CASES = {
+    'ecommerce:orders': ('ecommerce', "SELECT * FROM Orders"),
+    'ecommerce:users': ('ecommerce', "SELECT * FROM Users"),
+    'finance:transactions': ('finance', "SELECT * FROM Transactions"),
+}
+
+def _legacy_encode(app, result):
+    """기존 방식: jsonify(result)"""
+    with app.app_context():
+        from flask import jsonify
+        return jsonify(result).get_data()
+
+def _time(fn, iterations):
+    latencies = []
+    body = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        body = fn()
+        latencies.append(time.perf_counter() - start)
+    return body, latencies
+
+def run(iterations=5):
+    from app import app
+    from config import load_databases
+    from utils.query_generator import execute_sql
+    from utils.result_encoding import encode_result, compress_body
+
+    if importlib.util.find_spec('pyarrow') is not None:
+        formats = ['rows', 'columnar', 'arrow']
+    else:
+        print("ℹ️  pyarrow 미설치 - arrow 포맷은 건너뜁니다.")
+        formats = ['rows', 'columnar']
+
+    databases = load_databases()
+    results = {}
+
+    for case, (db, sql) in CASES.items():
+        if db not in databases:
+            continue
+        result = execute_sql(databases[db]['file'], sql)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+
+        print(f"\n📦 {case} ({len(result['rows']):,}행)")
+        print(f"   {'format':<22} {'bytes':>12} {'vs legacy':>10} {'encode p50(ms)':>15}")
+
+        variants = [('legacy', None, lambda: _legacy_encode(app, result))]
+        for fmt in formats:
+            variants.append((fmt, fmt, lambda fmt=fmt: encode_result(result, fmt)[0]))
+
+        legacy_size = None
+        for label, fmt, encode in variants:
+            for compression in (None, 'gzip', 'deflate'):
+                if label == 'legacy' and compression:
+                    continue
+
+                def run_once(encode=encode, compression=compression):
+                    body = encode()
+                    return compress_body(body, compression)[0] if compression else body
+
+                body, latencies = _time(run_once, iterations)
+                size = len(body)
+                legacy_size = legacy_size or size
+                name = label if not compression else f"{label}+{compression}"
+                p50 = percentile(latencies, 50) * 1000
+                print(f"   {name:<22} {size:>12,} {size / legacy_size:>9.1%} {p50:>15.2f}")
+                results[f"{case}:{name}"] = {
+                    'count': iterations,
+                    'bytes': size,
+                    'p50_ms': round(p50, 3),
+                    'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+                }
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='결과 인코딩 포맷 벤치마크')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    use_stub_llm()
+    ensure_sample_databases()
+    results = run(args.iterations)
+
+    if args.save_baseline:
+        save_baseline(BASELINE_NAME, results, meta={'iterations': args.iterations})
+        return 0
+
+    compare_to_baseline(BASELINE_NAME, results, tolerance=args.tolerance, metric='bytes')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
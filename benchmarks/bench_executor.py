@@ -0,0 +1,98 @@
+# benchmarks/bench_executor.py
+
+"""
+쿼리 실행기 격리 벤치마크
+
+무거운 쿼리(20만 행 프로파일링)를 계속 실행하는 클라이언트들과 동시에
+가벼운 엔드포인트(/api/history, /api/models, 작은 SELECT)의 지연 시간을 측정해
+요청 스레드에서 직접 실행(workers=0)할 때와 워커 프로세스 풀에서 실행할 때를 비교합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_executor
+    python -m benchmarks.bench_executor --heavy-clients 4 --duration 10
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from benchmarks.common import ensure_sample_databases, percentile, use_stub_llm
+
+HEAVY_SQL = (
+    "WITH RECURSIVE k(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM k WHERE i < 10) "
+    "SELECT o.*, u.tier FROM Orders o JOIN Users u ON o.user_id = u.user_id, k"
+)
+LIGHT_SQL = "SELECT COUNT(*) FROM Users"
+
+def run_mode(client, workers, heavy_clients, duration):
+    from utils import metrics
+    from utils.query_executor import configure_executor
+
+    configure_executor(workers=workers)
+    metrics.reset()
+
+    # 워커 프로세스 기동 비용은 측정에서 제외
+    client.post('/api/execute_sql/ecommerce', json={'sql': LIGHT_SQL})
+
+    stop = threading.Event()
+    heavy_done = []
+
+    def heavy_loop():
+        while not stop.is_set():
+            start = time.perf_counter()
+            r = client.post('/api/execute_sql/ecommerce', json={'sql': HEAVY_SQL, 'profile': True})
+            assert r.status_code == 200 and r.get_json()['success'], r.data[:200]
+            heavy_done.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=heavy_loop) for _ in range(heavy_clients)]
+    for t in threads:
+        t.start()
+    time.sleep(0.5)  # 무거운 쿼리가 실행 중인 상태에서 측정 시작
+
+    light = {'history': [], 'models': [], 'small_select': []}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for name, call in (
+            ('history', lambda: client.get('/api/history/ecommerce')),
+            ('models', lambda: client.get('/api/models')),
+            ('small_select', lambda: client.post('/api/execute_sql/ecommerce', json={'sql': LIGHT_SQL})),
+        ):
+            start = time.perf_counter()
+            assert call().status_code == 200
+            light[name].append(time.perf_counter() - start)
+
+    stop.set()
+    for t in threads:
+        t.join()
+
+    result = {
+        name: (round(percentile(v, 50) * 1000, 1), round(percentile(v, 95) * 1000, 1))
+        for name, v in light.items()
+    }
+    result['heavy'] = (round(percentile(heavy_done, 50) * 1000, 1), len(heavy_done))
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='쿼리 실행기 격리 벤치마크')
+    parser.add_argument('--heavy-clients', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=6)
+    parser.add_argument('--workers', type=int, default=2, help='프로세스 풀 모드의 워커 수')
+    args = parser.parse_args(argv)
+
+    use_stub_llm()
+    ensure_sample_databases()
+    from app import app
+    client = app.test_client()
+
+    print(f"🏋️ 무거운 클라이언트 {args.heavy_clients}개 (20만 행 프로파일) 실행 중 가벼운 요청 지연 (p50/p95 ms)\n")
+    print(f"{'mode':<16} {'history':>16} {'models':>16} {'small_select':>16} {'heavy p50 / 완료':>20}")
+    for label, workers in (('inline', 0), (f'process x{args.workers}', args.workers)):
+        r = run_mode(client, workers, args.heavy_clients, args.duration)
+        fmt = lambda pair: f"{pair[0]} / {pair[1]}"
+        print(f"{label:<16} {fmt(r['history']):>16} {fmt(r['models']):>16} "
+              f"{fmt(r['small_select']):>16} {fmt(r['heavy']):>20}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
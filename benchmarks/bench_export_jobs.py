@@ -0,0 +1,106 @@
+# benchmarks/bench_export_jobs.py
+
+"""
+백그라운드 내보내기 작업 벤치마크
+
+큰 결과(Orders × N배)를
+    sync : /api/export (요청 안에서 전체 결과를 받아 파일 생성)
+    job  : /api/export_jobs (워커 프로세스가 임시 파일로 스트리밍, 진행률 폴링 후 다운로드)
+로 내보내면서 첫 응답까지의 시간, 완료 시간, 웹 프로세스 최대 RSS 증가량을 비교합니다.
+같은 요청을 동시에 여러 번 보냈을 때 작업이 하나만 만들어지는지도 확인합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_export_jobs
+    python -m benchmarks.bench_export_jobs --multiplier 100 --format excel
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import ensure_sample_databases, peak_rss_mb, reset_peak_rss
+
+DB_NAME = 'ecommerce'
+
+def export_sql(multiplier):
+    return (f"WITH RECURSIVE k(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM k WHERE i < {multiplier}) "
+            f"SELECT k.i AS copy_no, o.* FROM Orders o, k")
+
+def run_sync(client, fmt, sql_query):
+    reset_peak_rss()
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    r = client.post(f'/api/export/{fmt}/{DB_NAME}', json={'sql': sql_query})
+    size = len(r.data)
+    elapsed = time.perf_counter() - start
+    assert r.status_code == 200, r.data[:200]
+    return {'first_response_s': elapsed, 'total_s': elapsed, 'bytes': size, 'rss_mb': peak_rss_mb() - before}
+
+def run_job(client, fmt, sql_query):
+    reset_peak_rss()
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    r = client.post(f'/api/export_jobs/{fmt}/{DB_NAME}', json={'sql': sql_query})
+    first_response = time.perf_counter() - start
+    assert r.status_code == 202, r.data[:200]
+    job = r.get_json()
+
+    polls = []
+    while job['status'] not in ('done', 'failed', 'cancelled'):
+        time.sleep(0.5)
+        job = client.get(f"/api/export_jobs/{job['job_id']}").get_json()
+        polls.append((job['rows_written'], job['percent'], job['eta_s']))
+    assert job['status'] == 'done', job
+
+    download = client.get(job['download_url'])
+    size = sum(len(chunk) for chunk in download.response)  # send_file 스트리밍 (메모리에 모으지 않음)
+    download.close()
+    total = time.perf_counter() - start
+    return {'first_response_s': first_response, 'total_s': total, 'bytes': size,
+            'rss_mb': peak_rss_mb() - before, 'polls': polls}
+
+def run_dedup(client, fmt, sql_query, requests):
+    def submit(_):
+        return client.post(f'/api/export_jobs/{fmt}/{DB_NAME}', json={'sql': sql_query}).get_json()
+
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        jobs = list(pool.map(submit, range(requests)))
+    job_ids = {job['job_id'] for job in jobs}
+    for job_id in job_ids:
+        client.delete(f'/api/export_jobs/{job_id}')  # 취소
+    return len(job_ids), sum(job['deduplicated'] for job in jobs)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='백그라운드 내보내기 작업 벤치마크')
+    parser.add_argument('--multiplier', type=int, default=50, help='Orders(2만 행) 반복 배수')
+    parser.add_argument('--format', choices=['csv', 'excel'], default='csv')
+    parser.add_argument('--dedup-requests', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    ensure_sample_databases()
+    from app import app
+    from utils.query_executor import start_executor
+    start_executor(wait=True)
+    client = app.test_client()
+    sql_query = export_sql(args.multiplier)
+
+    print(f"📦 {args.format} 내보내기: Orders × {args.multiplier}\n")
+    print(f"{'mode':<6} {'첫 응답(s)':>11} {'완료(s)':>9} {'MB':>8} {'웹 ΔRSS(MB)':>12}")
+    results = {}
+    for mode, run in (('job', run_job), ('sync', run_sync)):
+        r = results[mode] = run(client, args.format, sql_query)
+        print(f"{mode:<6} {r['first_response_s']:>11.3f} {r['total_s']:>9.2f} "
+              f"{r['bytes'] / 1024 / 1024:>8.1f} {r['rss_mb']:>12.1f}")
+
+    polls = results['job']['polls']
+    if polls:
+        print("\njob 진행률 (쓴 행 수, %, ETA 초): "
+              + ', '.join(f"({w}, {p}, {e})" for w, p, e in polls[:: max(1, len(polls) // 6)]))
+
+    jobs, deduplicated = run_dedup(client, args.format, sql_query, args.dedup_requests)
+    print(f"\n동시 요청 {args.dedup_requests}건 → 작업 {jobs}개 (중복 처리 {deduplicated}건)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# benchmarks/bench_hedging.py
+
+"""
+헤지 요청 벤치마크 (꼬리 지연이 있는 스텁 대상)
+
+스텁 LLM의 일부 호출을 크게 느리게 만들고(tail_rate, tail_ms),
+generate_sql_from_schema를 헤징 없이/헤징으로 호출했을 때의
+p50/p95/p99 지연 시간과 헤지 비율, 추가 호출 수를 비교합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_hedging
+    python -m benchmarks.bench_hedging --requests 500 --tail-rate 0.03 --tail-ms 2000
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import percentile, use_stub_llm
+
+SCHEMA_TEXT = "CREATE TABLE Orders (order_id INTEGER, customer_id INTEGER, total REAL);\n"
+MODEL = 'gemini-2.5-flash'
+
+def run_mode(hedge, requests, threads, warmup):
+    from utils import metrics
+    from utils.llm_hedging import hedge_status
+    from utils.query_generator import generate_sql_from_schema
+
+    metrics.reset()
+
+    def one(i):
+        start = time.perf_counter()
+        result = generate_sql_from_schema(SCHEMA_TEXT, f"질문 {i}", MODEL, hedge=hedge)
+        assert result['sql'].startswith('SELECT'), result
+        return time.perf_counter() - start
+
+    # 워밍업: 헤지 기한(주 모델 지연 백분위수)을 계산할 관측값 확보
+    for i in range(warmup):
+        generate_sql_from_schema(SCHEMA_TEXT, f"워밍업 {i}", MODEL)
+    calls_before = metrics.counter('llm.requests')
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    status = hedge_status()
+    return {
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'max_ms': round(max(latencies) * 1000, 1),
+        'wall_s': round(wall, 2),
+        'llm_calls': int(metrics.counter('llm.requests') - calls_before),
+        'hedge_rate': status['hedge_rate'] if hedge else 0.0,
+        'hedge_wins': int(metrics.counter('llm.hedge.wins.hedge')),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LLM 헤지 요청 벤치마크 (스텁 꼬리 지연)')
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=40)
+    parser.add_argument('--llm-latency-ms', type=float, default=40)
+    parser.add_argument('--llm-jitter-ms', type=float, default=20)
+    parser.add_argument('--tail-rate', type=float, default=0.05, help='느린 응답 비율')
+    parser.add_argument('--tail-ms', type=float, default=1000, help='느린 응답의 추가 지연 (밀리초)')
+    args = parser.parse_args(argv)
+
+    use_stub_llm(args.llm_latency_ms, args.llm_jitter_ms)
+    from utils.llm_stub import configure_stub
+    configure_stub(tail_rate=args.tail_rate, tail_ms=args.tail_ms)
+
+    print(f"🐢 스텁 지연 {args.llm_latency_ms:g}±{args.llm_jitter_ms:g}ms, "
+          f"{args.tail_rate:.0%} 확률로 +{args.tail_ms:g}ms, 요청 {args.requests}건\n")
+    print(f"{'mode':<10} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9} "
+          f"{'wall(s)':>8} {'calls':>6} {'hedge%':>7} {'hedge wins':>11}")
+
+    for hedge in (False, True):
+        r = run_mode(hedge, args.requests, args.threads, args.warmup)
+        print(f"{'hedged' if hedge else 'single':<10} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} "
+              f"{r['max_ms']:>9} {r['wall_s']:>8} {r['llm_calls']:>6} {r['hedge_rate']:>7.1%} {r['hedge_wins']:>11}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
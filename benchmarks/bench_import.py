@@ -0,0 +1,111 @@
+# benchmarks/bench_import.py
+
+"""
+대량 데이터 가져오기 벤치마크
+
+합성 CSV(주문 데이터)를 크기별로 만들어 utils.data_importer로 새 DB에 적재하면서
+초당 적재 행 수와 최대 RSS를 측정합니다. 파일이 커져도 최대 RSS가 거의 같아야
+스트리밍 적재(샘플 + 한 묶음만 메모리에 유지)가 제대로 동작하는 것입니다.
+비교용으로 행마다 INSERT + 커밋하는 단순 적재(row)도 앞부분 일부 행에 대해 측정합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --rows 200000 800000 --xlsx-rows 50000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.common import peak_rss_mb, reset_peak_rss
+
+HEADER = ['order_id', 'customer', 'region', 'amount', 'quantity', 'ordered_at', 'zip_code']
+
+def synthetic_rows(rows, seed=7):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield [i + 1, f'customer_{rng.randrange(50000)}', f'R{rng.randrange(20)}',
+               round(rng.uniform(1, 500), 2), rng.randrange(1, 10),
+               f'2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}', f'{rng.randrange(100000):05d}']
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(synthetic_rows(rows))
+
+def write_xlsx(path, rows):
+    import openpyxl
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('orders')
+    sheet.append(HEADER)
+    for row in synthetic_rows(rows):
+        sheet.append(row)
+    workbook.save(path)
+
+def run_import(workdir, filename, label):
+    from utils.data_importer import import_file
+
+    db_path = os.path.join(workdir, f'{label}.db')
+    reset_peak_rss()
+    before = peak_rss_mb()
+    with open(os.path.join(workdir, filename), 'rb') as stream:
+        result = import_file(db_path, stream, filename, table='orders', indexes=['customer', 'region'])
+    return result, peak_rss_mb() - before
+
+def run_row_by_row(workdir, filename, rows):
+    """비교용: 행마다 INSERT + 커밋 (기본 PRAGMA)"""
+    db_path = os.path.join(workdir, 'row_by_row.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE orders (order_id INTEGER, customer TEXT, region TEXT, amount REAL, "
+                 "quantity INTEGER, ordered_at TEXT, zip_code TEXT)")
+    conn.execute("CREATE INDEX idx_customer ON orders (customer)")
+    conn.execute("CREATE INDEX idx_region ON orders (region)")
+    start = time.perf_counter()
+    with open(os.path.join(workdir, filename), newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for i, row in enumerate(reader):
+            if i >= rows:
+                break
+            conn.execute("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return rows / elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='대량 데이터 가져오기 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 400000], help='CSV 행 수 (여러 개)')
+    parser.add_argument('--xlsx-rows', type=int, default=20000, help='XLSX 행 수 (0이면 생략)')
+    parser.add_argument('--row-by-row', type=int, default=2000, help='단순 적재 비교 행 수 (0이면 생략)')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = []
+        for rows in args.rows:
+            write_csv(os.path.join(workdir, f'orders_{rows}.csv'), rows)
+            cases.append((f'csv {rows:,}', f'orders_{rows}.csv', rows))
+        if args.xlsx_rows:
+            write_xlsx(os.path.join(workdir, f'orders_{args.xlsx_rows}.xlsx'), args.xlsx_rows)
+            cases.append((f'xlsx {args.xlsx_rows:,}', f'orders_{args.xlsx_rows}.xlsx', args.xlsx_rows))
+
+        print(f"{'file':<14} {'MB':>7} {'rows':>9} {'sec':>7} {'rows/s':>10} {'ΔRSS(MB)':>9}")
+        for label, filename, _ in cases:
+            size_mb = os.path.getsize(os.path.join(workdir, filename)) / 1024 / 1024
+            result, rss = run_import(workdir, filename, label.replace(' ', '_').replace(',', ''))
+            print(f"{label:<14} {size_mb:>7.1f} {result['rows']:>9} {result['elapsed_s']:>7.2f} "
+                  f"{result['rows_per_sec']:>10,.0f} {rss:>9.1f}")
+
+        if args.row_by_row:
+            rate = run_row_by_row(workdir, cases[0][1], args.row_by_row)
+            print(f"\n비교: 행마다 INSERT + 커밋 {args.row_by_row}행 → {rate:,.0f} rows/s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
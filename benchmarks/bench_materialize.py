@@ -0,0 +1,118 @@
+# benchmarks/bench_materialize.py
+
+"""
+히스토리 기반 자동 구체화 벤치마크
+
+임시 DB(주문 N행)에 대한 무거운 집계 쿼리를 히스토리에 여러 번 기록해 구체화 대상으로 만든 뒤
+    off : 매번 원래 DB에서 실행
+    on  : 구체화 결과에서 응답
+의 지연 시간을 비교하고, 쓰기 후 첫 요청(갱신 비용)과 갱신 이후 적중을 확인합니다.
+히스토리/구체화 DB도 임시 경로를 사용하므로 실제 데이터는 건드리지 않습니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_materialize
+    python -m benchmarks.bench_materialize --rows 500000 --requests 50
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.common import percentile
+
+DB_NAME = 'bench_orders'
+HOT_SQL = """
+SELECT region, category, COUNT(*) AS orders, ROUND(SUM(amount), 2) AS revenue, ROUND(AVG(amount), 2) AS avg_amount
+FROM orders
+GROUP BY region, category
+ORDER BY revenue DESC
+"""
+
+def build_database(path, rows):
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, region TEXT, category TEXT, amount REAL)")
+    conn.executemany(
+        "INSERT INTO orders (region, category, amount) VALUES (?, ?, ?)",
+        ((f'R{rng.randrange(20)}', f'C{rng.randrange(50)}', round(rng.uniform(1, 500), 2)) for _ in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+def use_temp_storage(workdir):
+    """히스토리/구체화 DB를 임시 폴더로 변경"""
+    import config
+    from utils import materializer, query_generator
+    from database.init_history import init_history_db
+    import database.init_history as init_history
+
+    config.HISTORY_DB = init_history.HISTORY_DB = os.path.join(workdir, 'history.db')
+    init_history_db()
+    query_generator._history_migrated = False
+    materializer.CACHE_DIR = os.path.join(workdir, 'cache')
+    materializer.CACHE_DB = os.path.join(materializer.CACHE_DIR, 'materialized.db')
+
+def timed_requests(db_path, requests):
+    from utils.materializer import execute_with_materialization
+
+    latencies, hits = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        result = execute_with_materialization(DB_NAME, db_path, HOT_SQL)
+        latencies.append(time.perf_counter() - start)
+        assert result['success'], result
+        hits += bool(result.get('materialized'))
+    return latencies, hits
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='히스토리 기반 자동 구체화 벤치마크')
+    parser.add_argument('--rows', type=int, default=300000, help='임시 DB 주문 행 수')
+    parser.add_argument('--requests', type=int, default=30)
+    args = parser.parse_args(argv)
+
+    from utils import metrics
+    from utils.materializer import configure_materializer, materializer_status, MATERIALIZE_MIN_RUNS
+    from utils.query_executor import start_executor
+    from utils.query_generator import save_to_history
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, f'{DB_NAME}.db')
+        build_database(db_path, args.rows)
+        use_temp_storage(workdir)
+        start_executor(wait=True)
+
+        # 원래 실행 시간을 재며 히스토리에 기록 → 구체화 대상이 됨
+        configure_materializer(enabled=False)
+        off, _ = timed_requests(db_path, max(args.requests, MATERIALIZE_MIN_RUNS))
+        for elapsed in off:
+            save_to_history(DB_NAME, '지역/카테고리별 매출', HOT_SQL, 1000, elapsed_ms=elapsed * 1000)
+
+        configure_materializer(enabled=True)
+        metrics.reset()
+        first, _ = timed_requests(db_path, 1)      # 최초 구체화 (원래 실행 + 저장)
+        on, hits = timed_requests(db_path, args.requests)
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO orders (region, category, amount) VALUES ('R0', 'C0', 10.0)")
+        conn.commit()
+        conn.close()
+        after_write, _ = timed_requests(db_path, 1)  # 변경 감지 → 갱신
+        again, again_hits = timed_requests(db_path, 5)
+
+        status = materializer_status(DB_NAME)
+
+    print(f"🧊 주문 {args.rows:,}행, 집계 쿼리 {args.requests}회\n")
+    print(f"{'mode':<14} {'p50(ms)':>9} {'p95(ms)':>9} {'hits':>6}")
+    print(f"{'off':<14} {percentile(off, 50) * 1000:>9.1f} {percentile(off, 95) * 1000:>9.1f} {'-':>6}")
+    print(f"{'on':<14} {percentile(on, 50) * 1000:>9.1f} {percentile(on, 95) * 1000:>9.1f} {hits:>6}")
+    print(f"\n최초 구체화 {first[0] * 1000:.1f}ms, 쓰기 후 첫 요청(갱신) {after_write[0] * 1000:.1f}ms, "
+          f"갱신 후 적중 {again_hits}/5 (p50 {percentile(again, 50) * 1000:.1f}ms)")
+    print(f"갱신 {status['refreshes']}회, 갱신 비용 p50 {status['refresh_ms_p50']}ms, 적중률 {status['hit_rate']:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# benchmarks/bench_parallel.py
+
+"""
+분할 병렬 집계 벤치마크
+
+샘플 finance DB의 Transactions를 --rows행으로 늘린 복사본을 임시 폴더에 만들고
+분해 가능한 집계 쿼리를
+    serial   : sqlite3로 그대로 실행
+    parallel : rowid 구간으로 나눠 워커 프로세스에서 부분 집계 후 합침
+로 실행해 지연 시간과 결과 일치 여부를 비교합니다.
+분할 실행은 직렬 실행과 비트 단위로 같은 결과만 반환하므로 금액은 정수(센트)로 바꿔 합산하고,
+REAL 컬럼을 그대로 합산하는 쿼리(real_sum)는 직렬로 되돌아가는지(fallback) 확인합니다.
+
+워커 수만큼 CPU 코어가 있어야 속도 향상이 나타납니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_parallel
+    python -m benchmarks.bench_parallel --rows 5000000 --workers 4 --trials 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_approximate import build_database, run_exact
+from benchmarks.common import ensure_sample_databases, percentile
+
+CENTS = 'CAST(amount * 100 AS INTEGER)'
+
+QUERIES = {
+    'by_account': f"SELECT account_id, SUM({CENTS}) AS total, COUNT(*) AS cnt FROM Transactions GROUP BY account_id",
+    'by_type_vendor': ("SELECT a.account_type, t.vendor, SUM(CAST(t.amount * 100 AS INTEGER)) AS total, "
+                       "AVG(CAST(t.amount * 100 AS INTEGER)) AS avg_cents "
+                       "FROM Transactions t JOIN Accounts a ON t.account_id = a.account_id "
+                       "GROUP BY 1, 2 ORDER BY total DESC LIMIT 20"),
+    'monthly_filtered': ("SELECT substr(transaction_date, 1, 7) AS month, COUNT(*) AS cnt, MAX(amount) AS max_amount "
+                         "FROM Transactions WHERE amount > 100000 GROUP BY month HAVING cnt > 10"),
+    'overall': f"SELECT COUNT(*), SUM({CENTS}), MIN(transaction_date), MAX(transaction_date) FROM Transactions",
+    'real_sum': "SELECT account_id, SUM(amount) AS total FROM Transactions GROUP BY account_id",
+}
+
+def run_parallel(path, sql_query):
+    from utils.parallel_aggregate import execute_parallel
+
+    start = time.perf_counter()
+    result = execute_parallel(path, sql_query, timeout=600)
+    elapsed = time.perf_counter() - start
+    if result is None:
+        return elapsed, None  # 분할 실행 대상이 아님 (서비스에서는 직렬로 실행)
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return elapsed, result
+
+def compare(exact_rows, result):
+    """'exact' | 'MISMATCH' | 'fallback'"""
+    if result is None:
+        return 'fallback'
+    return 'exact' if [tuple(r) for r in result['rows']] == [tuple(r) for r in exact_rows] else 'MISMATCH'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='분할 병렬 집계 벤치마크')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Transactions 행 수')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help='워커 프로세스 수')
+    parser.add_argument('--trials', type=int, default=3, help='쿼리/방식별 반복 횟수')
+    args = parser.parse_args(argv)
+
+    from utils.parallel_aggregate import configure_parallel
+
+    ensure_sample_databases()
+    configure_parallel(workers=max(args.workers, 2))
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"📦 Transactions {args.rows:,}행 DB 생성 중...")
+        path, total = build_database(workdir, args.rows)
+        print(f"⚡ 분할 병렬 집계 ({total:,}행, 워커 {max(args.workers, 2)}개, CPU {os.cpu_count()}개, {args.trials}회)\n")
+        print(f"{'query':<18} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8} {'result':>9}")
+
+        # 첫 실행은 워커 프로세스 기동 비용이 포함되므로 측정에서 제외
+        run_parallel(path, QUERIES['overall'])
+
+        for label, sql_query in QUERIES.items():
+            serial_times, parallel_times = [], []
+            for _ in range(args.trials):
+                elapsed, _, exact_rows = run_exact(path, sql_query)
+                serial_times.append(elapsed)
+                elapsed, result = run_parallel(path, sql_query)
+                parallel_times.append(elapsed)
+            serial_p50, parallel_p50 = percentile(serial_times, 50), percentile(parallel_times, 50)
+            speedup = f"{serial_p50 / parallel_p50:>7.2f}x" if result is not None else f"{'-':>8}"
+            print(f"{label:<18} {serial_p50 * 1000:>10.1f} {parallel_p50 * 1000:>12.1f} "
+                  f"{speedup} {compare(exact_rows, result):>9}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/bench_rate_limit.py
+
+"""
+LLM 제공자 레이어 벤치마크 (할당량이 있는 스텁 대상)
+
+스텁 LLM에 서버 측 할당량(윈도우당 요청 수)을 걸고, 동시 요청을 보내
+세 가지 클라이언트 전략의 성공률/처리량/지연 시간을 비교합니다.
+    naive       : 속도 제한 없음, 재시도 없음 (기존 동작)
+    retry_only  : 지수 백오프 재시도만
+    rate_limited: 토큰 버킷 속도 제한 + 재시도
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_rate_limit
+    python -m benchmarks.bench_rate_limit --quota 60 --window 6 --requests 150
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import percentile, use_stub_llm
+
+PROMPT = "<사용자 질문>\n벤치마크\nCREATE TABLE Orders (order_id INTEGER);"
+MODEL = 'gemini-2.0-flash-lite'
+
+STRATEGIES = {
+    'naive': {'rate_limit_enabled': False, 'max_retries': 0},
+    'retry_only': {'rate_limit_enabled': False, 'max_retries': 3},
+    'rate_limited': {'rate_limit_enabled': True, 'max_retries': 3},
+}
+
+def run_strategy(name, requests, threads, quota, window, headroom):
+    from utils import metrics
+    from utils.gemini_client import ask_gemini
+    from utils.llm_provider import LLMError, configure_provider
+    from utils.llm_stub import configure_stub
+
+    # 할당량(quota / window초)을 분당 한도로 환산, headroom 비율만큼 여유
+    rpm = int(quota * 60 / window * headroom)
+    configure_provider(rpm=rpm, tpm=10**9, burst_seconds=1, **STRATEGIES[name])
+    configure_stub(quota_rpm=quota, quota_window_s=window)
+    metrics.reset()
+
+    outcomes = Counter()
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            ask_gemini(PROMPT, model_name=MODEL)
+            outcomes['ok'] += 1
+            latencies.append(time.perf_counter() - start)
+        except LLMError as e:
+            outcomes[e.error_type] += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    return {
+        'ok': outcomes['ok'],
+        'failed': requests - outcomes['ok'],
+        'errors': {k: v for k, v in outcomes.items() if k != 'ok'},
+        'upstream_calls': int(metrics.counter('llm.requests')),
+        'retries': int(metrics.counter('llm.retries')),
+        'wall_s': round(wall, 2),
+        'goodput_rps': round(outcomes['ok'] / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LLM 속도 제한/재시도 벤치마크 (스텁 할당량)')
+    parser.add_argument('--requests', type=int, default=150)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--quota', type=int, default=60, help='스텁 윈도우당 허용 요청 수')
+    parser.add_argument('--window', type=float, default=6, help='스텁 할당량 윈도우 (초)')
+    parser.add_argument('--headroom', type=float, default=0.95, help='클라이언트 한도 = 할당량 × headroom')
+    parser.add_argument('--llm-latency-ms', type=float, default=20)
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES))
+    args = parser.parse_args(argv)
+
+    use_stub_llm(args.llm_latency_ms)
+    print(f"🚦 스텁 할당량 {args.quota}건/{args.window:g}초, 요청 {args.requests}건, 스레드 {args.threads}개\n")
+    print(f"{'strategy':<14} {'ok':>5} {'failed':>7} {'calls':>6} {'retries':>8} {'wall(s)':>8} {'ok/s':>7} {'p50(ms)':>9} {'p95(ms)':>9}  errors")
+
+    for name in args.strategies:
+        # 이전 전략의 할당량 사용분이 남지 않도록 윈도우만큼 대기
+        time.sleep(0 if name == args.strategies[0] else args.window)
+        r = run_strategy(name, args.requests, args.threads, args.quota, args.window, args.headroom)
+        print(f"{name:<14} {r['ok']:>5} {r['failed']:>7} {r['upstream_calls']:>6} {r['retries']:>8} "
+              f"{r['wall_s']:>8} {r['goodput_rps']:>7} {r['p50_ms']:>9} {r['p95_ms']:>9}  {r['errors']}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# benchmarks/bench_tuning.py
+
+"""
+SQLite 튜닝 프로필 벤치마크 (샘플 ecommerce / finance 워크로드)
+
+샘플 DB를 임시 폴더에 두 벌 복사해
+    default : sqlite3 기본 설정 (rollback 저널, 기본 캐시, mmap 없음)
+    tuned   : utils.sqlite_tuning.connect (WAL, mmap, 캐시) + run_optimize(PRAGMA optimize)
+로 서비스와 같이 요청마다 연결을 열어 대표 쿼리를 실행하고 지연 시간을 비교합니다.
+쿼리 히스토리 저장(요청마다 INSERT + 커밋)과 쓰기 중 읽기 지연도 함께 측정합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_tuning
+    python -m benchmarks.bench_tuning --iterations 300
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import ensure_sample_databases, percentile
+
+WORKLOADS = {
+    'ecommerce': {
+        'user_orders': "SELECT o.* FROM Orders o WHERE o.user_id = 42",
+        'revenue_by_tier': ("SELECT u.tier, COUNT(*), SUM(o.quantity * p.price) FROM Orders o "
+                            "JOIN Users u ON o.user_id = u.user_id "
+                            "JOIN Products p ON o.product_id = p.product_id GROUP BY u.tier"),
+        'top_products': ("SELECT p.product_name, SUM(o.quantity) AS qty FROM Orders o "
+                         "JOIN Products p ON o.product_id = p.product_id GROUP BY p.product_id "
+                         "ORDER BY qty DESC LIMIT 10"),
+    },
+    'finance': {
+        'account_txns': "SELECT * FROM Transactions WHERE account_id = 3 ORDER BY transaction_date DESC LIMIT 50",
+        'amount_by_type': ("SELECT a.account_type, t.vendor, SUM(t.amount) FROM Transactions t "
+                            "JOIN Accounts a ON t.account_id = a.account_id GROUP BY 1, 2"),
+        'monthly': ("SELECT substr(transaction_date, 1, 7) AS month, SUM(amount) FROM Transactions "
+                    "GROUP BY month ORDER BY month"),
+    },
+}
+
+CHUNK = 20
+
+HISTORY_SCHEMA = '''
+    CREATE TABLE query_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, db_name TEXT NOT NULL, question TEXT NOT NULL,
+        sql_query TEXT NOT NULL, executed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        is_bookmarked INTEGER DEFAULT 0, result_rows INTEGER DEFAULT 0, elapsed_ms REAL
+    )
+'''
+
+def prepare(workdir, mode):
+    """샘플 DB 복사본 (둘 다 샘플 DB의 sqlite_stat1 통계 유지, tuned는 프로필 적용 후 optimize)"""
+    from config import DATABASE_DIR
+    from utils.sqlite_tuning import connect, run_optimize
+
+    os.makedirs(os.path.join(workdir, mode))
+    paths = {}
+    for name in WORKLOADS:
+        path = paths[name] = os.path.join(workdir, mode, f'{name}.db')
+        shutil.copy(os.path.join(DATABASE_DIR, f'{name}.db'), path)
+        if mode == 'tuned':
+            connect(path).close()  # WAL 전환
+            run_optimize(path)
+
+    paths['query_history'] = os.path.join(workdir, mode, 'query_history.db')
+    conn = sqlite3.connect(paths['query_history'])
+    conn.execute(HISTORY_SCHEMA)
+    conn.close()
+    return paths
+
+def opener(mode):
+    if mode == 'tuned':
+        from utils.sqlite_tuning import connect
+        return connect
+    return lambda path, readonly=False, **kwargs: sqlite3.connect(path, **kwargs)
+
+def run_reads(open_conn, path, sql_query, iterations):
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn = open_conn(path, readonly=True)
+        conn.execute(sql_query).fetchall()
+        conn.close()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_history_writes(open_conn, path, iterations):
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        conn = open_conn(path)
+        conn.execute("INSERT INTO query_history (db_name, question, sql_query, result_rows) VALUES (?, ?, ?, ?)",
+                     ('ecommerce', f'질문 {i}', 'SELECT 1', 1))
+        conn.commit()
+        conn.close()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_reads_during_writes(open_conn, db_path, sql_query, iterations):
+    """다른 스레드가 같은 DB에 계속 쓰는 동안의 읽기 지연 (rollback 저널은 커밋 중 읽기가 막힘)"""
+    stop = threading.Event()
+
+    def writer():
+        conn = open_conn(db_path, timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS bench_writes (id INTEGER PRIMARY KEY, payload TEXT)")
+        while not stop.is_set():
+            conn.executemany("INSERT INTO bench_writes (payload) VALUES (?)", [('x' * 200,)] * 200)
+            conn.commit()
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.1)
+    latencies, errors = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            conn = open_conn(db_path, readonly=True, timeout=30)
+            conn.execute(sql_query).fetchall()
+            conn.close()
+        except sqlite3.OperationalError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    stop.set()
+    thread.join()
+    return latencies, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite 튜닝 프로필 벤치마크')
+    parser.add_argument('--iterations', type=int, default=200, help='워크로드별 반복 횟수 (20의 배수)')
+    args = parser.parse_args(argv)
+
+    ensure_sample_databases()
+    modes = ('default', 'tuned')
+    results = {mode: {} for mode in modes}
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = {mode: prepare(workdir, mode) for mode in modes}
+        # 읽기는 두 모드를 CHUNK회씩 번갈아 실행 (한쪽만 CPU 잡음을 받지 않도록)
+        for db_name, queries in WORKLOADS.items():
+            for label, sql_query in queries.items():
+                for mode in modes:
+                    run_reads(opener(mode), paths[mode][db_name], sql_query, 5)  # 워밍업
+                for _ in range(0, args.iterations, CHUNK):
+                    for mode in modes:
+                        results[mode].setdefault(f'{db_name}.{label}', []).extend(
+                            run_reads(opener(mode), paths[mode][db_name], sql_query, CHUNK))
+        for mode in modes:
+            open_conn, rows, mode_paths = opener(mode), results[mode], paths[mode]
+            rows['history.insert'] = run_history_writes(open_conn, mode_paths['query_history'], args.iterations)
+            rows['ecommerce.read_during_write'], errors = run_reads_during_writes(
+                open_conn, mode_paths['ecommerce'], WORKLOADS['ecommerce']['revenue_by_tier'], args.iterations)
+            if errors:
+                print(f"⚠️ {mode}: 쓰기 중 읽기 실패 {errors}건")
+
+    print(f"🔧 SQLite 튜닝 프로필 (요청마다 연결, {args.iterations}회)\n")
+    print(f"{'workload':<32} {'default p50':>12} {'tuned p50':>10} {'default p95':>12} {'tuned p95':>10}")
+    for name in results['default']:
+        d, t = results['default'][name], results['tuned'][name]
+        print(f"{name:<32} {percentile(d, 50) * 1000:>12.3f} {percentile(t, 50) * 1000:>10.3f} "
+              f"{percentile(d, 95) * 1000:>12.3f} {percentile(t, 95) * 1000:>10.3f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# benchmarks/common.py
+
+"""
+벤치마크 공통 유틸리티 (통계, 메모리 측정, 베이스라인 저장/비교)
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+def use_stub_llm(latency_ms=0, jitter_ms=0):
+    """
+    Gemini 대신 로컬 스텁 LLM을 사용하도록 설정
+    (utils.gemini_client import 전에 호출해야 함)
+    """
+    os.environ['LLM_PROVIDER'] = 'stub'
+    os.environ['LLM_STUB_LATENCY_MS'] = str(latency_ms)
+    os.environ['LLM_STUB_JITTER_MS'] = str(jitter_ms)
+
+    from utils.llm_stub import configure_stub
+    configure_stub(latency_ms=latency_ms, jitter_ms=jitter_ms)
+
+def ensure_sample_databases():
+    """init_dbs.py / init_history.py 결과물이 없으면 생성"""
+    from config import DATABASE_DIR, HISTORY_DB
+
+    sample_files = ['ecommerce.db', 'hr_management.db', 'finance.db']
+    if not all(os.path.exists(os.path.join(DATABASE_DIR, f)) for f in sample_files):
+        from database import init_dbs
+        init_dbs.create_ecommerce_db()
+        init_dbs.create_hr_db()
+        init_dbs.create_finance_db()
+
+    if not os.path.exists(HISTORY_DB):
+        from database.init_history import init_history_db
+        init_history_db()
+
+def percentile(values, p):
+    """선형 보간 백분위수 (p: 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+def summarize(latencies, wall_seconds):
+    """
+    지연 시간 목록(초)을 요약 통계로 변환
+
+    Returns:
+        dict: count, p50/p95/p99 (ms), mean (ms), throughput (req/s)
+    """
+    count = len(latencies)
+    return {
+        'count': count,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        'throughput_rps': round(count / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+def reset_peak_rss():
+    """
+    프로세스 최대 RSS 기록 초기화 (Linux /proc/self/clear_refs 지원 시)
+
+    Returns:
+        bool: 초기화 성공 여부 (실패 시 peak_rss_mb는 프로세스 전체 최대값)
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """현재까지의 최대 RSS (MB)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        pass
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(maxrss / divisor, 2)
+
+def measure(fn, iterations, warmup=1):
+    """
+    fn을 반복 실행하며 지연 시간/처리량/최대 RSS 측정
+
+    Args:
+        fn: 인자 없는 호출 대상 (실패 시 예외 발생)
+        iterations: 측정 반복 횟수
+        warmup: 측정 전 워밍업 횟수
+
+    Returns:
+        dict: summarize() 결과 + peak_rss_mb
+    """
+    for _ in range(warmup):
+        fn()
+
+    reset_peak_rss()
+    latencies = []
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - wall_start
+
+    stats = summarize(latencies, wall)
+    stats['peak_rss_mb'] = peak_rss_mb()
+    return stats
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+def load_baseline(name):
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(name, results, meta=None):
+    """벤치마크 결과를 베이스라인으로 저장"""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    payload = {
+        'meta': meta or {},
+        'results': results,
+    }
+    with open(baseline_path(name), 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"💾 베이스라인 저장: {baseline_path(name)}")
+
+def compare_to_baseline(name, results, tolerance=0.2, metric='p95_ms'):
+    """
+    베이스라인 대비 회귀 여부 출력
+
+    Args:
+        tolerance: 허용 악화 비율 (0.2 = 20%)
+        metric: 비교 지표
+
+    Returns:
+        list: 회귀가 감지된 항목 이름 리스트
+    """
+    baseline = load_baseline(name)
+    if baseline is None:
+        print(f"ℹ️  베이스라인 없음: {baseline_path(name)} (--save-baseline으로 생성)")
+        return []
+
+    regressions = []
+    print(f"\n📈 베이스라인 비교 ({metric}, 허용치 +{tolerance:.0%})")
+    for key, stats in results.items():
+        base = baseline['results'].get(key)
+        if not base or not base.get(metric):
+            print(f"   {key:<40} (베이스라인 없음)")
+            continue
+        ratio = stats[metric] / base[metric]
+        flag = '❌ REGRESSION' if ratio > 1 + tolerance else '✅'
+        if ratio > 1 + tolerance:
+            regressions.append(key)
+        print(f"   {key:<40} {base[metric]:>10.2f} → {stats[metric]:>10.2f}  ({ratio - 1:+.1%}) {flag}")
+    return regressions
+
+def print_table(results):
+    """결과 표 출력"""
+    header = f"{'endpoint':<40} {'n':>5} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10} {'req/s':>9} {'RSS(MB)':>9}"
+    print(header)
+    print('-' * len(header))
+    for key, s in results.items():
+        print(f"{key:<40} {s['count']:>5} {s['p50_ms']:>10.2f} {s['p95_ms']:>10.2f} "
+              f"{s['p99_ms']:>10.2f} {s['throughput_rps']:>9.1f} {s.get('peak_rss_mb', 0):>9.1f}")
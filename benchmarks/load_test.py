@@ -0,0 +1,447 @@
+# benchmarks/load_test.py
+
+"""
+동시 사용자 부하 테스트 (스텁 LLM)
+
+별도 프로세스로 서버를 띄우고(또는 --url로 이미 떠 있는 서버 지정) 가상 사용자들이
+대시보드 사용 흐름을 섞어 반복하면서 동시 사용자 수를 단계별로 늘립니다.
+
+    bootstrap  : 대시보드 페이지 + 스키마 분석/추천 질문/히스토리/모델 목록
+    generate   : SQL 생성 → 실행 → 히스토리 새로고침
+    history    : 히스토리 조회 → 지난 쿼리 다시 실행
+    bookmark   : 히스토리 조회 → 북마크 토글 ([load] 질문만)
+    export     : 내보내기 작업 등록 → 진행률 폴링 → 다운로드
+
+단계마다 라우트별 처리량/오류율/지연 백분위수와, /api/metrics의 공유 자원 지표
+(shared.*: load_databases 스캔, schema_cache.json 읽기/쓰기, query_history.db 읽기/쓰기)
+증가량으로 요청당 자원 사용 시간을 출력하고, 지연이 무너지기 시작한 단계와
+그때 호출당 시간이 가장 많이 늘어난 공유 자원을 요약합니다.
+
+쿼리 히스토리에는 '[load]'로 시작하는 질문이 기록되며, 직접 띄운 서버로 실행한 경우
+끝난 뒤 삭제합니다 (--keep-history면 유지, --url로 지정한 외부 서버의 기록은 삭제하지 않음).
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --stages 1,8,32,64 --stage-seconds 20 --llm-latency-ms 800
+    python -m benchmarks.load_test --server asgi           # uvicorn asgi:app
+    python -m benchmarks.load_test --url http://localhost:5000
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.bench_api import EXECUTE_CASES, QUESTIONS
+from benchmarks.common import ROOT_DIR, ensure_sample_databases, percentile, use_stub_llm
+
+DB_NAMES = ['ecommerce', 'hr_management', 'finance']
+
+# 세션 종류별 비중
+SESSION_WEIGHTS = {
+    'bootstrap': 2,
+    'generate': 4,
+    'history': 2,
+    'bookmark': 1,
+    'export': 1,
+}
+
+# 내보내기 세션이 내보낼 쿼리 (DB별 가장 큰 결과)
+EXPORT_SQL = {db: cases.get('wide') or cases['aggregate'] for db, cases in EXECUTE_CASES.items()}
+
+# 내보내기 진행률 폴링 간격 (초, 대시보드와 동일)
+EXPORT_POLL_S = 1.0
+
+# 지연 붕괴 판단: 사용자당 처리량이 첫 단계의 이 비율 미만으로 떨어지거나 (가상 사용자는 응답을 받아야
+# 다음 요청을 보내므로, 사용자당 처리량 감소 = 응답 시간 증가) 오류율이 이 값을 넘으면
+KNEE_EFFICIENCY = 0.7
+KNEE_ERROR_RATE = 0.01
+
+# ========== 서버 ==========
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def serve(args):
+    """--serve: 측정 대상 서버 실행 (부하 생성기와 다른 프로세스)"""
+    use_stub_llm(args.llm_latency_ms, args.llm_jitter_ms)
+    ensure_sample_databases()
+    if args.server == 'asgi':
+        import uvicorn
+        uvicorn.run('asgi:app', host='127.0.0.1', port=args.port, log_level='warning')
+        return
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app import app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    make_server('127.0.0.1', args.port, app, threaded=True, request_handler=QuietHandler).serve_forever()
+
+def start_server(args, log_file):
+    """
+    서버 프로세스 시작 후 응답할 때까지 대기
+
+    Returns:
+        (subprocess.Popen, base_url)
+    """
+    port = _free_port()
+    command = [sys.executable, '-m', 'benchmarks.load_test', '--serve', '--port', str(port),
+               '--server', args.server, '--llm-latency-ms', str(args.llm_latency_ms),
+               '--llm-jitter-ms', str(args.llm_jitter_ms)]
+    process = subprocess.Popen(command, cwd=ROOT_DIR, stdout=log_file, stderr=subprocess.STDOUT)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'서버 시작 실패 (로그: {log_file.name})')
+        try:
+            if _request(base_url, 'GET', '/api/models', timeout=2)[0] == 200:
+                return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'서버가 60초 안에 응답하지 않음 (로그: {log_file.name})')
+
+# ========== HTTP ==========
+
+def _request(base_url, method, path, payload=None, timeout=30):
+    """
+    요청 한 번 (연결도 요청마다 새로 열어 브라우저 탭 여러 개와 비슷하게)
+
+    Returns:
+        (status, body bytes)
+    """
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+    try:
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+class Recorder:
+    """라우트별 지연 시간/오류 기록 (가상 사용자 스레드 공용)"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, route, elapsed, error=None):
+        with self._lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+            if error is not None:
+                self.errors[route] = self.errors.get(route, 0) + 1
+                self.error_samples.setdefault(route, error)
+
+class VirtualUser:
+    """세션을 반복하는 가상 사용자 하나"""
+
+    def __init__(self, base_url, recorder, seed, timeout):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+
+    def call(self, method, route, path, payload=None, expect_json=True):
+        """
+        요청 후 기록 (route: 집계용 라우트 이름)
+
+        Returns:
+            dict | bytes | None: JSON 응답 (expect_json=False면 본문), 실패 시 None
+        """
+        start = time.perf_counter()
+        error, result = None, None
+        try:
+            status, body = _request(self.base_url, method, path, payload, self.timeout)
+            if status >= 400:
+                error = f'HTTP {status}: {body[:120]!r}'
+            elif expect_json:
+                result = json.loads(body)
+                if result.get('success') is False:
+                    error = str(result.get('message') or result.get('error'))[:120]
+                    result = None
+            else:
+                result = body
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            error = f'{type(e).__name__}: {e}'
+        self.recorder.add(f'{method} {route}', time.perf_counter() - start, error)
+        return result
+
+    # ---------- 세션 ----------
+
+    def bootstrap(self, db):
+        self.call('GET', '/dashboard/<db>', f'/dashboard/{db}', expect_json=False)
+        self.call('GET', '/api/analyze_schema/<db>', f'/api/analyze_schema/{db}')
+        self.call('GET', '/api/suggest_queries/<db>', f'/api/suggest_queries/{db}')
+        self.call('GET', '/api/history/<db>', f'/api/history/{db}')
+        self.call('GET', '/api/models', '/api/models')
+
+    def generate(self, db):
+        question = f'[load] {self.rng.choice(QUESTIONS)}'
+        generated = self.call('POST', '/api/generate_sql/<db>', f'/api/generate_sql/{db}',
+                              {'question': question})
+        if generated:
+            self.call('POST', '/api/execute_sql/<db>', f'/api/execute_sql/{db}',
+                      {'sql': generated['sql'], 'question': question})
+            self.call('GET', '/api/history/<db>', f'/api/history/{db}')
+
+    def history(self, db):
+        history = self.call('GET', '/api/history/<db>', f'/api/history/{db}')
+        entries = [item for item in (history or {}).get('history', []) if item['sql_query']]
+        if entries:
+            item = self.rng.choice(entries[:10])
+            self.call('POST', '/api/execute_sql/<db>', f'/api/execute_sql/{db}',
+                      {'sql': item['sql_query'], 'question': item['question']})
+
+    def bookmark(self, db):
+        history = self.call('GET', '/api/history/<db>', f'/api/history/{db}')
+        entries = [item for item in (history or {}).get('history', []) if item['question'].startswith('[load]')]
+        if entries:
+            item = self.rng.choice(entries[:10])
+            self.call('POST', '/api/bookmark/<id>', f"/api/bookmark/{item['id']}")
+
+    def export(self, db):
+        if db not in EXPORT_SQL:
+            return
+        job = self.call('POST', '/api/export_jobs/<format>/<db>', f'/api/export_jobs/csv/{db}',
+                        {'sql': EXPORT_SQL[db]})
+        while job and job['status'] not in ('done', 'failed', 'cancelled'):
+            time.sleep(EXPORT_POLL_S)
+            job = self.call('GET', '/api/export_jobs/<id>', f"/api/export_jobs/{job['job_id']}")
+        if job and job['status'] == 'done':
+            self.call('GET', '/api/export_jobs/<id>/download', job['download_url'], expect_json=False)
+
+    def run(self, deadline, db_names, think_s):
+        sessions = list(SESSION_WEIGHTS)
+        weights = [SESSION_WEIGHTS[name] for name in sessions]
+        while time.perf_counter() < deadline:
+            session = self.rng.choices(sessions, weights)[0]
+            getattr(self, session)(self.rng.choice(db_names))
+            if think_s:
+                time.sleep(self.rng.uniform(0.5, 1.5) * think_s)
+
+# ========== 단계 실행 / 집계 ==========
+
+def shared_counters(base_url):
+    """서버의 shared.* 누적 카운터 (지표가 없는 서버면 빈 dict)"""
+    try:
+        status, body = _request(base_url, 'GET', '/api/metrics')
+        counters = json.loads(body)['metrics']['counters'] if status == 200 else {}
+    except (OSError, ValueError, KeyError):
+        return {}
+    return {name: value for name, value in counters.items() if name.startswith('shared.')}
+
+def run_stage(base_url, users, seconds, db_names, think_s, timeout, seed):
+    recorder = Recorder()
+    before = shared_counters(base_url)
+    start = time.perf_counter()
+    deadline = start + seconds
+    threads = [
+        threading.Thread(target=VirtualUser(base_url, recorder, seed * 1000 + i, timeout).run,
+                         args=(deadline, db_names, think_s), daemon=True)
+        for i in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start  # 마감 시각에 진행 중이던 세션이 끝날 때까지 포함
+    after = shared_counters(base_url)
+    return summarize_stage(users, recorder, wall, before, after)
+
+def summarize_stage(users, recorder, wall, before, after):
+    all_latencies = [x for values in recorder.latencies.values() for x in values]
+    requests = len(all_latencies)
+    errors = sum(recorder.errors.values())
+    routes = {
+        route: {
+            'count': len(values),
+            'error_rate': recorder.errors.get(route, 0) / len(values),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'rps': len(values) / wall,
+        }
+        for route, values in sorted(recorder.latencies.items())
+    }
+
+    resources = {}
+    for name in sorted(after):
+        if not name.endswith('.calls'):
+            continue
+        resource = name[len('shared.'):-len('.calls')]
+        calls = after[name] - before.get(name, 0)
+        seconds = after.get(f'shared.{resource}.seconds', 0) - before.get(f'shared.{resource}.seconds', 0)
+        failed = after.get(f'shared.{resource}.errors', 0) - before.get(f'shared.{resource}.errors', 0)
+        resources[resource] = {
+            'calls_per_request': calls / requests if requests else 0.0,
+            'ms_per_call': seconds / calls * 1000 if calls else 0.0,
+            'ms_per_request': seconds / requests * 1000 if requests else 0.0,
+            'errors': int(failed),
+        }
+
+    return {
+        'users': users,
+        'requests': requests,
+        'rps': requests / wall,
+        'error_rate': errors / requests if requests else 0.0,
+        'p50_ms': percentile(all_latencies, 50) * 1000,
+        'p95_ms': percentile(all_latencies, 95) * 1000,
+        'p99_ms': percentile(all_latencies, 99) * 1000,
+        'routes': routes,
+        'resources': resources,
+        'error_samples': recorder.error_samples,
+    }
+
+def print_stage(stage):
+    print(f"\n👥 동시 사용자 {stage['users']}: {stage['rps']:.1f} req/s, 오류 {stage['error_rate']:.1%}, "
+          f"p50 {stage['p50_ms']:.0f}ms / p95 {stage['p95_ms']:.0f}ms / p99 {stage['p99_ms']:.0f}ms")
+    print(f"   {'route':<38} {'n':>6} {'req/s':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, r in stage['routes'].items():
+        print(f"   {route:<38} {r['count']:>6} {r['rps']:>7.1f} {r['error_rate'] * 100:>6.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+    if stage['resources']:
+        print(f"   {'공유 자원':<34} {'호출/요청':>10} {'ms/호출':>9} {'ms/요청':>9} {'오류':>6}")
+        for name, r in stage['resources'].items():
+            print(f"   {name:<38} {r['calls_per_request']:>10.2f} {r['ms_per_call']:>9.3f} "
+                  f"{r['ms_per_request']:>9.3f} {r['errors']:>6}")
+    for route, sample in stage['error_samples'].items():
+        print(f"   ⚠️ {route}: {sample}")
+
+def find_knee(stages):
+    """
+    지연이 무너지기 시작한 단계 (사용자당 처리량이 크게 줄거나 오류가 나기 시작)
+
+    Returns:
+        dict | None
+    """
+    base = stages[0]['rps'] / stages[0]['users']
+    for stage in stages[1:]:
+        if stage['error_rate'] > KNEE_ERROR_RATE or stage['rps'] / stage['users'] < base * KNEE_EFFICIENCY:
+            return stage
+    return None
+
+def print_summary(stages):
+    print("\n📊 단계별 요약")
+    print(f"   {'users':>6} {'req/s':>8} {'req/s/user':>11} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for s in stages:
+        print(f"   {s['users']:>6} {s['rps']:>8.1f} {s['rps'] / s['users']:>11.2f} {s['error_rate'] * 100:>6.1f} "
+              f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+
+    peak = max(stages, key=lambda s: s['rps'])
+    print(f"\n   최대 처리량: {peak['rps']:.1f} req/s (동시 사용자 {peak['users']})")
+    knee = find_knee(stages)
+    if knee is None:
+        print("   지연 붕괴 없음 (더 높은 단계로 다시 실행해 보세요)")
+        knee = stages[-1]
+    else:
+        print(f"   지연 붕괴 시작: 동시 사용자 {knee['users']} (p50 {knee['p50_ms']:.0f}ms, "
+              f"p95 {knee['p95_ms']:.0f}ms, 오류 {knee['error_rate']:.1%})")
+
+    first = stages[0]['resources']
+    growth = sorted(
+        ((r['ms_per_call'] / first[name]['ms_per_call'], name, r)
+         for name, r in knee['resources'].items()
+         if first.get(name, {}).get('ms_per_call') and r['ms_per_call']),
+        reverse=True,
+    )
+    if growth:
+        print(f"   공유 자원 호출당 시간 증가 (동시 사용자 {stages[0]['users']} → {knee['users']}):")
+        for ratio, name, r in growth:
+            print(f"     {name:<24} ×{ratio:>6.1f}  ({r['ms_per_call']:.2f} ms/호출, 요청당 {r['ms_per_request']:.2f} ms, "
+                  f"오류 {r['errors']})")
+
+def warm_up(base_url, db_names, timeout):
+    """워커 프로세스/스키마 캐시/컬럼 통계 준비 (측정 제외)"""
+    user = VirtualUser(base_url, Recorder(), 0, timeout)
+    for db in db_names:
+        user.bootstrap(db)
+        user.generate(db)
+
+def cleanup_history():
+    """부하 테스트가 남긴 '[load]' 히스토리 삭제 (북마크 포함)"""
+    from config import HISTORY_DB
+
+    conn = sqlite3.connect(HISTORY_DB, timeout=30)
+    try:
+        with conn:
+            deleted = conn.execute(
+                "DELETE FROM query_history WHERE substr(question, 1, 6) = '[load]'"
+            ).rowcount
+    finally:
+        conn.close()
+    print(f"🧹 부하 테스트 히스토리 {deleted}건 삭제")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='동시 사용자 부하 테스트')
+    parser.add_argument('--stages', default='1,2,4,8,16,32', help='단계별 동시 사용자 수 (쉼표 구분)')
+    parser.add_argument('--stage-seconds', type=float, default=15)
+    parser.add_argument('--think-ms', type=float, default=300, help='세션 사이 평균 대기 시간')
+    parser.add_argument('--llm-latency-ms', type=float, default=500)
+    parser.add_argument('--llm-jitter-ms', type=float, default=200)
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi',
+                        help='wsgi: werkzeug 스레드 서버, asgi: uvicorn asgi:app')
+    parser.add_argument('--url', help='이미 실행 중인 서버 주소 (지정하면 서버를 띄우지 않음)')
+    parser.add_argument('--dbs', default=','.join(DB_NAMES))
+    parser.add_argument('--timeout', type=float, default=30, help='요청 타임아웃 (초)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep-history', action='store_true', help="'[load]' 히스토리를 삭제하지 않음")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args)
+        return 0
+
+    stages = [int(n) for n in args.stages.split(',')]
+    db_names = args.dbs.split(',')
+    process = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        ensure_sample_databases()
+        with tempfile.NamedTemporaryFile('w', prefix='load_test_server_', suffix='.log', delete=False) as log_file:
+            process, base_url = start_server(args, log_file)
+
+    try:
+        print(f"🚦 부하 테스트: {base_url} ({args.server if not args.url else '외부 서버'}), "
+              f"단계 {stages}, 단계당 {args.stage_seconds:g}s, think {args.think_ms:g}ms, "
+              f"LLM 스텁 {args.llm_latency_ms:g}±{args.llm_jitter_ms:g}ms")
+        warm_up(base_url, db_names, args.timeout)
+        results = []
+        for i, users in enumerate(stages):
+            stage = run_stage(base_url, users, args.stage_seconds, db_names,
+                              args.think_ms / 1000, args.timeout, args.seed + i)
+            print_stage(stage)
+            results.append(stage)
+        print_summary(results)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+            print(f"\n서버 로그: {log_file.name}")
+            if not args.keep_history:
+                cleanup_history()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
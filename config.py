@@ -2,6 +2,7 @@
 
 import os
 import json
+from utils import metrics
 
 # 프로젝트 루트 경로
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,6 +13,10 @@ def load_databases():
     """
     database/ 폴더의 .db 파일들을 스캔하고 metadata.json과 매핑
     """
+    with metrics.timed('shared.load_databases'):
+        return _scan_databases()
+
+def _scan_databases():
     databases = {}
     
     # metadata.json 로드
@@ -1,7 +1,10 @@
 import sqlite3
 import os
 import random
-from datetime import datetime, timedelta
+import time
+import argparse
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker # pip install faker 필요
 
 # 한국어 더미 데이터 생성을 위한 Faker 설정
@@ -13,15 +16,89 @@ DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if not os.path.exists(DATABASE_DIR):
     os.makedirs(DATABASE_DIR)
 
-def create_ecommerce_db():
-    """전자상거래 DB 생성 (대용량)"""
-    db_path = os.path.join(DATABASE_DIR, 'ecommerce.db')
+# executemany 한 번에 넣을 행 수 (메모리 상한)
+BATCH_SIZE = 100_000
+
+# Faker 값 풀 최대 크기 (행마다 Faker를 호출하지 않고 풀에서 샘플링)
+POOL_SIZE = 5_000
+
+# 대량 적재용 PRAGMA (적재 중에는 저널/동기화 비활성화)
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -262144",  # 256MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA locking_mode = EXCLUSIVE",
+]
+
+def _open_for_bulk_load(db_path):
+    """기존 파일을 삭제하고 대량 적재용 PRAGMA가 적용된 연결 생성"""
     if os.path.exists(db_path):
         os.remove(db_path) # 기존 파일 삭제 후 재생성
 
     conn = sqlite3.connect(db_path)
+    for pragma in BULK_LOAD_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def _scaled(count, scale):
+    return max(1, int(count * scale))
+
+def _faker_pool(method, size, **kwargs):
+    """Faker 메서드 결과를 미리 만들어둔 값 풀"""
+    return [method(**kwargs) for _ in range(size)]
+
+def _date_pool(days_back):
+    """오늘부터 days_back일 전까지의 날짜 문자열 풀"""
+    today = date.today()
+    return [(today - timedelta(days=d)).isoformat() for d in range(days_back + 1)]
+
+def _time_pool():
+    """하루 전체 초 단위 'HH:MM:SS' 풀"""
+    return [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)]
+
+def _batches(total, batch_size=BATCH_SIZE):
+    """total개를 batch_size 단위로 나눈 크기 목록"""
+    done = 0
+    while done < total:
+        n = min(batch_size, total - done)
+        yield n
+        done += n
+
+def _bulk_insert(conn, sql, total, make_batch):
+    """
+    make_batch(n)으로 만든 행들을 배치 단위로 executemany (단일 트랜잭션)
+
+    Returns:
+        int: 삽입한 행 수
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    for n in _batches(total):
+        cursor.executemany(sql, make_batch(n))
+    conn.commit()
+    return total
+
+def _create_indexes(conn, statements):
+    """적재 완료 후 인덱스 생성 (지연 인덱스 생성)"""
+    for stmt in statements:
+        conn.execute(stmt)
+    conn.commit()
+
+def create_ecommerce_db(scale=1.0):
+    """
+    전자상거래 DB 생성 (대용량)
+
+    Args:
+        scale: 데이터 규모 배수 (1.0 = 유저 1,000명 / 주문 20,000건)
+
+    Returns:
+        int: 생성된 전체 행 수
+    """
+    db_path = os.path.join(DATABASE_DIR, 'ecommerce.db')
+    conn = _open_for_bulk_load(db_path)
     cursor = conn.cursor()
-    
+
     # 1. 테이블 생성
     cursor.execute('''
         CREATE TABLE Users (
@@ -32,7 +109,7 @@ def create_ecommerce_db():
             join_date DATE NOT NULL
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE Products (
             product_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -41,7 +118,7 @@ def create_ecommerce_db():
             price REAL NOT NULL
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE Orders (
             order_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -54,23 +131,30 @@ def create_ecommerce_db():
             FOREIGN KEY (product_id) REFERENCES Products(product_id)
         )
     ''')
-    
+
     print("🛒 전자상거래 데이터 생성 중...")
 
-    # 2. Users 데이터 생성 (1,000명)
-    users = []
+    # 2. Users 데이터 생성 (1,000명 × scale)
+    user_count = _scaled(1000, scale)
+    pool_size = min(user_count, POOL_SIZE)
+    names = _faker_pool(fake.name, pool_size)
+    emails = _faker_pool(fake.email, pool_size)
+    join_dates = _date_pool(730)
     tiers = ['Basic', 'Basic', 'Basic', 'Silver', 'Silver', 'Gold', 'VIP'] # 비율 조정
-    for _ in range(1000):
-        users.append((
-            fake.name(),
-            fake.email(),
-            random.choice(tiers),
-            fake.date_between(start_date='-2y', end_date='today')
-        ))
-    cursor.executemany('INSERT INTO Users (name, email, tier, join_date) VALUES (?, ?, ?, ?)', users)
-    print(f"   - 유저 1,000명 생성 완료")
-
-    # 3. Products 데이터 생성 (50개)
+
+    def user_batch(n):
+        return zip(
+            random.choices(names, k=n),
+            random.choices(emails, k=n),
+            random.choices(tiers, k=n),
+            random.choices(join_dates, k=n),
+        )
+
+    _bulk_insert(conn, 'INSERT INTO Users (name, email, tier, join_date) VALUES (?, ?, ?, ?)',
+                 user_count, user_batch)
+    print(f"   - 유저 {user_count:,}명 생성 완료")
+
+    # 3. Products 데이터 생성 (카테고리 고정)
     categories = {
         '전자제품': ['노트북', '스마트폰', '태블릿', '모니터', '마우스', '키보드', '헤드셋', '스마트워치', '충전기', 'USB허브'],
         '가구': ['게이밍 의자', '사무용 책상', '책장', '침대 프레임', '소파', '식탁', '조명', '서랍장'],
@@ -78,53 +162,74 @@ def create_ecommerce_db():
         '식품': ['생수 2L', '라면 1BOX', '햇반', '커피 원두', '비타민', '단백질 보충제'],
         '도서': ['파이썬 코딩', 'SQL 정석', '인공지능 개론', '소설', '에세이']
     }
-    
+
     products = []
     for cat, items in categories.items():
         for item in items:
             # 가격을 현실적으로 랜덤 생성 (천원 단위)
-            price = random.randint(10, 3000) * 1000 
+            price = random.randint(10, 3000) * 1000
             if cat == '전자제품' or cat == '가구':
                 price *= random.randint(2, 10) # 비싼 물건은 더 비싸게
-            
+
             # 제품명 조금씩 변형 (예: 고급 게이밍 의자 A)
             product_name = f"{random.choice(['고급', '보급형', '신형', '가성비', ''])} {item} {random.choice(['A', 'B', 'Pro', 'Max', ''])}".strip()
             products.append((product_name, cat, price))
-            
+
     cursor.executemany('INSERT INTO Products (product_name, category, price) VALUES (?, ?, ?)', products)
+    conn.commit()
     print(f"   - 상품 {len(products)}개 생성 완료")
 
-    # 4. Orders 데이터 생성 (20,000건)
-    orders = []
-    user_count = len(users)
-    product_count = len(products)
-    
-    for _ in range(20000):
-        user_id = random.randint(1, user_count)
-        product_id = random.randint(1, product_count)
-        quantity = random.choices([1, 2, 3, 4, 5, 10], weights=[70, 15, 5, 5, 3, 2])[0]
-        
-        # 주문 날짜: 최근 1년 이내 랜덤
-        order_date = fake.date_time_between(start_date='-1y', end_date='now')
-        status = random.choices(['Completed', 'Pending', 'Cancelled', 'Returned'], weights=[85, 5, 5, 5])[0]
-        
-        orders.append((user_id, product_id, quantity, order_date, status))
-        
-    cursor.executemany('INSERT INTO Orders (user_id, product_id, quantity, order_date, status) VALUES (?, ?, ?, ?, ?)', orders)
-    print(f"   - 주문 20,000건 생성 완료")
+    # 4. Orders 데이터 생성 (20,000건 × scale)
+    order_count = _scaled(20000, scale)
+    user_ids = range(1, user_count + 1)
+    product_ids = range(1, len(products) + 1)
+    quantities = [1, 2, 3, 4, 5, 10]
+    quantity_weights = [70, 15, 5, 5, 3, 2]
+    statuses = ['Completed', 'Pending', 'Cancelled', 'Returned']
+    status_weights = [85, 5, 5, 5]
+    # 주문 날짜: 최근 1년 이내 랜덤 (날짜 풀 + 시각 풀 조합)
+    order_days = _date_pool(365)
+    order_times = _time_pool()
+
+    def order_batch(n):
+        order_dates = [
+            f"{d} {t}"
+            for d, t in zip(random.choices(order_days, k=n), random.choices(order_times, k=n))
+        ]
+        return zip(
+            random.choices(user_ids, k=n),
+            random.choices(product_ids, k=n),
+            random.choices(quantities, weights=quantity_weights, k=n),
+            order_dates,
+            random.choices(statuses, weights=status_weights, k=n),
+        )
+
+    _bulk_insert(conn, 'INSERT INTO Orders (user_id, product_id, quantity, order_date, status) VALUES (?, ?, ?, ?, ?)',
+                 order_count, order_batch)
+    print(f"   - 주문 {order_count:,}건 생성 완료")
+
+    _create_indexes(conn, [
+        'CREATE INDEX idx_orders_user_id ON Orders(user_id)',
+        'CREATE INDEX idx_orders_product_id ON Orders(product_id)',
+    ])
 
-    conn.commit()
     conn.close()
+    return user_count + len(products) + order_count
 
-def create_hr_db():
-    """인사관리 DB 생성 (대용량)"""
-    db_path = os.path.join(DATABASE_DIR, 'hr_management.db')
-    if os.path.exists(db_path):
-        os.remove(db_path)
+def create_hr_db(scale=1.0):
+    """
+    인사관리 DB 생성 (대용량)
 
-    conn = sqlite3.connect(db_path)
+    Args:
+        scale: 데이터 규모 배수 (1.0 = 직원 300명)
+
+    Returns:
+        int: 생성된 전체 행 수
+    """
+    db_path = os.path.join(DATABASE_DIR, 'hr_management.db')
+    conn = _open_for_bulk_load(db_path)
     cursor = conn.cursor()
-    
+
     cursor.execute('''
         CREATE TABLE Departments (
             dept_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -132,7 +237,7 @@ def create_hr_db():
             location TEXT
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE Employees (
             emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -145,46 +250,68 @@ def create_hr_db():
             FOREIGN KEY (dept_id) REFERENCES Departments(dept_id)
         )
     ''')
-    
+
     print("👥 인사관리 데이터 생성 중...")
-    
+
     # 1. 부서 생성
     dept_names = ['개발팀', '기획팀', '디자인팀', '마케팅팀', '인사팀', '재무팀', '영업팀', 'CS팀']
     depts = [(name, fake.city()) for name in dept_names]
     cursor.executemany('INSERT INTO Departments (dept_name, location) VALUES (?, ?)', depts)
-    
-    # 2. 직원 생성 (300명)
-    employees = []
+    conn.commit()
+
+    # 2. 직원 생성 (300명 × scale)
+    employee_count = _scaled(300, scale)
+    pool_size = min(employee_count, POOL_SIZE)
+    names = _faker_pool(fake.name, pool_size)
+    emails = _faker_pool(fake.email, pool_size)
+    hire_dates = _date_pool(365 * 5)
+    dept_ids = range(1, len(dept_names) + 1)
     positions = ['사원', '대리', '과장', '차장', '부장']
+    position_weights = [40, 30, 15, 10, 5]
     base_salary = {'사원': 3500, '대리': 4500, '과장': 5500, '차장': 7000, '부장': 9000}
-    
-    for _ in range(300):
-        dept_id = random.randint(1, len(dept_names))
-        position = random.choices(positions, weights=[40, 30, 15, 10, 5])[0]
-        
+    salary_offsets = range(-200, 501)
+
+    def employee_batch(n):
+        picked = random.choices(positions, weights=position_weights, k=n)
         # 급여: 직급별 기본급 + 랜덤 알파 (만원 단위)
-        salary = (base_salary[position] + random.randint(-200, 500)) * 10000 
-        hire_date = fake.date_between(start_date='-5y', end_date='today')
-        name = fake.name()
-        email = fake.email()
-        
-        employees.append((name, dept_id, position, salary, hire_date, email))
-        
-    cursor.executemany('INSERT INTO Employees (name, dept_id, position, salary, hire_date, email) VALUES (?, ?, ?, ?, ?, ?)', employees)
-    print(f"   - 직원 300명 생성 완료")
+        salaries = [
+            (base_salary[p] + offset) * 10000
+            for p, offset in zip(picked, random.choices(salary_offsets, k=n))
+        ]
+        return zip(
+            random.choices(names, k=n),
+            random.choices(dept_ids, k=n),
+            picked,
+            salaries,
+            random.choices(hire_dates, k=n),
+            random.choices(emails, k=n),
+        )
+
+    _bulk_insert(conn, 'INSERT INTO Employees (name, dept_id, position, salary, hire_date, email) VALUES (?, ?, ?, ?, ?, ?)',
+                 employee_count, employee_batch)
+    print(f"   - 직원 {employee_count:,}명 생성 완료")
+
+    _create_indexes(conn, [
+        'CREATE INDEX idx_employees_dept_id ON Employees(dept_id)',
+    ])
 
-    conn.commit()
     conn.close()
+    return len(depts) + employee_count
 
-def create_finance_db():
-    """재무 DB 생성 (대용량)"""
-    db_path = os.path.join(DATABASE_DIR, 'finance.db')
-    if os.path.exists(db_path):
-        os.remove(db_path)
+def create_finance_db(scale=1.0):
+    """
+    재무 DB 생성 (대용량)
 
-    conn = sqlite3.connect(db_path)
+    Args:
+        scale: 데이터 규모 배수 (1.0 = 거래 내역 10,000건)
+
+    Returns:
+        int: 생성된 전체 행 수
+    """
+    db_path = os.path.join(DATABASE_DIR, 'finance.db')
+    conn = _open_for_bulk_load(db_path)
     cursor = conn.cursor()
-    
+
     cursor.execute('''
         CREATE TABLE Accounts (
             account_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -192,7 +319,7 @@ def create_finance_db():
             account_type TEXT CHECK(account_type IN ('Revenue', 'Expense', 'Asset', 'Liability')) NOT NULL
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE Transactions (
             transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -204,9 +331,9 @@ def create_finance_db():
             FOREIGN KEY (account_id) REFERENCES Accounts(account_id)
         )
     ''')
-    
+
     print("💰 재무 데이터 생성 중...")
-    
+
     # 1. 계정 과목 생성
     accounts_data = [
         ('제품 매출', 'Revenue'), ('서비스 수익', 'Revenue'),
@@ -214,37 +341,111 @@ def create_finance_db():
         ('법인카드 결제', 'Liability'), ('현금', 'Asset')
     ]
     cursor.executemany('INSERT INTO Accounts (account_name, account_type) VALUES (?, ?)', accounts_data)
-    
-    # 2. 거래 내역 생성 (10,000건)
-    transactions = []
-    account_count = len(accounts_data)
-    
-    for _ in range(10000):
-        account_idx = random.randint(0, account_count - 1)
-        acc_name, acc_type = accounts_data[account_idx]
-        
+    conn.commit()
+
+    # 2. 거래 내역 생성 (10,000건 × scale)
+    transaction_count = _scaled(10000, scale)
+    companies = _faker_pool(fake.company, min(transaction_count, POOL_SIZE))
+    contract_descs = [f"계약금_{c}" for c in companies]
+    expense_descs = {idx: f"{name} 지출" for idx, (name, _) in enumerate(accounts_data)}
+    revenue_idx = {idx for idx, (_, acc_type) in enumerate(accounts_data) if acc_type == 'Revenue'}
+    trans_dates = _date_pool(365)
+    account_idxs = range(len(accounts_data))
+    revenue_units = range(10, 1001)
+    expense_units = range(1, 501)
+
+    def transaction_batch(n):
+        picked = random.choices(account_idxs, k=n)
+        revenue_amounts = iter(random.choices(revenue_units, k=n))
+        expense_amounts = iter(random.choices(expense_units, k=n))
+        contract_iter = iter(random.choices(contract_descs, k=n))
+
         # 금액: Revenue는 + 크기, Expense는 작지만 빈번하게
-        if acc_type == 'Revenue':
-            amount = random.randint(10, 1000) * 100000 # 100만 ~ 1억
-            desc = f"계약금_{fake.company()}"
-        else:
-            amount = random.randint(1, 500) * 10000 # 1만 ~ 500만
-            desc = f"{acc_name} 지출"
-            
-        trans_date = fake.date_between(start_date='-1y', end_date='today')
-        vendor = fake.company()
-        
-        transactions.append((account_idx + 1, amount, trans_date, desc, vendor))
-        
-    cursor.executemany('INSERT INTO Transactions (account_id, amount, transaction_date, description, vendor) VALUES (?, ?, ?, ?, ?)', transactions)
-    print(f"   - 거래 내역 10,000건 생성 완료")
+        amounts = []
+        descs = []
+        for idx in picked:
+            if idx in revenue_idx:
+                amounts.append(next(revenue_amounts) * 100000) # 100만 ~ 1억
+                descs.append(next(contract_iter))
+            else:
+                amounts.append(next(expense_amounts) * 10000) # 1만 ~ 500만
+                descs.append(expense_descs[idx])
+
+        return zip(
+            [idx + 1 for idx in picked],
+            amounts,
+            random.choices(trans_dates, k=n),
+            descs,
+            random.choices(companies, k=n),
+        )
+
+    _bulk_insert(conn, 'INSERT INTO Transactions (account_id, amount, transaction_date, description, vendor) VALUES (?, ?, ?, ?, ?)',
+                 transaction_count, transaction_batch)
+    print(f"   - 거래 내역 {transaction_count:,}건 생성 완료")
+
+    _create_indexes(conn, [
+        'CREATE INDEX idx_transactions_account_id ON Transactions(account_id)',
+    ])
 
-    conn.commit()
     conn.close()
+    return len(accounts_data) + transaction_count
+
+GENERATORS = {
+    'ecommerce': create_ecommerce_db,
+    'hr': create_hr_db,
+    'finance': create_finance_db,
+}
+
+def _run_generator(name, scale, seed):
+    """개별 프로세스에서 실행되는 생성 작업 (소요 시간 측정 포함)"""
+    if seed is not None:
+        random.seed(f"{seed}:{name}")
+        Faker.seed(f"{seed}:{name}")
+
+    start = time.perf_counter()
+    rows = GENERATORS[name](scale)
+    return name, rows, time.perf_counter() - start
+
+def create_all(scale=1.0, jobs=None, seed=None, only=None):
+    """
+    샘플 DB들을 병렬 프로세스로 생성하고 처리량(rows/s) 출력
+
+    Args:
+        scale: 데이터 규모 배수
+        jobs: 프로세스 수 (1이면 순차 실행)
+        seed: 재현용 랜덤 시드
+        only: 생성할 DB 이름 리스트 (None이면 전체)
+    """
+    names = only or list(GENERATORS)
+    jobs = jobs or len(names)
+    start = time.perf_counter()
+
+    if jobs == 1:
+        results = [_run_generator(name, scale, seed) for name in names]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_run_generator, name, scale, seed) for name in names]
+            results = [f.result() for f in futures]
+
+    elapsed = time.perf_counter() - start
+    total_rows = 0
+    print("\n📊 생성 처리량")
+    for name, rows, seconds in results:
+        total_rows += rows
+        print(f"   - {name:<10} {rows:>12,}행  {seconds:8.2f}s  {rows / seconds:>12,.0f} rows/s")
+    print(f"   - {'total':<10} {total_rows:>12,}행  {elapsed:8.2f}s  {total_rows / elapsed:>12,.0f} rows/s")
+    return results
 
 if __name__ == '__main__':
-    print(f"🚀 대용량 샘플 데이터베이스 생성을 시작합니다...")
-    create_ecommerce_db()
-    create_hr_db()
-    create_finance_db()
-    print("\n🎉 모든 DB 생성 완료! (faker 라이브러리 사용됨)")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='샘플 데이터베이스 생성')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='데이터 규모 배수 (예: 500 → 주문 1천만 건)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='병렬 프로세스 수 (기본: DB 개수, 1이면 순차 실행)')
+    parser.add_argument('--seed', type=int, default=None, help='재현용 랜덤 시드')
+    parser.add_argument('--only', nargs='+', choices=list(GENERATORS), help='특정 DB만 생성')
+    args = parser.parse_args()
+
+    print(f"🚀 대용량 샘플 데이터베이스 생성을 시작합니다... (scale={args.scale})")
+    create_all(scale=args.scale, jobs=args.jobs, seed=args.seed, only=args.only)
+    print("\n🎉 모든 DB 생성 완료! (faker 라이브러리 사용됨)")
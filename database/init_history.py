@@ -19,13 +19,30 @@ def init_history_db():
             sql_query TEXT NOT NULL,
             executed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
             is_bookmarked INTEGER DEFAULT 0,
-            result_rows INTEGER DEFAULT 0
+            result_rows INTEGER DEFAULT 0,
+            elapsed_ms REAL
         )
     ''')
+    migrate_history_db(conn)
     
     conn.commit()
     conn.close()
     print("✅ query_history.db 생성 완료")
 
+def migrate_history_db(conn):
+    """
+    기존 히스토리 DB에 추가된 컬럼/인덱스 반영 (여러 번 실행해도 안전)
+    
+    - elapsed_ms: 실행 시간 (자주 실행되는 무거운 쿼리 판별용)
+    - (db_name, executed_at) 인덱스: DB별 최근 히스토리 조회
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(query_history)")]
+    if 'elapsed_ms' not in columns:
+        conn.execute("ALTER TABLE query_history ADD COLUMN elapsed_ms REAL")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_history_db_time ON query_history (db_name, executed_at)"
+    )
+    conn.commit()
+
 if __name__ == '__main__':
     init_history_db()
\ No newline at end of file
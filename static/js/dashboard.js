@@ -3,6 +3,7 @@
 const dbName = window.location.pathname.split('/').pop();
 let currentSQL = "";
 let diagramLoaded = false;
+let statsLoaded = false;
 
 // ========== 페이지 로드 시 초기화 ==========
 document.addEventListener('DOMContentLoaded', function() {
@@ -12,7 +13,7 @@ document.addEventListener('DOMContentLoaded', function() {
     loadModels();
     // 이벤트 리스너 등록
     document.getElementById('generate-sql-btn').addEventListener('click', generateSQL);
-    document.getElementById('execute-sql-btn').addEventListener('click', executeSQL);
+    document.getElementById('execute-sql-btn').addEventListener('click', () => executeSQL());
 });
 
 // ========== 스키마 분석 로드 ==========
@@ -41,9 +42,13 @@ async function loadSuggestedQueries() {
         
         if (data.success && data.queries.length > 0) {
             let html = '';
-            data.queries.forEach(query => {
-                html += `<div class="suggestion-item" onclick="selectSuggestion('${escapeHtml(query).replace(/'/g, "\\'")}')">
-                    ${escapeHtml(query)}
+            data.suggestions.forEach(s => {
+                // 히스토리에서 온 질문은 실행 횟수/북마크 표시
+                const meta = s.source === 'history'
+                    ? `<span class="suggestion-meta">${s.bookmarked ? '⭐ ' : ''}${s.runs}회 실행</span>`
+                    : '';
+                html += `<div class="suggestion-item" onclick="selectSuggestion('${escapeHtml(s.question).replace(/'/g, "\\'")}')">
+                    ${escapeHtml(s.question)}${meta}
                 </div>`;
             });
             container.innerHTML = html;
@@ -175,13 +180,16 @@ async function generateSQL() {
     }
 }
 // ========== SQL 실행 ==========
-async function executeSQL() {
+// exact=true면 빠른 근사를 켜 두었더라도 정확히 실행 (근사 결과의 '정확한 값 계산' 버튼)
+async function executeSQL(exact = false) {
     if (!currentSQL) {
         alert('먼저 SQL을 생성해주세요.');
         return;
     }
     
     const question = document.getElementById('user-query').value.trim();
+    const profile = document.getElementById('profile-mode').checked;  // 요약 모드
+    const approximate = !exact && document.getElementById('approx-mode').checked;  // 빠른 근사
     
     // 로딩 상태
     setButtonLoading('execute-sql-btn', true, 'execute-btn-text', 'execute-spinner');
@@ -189,10 +197,14 @@ async function executeSQL() {
     try {
         const data = await apiRequest(`/api/execute_sql/${dbName}`, 'POST', { 
             sql: currentSQL,
-            question: question 
+            question: question,
+            profile: profile,
+            approximate: approximate
         });
         
         if (data.success) {
+            displayApproximation(data);
+            displayProfile(data);
             displayResults(data.columns, data.rows);
             loadHistory(); // 히스토리 새로고침
         } else {
@@ -238,22 +250,111 @@ function displayResults(columns, rows) {
     }, 100);
 }
 
+// ========== 근사 결과 안내 (빠른 근사) ==========
+function displayApproximation(data) {
+    const container = document.getElementById('result-approx');
+    
+    if (data.approximate) {
+        const a = data.approximation;
+        const method = a.method === 'block' ? 'rowid 블록' : '행 단위';
+        let html = `⚡ 근사 결과: ${escapeHtml(a.table)} ${a.table_rows.toLocaleString('ko-KR')}행 중 `
+            + `${a.sampled_rows.toLocaleString('ko-KR')}행(${(a.fraction * 100).toFixed(1)}%, ${method} 표본)으로 추정 · ${a.elapsed_ms}ms<br>`
+            + `'± ' 컬럼은 ${Math.round(a.confidence * 100)}% 신뢰구간 반폭입니다.`;
+        if (a.sample_only_columns.length) {
+            html += ` ${a.sample_only_columns.map(escapeHtml).join(', ')}은 표본 안의 값이라 실제 최솟값/최댓값과 다를 수 있습니다.`;
+        }
+        html += ' <button class="btn btn-sm" onclick="executeSQL(true)">정확한 값 계산</button>';
+        container.innerHTML = html;
+        container.classList.remove('hidden');
+    } else if (data.approximation_skipped) {
+        container.textContent = `정확히 실행했습니다: ${data.approximation_skipped}`;
+        container.classList.remove('hidden');
+    } else {
+        container.classList.add('hidden');
+        container.innerHTML = '';
+    }
+}
+
+// ========== 컬럼 프로파일 렌더링 (요약 모드) ==========
+function displayProfile(data) {
+    const container = document.getElementById('result-profile');
+    
+    if (!data.profiled) {
+        container.classList.add('hidden');
+        container.innerHTML = '';
+        return;
+    }
+    
+    const fmt = v => (v === null || v === undefined) ? '-' : (typeof v === 'number' ? v.toLocaleString('ko-KR', { maximumFractionDigits: 2 }) : escapeHtml(String(v)));
+    
+    let html = `<div class="profile-caption">전체 ${data.row_count.toLocaleString('ko-KR')}행 중 ${data.rows.length}행 미리보기 · ${data.elapsed_ms}ms</div>`;
+    html += '<table><thead><tr><th>컬럼</th><th>NULL 비율</th><th>최소</th><th>최대</th><th>평균</th><th>중앙값</th><th>상위 값</th></tr></thead><tbody>';
+    
+    data.columns.forEach(col => {
+        const p = data.profile[col];
+        const top = (p.top_values || []).map(t => `${escapeHtml(String(t.value))} (${t.count})`).join(', ');
+        html += `<tr>
+            <td>${escapeHtml(col)}</td>
+            <td>${(p.null_fraction * 100).toFixed(1)}%</td>
+            <td>${fmt(p.min)}</td>
+            <td>${fmt(p.max)}</td>
+            <td>${fmt(p.mean)}</td>
+            <td>${fmt(p.quantiles ? p.quantiles.p50 : null)}</td>
+            <td>${top || '-'}</td>
+        </tr>`;
+    });
+    
+    html += '</tbody></table>';
+    container.innerHTML = html;
+    container.classList.remove('hidden');
+}
+
 // ========== CSV/Excel 내보내기 ==========
-async function exportData(format) {
+// 서버에서 백그라운드 작업으로 파일을 만들고, 진행률을 버튼에 표시한 뒤 완료되면 다운로드
+async function exportData(format, button = null) {
     if (!currentSQL) {
         alert('먼저 쿼리를 실행해주세요.');
         return;
     }
     
-    const success = await downloadFile(
-        `/api/export/${format}/${dbName}`,
-        'POST',
-        { sql: currentSQL },
-        `export_${Date.now()}.${format === 'csv' ? 'csv' : 'xlsx'}`
-    );
+    const label = button ? button.textContent : '';
+    if (button) button.disabled = true;
     
-    if (!success) {
-        alert('내보내기 실패');
+    try {
+        const response = await fetch(`/api/export_jobs/${format}/${dbName}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ sql: currentSQL })
+        });
+        let job = await response.json();
+        if (!job.success) {
+            throw new Error(job.message);
+        }
+        
+        while (!['done', 'failed', 'cancelled'].includes(job.status)) {
+            if (button) {
+                button.textContent = job.percent !== null
+                    ? `${label} ${Math.floor(job.percent)}%`
+                    : `${label} ${job.rows_written.toLocaleString()}행`;
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            job = await (await fetch(`/api/export_jobs/${job.job_id}`)).json();
+            if (!job.success) {
+                throw new Error(job.message);
+            }
+        }
+        
+        if (job.status !== 'done') {
+            throw new Error(job.error);
+        }
+        window.location.href = job.download_url;  // 브라우저가 파일을 바로 스트리밍 저장
+    } catch (error) {
+        alert(`내보내기 실패: ${error.message}`);
+    } finally {
+        if (button) {
+            button.textContent = label;
+            button.disabled = false;
+        }
     }
 }
 
@@ -276,14 +377,91 @@ function toggleDiagram() {
     }
 }
 
+// ========== 테이블 통계 토글 ==========
+function toggleStats() {
+    const container = document.getElementById('stats-container');
+    const toggle = document.getElementById('stats-toggle');
+    
+    if (container.classList.contains('hidden')) {
+        container.classList.remove('hidden');
+        toggle.textContent = '▲';
+        
+        if (!statsLoaded) {
+            loadColumnStats();
+            statsLoaded = true;
+        }
+    } else {
+        container.classList.add('hidden');
+        toggle.textContent = '▼';
+    }
+}
+
+// ========== 테이블 통계 로드 (사전 계산된 통계, 라이브 스캔 없음) ==========
+async function loadColumnStats() {
+    const container = document.getElementById('column-stats');
+    
+    try {
+        const data = await apiRequest(`/api/column_stats/${dbName}`);
+        
+        if (!data.success) {
+            container.innerHTML = `<div class="loading" style="color: var(--accent-danger);">${escapeHtml(data.message)}</div>`;
+            return;
+        }
+        
+        const fmt = v => (v === null || v === undefined) ? '-' : (typeof v === 'number' ? v.toLocaleString('ko-KR', { maximumFractionDigits: 2 }) : escapeHtml(String(v)));
+        
+        let html = `<div class="stats-caption">통계 계산 시각: ${formatDateTime(data.computed_at)}</div>`;
+        Object.entries(data.tables).forEach(([table, t]) => {
+            html += `<h4 class="stats-table-title">${escapeHtml(table)} <span class="stats-row-count">${t.row_count.toLocaleString('ko-KR')}행</span></h4>`;
+            html += '<div class="profile-summary"><table><thead><tr><th>컬럼</th><th>고유값</th><th>NULL 비율</th><th>최소</th><th>최대</th><th>상위 값</th></tr></thead><tbody>';
+            Object.entries(t.columns).forEach(([col, c]) => {
+                const top = (c.top_values || []).map(v => `${escapeHtml(String(v.value))} (${v.count})`).join(', ');
+                html += `<tr>
+                    <td>${escapeHtml(col)}</td>
+                    <td>${c.distinct_exact ? fmt(c.distinct) : '&gt; ' + fmt(c.distinct - 1)}</td>
+                    <td>${(c.null_fraction * 100).toFixed(1)}%</td>
+                    <td>${fmt(c.min)}</td>
+                    <td>${fmt(c.max)}</td>
+                    <td>${top || '-'}</td>
+                </tr>`;
+            });
+            html += '</tbody></table></div>';
+        });
+        container.classList.remove('loading');
+        container.innerHTML = html;
+    } catch (error) {
+        container.innerHTML = '<div class="loading" style="color: var(--accent-danger);">통계 로드 실패</div>';
+    }
+}
+
 // ========== 스키마 다이어그램 로드 ==========
 async function loadSchemaDiagram() {
     const container = document.getElementById('schema-diagram');
+    const tableSelect = document.getElementById('diagram-table');
+    const hops = document.getElementById('diagram-hops').value;
+    
+    // 테이블 선택 시 해당 테이블과 FK 이웃만 포함한 부분 다이어그램 요청
+    const params = new URLSearchParams();
+    if (tableSelect.value) {
+        params.set('table', tableSelect.value);
+        params.set('hops', hops);
+    }
     
     try {
-        const data = await apiRequest(`/api/schema_diagram/${dbName}`);
+        const data = await apiRequest(`/api/schema_diagram/${dbName}?${params}`);
         
         if (data.success) {
+            // 테이블 목록은 처음 한 번만 채움
+            if (tableSelect.options.length === 1) {
+                data.all_tables.forEach(name => tableSelect.add(new Option(name, name)));
+            }
+            if (data.focus) {
+                tableSelect.value = data.focus;
+            }
+            document.getElementById('diagram-caption').textContent =
+                `${data.tables.length} / ${data.table_count}개 테이블`;
+            
+            container.classList.remove('loading');
             container.innerHTML = `<pre class="mermaid">${data.diagram}</pre>`;
             
             // Mermaid 렌더링
@@ -0,0 +1,39 @@
+# tests/test_llm_provider.py
+
+from utils.llm_provider import LLMRateLimitError, _retry_after_hint, classify_exception
+
+# google.api_core.exceptions.ResourceExhausted의 실제 str() (Gemini 무료 등급 분당 한도 초과)
+GEMINI_429 = '''429 You exceeded your current quota, please check your plan and billing details. For more information on this error, head to: https://ai.google.dev/gemini-api/docs/rate-limits. [violations {
+  quota_metric: "generativelanguage.googleapis.com/generate_content_free_tier_requests"
+  quota_id: "GenerateRequestsPerMinutePerProjectPerModel-FreeTier"
+  quota_dimensions {
+    key: "model"
+    value: "gemini-2.0-flash"
+  }
+  quota_value: 15
+}
+, links {
+  description: "Learn more about Gemini API quotas"
+  url: "https://ai.google.dev/gemini-api/docs/rate-limits"
+}
+, retry_delay {
+  seconds: 31
+}
+]'''
+
+def test_retry_delay_from_gemini_error():
+    assert _retry_after_hint(GEMINI_429) == 31
+
+def test_retry_delay_with_nanos():
+    assert _retry_after_hint('retry_delay {\n  seconds: 2\n  nanos: 500000000\n}') == 2.5
+
+def test_retry_in_seconds():
+    assert _retry_after_hint('Please retry in 12.3s.') == 12.3
+
+def test_no_hint():
+    assert _retry_after_hint('429 quota exceeded') is None
+
+def test_classify_gemini_429():
+    error = classify_exception(RuntimeError(GEMINI_429), 'gemini-2.0-flash')
+    assert isinstance(error, LLMRateLimitError)
+    assert error.retry_after == 31
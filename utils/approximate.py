@@ -0,0 +1,365 @@
+# utils/approximate.py
+
+import math
+import os
+import random
+import sqlite3
+import time
+from statistics import NormalDist
+from utils import metrics
+from utils.sql_aggregates import parse_aggregate_query, replace_spans, scans_table, unquote_identifier
+
+# 표본 대상 테이블에서 읽을 목표 행 수 (표본 비율 = 이 값 / 테이블 행 수)
+APPROX_SAMPLE_ROWS = int(os.getenv('APPROX_SAMPLE_ROWS', '100000'))
+
+# 가장 큰 테이블이 이 행 수보다 작으면 근사하지 않고 정확히 실행
+APPROX_MIN_ROWS = int(os.getenv('APPROX_MIN_ROWS', '500000'))
+
+# 표본 비율이 이보다 크면 정확 실행과 비용 차이가 작으므로 정확히 실행
+APPROX_MAX_FRACTION = 0.5
+
+# 표본을 나누는 블록 수 (rowid 블록 수이자 신뢰구간 계산용 복제 그룹 수)
+APPROX_BLOCKS = 32
+
+# 신뢰구간 수준
+APPROX_CONFIDENCE = 0.95
+
+# block: rowid 범위 블록 (읽는 페이지 수 자체가 줄어듦)
+# bernoulli: rowid 해시로 행마다 독립 추출 (전체 스캔은 하지만 조인/집계 비용이 줄고 rowid 순서와 무관)
+SAMPLE_METHODS = ('block', 'bernoulli')
+
+# 표본 비율만큼 값을 키워야 하는 집계 (AVG/MIN/MAX는 그대로)
+SCALED_FUNCTIONS = ('COUNT', 'SUM', 'TOTAL')
+
+_HASH_MULTIPLIER = 1103515245
+_HASH_MODULUS = 2147483648
+
+# ========== 계획 ==========
+
+def plan_approximation(db_path, sql_query, method='block', fraction=None):
+    """
+    근사 실행 계획 (표본으로 바꿀 테이블과 표본 비율)
+
+    조인된 테이블 중 가장 큰 테이블 하나만 표본으로 바꾸고 (LEFT JOIN의 오른쪽 테이블 제외)
+    나머지 테이블은 그대로 둡니다.
+
+    Args:
+        method: 'block' | 'bernoulli'
+        fraction: 표본 비율 (None이면 APPROX_SAMPLE_ROWS 기준)
+
+    Returns:
+        dict: {'method', 'table_index', 'table', 'table_rows', 'fraction', 'seed'}
+
+    Raises:
+        ValueError: 근사할 수 없거나 근사할 필요가 없는 쿼리 (메시지에 이유)
+    """
+    from utils.column_stats import get_column_stats
+
+    if method not in SAMPLE_METHODS:
+        raise ValueError(f"표본 방식은 {', '.join(SAMPLE_METHODS)} 중 하나여야 합니다.")
+    parsed = parse_aggregate_query(sql_query)
+    if not parsed['aggregate_calls']:
+        raise ValueError('집계 함수(COUNT/SUM/AVG/MIN/MAX)가 있는 쿼리만 근사 실행할 수 있습니다.')
+    if any(call['distinct'] and call['func'] not in ('MIN', 'MAX') for call in parsed['aggregate_calls']):
+        raise ValueError('DISTINCT 집계는 표본으로 추정할 수 없습니다.')
+
+    stats = get_column_stats(db_path)['tables']
+    candidates = []
+    for index, table in enumerate(parsed['tables']):
+        name = unquote_identifier(table['name'].split('.')[-1])
+        if table['join'] != 'left' and name in stats and stats[name].get('row_count'):
+            candidates.append((stats[name]['row_count'], index, name))
+    if not candidates:
+        raise ValueError('표본으로 바꿀 수 있는 테이블이 없습니다.')
+    table_rows, index, name = max(candidates)
+
+    if table_rows < APPROX_MIN_ROWS:
+        raise ValueError(f'{name}({table_rows:,}행)은 근사가 필요 없을 만큼 작아 정확히 실행했습니다.')
+    if fraction is None:
+        fraction = APPROX_SAMPLE_ROWS / table_rows
+    fraction = float(fraction)
+    if not 0 < fraction < APPROX_MAX_FRACTION:
+        raise ValueError(f'표본 비율 {fraction:.0%}로는 정확 실행과 비용 차이가 작아 정확히 실행했습니다.')
+    table = parsed['tables'][index]
+    if not _scans_table(db_path, parsed['sql'], table['alias'] or name):
+        raise ValueError(f'{name}을 인덱스로 일부만 읽는 쿼리라 표본보다 정확 실행이 빠릅니다.')
+
+    return {
+        'method': method,
+        'table_index': index,
+        'table': name,
+        'table_rows': table_rows,
+        'fraction': fraction,
+        'seed': random.randrange(1, _HASH_MODULUS),
+    }
+
+def _scans_table(db_path, sql_query, label):
+    """원래 쿼리가 테이블 대부분을 읽는지 (가장 바깥 루프에서 인덱스로 일부만 읽으면 표본이 오히려 느림)"""
+    from utils.sqlite_tuning import connect
+
+    conn = connect(db_path, readonly=True)
+    try:
+        return scans_table(conn, sql_query, label)
+    finally:
+        conn.close()
+
+# ========== 워커 프로세스에서 실행되는 함수 ==========
+
+def _sample_subquery(table_name, plan, lo, hi):
+    """
+    표본 서브쿼리와 블록 수
+
+    LIMIT -1은 서브쿼리 평탄화를 막는 용도입니다. 평탄화되면 플래너가 GROUP BY 정렬을 피하려고
+    인덱스 전체를 훑으며 rowid 조건을 행마다 검사해 정확 실행보다 느려질 수 있습니다.
+
+    Returns:
+        (sql, blocks): 각 행에 __approx_block (0 ~ blocks-1) 컬럼이 붙은 표본
+    """
+    if plan['method'] == 'block':
+        span = hi - lo + 1
+        blocks = min(APPROX_BLOCKS, span)
+        stratum = math.ceil(span / blocks)
+        length = max(1, round(stratum * plan['fraction']))
+        rng = random.Random(plan['seed'])
+        ranges = []
+        for b in range(blocks):
+            start = lo + b * stratum + rng.randrange(stratum - length + 1)
+            ranges.append(f'rowid BETWEEN {start} AND {start + length - 1}')
+        return (f"SELECT *, (rowid - {lo}) / {stratum} AS __approx_block FROM {table_name} "
+                f"WHERE {' OR '.join(ranges)} LIMIT -1"), blocks
+
+    hashed = f'((rowid * {_HASH_MULTIPLIER} + {plan["seed"]}) % {_HASH_MODULUS})'
+    threshold = max(1, int(plan['fraction'] * _HASH_MODULUS))
+    return (f"SELECT *, {hashed} * {APPROX_BLOCKS} / {threshold} AS __approx_block FROM {table_name} "
+            f"WHERE {hashed} < {threshold} LIMIT -1"), APPROX_BLOCKS
+
+def _moment_columns(items):
+    """신뢰구간 계산용 블록별 합계 컬럼 (SELECT 항목 번호 → (합계 식, 개수 식))"""
+    columns = {}
+    for i, item in enumerate(items):
+        aggregate = item['aggregate']
+        if aggregate is None or aggregate['distinct'] or aggregate['func'] in ('MIN', 'MAX'):
+            continue
+        arg = aggregate['arg']
+        if aggregate['func'] == 'COUNT':
+            columns[i] = (f'COUNT({arg})', None)
+        elif aggregate['func'] == 'AVG':
+            columns[i] = (f'TOTAL({arg})', f'COUNT({arg})')
+        else:
+            columns[i] = (f'TOTAL({arg})', None)
+    return columns
+
+def build_sample_queries(parsed, table_index, sample_sql, scale):
+    """
+    원래 쿼리를 표본 쿼리 두 개로 변환
+
+    Returns:
+        (estimate_sql, moments_sql):
+            estimate_sql: 표본 테이블 + COUNT/SUM/TOTAL에 scale을 곱한 원래 쿼리 (+ 숨은 그룹 키 컬럼)
+            moments_sql: 그룹 키 × 블록별 집계 인자 합계/개수 (신뢰구간용)
+    """
+    sql_query = parsed['sql']
+    table = parsed['tables'][table_index]
+    alias = table['alias'] or table['name'].split('.')[-1]
+    table_replacement = (table['start'], table['end'], f'({sample_sql}) AS {alias}')
+
+    replacements = [table_replacement]
+    for call in parsed['aggregate_calls']:
+        if call['func'] in SCALED_FUNCTIONS:
+            replacements.append((call['start'], call['end'],
+                                 f"({sql_query[call['start']:call['end']]} * {scale!r})"))
+    for item in parsed['items']:
+        # 배율을 곱해도 결과 컬럼 이름은 원래 식 그대로
+        if item['alias'] is None and item['has_aggregate']:
+            quoted = item['text'].replace('"', '""')
+            replacements.append((item['end'], item['end'], f' AS "{quoted}"'))
+    select_end = parsed['clauses']['select'][1]
+    hidden = ''.join(f', {expr} AS __approx_g{k}' for k, expr in enumerate(parsed['group_by']))
+    replacements.append((select_end, select_end, hidden))
+    estimate_sql = replace_spans(sql_query, replacements)
+
+    from_start, from_end = parsed['clauses']['from']
+    from_sql = replace_spans(sql_query[from_start:from_end], [
+        (table_replacement[0] - from_start, table_replacement[1] - from_start, table_replacement[2])
+    ])
+    moments = [f'{total} AS __approx_t{i}' + (f', {count} AS __approx_n{i}' if count else '')
+               for i, (total, count) in _moment_columns(parsed['items']).items()]
+    keys = parsed['group_by'] + ['__approx_block']
+    where = parsed['clauses'].get('where')
+    moments_sql = (f"SELECT {', '.join(keys + moments)} FROM {from_sql}"
+                   + (f" WHERE {sql_query[where[0]:where[1]]}" if where else '')
+                   + f" GROUP BY {', '.join(keys)}")
+    return estimate_sql, moments_sql
+
+def run_sample(db_path, sql_query, plan, timeout):
+    """
+    워커 프로세스에서 표본 쿼리 실행
+
+    Returns:
+        dict: {'success', 'columns', 'rows', 'moments': {'columns', 'rows'}, 'scale', 'blocks', 'sampled_rows'}
+    """
+    from utils.sqlite_tuning import connect
+
+    parsed = parse_aggregate_query(sql_query)
+    table = parsed['tables'][plan['table_index']]
+    start = time.perf_counter()
+    try:
+        conn = connect(db_path, readonly=True)
+        deadline = start + timeout
+        conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000)
+        try:
+            lo, hi = conn.execute(f"SELECT min(rowid), max(rowid) FROM {table['name']}").fetchone()
+            if lo is None:
+                return {'success': False, 'error': f"{plan['table']} 테이블이 비어 있습니다."}
+            sample_sql, blocks = _sample_subquery(table['name'], plan, lo, hi)
+            if plan['method'] == 'block':
+                sampled_rows = conn.execute(f"SELECT COUNT(*) FROM ({sample_sql})").fetchone()[0]
+                if not sampled_rows:
+                    return {'success': False, 'error': '표본이 비어 있습니다.'}
+                scale = plan['table_rows'] / sampled_rows
+            else:
+                sampled_rows = None
+                scale = 1 / plan['fraction']
+
+            estimate_sql, moments_sql = build_sample_queries(parsed, plan['table_index'], sample_sql, scale)
+            cursor = conn.execute(estimate_sql)
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+            cursor = conn.execute(moments_sql)
+            moments = {'columns': [desc[0] for desc in cursor.description], 'rows': cursor.fetchall()}
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:
+        if str(e) == 'interrupted':
+            return {'success': False, 'timed_out': True, 'error': f'쿼리 실행 시간 초과 ({timeout:g}초)'}
+        return {'success': False, 'error': str(e)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+    return {'success': True, 'columns': columns, 'rows': rows, 'moments': moments,
+            'scale': scale, 'blocks': blocks, 'sampled_rows': sampled_rows}
+
+# ========== 추정치 / 신뢰구간 ==========
+
+def _replicate_sums(moments, group_count, moment_columns):
+    """그룹 키별 {항목 번호: [Σt, Σt², Σn, Σn², Σtn]} (블록 단위 합계에서)"""
+    index = {name: i for i, name in enumerate(moments['columns'])}
+    sums = {}
+    for row in moments['rows']:
+        group = sums.setdefault(tuple(row[:group_count]), {})
+        for item, (_, count) in moment_columns.items():
+            t = row[index[f'__approx_t{item}']] or 0.0
+            n = (row[index[f'__approx_n{item}']] or 0) if count else 0
+            acc = group.setdefault(item, [0.0, 0.0, 0.0, 0.0, 0.0])
+            acc[0] += t
+            acc[1] += t * t
+            acc[2] += n
+            acc[3] += n * n
+            acc[4] += t * n
+    return sums
+
+def _margin(func, acc, blocks, scale, fraction, z):
+    """
+    복제 그룹(블록) 분산으로 구한 신뢰구간 반폭
+
+    COUNT/SUM/TOTAL: 블록 합계 × blocks × scale을 블록별 추정치로 보고 그 분산 / blocks
+    AVG: 비율 추정치의 선형화 분산
+    """
+    if blocks < 2:
+        return None
+    fpc = max(0.0, 1 - fraction)
+    total, total_sq, count, count_sq, cross = acc
+    if func == 'AVG':
+        if not count:
+            return None
+        ratio = total / count
+        residual = total_sq - 2 * ratio * cross + ratio * ratio * count_sq
+        variance = blocks / (blocks - 1) * residual / (count * count) * fpc
+    else:
+        variance = scale * scale * blocks * (total_sq - total * total / blocks) / (blocks - 1) * fpc
+    return z * math.sqrt(max(variance, 0.0))
+
+def finalize_estimates(parsed, plan, sample):
+    """
+    표본 결과 → 근사 결과 (추정 컬럼 옆에 '<컬럼> ±' 신뢰구간 반폭 컬럼 추가)
+
+    Returns:
+        dict: {'success', 'columns', 'rows', 'row_count', 'approximate': True, 'approximation': {...}}
+    """
+    items = parsed['items']
+    group_count = len(parsed['group_by'])
+    visible = len(sample['columns']) - group_count
+    moment_columns = _moment_columns(items)
+    sums = _replicate_sums(sample['moments'], group_count, moment_columns)
+    fraction = (1 / sample['scale']) if plan['method'] == 'block' else plan['fraction']
+    z = NormalDist().inv_cdf(0.5 + APPROX_CONFIDENCE / 2)
+
+    columns = []
+    for i, name in enumerate(sample['columns'][:visible]):
+        columns.append(name)
+        if i in moment_columns:
+            columns.append(f'{name} ±')
+
+    rows = []
+    for row in sample['rows']:
+        group = sums.get(tuple(row[visible:]), {})
+        out = []
+        for i, value in enumerate(row[:visible]):
+            aggregate = items[i]['aggregate']
+            if aggregate and aggregate['func'] == 'COUNT' and value is not None:
+                value = int(round(value))
+            out.append(value)
+            if i in moment_columns:
+                acc = group.get(i)
+                margin = _margin(aggregate['func'], acc, sample['blocks'], sample['scale'], fraction, z) \
+                    if acc else None
+                out.append(round(margin, 6) if margin is not None else None)
+        rows.append(out)
+
+    names = sample['columns']
+    return {
+        'success': True,
+        'columns': columns,
+        'rows': rows,
+        'row_count': len(rows),
+        'approximate': True,
+        'approximation': {
+            'method': plan['method'],
+            'table': plan['table'],
+            'table_rows': plan['table_rows'],
+            'sampled_rows': sample['sampled_rows'] if sample['sampled_rows'] is not None
+            else round(plan['table_rows'] * plan['fraction']),
+            'fraction': round(fraction, 6),
+            'confidence': APPROX_CONFIDENCE,
+            'blocks': sample['blocks'],
+            'estimated_columns': [names[i] for i in range(visible)
+                                  if items[i]['has_aggregate']],
+            'sample_only_columns': [names[i] for i in range(visible)
+                                    if items[i]['aggregate'] and items[i]['aggregate']['func'] in ('MIN', 'MAX')],
+        },
+    }
+
+def execute_approximate(db_path, sql_query, plan):
+    """
+    표본으로 근사 실행 (쿼리 실행기 워커 프로세스, interactive 우선순위)
+
+    Args:
+        plan: plan_approximation 결과
+
+    Returns:
+        dict: finalize_estimates 형식 (실패 시 {'success': False, 'error'})
+    """
+    from utils.query_executor import QUERY_TIMEOUTS, submit_task
+
+    start = time.perf_counter()
+    sample = submit_task(db_path, run_sample, (db_path, sql_query, plan, QUERY_TIMEOUTS['interactive']),
+                         priority='interactive').result()
+    if not sample['success']:
+        metrics.increment('approximate.errors')
+        return sample
+    result = finalize_estimates(parse_aggregate_query(sql_query), plan, sample)
+    elapsed = time.perf_counter() - start
+    result['approximation']['elapsed_ms'] = round(elapsed * 1000, 2)
+    metrics.increment('approximate.queries')
+    metrics.observe('approximate.latency_s', elapsed)
+    return result
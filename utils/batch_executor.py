@@ -0,0 +1,143 @@
+# utils/batch_executor.py
+
+import json
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.query_executor import QUERY_TIMEOUTS, _readonly_connect, execute_with_timeout
+
+# 서로 다른 DB를 동시에 실행할 최대 스레드 수
+BATCH_MAX_WORKERS = 4
+
+# 한 요청에 허용하는 최대 항목 수
+BATCH_MAX_ITEMS = 200
+
+def validate_items(items):
+    """
+    배치 항목 검증
+
+    Returns:
+        str | None: 에러 메시지 (정상이면 None)
+    """
+    if not isinstance(items, list) or not items:
+        return 'items는 비어 있지 않은 리스트여야 합니다.'
+    if len(items) > BATCH_MAX_ITEMS:
+        return f'한 번에 최대 {BATCH_MAX_ITEMS}개까지 실행할 수 있습니다.'
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('db') or not item.get('sql'):
+            return f'items[{i}]에 db와 sql이 필요합니다.'
+        if not isinstance(item['db'], str) or not isinstance(item['sql'], str) or not item['sql'].strip():
+            return f'items[{i}]의 db와 sql은 비어 있지 않은 문자열이어야 합니다.'
+        if 'question' in item and not isinstance(item['question'], str):
+            return f'items[{i}]의 question은 문자열이어야 합니다.'
+    return None
+
+def _run_db_group(db_path, entries, results):
+    """
+    같은 DB의 항목들을 하나의 읽기 전용 연결에서 순서대로 실행 (항목마다 interactive 실행 시간 한도)
+
+    Args:
+        entries: [(index, item)] 리스트
+        results: 완료된 (index, 결과) 를 넣을 큐
+    """
+    try:
+        conn = _readonly_connect(db_path)
+    except Exception as e:
+        for index, _ in entries:
+            results.put((index, {'success': False, 'error': str(e), 'elapsed_ms': 0.0}))
+        return
+    try:
+        for index, item in entries:
+            start = time.perf_counter()
+            result = execute_with_timeout(conn, item['sql'].strip(), QUERY_TIMEOUTS['interactive'], start=start)
+            result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            results.put((index, result))
+    finally:
+        conn.close()
+
+def run_batch(items, databases, max_workers=BATCH_MAX_WORKERS):
+    """
+    배치 SQL 실행 (DB별 연결 1개, DB 간에는 스레드 풀로 병렬 실행)
+
+    결과는 요청 순서대로, 앞선 항목이 모두 끝나는 즉시 하나씩 yield됩니다.
+
+    Args:
+        items: [{'db': DB 키, 'sql': SQL, 'question': 질문(선택)}]
+        databases: load_databases() 결과
+
+    Yields:
+        dict: {
+            'index': 요청 내 순번,
+            'db': DB 키,
+            'success': bool,
+            'columns': [...], 'rows': [...]  (성공 시)
+            'error': 에러 메시지 (실패 시),
+            'elapsed_ms': 실행 시간
+        }
+    """
+    results = queue.Queue()
+    groups = {}
+
+    for index, item in enumerate(items):
+        db = item['db']
+        if db not in databases:
+            results.put((index, {'success': False, 'error': 'DB not found', 'elapsed_ms': 0.0}))
+            continue
+        groups.setdefault(db, []).append((index, item))
+
+    workers = max(1, min(max_workers, len(groups)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_run_db_group, databases[db]['file'], entries, results): entries
+            for db, entries in groups.items()
+        }
+
+        pending = {}
+        next_index = 0
+        while next_index < len(items):
+            try:
+                index, result = results.get(timeout=0.5)
+            except queue.Empty:
+                # 연결 실패 등으로 그룹 전체가 중단된 경우 남은 항목을 실패 처리
+                for future, entries in list(futures.items()):
+                    if future.done() and future.exception() is not None:
+                        for index, _ in entries:
+                            if index >= next_index and index not in pending:
+                                pending[index] = {'success': False, 'error': str(future.exception()), 'elapsed_ms': 0.0}
+                        del futures[future]
+                index = None
+
+            if index is not None:
+                pending[index] = result
+
+            while next_index in pending:
+                result = pending.pop(next_index)
+                result['index'] = next_index
+                result['db'] = items[next_index]['db']
+                yield result
+                next_index += 1
+
+def stream_ndjson(results, on_result=None):
+    """
+    결과 이터레이터를 NDJSON 라인으로 변환 (마지막 줄은 요약)
+
+    Args:
+        on_result: 각 결과마다 호출할 콜백 (히스토리 저장 등)
+    """
+    start = time.perf_counter()
+    count = 0
+    failed = 0
+
+    for result in results:
+        if on_result:
+            on_result(result)
+        count += 1
+        failed += 0 if result['success'] else 1
+        yield json.dumps(result, ensure_ascii=False, default=str) + '\n'
+
+    yield json.dumps({
+        'done': True,
+        'count': count,
+        'failed': failed,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+    }) + '\n'
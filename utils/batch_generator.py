@@ -0,0 +1,106 @@
+# utils/batch_generator.py
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.gemini_client import ask_gemini
+from utils.llm_provider import LLMError
+from utils.query_executor import run_query
+from utils.query_generator import build_db_sql_prompt_parts, build_sql_suffix, parse_sql_response
+from utils.schema_analyzer import get_database_schema
+
+# 동시에 진행할 LLM 호출 최대 개수 (요청에서 더 낮게 지정 가능)
+LLM_BATCH_CONCURRENCY = int(os.getenv('LLM_BATCH_CONCURRENCY', '4'))
+
+# 한 요청에 허용하는 최대 질문 수
+MAX_QUESTIONS = 100
+
+def validate_questions(questions):
+    """
+    질문 리스트 검증
+
+    Returns:
+        str | None: 에러 메시지 (정상이면 None)
+    """
+    if not isinstance(questions, list) or not questions:
+        return 'questions는 비어 있지 않은 리스트여야 합니다.'
+    if len(questions) > MAX_QUESTIONS:
+        return f'한 번에 최대 {MAX_QUESTIONS}개까지 생성할 수 있습니다.'
+    if any(not isinstance(q, str) or not q.strip() for q in questions):
+        return '빈 질문이 포함되어 있습니다.'
+    return None
+
+def resolve_concurrency(requested=None):
+    """
+    요청 동시성을 [1, LLM_BATCH_CONCURRENCY] 범위로 제한
+
+    Raises:
+        ValueError: 정수로 해석할 수 없는 값
+    """
+    if requested is None:
+        return LLM_BATCH_CONCURRENCY
+    try:
+        return max(1, min(int(requested), LLM_BATCH_CONCURRENCY))
+    except (TypeError, ValueError):
+        raise ValueError('concurrency는 정수여야 합니다.')
+
+def _generate_one(index, question, prefix, stats_text, model_name, db_path, execute):
+    """질문 1개 처리 (SQL 생성 + 선택적 실행)"""
+    result = {'index': index, 'question': question}
+
+    start = time.perf_counter()
+    try:
+        response = ask_gemini(build_sql_suffix(question, stats_text), model_name=model_name,
+                              cache_prefix=prefix, cache_scope=db_path)
+    except LLMError as e:
+        result['llm_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        result.update(e.to_dict())
+        result['error'] = result.pop('message')
+        return result
+
+    parsed = parse_sql_response(response)
+    result['llm_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    result['reasoning'] = parsed['reasoning']
+    result['sql'] = parsed['sql']
+    result['success'] = not parsed['sql'].startswith('-- SQL 생성 실패')
+    if not result['success']:
+        result['error'] = 'SQL 파싱 실패'
+
+    if execute and result['success']:
+        start = time.perf_counter()
+        executed = run_query(db_path, parsed['sql'], priority='interactive')
+        result['execute_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        result['executed'] = executed
+        result['success'] = executed['success']
+        if not executed['success']:
+            result['error'] = executed['error']
+
+    return result
+
+def generate_batch(db_path, questions, model_name, execute=False, concurrency=None):
+    """
+    여러 질문의 SQL을 동시에 생성 (스키마는 한 번만 추출, 스키마 접두부는 단건 생성과 같은 컨텍스트 캐시로 공유)
+
+    Args:
+        db_path: DB 파일 경로
+        questions: 자연어 질문 리스트
+        model_name: 사용할 LLM 모델
+        execute: True면 생성된 SQL을 바로 실행 (쿼리 실행기, 읽기 전용)
+        concurrency: 동시 LLM 호출 수 (resolve_concurrency로 검증한 값, None이면 기본값)
+
+    Yields:
+        dict: 완료 순서대로 {
+            'index', 'question', 'reasoning', 'sql', 'success',
+            'llm_ms', 'execute_ms'/'executed' (execute=True), 'error' (실패 시)
+        }
+    """
+    prefix, stats_text = build_db_sql_prompt_parts(get_database_schema(db_path))
+    workers = min(resolve_concurrency(concurrency), len(questions))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_generate_one, i, q.strip(), prefix, stats_text, model_name, db_path, execute)
+            for i, q in enumerate(questions)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
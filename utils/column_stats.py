@@ -0,0 +1,302 @@
+# utils/column_stats.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from utils.sqlite_tuning import connect, file_signature
+
+# 통계 저장 파일 (DB별 스키마 지문과 함께 저장, 서버 재시작 후 재사용)
+STATS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'column_stats.json')
+
+# 컬럼별 상위 빈도 값 개수 (범주형 컬럼만)
+TOP_K = 5
+
+# 고유값 수를 정확히 세는 상한 (초과하면 distinct_exact=False, 상위 값 생략)
+DISTINCT_CAP = 1000
+
+# 프롬프트에 값 목록을 그대로 보여줄 범주형 컬럼의 최대 고유값 수
+PROMPT_CATEGORY_MAX = 12
+PROMPT_VALUE_MAX_CHARS = 30
+
+# ANALYZE 시 인덱스당 검사할 최대 행 수 (플래너 통계는 근사로 충분)
+ANALYSIS_LIMIT = 1000
+
+# 행 수/최대 rowid가 같아도 (UPDATE만 있었던 경우 대비) 이 시간이 지나면 테이블 재계산
+STATS_MAX_AGE = 24 * 3600
+
+_watchers = {}   # db_path -> {'conn', 'inode'} (PRAGMA data_version 감시용 상주 연결)
+_memory = {}     # db_path -> {'version', 'stats'}
+_locks = {}
+_registry_lock = threading.Lock()
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _db_lock(db_path):
+    with _registry_lock:
+        return _locks.setdefault(db_path, threading.Lock())
+
+def _watcher(db_path):
+    """
+    DB별 상주 연결 (PRAGMA data_version은 같은 연결에서 비교해야 의미가 있음)
+    파일이 교체되면(inode 변경) 새로 연결
+    """
+    inode = os.stat(db_path).st_ino
+    watcher = _watchers.get(db_path)
+    if watcher is None or watcher['inode'] != inode:
+        if watcher is not None:
+            watcher['conn'].close()
+            _memory.pop(db_path, None)
+        watcher = _watchers[db_path] = {
+            'conn': connect(db_path, check_same_thread=False),
+            'inode': inode,
+        }
+    return watcher['conn']
+
+def _data_version(conn):
+    """다른 연결(프로세스)이 커밋할 때마다 바뀌는 값"""
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+def _file_signature(db_path):
+    return file_signature(db_path)
+
+def schema_fingerprint(conn):
+    """사용자 테이블/인덱스 정의의 해시 (ANALYZE가 만드는 sqlite_stat* 제외)"""
+    rows = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+    ).fetchall()
+    return hashlib.sha1(json.dumps(rows).encode('utf-8')).hexdigest()
+
+def _load_store():
+    if os.path.exists(STATS_FILE):
+        try:
+            with open(STATS_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+def _save_store(store):
+    tmp = STATS_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(store, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp, STATS_FILE)
+
+def _jsonable(value):
+    """BLOB 값은 JSON으로 저장할 수 없으므로 요약 문자열로 대체"""
+    if isinstance(value, bytes):
+        return f"<blob {len(value)} bytes>"
+    return value
+
+def _table_signature(conn, table):
+    """(행 수, 최대 rowid) - 삽입/삭제 감지용 (WITHOUT ROWID 테이블은 행 수만)"""
+    try:
+        return list(conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {_quote(table)}").fetchone())
+    except sqlite3.OperationalError:
+        return [conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0], None]
+
+def _compute_table(conn, table, row_count):
+    """
+    테이블 1개의 컬럼 통계 계산 (ANALYZE + 집계 쿼리 1회 + 상한 있는 고유값 수 + 범주형 컬럼 상위 값)
+
+    Returns:
+        dict: {컬럼명: {distinct, distinct_exact, nulls, null_fraction, min, max, top_values}}
+    """
+    try:
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        conn.execute(f"ANALYZE {_quote(table)}")  # 쿼리 플래너용 sqlite_stat1 갱신
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass  # 읽기 전용 DB 등 - 컬럼 통계는 계속 계산
+
+    table_info = conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+    columns = [row[1] for row in table_info]
+    if not columns:
+        return {}
+
+    # INTEGER PRIMARY KEY(rowid 별칭)는 항상 고유하므로 고유값 계산 생략
+    pk_columns = [row for row in table_info if row[5]]
+    rowid_alias = (pk_columns[0][1] if len(pk_columns) == 1 and pk_columns[0][2].upper() == 'INTEGER'
+                   else None)
+
+    # 모든 컬럼의 NULL 수/최소/최대를 테이블 1회 스캔으로 계산
+    select = ', '.join(f"SUM({_quote(c)} IS NULL), MIN({_quote(c)}), MAX({_quote(c)})" for c in columns)
+    values = conn.execute(f"SELECT {select} FROM {_quote(table)}").fetchone()
+
+    stats = {}
+    for i, column in enumerate(columns):
+        nulls, min_value, max_value = values[i * 3:(i + 1) * 3]
+        nulls = nulls or 0
+
+        if column == rowid_alias:
+            distinct, exact = row_count - nulls, True
+        else:
+            # 고유값 수는 DISTINCT_CAP까지만 셈 (고카디널리티 컬럼은 상한에 닿는 즉시 중단)
+            distinct = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT DISTINCT {_quote(column)} FROM {_quote(table)} "
+                f"WHERE {_quote(column)} IS NOT NULL LIMIT ?)",
+                (DISTINCT_CAP + 1,)
+            ).fetchone()[0]
+            exact = distinct <= DISTINCT_CAP
+
+        stats[column] = {
+            'distinct': distinct,
+            'distinct_exact': exact,
+            'nulls': nulls,
+            'null_fraction': round(nulls / row_count, 4) if row_count else 0.0,
+            'min': _jsonable(min_value),
+            'max': _jsonable(max_value),
+            'top_values': [],
+        }
+        # 범주형 컬럼 (고유값이 적고 행 수보다 충분히 작은 경우)만 상위 값 계산
+        if exact and 0 < distinct and distinct * 2 <= row_count:
+            rows = conn.execute(
+                f"SELECT {_quote(column)}, COUNT(*) FROM {_quote(table)} "
+                f"WHERE {_quote(column)} IS NOT NULL GROUP BY 1 ORDER BY 2 DESC LIMIT ?",
+                (TOP_K,)
+            ).fetchall()
+            stats[column]['top_values'] = [{'value': _jsonable(v), 'count': c} for v, c in rows]
+    return stats
+
+def _refresh(conn, previous, force=False):
+    """
+    변경된 테이블만 다시 계산 (행 수/최대 rowid가 같고 STATS_MAX_AGE 이내면 재사용)
+
+    Args:
+        previous: 같은 스키마 지문으로 저장된 이전 통계의 tables (없으면 {})
+    """
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+
+    result = {}
+    refreshed = []
+    for table in tables:
+        signature = _table_signature(conn, table)
+        old = previous.get(table)
+        if (not force and old and old.get('signature') == signature
+                and time.time() - old.get('computed_ts', 0) < STATS_MAX_AGE):
+            result[table] = old
+            continue
+
+        start = time.perf_counter()
+        result[table] = {
+            'signature': signature,
+            'row_count': signature[0],
+            'columns': _compute_table(conn, table, signature[0]),
+            'computed_ts': time.time(),
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+        refreshed.append(table)
+    return result, refreshed
+
+def get_column_stats(db_path, refresh=False):
+    """
+    DB의 테이블/컬럼 통계 (행 수, 고유값 수, NULL 비율, 최소/최대, 상위 값)
+
+    같은 프로세스에서는 PRAGMA data_version이 바뀌었을 때만,
+    재시작 후에는 파일이 바뀌었을 때만 다시 계산하며 그마저도 변경된 테이블만 계산합니다.
+
+    Args:
+        db_path: DB 파일 경로
+        refresh: True면 모든 테이블 강제 재계산
+
+    Returns:
+        dict: {
+            'fingerprint': 스키마 지문,
+            'computed_at': 마지막 계산 시각,
+            'tables': {테이블명: {row_count, columns: {컬럼명: 통계}, ...}}
+        }
+    """
+    with _db_lock(db_path):
+        conn = _watcher(db_path)
+        version = _data_version(conn)
+
+        cached = _memory.get(db_path)
+        if not refresh and cached and cached['version'] == version:
+            return cached['stats']
+
+        db_key = os.path.basename(db_path)
+        fingerprint = schema_fingerprint(conn)
+        store = _load_store()
+        persisted = store.get(db_key)
+        if persisted and persisted.get('fingerprint') != fingerprint:
+            persisted = None  # 스키마 변경 → 전체 재계산
+
+        if not refresh and persisted and persisted.get('file_signature') == _file_signature(db_path):
+            print(f"[STATS HIT] {db_key} 저장된 통계 사용")
+            stats = persisted
+        else:
+            start = time.perf_counter()
+            tables, refreshed = _refresh(conn, (persisted or {}).get('tables', {}), force=refresh)
+            stats = {
+                'fingerprint': fingerprint,
+                'computed_at': datetime.now().isoformat(),
+                'tables': tables,
+                'file_signature': _file_signature(db_path),  # ANALYZE 반영 후 시그니처
+            }
+            store[db_key] = stats
+            _save_store(store)
+            print(f"[STATS REFRESH] {db_key} {len(refreshed)}/{len(tables)}개 테이블 재계산 "
+                  f"({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+        # 자기 연결의 ANALYZE 커밋은 data_version을 바꾸지 않으므로 그대로 기록
+        _memory[db_path] = {'version': _data_version(conn), 'stats': stats}
+        return stats
+
+def _is_rangeable(value):
+    """값 범위를 보여줄 의미가 있는 타입 (수치, 날짜/시각 문자열)"""
+    if isinstance(value, (int, float)):
+        return True
+    return isinstance(value, str) and bool(re.match(r'\d{4}-\d{2}-\d{2}', value))
+
+def _short(value):
+    text = str(value)
+    return text if len(text) <= PROMPT_VALUE_MAX_CHARS else text[:PROMPT_VALUE_MAX_CHARS] + '…'
+
+def format_stats_for_prompt(stats):
+    """
+    프롬프트용 통계 요약 (테이블당 한 줄의 SQL 주석)
+
+    예: -- Orders (1,200행): status ∈ {'pending', 'shipped'}; order_date 2023-01-01~2024-12-31
+    """
+    lines = []
+    for table, table_stats in stats['tables'].items():
+        parts = []
+        for column, col in table_stats['columns'].items():
+            if col['distinct'] == 0:
+                continue
+            if col['top_values'] and col['distinct'] <= PROMPT_CATEGORY_MAX and isinstance(col['min'], str):
+                values = ', '.join(repr(_short(t['value'])) for t in col['top_values'])
+                more = ', …' if col['distinct'] > len(col['top_values']) else ''
+                parts.append(f"{column} ∈ {{{values}{more}}}")
+            elif (_is_rangeable(col['min']) and col['min'] != col['max']
+                  and col['distinct'] < table_stats['row_count']):
+                parts.append(f"{column} {_short(col['min'])}~{_short(col['max'])}")
+            if col['null_fraction'] >= 0.01:
+                parts.append(f"{column} NULL {col['null_fraction']:.0%}")
+        summary = f"-- {table} ({table_stats['row_count']:,}행)"
+        lines.append(summary + (': ' + '; '.join(parts) if parts else ''))
+
+    if not lines:
+        return ''
+    return "-- 테이블 통계 (행 수, 범주형 컬럼 값, 값 범위)\n" + '\n'.join(lines) + '\n'
+
+def clear_stats(db_path=None):
+    """통계 캐시 삭제 (db_path가 None이면 전체)"""
+    with _registry_lock:
+        paths = [db_path] if db_path else list(_memory)
+        for path in paths:
+            _memory.pop(path, None)
+    store = _load_store()
+    if db_path:
+        store.pop(os.path.basename(db_path), None)
+    else:
+        store = {}
+    _save_store(store)
@@ -0,0 +1,164 @@
+# utils/context_cache.py
+
+import hashlib
+import os
+import threading
+import time
+from utils import metrics
+
+# 프롬프트 접두부(역할 + 스키마 + 규칙)를 제공자 측 컨텍스트 캐시에 등록해 재사용
+CONTEXT_CACHE_ENABLED = os.getenv('LLM_CONTEXT_CACHE', '1') != '0'
+
+# 캐시 수명 (초). 만료 REFRESH_MARGIN초 전부터는 새로 등록
+CONTEXT_CACHE_TTL = int(os.getenv('LLM_CONTEXT_CACHE_TTL', '3600'))
+REFRESH_MARGIN = 60
+
+# 이보다 짧은 접두부는 캐시하지 않음 (Gemini 명시적 캐시 최소 토큰 수)
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv('LLM_CONTEXT_CACHE_MIN_TOKENS', '1024'))
+
+# 등록 실패(모델 미지원 등) 후 다시 시도하기까지 대기 (초)
+FAILURE_BACKOFF = 300
+
+# 캐시가 만료/삭제되어 찾을 수 없을 때의 예외 이름 (접두부를 포함한 전체 프롬프트로 재시도)
+_CACHE_MISS_NAMES = {'NotFound', 'StubCacheNotFoundError'}
+
+_entries = {}    # (model_name, fingerprint) -> {'handle', 'expires_at', 'tokens'} 또는 {'failed_until'}
+_scopes = {}     # (scope, model_name) -> 현재 fingerprint (스키마 변경 시 이전 캐시 삭제용)
+_key_locks = {}  # (model_name, fingerprint) -> Lock (같은 접두부 동시 등록 방지)
+_lock = threading.Lock()
+_settings = {
+    'enabled': CONTEXT_CACHE_ENABLED,
+    'min_tokens': CONTEXT_CACHE_MIN_TOKENS,
+    'ttl': CONTEXT_CACHE_TTL,
+}
+
+def configure_context_cache(enabled=None, min_tokens=None, ttl=None):
+    """
+    컨텍스트 캐시 설정 변경 (벤치마크/테스트용, 등록 기록 초기화)
+
+    Args:
+        enabled: 사용 여부
+        min_tokens: 캐시할 최소 접두부 토큰 수
+        ttl: 캐시 수명 (초)
+    """
+    if enabled is not None:
+        _settings['enabled'] = enabled
+    if min_tokens is not None:
+        _settings['min_tokens'] = min_tokens
+    if ttl is not None:
+        _settings['ttl'] = ttl
+    with _lock:
+        _entries.clear()
+        _scopes.clear()
+        _key_locks.clear()
+
+def prefix_fingerprint(prefix):
+    """접두부 지문 (스키마가 바뀌면 접두부와 함께 바뀜)"""
+    return hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]
+
+def is_cache_miss_error(exc):
+    """제공자가 캐시를 찾지 못한 에러인지 (만료/삭제)"""
+    return type(exc).__name__ in _CACHE_MISS_NAMES
+
+def resolve(prefix, model_name, create, delete=None, scope=None):
+    """
+    접두부의 캐시 핸들 반환 (없으면 등록, 만료가 가까우면 새로 등록)
+
+    Args:
+        prefix: 질문마다 같은 프롬프트 앞부분
+        model_name: 캐시는 모델별로 따로 등록됨
+        create: create(prefix, model_name, ttl) -> handle (제공자별 등록 함수)
+        delete: delete(handle) - 같은 scope의 이전 접두부 캐시 삭제
+        scope: 접두부의 출처 (DB 경로 등). 지문이 바뀌면 이전 캐시를 삭제
+
+    Returns:
+        handle 또는 None (비활성화/너무 짧음/등록 실패 → 전체 프롬프트 전송)
+    """
+    from utils.llm_provider import estimate_tokens
+
+    tokens = estimate_tokens(prefix)
+    if not _settings['enabled'] or tokens < _settings['min_tokens']:
+        return None
+
+    fingerprint = prefix_fingerprint(prefix)
+    key = (model_name, fingerprint)
+    with _lock:
+        stale = _replace_scope_locked(scope, model_name, fingerprint)
+        entry = _entries.get(key)
+        if _usable(entry):
+            metrics.increment('llm.context_cache.hits')
+            handle = entry['handle']
+        else:
+            handle = None
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    if stale is not None and delete is not None:
+        _delete_quietly(delete, stale)
+    if handle is not None:
+        return handle
+
+    with key_lock:
+        # 기다리는 동안 다른 요청이 등록했으면 그대로 사용
+        entry = _entries.get(key)
+        if _usable(entry):
+            metrics.increment('llm.context_cache.hits')
+            return entry['handle']
+        if entry and time.monotonic() < entry.get('failed_until', 0):
+            return None
+
+        ttl = _settings['ttl']
+        start = time.perf_counter()
+        try:
+            handle = create(prefix, model_name, ttl)
+        except Exception as e:
+            metrics.increment('llm.context_cache.errors')
+            print(f"[CONTEXT CACHE] {model_name} 등록 실패 - {FAILURE_BACKOFF}초 동안 전체 프롬프트 사용: {e}")
+            with _lock:
+                _entries[key] = {'failed_until': time.monotonic() + FAILURE_BACKOFF}
+            return None
+
+        metrics.increment('llm.context_cache.creates')
+        metrics.observe('llm.context_cache.create_s', time.perf_counter() - start)
+        print(f"[CONTEXT CACHE] {model_name} 접두부 등록 ({tokens} 토큰, {fingerprint})")
+        with _lock:
+            _entries[key] = {'handle': handle, 'expires_at': time.monotonic() + ttl, 'tokens': tokens}
+        return handle
+
+def invalidate(prefix, model_name):
+    """제공자 측에서 사라진 캐시 기록 제거 (다음 호출에서 다시 등록)"""
+    with _lock:
+        _entries.pop((model_name, prefix_fingerprint(prefix)), None)
+
+def _usable(entry):
+    return bool(entry and 'handle' in entry
+                and entry['expires_at'] - time.monotonic() > REFRESH_MARGIN)
+
+def _replace_scope_locked(scope, model_name, fingerprint):
+    """scope의 지문이 바뀌었으면 이전 캐시 기록을 빼고 그 핸들 반환"""
+    if scope is None:
+        return None
+    previous = _scopes.get((scope, model_name))
+    _scopes[(scope, model_name)] = fingerprint
+    if previous is None or previous == fingerprint:
+        return None
+    old = _entries.pop((model_name, previous), None)
+    _key_locks.pop((model_name, previous), None)
+    print(f"[CONTEXT CACHE] {scope} 스키마 변경 - 이전 접두부 캐시 폐기 ({previous})")
+    return old.get('handle') if old else None
+
+def _delete_quietly(delete, handle):
+    try:
+        delete(handle)
+    except Exception as e:
+        print(f"[CONTEXT CACHE] 이전 캐시 삭제 실패 (만료 시 자동 삭제): {e}")
+
+def context_cache_status():
+    """등록된 캐시 수/토큰 (/api/metrics용)"""
+    with _lock:
+        live = [e for e in _entries.values() if 'handle' in e]
+        return {
+            'enabled': _settings['enabled'],
+            'entries': len(live),
+            'cached_tokens': sum(e['tokens'] for e in live),
+            'min_tokens': _settings['min_tokens'],
+        }
@@ -0,0 +1,307 @@
+# utils/data_importer.py
+
+import codecs
+import csv
+import os
+import re
+import sqlite3
+import time
+from datetime import date, datetime, time as dt_time
+from itertools import islice
+from utils import metrics
+from utils.sqlite_tuning import connect, is_readonly, release
+
+# 타입 추론에 사용할 앞부분 행 수 (이 행들만 메모리에 보관)
+IMPORT_SAMPLE_ROWS = 1000
+
+# executemany 한 번에 넣는 행 수
+IMPORT_BATCH_ROWS = int(os.getenv('IMPORT_BATCH_ROWS', '20000'))
+
+# 적재 중 페이지 캐시 크기 (KB). 인덱스 생성 정렬도 이 크기까지만 메모리를 쓰고 임시 파일로 넘기므로
+# 파일 크기와 관계없이 적재 메모리는 대략 이 값의 2배 이내
+IMPORT_CACHE_KB = 32768
+
+IF_EXISTS_MODES = ('fail', 'append', 'replace')
+
+# 앞자리 0이 있는 숫자(우편번호, 코드 등)는 문자열로 유지
+_INTEGER = re.compile(r'[+-]?(0|[1-9]\d*)')
+_REAL = re.compile(r'[+-]?((0|[1-9]\d*)(\.\d*)?|\.\d+)([eE][+-]?\d+)?')
+_TYPE_RANK = {'INTEGER': 0, 'REAL': 1, 'TEXT': 2}
+
+# SQLite INTEGER 범위 (벗어나는 정수는 SQLite처럼 REAL로 저장)
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+def is_valid_identifier(name):
+    """테이블명으로 사용 가능한지 (DB key와 같은 규칙: 문자, 숫자, _)"""
+    return bool(name) and name.replace('_', '').isalnum()
+
+# ========== 파일 읽기 (행 단위 스트리밍) ==========
+
+def iter_csv_rows(stream, delimiter=','):
+    """바이너리 스트림에서 CSV 행을 하나씩 읽기 (UTF-8, BOM 허용)"""
+    reader = codecs.getreader('utf-8-sig')(stream)
+    yield from csv.reader(reader, delimiter=delimiter)
+
+def iter_xlsx_rows(stream, sheet=None):
+    """
+    엑셀 시트의 행을 하나씩 읽기
+
+    openpyxl 읽기 전용 모드는 시트 XML을 스트리밍으로 파싱하므로
+    파일 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        if sheet and sheet not in workbook.sheetnames:
+            raise ValueError(f"시트 '{sheet}'가 없습니다. (시트: {', '.join(workbook.sheetnames)})")
+        worksheet = workbook[sheet] if sheet else workbook.active
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def iter_file_rows(stream, filename, sheet=None):
+    """확장자에 따라 CSV/TSV/XLSX 행 반복자 반환"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.xlsx':
+        return iter_xlsx_rows(stream, sheet)
+    if extension in ('.csv', '.tsv', '.txt'):
+        return iter_csv_rows(stream, '\t' if extension == '.tsv' else ',')
+    raise ValueError('CSV(.csv/.tsv) 또는 엑셀(.xlsx) 파일만 가져올 수 있습니다.')
+
+# ========== 컬럼/타입 추론 ==========
+
+def normalize_columns(header):
+    """헤더 행 → 컬럼명 (빈 이름은 column_N, 중복은 _2, _3...)"""
+    columns, seen = [], set()
+    for i, value in enumerate(header):
+        base = (str(value).strip() if value is not None else '') or f'column_{i + 1}'
+        name, n = base, 1
+        while name.lower() in seen:  # SQLite 컬럼명은 대소문자 구분 안 함
+            n += 1
+            name = f'{base}_{n}'
+        seen.add(name.lower())
+        columns.append(name)
+    return columns
+
+def _fits_int64(number):
+    return _INT64_MIN <= number <= _INT64_MAX
+
+def _value_type(value):
+    if isinstance(value, bool):
+        return 'INTEGER'
+    if isinstance(value, int):
+        return 'INTEGER' if _fits_int64(value) else 'REAL'
+    if isinstance(value, float):
+        return 'REAL'
+    if isinstance(value, str):
+        text = value.strip()
+        if _INTEGER.fullmatch(text):
+            return 'INTEGER' if _fits_int64(int(text)) else 'REAL'
+        if _REAL.fullmatch(text):
+            return 'REAL'
+    return 'TEXT'  # 날짜/시간 등은 ISO 문자열로 저장
+
+def infer_column_types(sample_rows, column_count):
+    """
+    샘플 행으로 컬럼별 SQLite 타입 추론 (INTEGER < REAL < TEXT 중 모든 값을 담는 가장 좁은 타입)
+
+    빈 값은 NULL로 보고 추론에서 제외하며, 값이 하나도 없는 컬럼은 TEXT
+    """
+    types = [None] * column_count
+    for row in sample_rows:
+        for i in range(column_count):
+            value = row[i] if i < len(row) else None
+            if value is None or value == '':
+                continue
+            value_type = _value_type(value)
+            if types[i] is None or _TYPE_RANK[value_type] > _TYPE_RANK[types[i]]:
+                types[i] = value_type
+    return [t or 'TEXT' for t in types]
+
+def _converter(column_type):
+    """타입별 값 변환 함수 (변환할 수 없는 값은 그대로 저장 - SQLite 유연한 타입)"""
+    def convert(value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            text = value.strip()
+            if text == '':
+                return None
+            if column_type == 'INTEGER' and _INTEGER.fullmatch(text) and _fits_int64(int(text)):
+                return int(text)
+            if column_type in ('INTEGER', 'REAL') and _REAL.fullmatch(text):
+                return float(text)
+            return value
+        if isinstance(value, (datetime, date, dt_time)):
+            return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+        if isinstance(value, int) and not isinstance(value, bool) and not _fits_int64(value):
+            return float(value)  # sqlite3 바인딩은 int64를 넘는 정수에서 OverflowError
+        return value
+    return convert
+
+# ========== 적재 ==========
+
+def _batches(rows, column_count, converters, batch_rows):
+    """행 반복자 → 변환된 튜플 리스트 묶음 (길이 맞춤, 빈 행 제외)"""
+    while True:
+        chunk = []
+        for row in islice(rows, batch_rows):
+            row = list(row[:column_count]) + [None] * (column_count - len(row))
+            if all(value is None or value == '' for value in row):
+                continue
+            chunk.append(tuple(convert(value) for convert, value in zip(converters, row)))
+        if not chunk:
+            return
+        yield chunk
+
+def import_rows(db_path, table, rows, if_exists='fail', indexes=None, new_database=False):
+    """
+    행 반복자(첫 행은 헤더)를 SQLite 테이블로 적재
+
+    앞 IMPORT_SAMPLE_ROWS행으로 컬럼 타입을 추론한 뒤, 나머지는 IMPORT_BATCH_ROWS행씩
+    executemany로 넣습니다. 전체 적재는 하나의 트랜잭션이며, 요청된 인덱스는 데이터를
+    모두 넣은 뒤에 만듭니다(행마다 인덱스를 갱신하지 않음). 메모리에는 샘플과 한 묶음만 유지합니다.
+
+    Args:
+        db_path: 대상 DB 파일 (없으면 생성)
+        table: 테이블명
+        rows: 행 반복자 (헤더 포함)
+        if_exists: 테이블이 이미 있을 때 'fail' | 'append' | 'replace'
+        indexes: 적재 후 인덱스를 만들 컬럼명 리스트
+        new_database: 새로 만드는 DB인지 (롤백 저널 생략, 실패 시 파일 삭제)
+
+    Returns:
+        dict: {
+            'table', 'rows': 적재 행 수, 'columns': [{'name', 'type'}], 'indexes': [...],
+            'elapsed_s', 'rows_per_sec'
+        }
+
+    Raises:
+        ValueError: 잘못된 입력 (빈 파일, 테이블 존재, 없는 컬럼 등)
+    """
+    if not is_valid_identifier(table):
+        raise ValueError('테이블명은 영문, 숫자, _만 사용 가능합니다.')
+    if if_exists not in IF_EXISTS_MODES:
+        raise ValueError(f"if_exists는 {', '.join(IF_EXISTS_MODES)} 중 하나여야 합니다.")
+
+    rows = iter(rows)
+    header = next(rows, None)
+    if not header or all(value is None or str(value).strip() == '' for value in header):
+        raise ValueError('헤더 행이 없는 빈 파일입니다.')
+    columns = normalize_columns(header)
+    # 인덱스 컬럼은 적재 전에 확인 (전체를 넣은 뒤 실패해 롤백하지 않도록)
+    for column in indexes or []:
+        if column.lower() not in {c.lower() for c in columns}:
+            raise ValueError(f"인덱스 컬럼 '{column}'이(가) 파일에 없습니다.")
+    sample = list(islice(rows, IMPORT_SAMPLE_ROWS))
+
+    if not new_database and is_readonly(db_path):
+        raise ValueError('읽기 전용(ro/immutable) 튜닝 프로필의 DB에는 가져올 수 없습니다.')
+
+    start = time.perf_counter()
+    if new_database:
+        # 실패하면 파일째 삭제하므로 롤백 저널 불필요 (튜닝 프로필은 다음 연결부터 적용)
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = OFF")
+    else:
+        conn = connect(db_path, timeout=30, isolation_level=None)
+    try:
+        # 대량 적재용 설정 (이 연결에만 프로필 대신 적용): fsync 생략, 큰 페이지 캐시,
+        # 인덱스 생성 정렬은 메모리 대신 임시 파일로 넘치도록
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(f"PRAGMA cache_size = -{IMPORT_CACHE_KB}")
+        conn.execute("PRAGMA temp_store = FILE")
+
+        conn.execute("BEGIN IMMEDIATE")
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE", (table,)
+        ).fetchone()
+
+        if exists and if_exists == 'fail':
+            raise ValueError(f"테이블 '{table}'이(가) 이미 있습니다. (if_exists=append 또는 replace)")
+        if exists and if_exists == 'append':
+            declared = {row[1].lower(): (row[1], row[2].upper())
+                        for row in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+            missing = [c for c in columns if c.lower() not in declared]
+            if missing:
+                raise ValueError(f"테이블 '{table}'에 없는 컬럼: {', '.join(missing)}")
+            types = [declared[c.lower()][1] or 'TEXT' for c in columns]
+        else:
+            if exists:
+                conn.execute(f"DROP TABLE {_quote(table)}")
+            types = infer_column_types(sample, len(columns))
+            conn.execute(f"CREATE TABLE {_quote(table)} ("
+                         + ', '.join(f"{_quote(c)} {t}" for c, t in zip(columns, types)) + ")")
+
+        insert = (f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+                  f"VALUES ({', '.join('?' * len(columns))})")
+        converters = [_converter(t) for t in types]
+        loaded = 0
+        for source in (iter(sample), rows):
+            for chunk in _batches(source, len(columns), converters, IMPORT_BATCH_ROWS):
+                conn.executemany(insert, chunk)
+                loaded += len(chunk)
+
+        created = []
+        for column in indexes or []:
+            index_name = f"idx_{table}_{column}"
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(index_name)} ON {_quote(table)} ({_quote(column)})")
+            created.append(index_name)
+
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA optimize")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    rows_per_sec = round(loaded / elapsed, 1) if elapsed > 0 else 0.0
+    metrics.increment('import.rows', loaded)
+    metrics.observe('import.rows_per_sec', rows_per_sec)
+    print(f"[IMPORT] {os.path.basename(db_path)}.{table}: {loaded}행, {elapsed:.2f}초 ({rows_per_sec:,.0f}행/초)")
+
+    return {
+        'table': table,
+        'rows': loaded,
+        'columns': [{'name': c, 'type': t} for c, t in zip(columns, types)],
+        'indexes': created,
+        'elapsed_s': round(elapsed, 3),
+        'rows_per_sec': rows_per_sec,
+    }
+
+def import_file(db_path, stream, filename, table=None, if_exists='fail', indexes=None, sheet=None):
+    """
+    업로드 파일(CSV/TSV/XLSX)을 DB 테이블로 가져오기
+
+    DB 파일이 없으면 새로 만들고, 실패하면 만든 파일을 삭제합니다.
+
+    Args:
+        stream: 파일 바이너리 스트림 (XLSX는 seek 가능해야 함)
+        filename: 원래 파일명 (형식 판별, table이 없으면 테이블명으로 사용)
+        table: 테이블명 (None이면 파일명에서)
+        sheet: XLSX 시트명 (None이면 첫 시트)
+
+    Returns:
+        dict: import_rows 결과 + 'created_db'
+    """
+    table = table or re.sub(r'\W', '_', os.path.splitext(os.path.basename(filename or ''))[0]).strip('_')
+    new_database = not os.path.exists(db_path)
+    try:
+        result = import_rows(db_path, table, iter_file_rows(stream, filename, sheet),
+                             if_exists=if_exists, indexes=indexes, new_database=new_database)
+    except BaseException:
+        if new_database:
+            release(db_path)
+            for path in (db_path, db_path + '-wal', db_path + '-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
+        raise
+    result['created_db'] = new_database
+    return result
@@ -0,0 +1,369 @@
+# utils/export_jobs.py
+
+import csv
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from utils import metrics
+
+# 내보내기 파일을 만드는 임시 폴더 (작업별 하위 폴더)
+EXPORT_JOB_DIR = os.getenv('EXPORT_JOB_DIR', os.path.join(tempfile.gettempdir(), 'sql_agent_exports'))
+
+# 완료된 파일 보관 시간 (초). 지나면 파일과 작업 기록 삭제
+EXPORT_JOB_TTL = int(os.getenv('EXPORT_JOB_TTL', '3600'))
+
+# 작업 하나의 실행 시간 한도 (초)
+EXPORT_JOB_TIMEOUT = float(os.getenv('EXPORT_JOB_TIMEOUT', '1800'))
+
+# 한 번에 가져와 쓰는 행 수 / 진행 상황 파일 갱신 간격 (초)
+EXPORT_FETCH_ROWS = 5000
+PROGRESS_INTERVAL = 0.5
+
+# ETA 계산용 전체 행 수를 세는 데 쓸 최대 시간 (초, 넘기면 ETA 없이 진행)
+COUNT_BUDGET = 2.0
+
+# 엑셀 시트당 최대 행 수 (헤더 포함, 넘치면 다음 시트에 이어서 씀)
+EXCEL_MAX_ROWS = 1_048_576
+
+FORMATS = {
+    'csv': {'extension': 'csv', 'mimetype': 'text/csv'},
+    'excel': {'extension': 'xlsx',
+              'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+}
+
+# 아직 끝나지 않은 작업 상태
+IN_PROGRESS = ('queued', 'running', 'finalizing')
+
+_jobs = {}       # job_id -> 작업 정보
+_active = {}     # 중복 판별 키 -> 대기/실행 중인 job_id
+_lock = threading.Lock()
+_swept_at = [0.0]
+
+# ========== 워커 프로세스에서 실행되는 함수 ==========
+
+def _write_progress(progress_path, **progress):
+    """진행 상황 파일 교체 (웹 프로세스가 읽는 도중 반쯤 쓴 내용을 보지 않도록 rename)"""
+    temp_path = progress_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(progress, f)
+    os.replace(temp_path, progress_path)
+
+def _count_rows(conn, sql_query):
+    """전체 행 수 (COUNT_BUDGET 안에 끝나지 않으면 None)"""
+    deadline = time.perf_counter() + COUNT_BUDGET
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql_query.rstrip().rstrip(';')})").fetchone()[0]
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.set_progress_handler(None, 0)
+
+class _CsvSink:
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', newline='', encoding='utf-8-sig')  # BOM (엑셀 한글 깨짐 방지)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class _ExcelSink:
+    """openpyxl 쓰기 전용 모드 (행을 임시 XML로 바로 내보내 메모리 일정)"""
+
+    def __init__(self, path, columns):
+        from openpyxl import Workbook
+        self.workbook = Workbook(write_only=True)
+        self.path = path
+        self.columns = columns
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill
+
+        self.sheets += 1
+        title = "Query Result" if self.sheets == 1 else f"Query Result ({self.sheets})"
+        self.sheet = self.workbook.create_sheet(title)
+        header = []
+        for name in self.columns:
+            cell = WriteOnlyCell(self.sheet, value=name)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
+            header.append(cell)
+        self.sheet.append(header)
+        self.sheet_rows = 1
+
+    def write(self, rows):
+        for row in rows:
+            if self.sheet_rows >= EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def close(self):
+        self.workbook.save(self.path)
+
+def run_export(db_path, sql_query, fmt, output_path, progress_path, cancel_path, timeout):
+    """
+    워커 프로세스에서 쿼리 결과를 파일로 스트리밍
+
+    EXPORT_FETCH_ROWS행씩 읽어 바로 파일에 쓰고, PROGRESS_INTERVAL마다 진행 상황 파일을 갱신합니다.
+    cancel_path 파일이 생기면 다음 묶음에서 중단합니다.
+
+    Returns:
+        dict: {'success', 'rows', 'columns'} 또는 {'success': False, 'error', 'cancelled'?}
+    """
+    from utils.query_executor import _readonly_connect
+
+    if os.path.exists(cancel_path):  # 대기 중에 취소됨
+        return {'success': False, 'cancelled': True, 'error': '취소됨'}
+
+    start, started_at = time.perf_counter(), time.time()
+    part_path = output_path + '.part'
+    try:
+        conn = _readonly_connect(db_path)
+        try:
+            total = _count_rows(conn, sql_query)
+            _write_progress(progress_path, rows_written=0, total_rows=total, started_at=started_at)
+
+            deadline = start + timeout
+            conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000)
+            cursor = conn.execute(sql_query)
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+
+            sink = (_ExcelSink if fmt == 'excel' else _CsvSink)(part_path, columns)
+            written, reported_at = 0, time.perf_counter()
+            try:
+                while True:
+                    rows = cursor.fetchmany(EXPORT_FETCH_ROWS)
+                    if not rows:
+                        break
+                    sink.write(rows)
+                    written += len(rows)
+                    if time.perf_counter() - reported_at >= PROGRESS_INTERVAL:
+                        if os.path.exists(cancel_path):
+                            return {'success': False, 'cancelled': True, 'error': '취소됨', 'rows': written}
+                        _write_progress(progress_path, rows_written=written, total_rows=total,
+                                        started_at=started_at)
+                        reported_at = time.perf_counter()
+                _write_progress(progress_path, rows_written=written, total_rows=total, finalizing=True,
+                                started_at=started_at)
+            finally:
+                sink.close()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:
+        if str(e) == 'interrupted':
+            return {'success': False, 'error': f'내보내기 시간 초과 ({timeout:g}초)'}
+        return {'success': False, 'error': str(e)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+    os.replace(part_path, output_path)
+    return {'success': True, 'rows': written, 'columns': columns}
+
+# ========== 웹 프로세스 측 작업 관리 ==========
+
+def _job_key(db_path, sql_query, fmt):
+    """같은 DB/SQL/형식의 동시 요청을 하나로 묶는 키"""
+    return hashlib.sha1(f"{db_path}\0{fmt}\0{sql_query.strip()}".encode('utf-8')).hexdigest()
+
+def submit_export(db_name, db_path, sql_query, fmt):
+    """
+    내보내기 작업 등록
+
+    같은 DB/SQL/형식의 작업이 대기/실행 중이면 새로 만들지 않고 그 작업을 반환합니다.
+    작업은 쿼리 실행기 워커 프로세스에서 export 우선순위로 실행됩니다.
+
+    Returns:
+        tuple: (작업 상태 dict, 중복 요청 여부)
+    """
+    from utils.query_executor import submit_task
+
+    if fmt not in FORMATS:
+        raise ValueError('Invalid format')
+    _sweep_expired()
+
+    key = _job_key(db_path, sql_query, fmt)
+    with _lock:
+        existing = _active.get(key)
+        if existing is not None:
+            metrics.increment('export_jobs.deduplicated')
+            return _status_locked(_jobs[existing]), True
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(EXPORT_JOB_DIR, job_id)
+        os.makedirs(job_dir)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        job = _jobs[job_id] = {
+            'id': job_id,
+            'key': key,
+            'db_name': db_name,
+            'format': fmt,
+            'status': 'queued',
+            'dir': job_dir,
+            'path': os.path.join(job_dir, f"export.{FORMATS[fmt]['extension']}"),
+            'download_name': f"{db_name}_export_{timestamp}.{FORMATS[fmt]['extension']}",
+            'created_at': time.time(),
+        }
+        _active[key] = job_id
+
+    metrics.increment('export_jobs.submitted')
+    future = submit_task(db_path, run_export,
+                         (db_path, sql_query, fmt, job['path'], os.path.join(job_dir, 'progress.json'),
+                          os.path.join(job_dir, 'cancel'), EXPORT_JOB_TIMEOUT),
+                         priority='export')
+    future.add_done_callback(lambda f, job=job: _on_done(job, f.result()))
+    with _lock:
+        return _status_locked(job), False
+
+def _on_done(job, result):
+    with _lock:
+        _active.pop(job['key'], None)
+        job['finished_at'] = time.time()
+        job['expires_at'] = job['finished_at'] + EXPORT_JOB_TTL
+        if result['success']:
+            job['status'] = 'done'
+            job['rows'] = result['rows']
+        else:
+            job['status'] = 'cancelled' if result.get('cancelled') else 'failed'
+            job['error'] = result['error']
+            job['rows'] = result.get('rows', 0)
+
+    metrics.increment(f"export_jobs.{job['status']}")
+    if job['status'] == 'done':
+        elapsed = job['finished_at'] - job['created_at']
+        metrics.observe('export_jobs.rows_per_sec', job['rows'] / elapsed if elapsed > 0 else 0.0)
+        print(f"[EXPORT] {job['db_name']} {job['id'][:8]} 완료 ({job['rows']}행, {elapsed:.1f}초)")
+    else:
+        shutil.rmtree(job['dir'], ignore_errors=True)
+        print(f"[EXPORT] {job['db_name']} {job['id'][:8]} {job['status']}: {job['error']}")
+
+def _read_progress(job):
+    try:
+        with open(os.path.join(job['dir'], 'progress.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _status_locked(job):
+    """
+    작업 상태 (진행 중이면 쓴 행 수, 처리 속도, 전체 행 수를 알 때 예상 남은 시간)
+    """
+    status = {
+        'job_id': job['id'],
+        'db_name': job['db_name'],
+        'format': job['format'],
+        'status': job['status'],
+        'rows_written': job.get('rows', 0),
+        'total_rows': None,
+        'percent': None,
+        'rows_per_sec': None,
+        'eta_s': None,
+        'elapsed_s': round((job.get('finished_at') or time.time()) - job['created_at'], 2),
+    }
+    if job['status'] in IN_PROGRESS:
+        progress = _read_progress(job)
+        if progress is not None:
+            job['status'] = status['status'] = 'finalizing' if progress.get('finalizing') else 'running'
+            written, total = progress['rows_written'], progress['total_rows']
+            running_s = time.time() - progress['started_at']
+            rate = written / running_s if running_s > 0 else 0.0
+            status.update(rows_written=written, total_rows=total,
+                          rows_per_sec=round(rate, 1) if written else None)
+            if total:
+                status['percent'] = round(min(100.0, written * 100 / total), 1)
+                if rate > 0:
+                    status['eta_s'] = round(max(0, total - written) / rate, 1)
+    elif job['status'] == 'done':
+        status.update(total_rows=job['rows'], percent=100.0, eta_s=0,
+                      download_url=f"/api/export_jobs/{job['id']}/download",
+                      expires_in_s=round(job['expires_at'] - time.time()))
+    else:
+        status['error'] = job['error']
+    return status
+
+def get_export_job(job_id):
+    """작업 상태 (없거나 만료되었으면 None)"""
+    _sweep_expired()
+    with _lock:
+        job = _jobs.get(job_id)
+        return _status_locked(job) if job else None
+
+def get_export_file(job_id):
+    """
+    완료된 작업의 파일 정보
+
+    Returns:
+        dict | None: {'path', 'download_name', 'mimetype'} (완료 전/없음/만료면 None)
+    """
+    _sweep_expired()
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or job['status'] != 'done':
+            return None
+        return {'path': job['path'], 'download_name': job['download_name'],
+                'mimetype': FORMATS[job['format']]['mimetype']}
+
+def cancel_export_job(job_id):
+    """
+    작업 취소 (실행 중이면 다음 묶음에서 중단) 또는 완료된 파일 삭제
+
+    Returns:
+        bool: 작업 존재 여부
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return False
+        if job['status'] not in IN_PROGRESS:
+            _jobs.pop(job_id)
+            shutil.rmtree(job['dir'], ignore_errors=True)
+            return True
+    open(os.path.join(job['dir'], 'cancel'), 'w').close()
+    return True
+
+def _sweep_expired():
+    """
+    만료된 작업의 파일/기록 삭제 (요청 처리 중 최대 1분에 한 번)
+    이전 서버 실행에서 남은 오래된 작업 폴더도 함께 정리
+    """
+    now = time.time()
+    with _lock:
+        if now - _swept_at[0] < 60:
+            return
+        _swept_at[0] = now
+        expired = [job for job in _jobs.values() if job.get('expires_at', now + 1) <= now]
+        for job in expired:
+            _jobs.pop(job['id'])
+        known = set(_jobs)
+
+    for job in expired:
+        shutil.rmtree(job['dir'], ignore_errors=True)
+    if os.path.isdir(EXPORT_JOB_DIR):
+        for name in os.listdir(EXPORT_JOB_DIR):
+            path = os.path.join(EXPORT_JOB_DIR, name)
+            if name not in known and now - os.path.getmtime(path) > EXPORT_JOB_TTL:
+                shutil.rmtree(path, ignore_errors=True)
+    if expired:
+        print(f"[EXPORT] 만료된 내보내기 {len(expired)}건 삭제")
+
+def export_jobs_status():
+    """작업 현황 (/api/metrics용)"""
+    with _lock:
+        by_status = {}
+        for job in _jobs.values():
+            by_status[job['status']] = by_status.get(job['status'], 0) + 1
+        return {'jobs': by_status, 'ttl_s': EXPORT_JOB_TTL}
@@ -0,0 +1,207 @@
+# utils/federation.py
+
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from utils import metrics, query_executor
+from utils.query_executor import QUERY_TIMEOUTS, execute_with_timeout
+from utils.sqlite_tuning import apply_profile, db_mtime, tuning_profile
+
+# SQLite 기본 ATTACH 한도 (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED = 10
+
+# DB 조합별로 유지할 유휴 연결 수
+POOL_SIZE = 4
+
+# 인자를 받지만 조회만 하는 PRAGMA (그 외 PRAGMA는 인자 없는 조회만 허용)
+_INFO_PRAGMAS = {'table_info', 'table_xinfo', 'table_list', 'index_list', 'index_info', 'index_xinfo',
+                 'foreign_key_list', 'foreign_key_check', 'integrity_check', 'quick_check'}
+
+_pool = {}   # frozenset(db_keys) -> [(signature, conn), ...]
+_pool_lock = threading.Lock()
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+def validate_keys(db_keys, databases):
+    """
+    연합 쿼리 대상 DB 키 검증
+
+    Returns:
+        str | None: 에러 메시지 (정상이면 None)
+    """
+    if not isinstance(db_keys, list) or len(db_keys) < 1:
+        return 'dbs는 DB 키 리스트여야 합니다.'
+    if len(set(db_keys)) > MAX_ATTACHED:
+        return f'최대 {MAX_ATTACHED}개 DB까지 연결할 수 있습니다.'
+    missing = [key for key in db_keys if key not in databases]
+    if missing:
+        return f"등록되지 않은 DB: {', '.join(missing)}"
+    return None
+
+def _signature(db_keys, databases):
+    """ATTACH 대상 파일들의 (경로, inode, mtime) - 파일 교체 시 재연결 판단용"""
+    signature = []
+    for key in db_keys:
+        path = databases[key]['file']
+        signature.append((path, os.stat(path).st_ino, db_mtime(path)))
+    return tuple(signature)
+
+def _attached(conn):
+    """연결에 ATTACH된 스키마 이름 (사용자 SQL의 DETACH 감지용)"""
+    return {row[1] for row in conn.execute("PRAGMA database_list")} - {'main', 'temp'}
+
+def _deny_changes(action, arg1, arg2, db_name, source):
+    """사용자 SQL의 ATTACH/DETACH와 PRAGMA 설정 변경 차단 (PRAGMA 조회는 허용)"""
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_PRAGMA and arg2 is not None and arg1.lower() not in _INFO_PRAGMAS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+def _open(db_keys, databases):
+    """
+    메모리 DB를 main으로 하고 각 DB를 키 이름으로 읽기 전용(mode=ro) ATTACH한 연결 생성
+
+    사용자 SQL이 DB를 수정할 수 없도록 query_only를 켜고,
+    ATTACH 구성을 바꾸거나 PRAGMA로 설정을 되돌리는 구문은 authorizer로 막습니다.
+    """
+    conn = sqlite3.connect('file::memory:', uri=True, check_same_thread=False)
+    for key in db_keys:
+        path = databases[key]['file']
+        profile = tuning_profile(path)
+        uri = pathlib.Path(path).resolve().as_uri() + '?mode=ro'
+        if profile and profile['mode'] == 'immutable':
+            uri += '&immutable=1'
+        conn.execute(f"ATTACH DATABASE ? AS {_quote(key)}", (uri,))
+        if profile:
+            apply_profile(conn, profile, schema=key, writable=False)
+    conn.execute("PRAGMA query_only = ON")
+    conn.set_authorizer(_deny_changes)
+    return conn
+
+@contextmanager
+def federated_connection(db_keys, databases):
+    """
+    여러 DB가 ATTACH된 풀 연결을 빌려주는 컨텍스트 매니저
+    (같은 DB 조합은 매 요청마다 다시 ATTACH하지 않고 재사용)
+
+    Args:
+        db_keys: ATTACH할 DB 키 리스트 (스키마 이름으로 사용)
+        databases: load_databases() 결과
+    """
+    keys = sorted(set(db_keys))
+    pool_key = frozenset(keys)
+    signature = _signature(keys, databases)
+
+    conn = None
+    with _pool_lock:
+        idle = _pool.get(pool_key, [])
+        while idle:
+            cached_signature, cached_conn = idle.pop()
+            if cached_signature == signature and _attached(cached_conn) == set(keys):
+                conn = cached_conn
+                break
+            cached_conn.close()  # 파일이 교체/수정된 연결은 폐기
+
+    if conn is None:
+        conn = _open(keys, databases)
+
+    try:
+        yield conn
+    except Exception:
+        conn.close()
+        raise
+    else:
+        if conn.in_transaction:
+            conn.rollback()
+        with _pool_lock:
+            idle = _pool.setdefault(pool_key, [])
+            if len(idle) < POOL_SIZE:
+                idle.append((signature, conn))
+                conn = None
+        if conn is not None:
+            conn.close()
+
+def get_federated_schema(db_keys, databases):
+    """
+    ATTACH된 모든 DB의 테이블을 '<db키>.<테이블>' 형태로 한정한 스키마 추출
+
+    Returns:
+        dict: {
+            'tables': ['ecommerce.Orders', ...],
+            'schema_text': 'CREATE TABLE ecommerce.Orders (...) 구문들'
+        }
+    """
+    keys = sorted(set(db_keys))
+    tables = []
+    schema_text = (
+        "-- 여러 데이터베이스가 ATTACH되어 있습니다. "
+        "테이블은 반드시 <db키>.<테이블> 형태로 참조하세요.\n"
+        f"-- ATTACH된 DB: {', '.join(keys)}\n\n"
+    )
+
+    with federated_connection(keys, databases) as conn:
+        for key in keys:
+            rows = conn.execute(
+                f"SELECT name, sql FROM {_quote(key)}.sqlite_master "
+                f"WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchall()
+            for name, create_stmt in rows:
+                qualified = f"{key}.{name}"
+                tables.append(qualified)
+                # CREATE TABLE <name> → CREATE TABLE <key>.<name>
+                create_stmt = re.sub(
+                    r'^(\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?)["`\[]?' + re.escape(name) + r'["`\]]?',
+                    lambda m: m.group(1) + qualified,
+                    create_stmt,
+                    count=1,
+                    flags=re.IGNORECASE,
+                )
+                schema_text += f"{create_stmt};\n\n"
+
+    return {
+        'tables': tables,
+        'schema_text': schema_text
+    }
+
+def _run_federated(db_keys, sql_query, databases, timeout):
+    """
+    ATTACH 연결에서 실행 시간 한도를 걸고 SQL 실행 (워커 프로세스에서도 실행, 프로세스별 연결 풀 재사용)
+    """
+    try:
+        with federated_connection(db_keys, databases) as conn:
+            return execute_with_timeout(conn, sql_query, timeout)
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def execute_federated(db_keys, sql_query, databases):
+    """
+    여러 DB를 ATTACH한 연결에서 SQL 실행 (execute_sql과 같은 형식의 결과)
+
+    run_query와 같이 요청 스레드에서 INLINE_BUDGET_MS만큼 실행해 보고, 넘기면 쿼리 실행기
+    워커 프로세스에서 interactive 우선순위로 다시 실행합니다 (ATTACH한 모든 DB의 DB별 한도 적용).
+    실행 시간 한도는 QUERY_TIMEOUTS['interactive']이며, 초과하면 'timed_out': True인 에러를 반환합니다.
+    """
+    keys = sorted(set(db_keys))
+    databases = {key: databases[key] for key in keys}  # 워커에 넘길 DB 정보만
+    timeout = QUERY_TIMEOUTS['interactive']
+    if query_executor.QUERY_WORKERS <= 0:
+        return _run_federated(keys, sql_query, databases, timeout)
+
+    if query_executor.INLINE_BUDGET_MS > 0:
+        result = _run_federated(keys, sql_query, databases, query_executor.INLINE_BUDGET_MS / 1000)
+        if not result.get('timed_out'):
+            metrics.increment('query.inline')
+            return result
+        metrics.increment('query.escalated')  # 예산 초과 → 워커에서 처음부터 다시 실행
+
+    db_paths = tuple(databases[key]['file'] for key in keys)
+    return query_executor.submit_task(db_paths, _run_federated, (keys, sql_query, databases, timeout),
+                                      priority='interactive').result()
@@ -1,18 +1,34 @@
 # utils/gemini_client.py
 
+import asyncio
 import os
+from datetime import timedelta
 import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
+# .env 로드 후 import (llm_provider가 LLM_RPM 등 환경 변수를 읽음)
+from utils import context_cache, metrics
+from utils.llm_provider import (
+    LLMResponseError, call_with_resilience, call_with_resilience_async, configure_provider, estimate_tokens
+)
+
+# LLM 제공자 선택: 'gemini' (기본) 또는 'stub' (오프라인 결정적 스텁)
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini').lower()
+
+# 스텁은 실제 할당량이 없으므로 명시적으로 켜지 않으면 클라이언트 속도 제한 비활성화
+if LLM_PROVIDER == 'stub' and 'LLM_RATE_LIMIT' not in os.environ:
+    configure_provider(rate_limit_enabled=False)
+
 # Gemini API 설정
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-print(f"GEMINI_API_KEY: {GEMINI_API_KEY}")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY가 .env 파일에 설정되지 않았습니다.")
+if LLM_PROVIDER != 'stub':
+    print(f"GEMINI_API_KEY: {GEMINI_API_KEY}")
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY가 .env 파일에 설정되지 않았습니다.")
 
-genai.configure(api_key=GEMINI_API_KEY)
+    genai.configure(api_key=GEMINI_API_KEY)
 
 # 사용 가능한 모델 목록
 AVAILABLE_MODELS = {
@@ -21,38 +37,183 @@ AVAILABLE_MODELS = {
     'gemini-2.0-flash-lite': '초고속 응답'
 }
 
-def ask_gemini(prompt, model_name="gemini-2.5-flash", temperature=0.7):
+# 요청 타임아웃 (초)
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))
+
+def _generation_config(temperature):
+    return genai.types.GenerationConfig(
+        temperature=temperature,
+        max_output_tokens=2048,
+    )
+
+def _gemini_model(model_name, temperature, cached_content):
+    if cached_content:
+        # 캐시된 접두부(스키마 등)를 이어 쓰는 모델 (모델명은 캐시에 포함됨)
+        return genai.GenerativeModel.from_cached_content(
+            cached_content, generation_config=_generation_config(temperature)
+        )
+    return genai.GenerativeModel(model_name)
+
+def _gemini_generate(prompt, model_name, temperature, cached_content=None):
+    """Gemini API 단일 호출 (예외는 그대로 전파, 분류는 llm_provider에서)"""
+    model = _gemini_model(model_name, temperature, cached_content)
+    
+    response = model.generate_content(
+        prompt,
+        generation_config=_generation_config(temperature),
+        request_options={'timeout': LLM_TIMEOUT}
+    )
+    return _response_text(response, model_name)
+
+async def _gemini_generate_async(prompt, model_name, temperature, cached_content=None):
+    """Gemini API 비동기 단일 호출 (gRPC asyncio 클라이언트, 스레드를 점유하지 않음)"""
+    model = _gemini_model(model_name, temperature, cached_content)
+    
+    response = await model.generate_content_async(
+        prompt,
+        generation_config=_generation_config(temperature),
+        request_options={'timeout': LLM_TIMEOUT}
+    )
+    return _response_text(response, model_name)
+
+def _gemini_create_cache(prefix, model_name, ttl):
+    """Gemini 명시적 컨텍스트 캐시 등록 → 캐시 이름"""
+    from google.generativeai import caching
+    cached = caching.CachedContent.create(
+        model=model_name,
+        display_name='sql-agent-prompt-prefix',
+        contents=[prefix],
+        ttl=timedelta(seconds=ttl),
+    )
+    return cached.name
+
+def _gemini_delete_cache(name):
+    from google.generativeai import caching
+    caching.CachedContent.get(name).delete()
+
+def _response_text(response, model_name):
+    """응답 텍스트 추출 (차단되었거나 비어 있으면 LLMResponseError)"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        metrics.observe('llm.usage.prompt_tokens', usage.prompt_token_count)
+        metrics.observe('llm.usage.cached_tokens', getattr(usage, 'cached_content_token_count', 0))
+    
+    try:
+        text = response.text
+    except ValueError as e:
+        # 안전 필터 차단 등으로 응답 파트가 없는 경우
+        raise LLMResponseError(f"응답을 읽을 수 없습니다: {e}", model_name)
+    
+    if not text:
+        raise LLMResponseError("응답이 비어있습니다.", model_name)
+    return text
+
+def _provider():
+    """현재 제공자의 호출/캐시 함수"""
+    if LLM_PROVIDER == 'stub':
+        from utils import llm_stub
+        return {
+            'generate': lambda p, m, t, c: llm_stub.ask_stub(p, model_name=m, temperature=t, cached_content=c),
+            'generate_async': lambda p, m, t, c: llm_stub.ask_stub_async(p, model_name=m, temperature=t, cached_content=c),
+            'create_cache': llm_stub.create_cached_content,
+            'delete_cache': llm_stub.delete_cached_content,
+        }
+    return {
+        'generate': _gemini_generate,
+        'generate_async': _gemini_generate_async,
+        'create_cache': _gemini_create_cache,
+        'delete_cache': _gemini_delete_cache,
+    }
+
+def _observe_prompt(sent_text, cached_text=''):
+    """실제로 전송한 프롬프트 토큰 수 / 캐시로 대신한 토큰 수 기록"""
+    metrics.observe('llm.prompt_tokens', estimate_tokens(sent_text))
+    if cached_text:
+        metrics.increment('llm.prompt_tokens_cached', estimate_tokens(cached_text))
+
+def ask_gemini(prompt, model_name="gemini-2.5-flash", temperature=0.7, cancel_event=None,
+               cache_prefix=None, cache_scope=None):
     """
     Gemini API에 프롬프트를 보내고 응답을 받는 함수
+    (모델별 속도 제한, 지수 백오프 재시도, 서킷 브레이커 적용)
     
     Args:
-        prompt (str): LLM에게 보낼 프롬프트
+        prompt (str): LLM에게 보낼 프롬프트 (cache_prefix가 있으면 그 뒤에 붙는 부분)
         model_name (str): 사용할 모델
         temperature (float): 창의성 수준 (0.0~1.0)
+        cancel_event (threading.Event): 설정되면 아직 보내지 않은 호출/재시도 중단
+        cache_prefix (str): 요청마다 같은 프롬프트 앞부분 - 제공자 컨텍스트 캐시에 한 번 등록해
+                            이후 호출은 prompt만 전송 (캐시할 수 없으면 접두부 + prompt 전송)
+        cache_scope (str): 접두부의 출처 (DB 경로 등, 스키마 변경 시 이전 캐시 삭제)
     
     Returns:
         str: LLM 응답 텍스트
+    
+    Raises:
+        LLMError: 할당량 초과(LLMRateLimitError), 일시 오류(LLMTransientError),
+                  서킷 차단(LLMCircuitOpenError), 응답 오류(LLMResponseError) 등
     """
-    try:
-        model = genai.GenerativeModel(model_name)
-        
-        generation_config = genai.types.GenerationConfig(
-            temperature=temperature,
-            max_output_tokens=2048,
-        )
+    provider = _provider()
+    
+    def call(_, m):
+        handle = None
+        if cache_prefix:
+            handle = context_cache.resolve(cache_prefix, m, provider['create_cache'],
+                                           provider['delete_cache'], scope=cache_scope)
+        if handle is not None:
+            try:
+                text = provider['generate'](prompt, m, temperature, handle)
+                _observe_prompt(prompt, cache_prefix)
+                return text
+            except Exception as e:
+                if not context_cache.is_cache_miss_error(e):
+                    raise
+                context_cache.invalidate(cache_prefix, m)  # 만료됨 → 이번엔 전체 전송, 다음 호출에서 재등록
         
-        response = model.generate_content(
-            prompt,
-            generation_config=generation_config
-        )
+        full_prompt = (cache_prefix or '') + prompt
+        text = provider['generate'](full_prompt, m, temperature, None)
+        _observe_prompt(full_prompt)
+        return text
+    
+    # 속도 제한(TPM)은 캐시 여부와 관계없이 전체 프롬프트 기준으로 예약
+    return call_with_resilience(call, (cache_prefix or '') + prompt, model_name, cancel_event=cancel_event)
+
+async def ask_gemini_async(prompt, model_name="gemini-2.5-flash", temperature=0.7,
+                           cache_prefix=None, cache_scope=None):
+    """
+    ask_gemini의 비동기 버전 (ASGI 서버용)
+    
+    응답을 기다리는 동안 스레드를 점유하지 않으므로 한 프로세스에서
+    수백 개의 LLM 요청을 동시에 대기시킬 수 있습니다.
+    속도 제한/재시도/서킷 브레이커/컨텍스트 캐시는 동기 버전과 상태를 공유합니다.
+    
+    Raises:
+        LLMError: ask_gemini와 동일
+    """
+    provider = _provider()
+    
+    async def call(_, m):
+        handle = None
+        if cache_prefix:
+            # 등록은 제공자 API를 동기 호출하므로 스레드에서
+            handle = await asyncio.to_thread(context_cache.resolve, cache_prefix, m, provider['create_cache'],
+                                             provider['delete_cache'], scope=cache_scope)
+        if handle is not None:
+            try:
+                text = await provider['generate_async'](prompt, m, temperature, handle)
+                _observe_prompt(prompt, cache_prefix)
+                return text
+            except Exception as e:
+                if not context_cache.is_cache_miss_error(e):
+                    raise
+                context_cache.invalidate(cache_prefix, m)
         
-        if response.text:
-            return response.text
-        else:
-            return "Error: 응답이 비어있습니다."
+        full_prompt = (cache_prefix or '') + prompt
+        text = await provider['generate_async'](full_prompt, m, temperature, None)
+        _observe_prompt(full_prompt)
+        return text
     
-    except Exception as e:
-        return f"Error: {str(e)}"
+    return await call_with_resilience_async(call, (cache_prefix or '') + prompt, model_name)
 
 def get_available_models():
     """사용 가능한 모델 목록 반환"""
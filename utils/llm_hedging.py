@@ -0,0 +1,169 @@
+# utils/llm_hedging.py
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from utils import metrics
+from utils.gemini_client import ask_gemini
+from utils.llm_provider import LLMError
+
+# 주 모델이 늦을 때 헤지 요청을 보낼 (더 빠른) 모델
+HEDGE_MODELS = {
+    'gemini-2.5-flash': 'gemini-2.0-flash-lite',
+    'gemini-2.5-flash-lite': 'gemini-2.0-flash-lite',
+    'gemini-2.0-flash': 'gemini-2.0-flash-lite',
+    'gemini-2.0-flash-lite': 'gemini-2.5-flash-lite',
+}
+
+# 헤지 기한: 주 모델 최근 지연 시간의 이 백분위수 (p95면 약 5%의 요청만 헤지)
+HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', '95'))
+
+# 백분위수를 신뢰하기 위한 최소 관측 수 (미만이면 HEDGE_DEFAULT_DELAY 사용)
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = float(os.getenv('LLM_HEDGE_DEFAULT_DELAY', '3'))
+HEDGE_MIN_DELAY = 0.05
+
+# 요청 모드 기본값 (요청에서 hedge를 지정하지 않으면 사용)
+HEDGE_ENABLED = os.getenv('LLM_HEDGE', '0') == '1'
+
+# 진 요청은 중단할 수 없이 끝까지 실행될 수 있으므로 별도 풀에서 실행
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv('LLM_HEDGE_WORKERS', '16')),
+                               thread_name_prefix='llm-hedge')
+
+def hedge_model_for(model_name):
+    """주 모델에 대응하는 헤지 모델 (LLM_HEDGE_MODEL로 고정 가능, 같은 모델이면 None)"""
+    hedge = os.getenv('LLM_HEDGE_MODEL') or HEDGE_MODELS.get(model_name)
+    return hedge if hedge and hedge != model_name else None
+
+def hedge_delay(model_name):
+    """
+    헤지 요청을 보내기까지 기다릴 시간 (초)
+
+    주 모델의 최근 지연 시간 HEDGE_PERCENTILE 백분위수. 관측값이 부족하면 기본값.
+    """
+    name = f'llm.latency.{model_name}'
+    if metrics.sample_count(name) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, metrics.percentile(name, HEDGE_PERCENTILE))
+
+def ask_hedged(prompt, model_name, is_valid, temperature=0.7, cache_prefix=None, cache_scope=None):
+    """
+    주 모델에 요청하고, 기한 내에 유효한 응답이 없으면 헤지 모델에도 요청
+    먼저 도착한 유효한 응답을 반환하고 나머지 요청은 취소
+
+    주 모델이 기한 전에 실패하거나 무효한 응답을 주면 기한을 기다리지 않고 바로 헤지합니다.
+    이미 전송된 HTTP 호출은 중단할 수 없으므로 진 요청의 결과는 버리고,
+    아직 속도 제한/백오프 대기 중이면 전송 전에 중단합니다.
+
+    Args:
+        prompt: 프롬프트
+        model_name: 주 모델
+        is_valid: is_valid(response_text) -> bool
+        temperature: 생성 온도
+        cache_prefix, cache_scope: ask_gemini와 동일 (컨텍스트 캐시는 모델별로 등록됨)
+
+    Returns:
+        dict: {
+            'text': 응답 텍스트 (모두 무효하면 주 모델의 무효한 응답),
+            'model': 응답한 모델,
+            'hedged': 헤지 요청을 보냈는지 여부
+        }
+
+    Raises:
+        LLMError: 유효/무효 응답 없이 모두 실패 (주 모델의 에러 우선)
+    """
+    metrics.increment('llm.hedge.requests')
+    hedge_model = hedge_model_for(model_name)
+    cancel = threading.Event()
+    start = time.perf_counter()
+
+    def call(model):
+        text = ask_gemini(prompt, model_name=model, temperature=temperature, cancel_event=cancel,
+                          cache_prefix=cache_prefix, cache_scope=cache_scope)
+        return text, time.perf_counter()
+
+    pending = {_executor.submit(call, model_name): model_name}
+    errors = {}
+    invalid = {}
+    deadline = start + hedge_delay(model_name)
+    hedged = False
+
+    try:
+        while pending:
+            timeout = max(0.0, deadline - time.perf_counter()) if not hedged and hedge_model else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    text, finished = future.result()
+                except LLMError as e:
+                    errors[model] = e
+                    continue
+                if not is_valid(text):
+                    metrics.increment('llm.hedge.invalid')
+                    invalid[model] = text
+                    continue
+
+                _record_win(model, model_name, hedged, finished - start, pending)
+                return {'text': text, 'model': model, 'hedged': hedged}
+
+            # 기한 초과 또는 주 모델 실패 → 헤지 요청
+            if not hedged and hedge_model and (not done or model_name in errors or model_name in invalid):
+                hedged = True
+                metrics.increment('llm.hedge.fired')
+                reason = '기한 초과' if not done else '실패/무효 응답'
+                print(f"[LLM HEDGE] {model_name} {reason} ({(time.perf_counter() - start) * 1000:.0f}ms) → {hedge_model}")
+                pending[_executor.submit(call, hedge_model)] = hedge_model
+    finally:
+        cancel.set()
+
+    if invalid:
+        model = model_name if model_name in invalid else next(iter(invalid))
+        return {'text': invalid[model], 'model': model, 'hedged': hedged}
+    raise errors.get(model_name) or next(iter(errors.values()))
+
+def _record_win(winner, primary, hedged, elapsed, losers):
+    """승자 지표 기록, 진 요청이 나중에 끝나면 절약한 시간 기록"""
+    metrics.observe('llm.hedge.latency_s', elapsed)
+    if not hedged:
+        metrics.increment('llm.hedge.wins.primary')
+        return
+
+    metrics.increment('llm.hedge.wins.primary' if winner == primary else 'llm.hedge.wins.hedge')
+    won_at = time.perf_counter()
+
+    def on_loser_done(future):
+        # 진 요청이 실제로 응답했다면 그 시각과의 차이가 헤지로 아낀 시간
+        if future.cancelled() or future.exception() is not None:
+            metrics.increment('llm.hedge.cancelled')
+            return
+        if winner != primary:
+            _, finished = future.result()
+            metrics.observe('llm.hedge.saved_s', max(0.0, finished - won_at))
+
+    for future in losers:
+        future.add_done_callback(on_loser_done)
+
+def hedge_status():
+    """
+    헤지 요약 지표
+
+    Returns:
+        dict: {
+            'requests': 헤징 모드 요청 수,
+            'hedge_rate': 헤지 요청을 보낸 비율,
+            'hedge_win_rate': 헤지 요청이 이긴 비율 (헤지한 요청 중),
+            'saved_ms_p50': 헤지로 아낀 시간 중앙값
+        }
+    """
+    requests = metrics.counter('llm.hedge.requests')
+    fired = metrics.counter('llm.hedge.fired')
+    saved = metrics.percentile('llm.hedge.saved_s', 50)
+    return {
+        'requests': int(requests),
+        'hedge_rate': round(fired / requests, 4) if requests else 0.0,
+        'hedge_win_rate': round(metrics.counter('llm.hedge.wins.hedge') / fired, 4) if fired else 0.0,
+        'saved_ms_p50': round(saved * 1000, 1) if saved is not None else None,
+    }
@@ -0,0 +1,424 @@
+# utils/llm_provider.py
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from utils import metrics
+
+# 모델별 분당 요청/토큰 한도 (Gemini 무료 등급 기준, 환경 변수로 일괄 덮어쓰기 가능)
+MODEL_RATE_LIMITS = {
+    'gemini-2.5-flash': {'rpm': 10, 'tpm': 250_000},
+    'gemini-2.5-flash-lite': {'rpm': 15, 'tpm': 250_000},
+    'gemini-2.0-flash-lite': {'rpm': 30, 'tpm': 1_000_000},
+    'gemini-2.0-flash': {'rpm': 15, 'tpm': 1_000_000},
+}
+DEFAULT_RATE_LIMIT = {'rpm': 10, 'tpm': 250_000}
+
+# 버킷 최대 적립량 (초 단위 한도만큼 버스트 허용)
+BURST_SECONDS = 10
+
+# 재시도 설정 (지수 백오프 + full jitter)
+MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '0.5'))
+BACKOFF_CAP = float(os.getenv('LLM_BACKOFF_CAP', '8'))
+
+# 로컬 대기 상한: 이보다 오래 기다려야 하면 즉시 rate_limited 에러
+MAX_QUEUE_WAIT = float(os.getenv('LLM_MAX_QUEUE_WAIT', '30'))
+
+# 서킷 브레이커: 연속 실패 횟수 / 차단 유지 시간(초)
+BREAKER_THRESHOLD = int(os.getenv('LLM_BREAKER_THRESHOLD', '5'))
+BREAKER_COOLDOWN = float(os.getenv('LLM_BREAKER_COOLDOWN', '30'))
+
+# ========== 에러 타입 ==========
+
+class LLMError(Exception):
+    """LLM 호출 실패 (재시도 불가)"""
+    error_type = 'llm_error'
+    http_status = 502
+    retryable = False
+
+    def __init__(self, message, model_name=None, retry_after=None):
+        super().__init__(message)
+        self.model_name = model_name
+        self.retry_after = retry_after
+
+    def to_dict(self):
+        payload = {
+            'success': False,
+            'error_type': self.error_type,
+            'message': str(self),
+        }
+        if self.retry_after is not None:
+            payload['retry_after'] = round(self.retry_after, 2)
+        return payload
+
+class LLMRateLimitError(LLMError):
+    """할당량 초과 (429) 또는 로컬 대기열 초과"""
+    error_type = 'rate_limited'
+    http_status = 429
+    retryable = True
+
+class LLMTransientError(LLMError):
+    """일시적 오류 (5xx, 타임아웃, 네트워크)"""
+    error_type = 'transient'
+    http_status = 503
+    retryable = True
+
+class LLMCircuitOpenError(LLMError):
+    """연속 실패로 서킷이 열려 호출 차단됨"""
+    error_type = 'circuit_open'
+    http_status = 503
+
+class LLMCancelledError(LLMError):
+    """호출자가 취소함 (헤징에서 진 요청 등)"""
+    error_type = 'cancelled'
+    http_status = 503
+
+class LLMResponseError(LLMError):
+    """빈 응답/차단된 응답 등 응답 자체의 문제"""
+    error_type = 'bad_response'
+    http_status = 502
+
+_TRANSIENT_NAMES = {
+    'ServiceUnavailable', 'InternalServerError', 'DeadlineExceeded',
+    'GatewayTimeout', 'BadGateway', 'Aborted', 'RetryError',
+    'StubUnavailableError',
+}
+_RATE_LIMIT_NAMES = {'ResourceExhausted', 'TooManyRequests', 'StubQuotaError'}
+
+_RETRY_DELAY = re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)(?:\s+nanos:\s*(\d+))?', re.IGNORECASE)
+_RETRY_IN = re.compile(r'retry\D{0,20}?(\d+(?:\.\d+)?)\s*s', re.IGNORECASE)
+
+def _retry_after_hint(message):
+    """에러 메시지의 'retry_delay { seconds: 31 }'(Gemini 429 상세) / 'retry in 12.3s' 힌트 추출"""
+    match = _RETRY_DELAY.search(message)
+    if match:
+        return int(match.group(1)) + int(match.group(2) or 0) / 1e9
+    match = _RETRY_IN.search(message)
+    return float(match.group(1)) if match else None
+
+def classify_exception(exc, model_name=None):
+    """
+    제공자 예외를 LLMError 하위 타입으로 변환
+
+    Returns:
+        LLMError
+    """
+    if isinstance(exc, LLMError):
+        return exc
+
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    message = str(exc) or type(exc).__name__
+
+    if names & _RATE_LIMIT_NAMES or '429' in message or 'quota' in message.lower():
+        return LLMRateLimitError(message, model_name, retry_after=_retry_after_hint(message))
+    if names & _TRANSIENT_NAMES or isinstance(exc, (TimeoutError, ConnectionError)):
+        return LLMTransientError(message, model_name)
+    return LLMError(message, model_name)
+
+# ========== 토큰 버킷 ==========
+
+class TokenBucket:
+    """
+    분당 한도 기반 토큰 버킷
+
+    reserve()는 토큰을 즉시 차감(음수 허용)하고 기다려야 할 시간을 반환하므로
+    동시에 들어온 요청들이 도착 순서대로 대기 시간을 배정받습니다.
+    """
+
+    def __init__(self, per_minute, burst_seconds=BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount=1.0):
+        """amount만큼 차감하고 대기 시간(초) 반환"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount=1.0):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class ModelRateLimiter:
+    """모델 1개의 요청(RPM) + 토큰(TPM) 버킷"""
+
+    def __init__(self, rpm, tpm, burst_seconds=BURST_SECONDS):
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+
+    def reserve(self, token_count, model_name=None):
+        """
+        요청 1건 + token_count 토큰 예약
+
+        Returns:
+            float: 대기 시간(초)
+
+        Raises:
+            LLMRateLimitError: 대기 시간이 MAX_QUEUE_WAIT 초과
+        """
+        wait = max(self.requests.reserve(1), self.tokens.reserve(token_count))
+        if wait > MAX_QUEUE_WAIT:
+            self.requests.refund(1)
+            self.tokens.refund(token_count)
+            raise LLMRateLimitError(
+                f"로컬 요청 한도 초과: {wait:.1f}초 대기 필요", model_name, retry_after=wait
+            )
+        return wait
+
+# ========== 서킷 브레이커 ==========
+
+class CircuitBreaker:
+    """연속 실패 시 일정 시간 호출을 차단 (이후 1건 시험 호출 허용)"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self, model_name=None):
+        """호출 가능 여부 확인 (차단 시 LLMCircuitOpenError)"""
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half_open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            remaining = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            raise LLMCircuitOpenError(
+                f"{model_name} 호출이 연속 실패로 일시 차단되었습니다.", model_name, retry_after=remaining
+            )
+
+    def cancel_trial(self):
+        """시험 호출이 실제로 나가지 못한 경우 되돌림"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+# ========== 제공자 레이어 ==========
+
+_limiters = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+_settings = {
+    'rate_limit_enabled': os.getenv('LLM_RATE_LIMIT', '1') != '0',
+    'rpm': int(os.environ['LLM_RPM']) if os.getenv('LLM_RPM') else None,
+    'tpm': int(os.environ['LLM_TPM']) if os.getenv('LLM_TPM') else None,
+    'max_retries': MAX_RETRIES,
+    'burst_seconds': BURST_SECONDS,
+}
+
+def configure_provider(rate_limit_enabled=None, rpm=None, tpm=None, max_retries=None, burst_seconds=None):
+    """
+    제공자 설정 변경 (벤치마크/테스트용, 기존 버킷/브레이커 초기화)
+
+    Args:
+        rate_limit_enabled: 클라이언트 측 속도 제한 사용 여부
+        rpm, tpm: 모든 모델에 적용할 분당 한도 (None이면 MODEL_RATE_LIMITS)
+        max_retries: 최대 재시도 횟수
+        burst_seconds: 버킷 최대 적립량 (초 단위 한도)
+    """
+    if rate_limit_enabled is not None:
+        _settings['rate_limit_enabled'] = rate_limit_enabled
+    if rpm is not None:
+        _settings['rpm'] = rpm
+    if tpm is not None:
+        _settings['tpm'] = tpm
+    if max_retries is not None:
+        _settings['max_retries'] = max_retries
+    if burst_seconds is not None:
+        _settings['burst_seconds'] = burst_seconds
+    with _registry_lock:
+        _limiters.clear()
+        _breakers.clear()
+
+def _limiter(model_name):
+    with _registry_lock:
+        if model_name not in _limiters:
+            limits = MODEL_RATE_LIMITS.get(model_name, DEFAULT_RATE_LIMIT)
+            _limiters[model_name] = ModelRateLimiter(
+                _settings['rpm'] or limits['rpm'],
+                _settings['tpm'] or limits['tpm'],
+                _settings['burst_seconds'],
+            )
+        return _limiters[model_name]
+
+def _breaker(model_name):
+    with _registry_lock:
+        if model_name not in _breakers:
+            _breakers[model_name] = CircuitBreaker()
+        return _breakers[model_name]
+
+def estimate_tokens(text):
+    """프롬프트 토큰 수 근사 (한글/영문 혼합 기준 약 3자당 1토큰)"""
+    return max(1, len(text) // 3)
+
+def backoff_delay(attempt, retry_after=None):
+    """attempt번째 재시도 전 대기 시간 (full jitter, 서버 힌트가 있으면 그 이상)"""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_CAP * 4))
+    return delay
+
+def reserve_capacity(prompt, model_name):
+    """
+    속도 제한 버킷 예약 후 대기 시간 반환 (비활성화 시 0)
+
+    동기 호출은 time.sleep, 비동기 호출은 asyncio.sleep으로 기다리면 됩니다.
+    """
+    if not _settings['rate_limit_enabled']:
+        return 0.0
+    wait = _limiter(model_name).reserve(estimate_tokens(prompt), model_name)
+    if wait > 0:
+        metrics.increment('llm.rate_limit.waits')
+        metrics.observe('llm.rate_limit.wait_s', wait)
+    return wait
+
+def _pause(seconds, cancel_event, model_name):
+    """대기 (cancel_event가 설정되면 즉시 LLMCancelledError)"""
+    if cancel_event is None:
+        time.sleep(seconds)
+    elif cancel_event.wait(seconds):
+        raise LLMCancelledError(f"{model_name} 호출이 취소되었습니다.", model_name)
+
+def call_with_resilience(call, prompt, model_name, cancel_event=None):
+    """
+    속도 제한 → 서킷 확인 → 호출 → 실패 분류/재시도 순서로 LLM 호출
+
+    Args:
+        call: call(prompt, model_name) -> str (제공자별 실제 호출 함수)
+        cancel_event: threading.Event - 설정되면 아직 보내지 않은 호출/재시도를 중단
+
+    Returns:
+        str: 응답 텍스트
+
+    Raises:
+        LLMError 하위 타입 (취소 시 LLMCancelledError)
+    """
+    breaker = _breaker(model_name)
+    attempt = 0
+
+    while True:
+        breaker.before_call(model_name)
+        try:
+            wait = reserve_capacity(prompt, model_name)
+            if wait > 0 or cancel_event is not None:
+                _pause(wait, cancel_event, model_name)
+        except (LLMRateLimitError, LLMCancelledError):
+            breaker.cancel_trial()
+            raise
+
+        metrics.increment('llm.requests')
+        start = time.perf_counter()
+        try:
+            text = call(prompt, model_name)
+        except Exception as e:
+            delay = _retry_delay_or_raise(e, attempt, model_name, breaker)
+            _pause(delay, cancel_event, model_name)
+            attempt += 1
+            continue
+
+        _record_success(breaker, model_name, start)
+        return text
+
+async def call_with_resilience_async(call, prompt, model_name):
+    """
+    call_with_resilience의 비동기 버전 (대기/백오프를 asyncio.sleep으로 처리)
+
+    Args:
+        call: async call(prompt, model_name) -> str
+
+    Returns:
+        str: 응답 텍스트
+
+    Raises:
+        LLMError 하위 타입
+    """
+    breaker = _breaker(model_name)
+    attempt = 0
+
+    while True:
+        breaker.before_call(model_name)
+        try:
+            wait = reserve_capacity(prompt, model_name)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:  # 한도 초과 또는 요청 취소(CancelledError)
+            breaker.cancel_trial()
+            raise
+
+        metrics.increment('llm.requests')
+        start = time.perf_counter()
+        try:
+            text = await call(prompt, model_name)
+        except asyncio.CancelledError:
+            breaker.cancel_trial()  # 클라이언트 연결 종료 등으로 요청 취소
+            raise
+        except Exception as e:
+            delay = _retry_delay_or_raise(e, attempt, model_name, breaker)
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+
+        _record_success(breaker, model_name, start)
+        return text
+
+def _retry_delay_or_raise(exc, attempt, model_name, breaker):
+    """호출 실패를 분류/기록하고 재시도 전 대기 시간 반환 (재시도 불가면 LLMError 발생)"""
+    error = classify_exception(exc, model_name)
+    metrics.increment(f'llm.errors.{error.error_type}')
+    if isinstance(error, LLMTransientError):
+        breaker.record_failure()
+    else:
+        breaker.record_success()  # 서비스 자체는 응답함 (할당량 초과/잘못된 요청 등)
+    if not error.retryable or attempt >= _settings['max_retries']:
+        raise error from exc
+
+    delay = backoff_delay(attempt, error.retry_after)
+    metrics.increment('llm.retries')
+    print(f"[LLM RETRY] {model_name} {error.error_type} - {delay:.2f}초 후 재시도 ({attempt + 1}/{_settings['max_retries']})")
+    return delay
+
+def _record_success(breaker, model_name, start):
+    breaker.record_success()
+    metrics.observe(f'llm.latency.{model_name}', time.perf_counter() - start)
+
+def provider_status():
+    """모델별 서킷 상태 (대시보드/메트릭용)"""
+    with _registry_lock:
+        return {name: breaker.state for name, breaker in _breakers.items()}
@@ -0,0 +1,209 @@
+# utils/llm_stub.py
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from utils.llm_provider import estimate_tokens
+
+# 스텁 응답 지연 (밀리초) 및 장애 시뮬레이션 - 환경 변수 또는 configure_stub()으로 조정
+_stub_config = {
+    'latency_ms': float(os.getenv('LLM_STUB_LATENCY_MS', '0')),
+    'jitter_ms': float(os.getenv('LLM_STUB_JITTER_MS', '0')),
+    'quota_rpm': int(os.getenv('LLM_STUB_QUOTA_RPM', '0')),   # 0이면 할당량 없음
+    'quota_window_s': float(os.getenv('LLM_STUB_QUOTA_WINDOW_S', '60')),  # 할당량 윈도우 (벤치마크 단축용)
+    'error_rate': float(os.getenv('LLM_STUB_ERROR_RATE', '0')),  # 일시 오류 비율 (0~1)
+    'tail_rate': float(os.getenv('LLM_STUB_TAIL_RATE', '0')),    # 느린 응답 비율 (0~1)
+    'tail_ms': float(os.getenv('LLM_STUB_TAIL_MS', '0')),        # 느린 응답의 추가 지연 (밀리초)
+    'prefill_ms_per_1k': float(os.getenv('LLM_STUB_PREFILL_MS_PER_1K', '0')),  # 캐시되지 않은 입력 1K 토큰당 지연
+}
+
+_quota_lock = threading.Lock()
+_quota_window = deque()  # 최근 윈도우 내 요청 시각
+_error_rng = random.Random(0)
+_tail_rng = random.Random(1)
+
+# 스텁 컨텍스트 캐시: 이름 -> {'prefix', 'expires_at'}
+_cached_contents = {}
+_cache_lock = threading.Lock()
+
+class StubQuotaError(Exception):
+    """스텁 할당량 초과 (Gemini 429 ResourceExhausted 모사)"""
+
+class StubUnavailableError(Exception):
+    """스텁 일시 오류 (Gemini 503 ServiceUnavailable 모사)"""
+
+class StubCacheNotFoundError(Exception):
+    """만료/삭제된 스텁 컨텍스트 캐시 (Gemini 404 NotFound 모사)"""
+
+def configure_stub(latency_ms=None, jitter_ms=None, quota_rpm=None, error_rate=None, quota_window_s=None,
+                   tail_rate=None, tail_ms=None, prefill_ms_per_1k=None):
+    """
+    스텁 LLM의 응답 지연/장애 설정
+
+    Args:
+        latency_ms: 기본 지연 시간 (밀리초)
+        jitter_ms: 프롬프트별 추가 지연 최대값 (밀리초, 프롬프트 해시로 결정되어 재현 가능)
+        quota_rpm: 서버 측 윈도우당 요청 한도 (초과 시 StubQuotaError, 0이면 무제한)
+        error_rate: 일시 오류(StubUnavailableError) 발생 비율
+        quota_window_s: 할당량 윈도우 길이 (기본 60초)
+        tail_rate: 호출마다 독립적으로 tail_ms만큼 더 느려질 확률 (꼬리 지연 모사)
+        tail_ms: 느린 응답의 추가 지연 (밀리초)
+        prefill_ms_per_1k: 캐시되지 않은 입력 토큰 1,000개당 추가 지연 (프리필 비용 모사)
+    """
+    if latency_ms is not None:
+        _stub_config['latency_ms'] = float(latency_ms)
+    if jitter_ms is not None:
+        _stub_config['jitter_ms'] = float(jitter_ms)
+    if quota_rpm is not None:
+        _stub_config['quota_rpm'] = int(quota_rpm)
+        with _quota_lock:
+            _quota_window.clear()
+    if error_rate is not None:
+        _stub_config['error_rate'] = float(error_rate)
+    if quota_window_s is not None:
+        _stub_config['quota_window_s'] = float(quota_window_s)
+    if tail_rate is not None:
+        _stub_config['tail_rate'] = float(tail_rate)
+    if tail_ms is not None:
+        _stub_config['tail_ms'] = float(tail_ms)
+    if prefill_ms_per_1k is not None:
+        _stub_config['prefill_ms_per_1k'] = float(prefill_ms_per_1k)
+
+def _check_quota():
+    """슬라이딩 윈도우 기준 할당량 확인"""
+    quota = _stub_config['quota_rpm']
+    window = _stub_config['quota_window_s']
+    if not quota:
+        return
+    with _quota_lock:
+        now = time.monotonic()
+        while _quota_window and now - _quota_window[0] >= window:
+            _quota_window.popleft()
+        if len(_quota_window) >= quota:
+            retry = window - (now - _quota_window[0])
+            raise StubQuotaError(f"429 Resource has been exhausted (stub quota {quota}/{window:g}s). Please retry in {retry:.1f}s")
+        _quota_window.append(now)
+
+def _prompt_hash(prompt):
+    """프롬프트의 결정적 해시값 (실행마다 동일)"""
+    return zlib.crc32(prompt.encode('utf-8'))
+
+def _extract_tables(prompt):
+    """프롬프트에 포함된 CREATE TABLE 구문에서 테이블명 추출"""
+    return re.findall(r'CREATE TABLE\s+(?:IF NOT EXISTS\s+)?["`\[]?([\w.]+)', prompt, re.IGNORECASE)
+
+def stub_delay(prompt):
+    """프롬프트에 대한 결정적 지연 시간 (초)"""
+    jitter = _stub_config['jitter_ms']
+    extra = (_prompt_hash(prompt) % 1000) / 1000 * jitter if jitter else 0
+    return (_stub_config['latency_ms'] + extra) / 1000
+
+def render_stub_response(prompt):
+    """
+    프롬프트 종류에 맞는 결정적 응답 생성 (지연 없음)
+
+    - SQL 생성 프롬프트: <reasoning>/<sql> 블록
+    - 추천 질문 프롬프트: 번호 매긴 질문 5개
+    - 그 외 (스키마 분석): 테이블 요약
+    """
+    tables = _extract_tables(prompt) or ['sqlite_master']
+    seed = _prompt_hash(prompt)
+
+    if '<사용자 질문>' in prompt:
+        table = tables[seed % len(tables)]
+        return (
+            "<reasoning>\n"
+            f"[stub] {table} 테이블에서 상위 10개 행을 조회합니다.\n"
+            "</reasoning>\n\n"
+            "<sql>\n"
+            f"SELECT * FROM {table} LIMIT 10\n"
+            "</sql>"
+        )
+
+    if '질문 5개' in prompt:
+        return '\n'.join(
+            f"{i + 1}. {tables[(seed + i) % len(tables)]} 테이블의 전체 행 수는?"
+            for i in range(5)
+        )
+
+    return (
+        "1. [stub] 스키마 분석 결과\n"
+        f"2. 테이블: {', '.join(tables)}\n"
+        "3. 관계: FK 정보 참고"
+    )
+
+def create_cached_content(prefix, model_name='stub', ttl=3600):
+    """
+    스텁 컨텍스트 캐시 등록 (Gemini CachedContent.create 모사)
+
+    Returns:
+        str: 캐시 이름 (ask_stub의 cached_content로 전달)
+    """
+    name = f"cachedContents/stub-{model_name}-{_prompt_hash(prefix):08x}"
+    with _cache_lock:
+        _cached_contents[name] = {'prefix': prefix, 'expires_at': time.monotonic() + ttl}
+    return name
+
+def delete_cached_content(name):
+    """스텁 컨텍스트 캐시 삭제"""
+    with _cache_lock:
+        _cached_contents.pop(name, None)
+
+def _cached_prefix(name):
+    with _cache_lock:
+        entry = _cached_contents.get(name)
+        if entry is None or entry['expires_at'] <= time.monotonic():
+            _cached_contents.pop(name, None)
+            raise StubCacheNotFoundError(f"404 CachedContent not found (stub): {name}")
+        return entry['prefix']
+
+def ask_stub(prompt, model_name='stub', temperature=0.7, cached_content=None):
+    """
+    Gemini 대신 사용하는 로컬 결정적 LLM 스텁 (오프라인 벤치마크/테스트용)
+
+    Args:
+        prompt (str): 프롬프트 (cached_content가 있으면 캐시된 접두부 뒤에 붙는 부분)
+        model_name (str): 모델명 (응답에 영향 없음)
+        temperature (float): 무시됨
+        cached_content (str): create_cached_content가 반환한 캐시 이름
+
+    Returns:
+        str: 결정적 응답 텍스트 (접두부 + prompt 전체 기준)
+
+    Raises:
+        StubQuotaError: quota_rpm 초과
+        StubUnavailableError: error_rate 확률의 일시 오류
+        StubCacheNotFoundError: 캐시가 만료/삭제됨
+    """
+    full_prompt = _cached_prefix(cached_content) + prompt if cached_content else prompt
+    delay = _begin_call(full_prompt, prompt)
+    if delay > 0:
+        time.sleep(delay)
+    return render_stub_response(full_prompt)
+
+async def ask_stub_async(prompt, model_name='stub', temperature=0.7, cached_content=None):
+    """ask_stub의 비동기 버전 (지연 동안 이벤트 루프를 막지 않음)"""
+    full_prompt = _cached_prefix(cached_content) + prompt if cached_content else prompt
+    delay = _begin_call(full_prompt, prompt)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return render_stub_response(full_prompt)
+
+def _begin_call(full_prompt, uncached_prompt):
+    """할당량/장애 시뮬레이션 후 이번 호출의 지연 시간(초) 반환"""
+    _check_quota()
+    if _stub_config['error_rate'] and _error_rng.random() < _stub_config['error_rate']:
+        raise StubUnavailableError("503 The service is currently unavailable (stub)")
+
+    delay = stub_delay(full_prompt)
+    if _stub_config['prefill_ms_per_1k']:
+        # 캐시된 접두부는 프리필하지 않음 (캐시 적중 시 첫 토큰까지의 시간 단축)
+        delay += estimate_tokens(uncached_prompt) / 1000 * _stub_config['prefill_ms_per_1k'] / 1000
+    if _stub_config['tail_rate'] and _tail_rng.random() < _stub_config['tail_rate']:
+        delay += _stub_config['tail_ms'] / 1000
+    return delay
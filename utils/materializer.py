@@ -0,0 +1,381 @@
+# utils/materializer.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from utils import metrics
+from utils.sqlite_tuning import connect, file_signature
+
+# 구체화 결과 저장 DB (database/ 바로 아래 .db는 사용자 DB로 인식되므로 하위 폴더에 둠)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'cache')
+CACHE_DB = os.path.join(CACHE_DIR, 'materialized.db')
+
+# DB별 구체화할 최대 쿼리 수 (최근 실행 횟수 순)
+MATERIALIZE_TOP_N = int(os.getenv('MATERIALIZE_TOP_N', '5'))
+
+# 대상 조건: 최근 MATERIALIZE_WINDOW_HOURS 동안 MIN_RUNS회 이상, 평균 MIN_MS 이상 걸린 SELECT
+MATERIALIZE_MIN_RUNS = int(os.getenv('MATERIALIZE_MIN_RUNS', '5'))
+MATERIALIZE_MIN_MS = float(os.getenv('MATERIALIZE_MIN_MS', '20'))
+MATERIALIZE_WINDOW_HOURS = 24
+
+# 결과 행 수 상한 (초과하면 구체화하지 않음)
+MATERIALIZE_MAX_ROWS = int(os.getenv('MATERIALIZE_MAX_ROWS', '50000'))
+
+# 히스토리에서 대상 목록을 다시 뽑는 간격 (초)
+HOT_SET_INTERVAL = 60
+
+MATERIALIZE_ENABLED = os.getenv('MATERIALIZE', '1') != '0'
+
+# 실행할 때마다 결과가 달라지는 함수가 들어간 SQL은 구체화하지 않음
+_NONDETERMINISTIC = re.compile(
+    r"\b(random|randomblob|changes|total_changes|last_insert_rowid)\s*\("
+    r"|'now'|\bcurrent_(date|time|timestamp)\b",
+    re.IGNORECASE
+)
+
+# 문자열 리터럴/식별자 밖의 연속 공백만 정규화
+_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+")
+
+_hot = {}        # db_name -> {'scanned_at', 'entries': {정규화 SQL: key}}
+_versions = {}   # key -> 구체화 시점의 (inode, data_version) (같은 프로세스 안에서의 신선도)
+_skipped = {}    # key -> 사유 (결과가 너무 큼 등, 다음 대상 선정까지 재시도 안 함)
+_watchers = {}   # db_path -> {'conn', 'inode'}
+_key_locks = {}
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_settings = {'enabled': MATERIALIZE_ENABLED}
+
+def normalize_sql(sql_query):
+    """정확히 같은 쿼리 판별용 정규화 (리터럴 밖 공백 압축, 끝의 세미콜론 제거)"""
+    normalized = _TOKEN.sub(lambda m: m.group(0) if m.group(0)[0] in '\'"' else ' ', sql_query)
+    return normalized.strip().rstrip(';').strip()
+
+def is_materializable(sql_query):
+    """결정적인 SELECT/WITH 쿼리인지"""
+    head = sql_query.lstrip().split(None, 1)[0].upper() if sql_query.strip() else ''
+    return head in ('SELECT', 'WITH') and not _NONDETERMINISTIC.search(sql_query)
+
+def _key(db_name, normalized_sql):
+    return hashlib.sha1(f"{db_name}\0{normalized_sql}".encode('utf-8')).hexdigest()[:16]
+
+# ========== 변경 감지 ==========
+
+def _version(db_path):
+    """
+    (inode, PRAGMA data_version) - 다른 연결이 커밋하면 바뀜
+    data_version은 같은 연결에서 비교해야 하므로 DB별 상주 연결 사용
+    """
+    inode = os.stat(db_path).st_ino
+    with _lock:
+        watcher = _watchers.get(db_path)
+        if watcher is None or watcher['inode'] != inode:
+            if watcher is not None:
+                watcher['conn'].close()
+            watcher = _watchers[db_path] = {
+                'conn': connect(db_path, check_same_thread=False),
+                'inode': inode,
+            }
+        return inode, watcher['conn'].execute("PRAGMA data_version").fetchone()[0]
+
+def _file_signature(db_path):
+    """서버 재시작 후 신선도 판별용 (DB/WAL 파일 mtime, 크기)"""
+    return json.dumps(file_signature(db_path))
+
+# ========== 캐시 DB ==========
+
+def _cache_conn():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(CACHE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # 갱신 중에도 읽기 가능
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS materializations (
+            key TEXT PRIMARY KEY,
+            db_name TEXT NOT NULL,
+            sql_query TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            columns TEXT NOT NULL,
+            row_count INTEGER,
+            file_signature TEXT,
+            refreshed_at TEXT,
+            refresh_ms REAL
+        )
+    ''')
+    return conn
+
+def _catalog_entry(key):
+    conn = _cache_conn()
+    try:
+        row = conn.execute(
+            "SELECT table_name, columns, file_signature FROM materializations WHERE key = ?", (key,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {'table_name': row[0], 'columns': json.loads(row[1]), 'file_signature': row[2]}
+
+def _select_sql(entry):
+    """구체화 테이블 조회 SQL (원래 컬럼명/순서 복원)"""
+    select_list = ', '.join(
+        f'c{i} AS "{name.replace(chr(34), chr(34) * 2)}"' for i, name in enumerate(entry['columns'])
+    )
+    return f"SELECT {select_list} FROM {entry['table_name']} ORDER BY rowid"
+
+def _store(key, db_name, sql_query, result, version, file_signature, query_ms):
+    """실행 결과를 구체화 테이블에 저장 (새 테이블에 쓴 뒤 교체)"""
+    columns = result['columns']
+    table_name = f"mv_{key}"
+    staging = f"{table_name}_new"
+    start = time.perf_counter()
+
+    with _write_lock:
+        conn = _cache_conn()
+        try:
+            # 컬럼명은 중복될 수 있으므로 위치 기반(c0, c1...)으로 저장, 타입 선언 없이 값 그대로 보존
+            conn.execute(f"DROP TABLE IF EXISTS {staging}")
+            conn.execute(f"CREATE TABLE {staging} ({', '.join(f'c{i}' for i in range(len(columns)))})")
+            conn.executemany(
+                f"INSERT INTO {staging} VALUES ({', '.join('?' * len(columns))})", result['rows']
+            )
+            conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+            conn.execute(f"ALTER TABLE {staging} RENAME TO {table_name}")
+            refresh_ms = round((time.perf_counter() - start) * 1000 + query_ms, 2)
+            conn.execute('''
+                INSERT OR REPLACE INTO materializations
+                    (key, db_name, sql_query, table_name, columns, row_count, file_signature, refreshed_at, refresh_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, db_name, sql_query, table_name, json.dumps(columns, ensure_ascii=False),
+                  len(result['rows']), file_signature, datetime.now().isoformat(), refresh_ms))
+            conn.commit()
+        finally:
+            conn.close()
+
+    with _lock:
+        _versions[key] = version
+    metrics.increment('materialize.refreshes')
+    metrics.observe('materialize.refresh_s', refresh_ms / 1000)
+    print(f"[MATERIALIZE] {db_name} {key} 갱신 ({len(result['rows'])}행, {refresh_ms:.1f}ms)")
+
+def _drop(keys):
+    if not keys:
+        return
+    with _write_lock:
+        conn = _cache_conn()
+        try:
+            for key in keys:
+                conn.execute(f"DROP TABLE IF EXISTS mv_{key}")
+                conn.execute("DELETE FROM materializations WHERE key = ?", (key,))
+            conn.commit()
+        finally:
+            conn.close()
+    with _lock:
+        for key in keys:
+            _versions.pop(key, None)
+
+# ========== 대상 선정 ==========
+
+def find_hot_queries(db_name, limit=None):
+    """
+    히스토리에서 자주 실행되는 무거운 SELECT 찾기
+
+    Returns:
+        list: [{'sql', 'normalized', 'runs', 'avg_ms'}] (실행 횟수 내림차순, 최대 limit개)
+    """
+    from utils.query_generator import connect_history
+
+    conn = connect_history()
+    try:
+        rows = conn.execute('''
+            SELECT sql_query, COUNT(*), SUM(elapsed_ms), COUNT(elapsed_ms)
+            FROM query_history
+            WHERE db_name = ? AND executed_at >= datetime('now', ?)
+            GROUP BY sql_query
+        ''', (db_name, f'-{MATERIALIZE_WINDOW_HOURS} hours')).fetchall()
+    finally:
+        conn.close()
+
+    # 공백만 다른 쿼리는 하나로 합산
+    merged = {}
+    for sql_query, runs, total_ms, timed in rows:
+        if not is_materializable(sql_query):
+            continue
+        normalized = normalize_sql(sql_query)
+        entry = merged.setdefault(normalized, {'sql': sql_query, 'normalized': normalized,
+                                               'runs': 0, 'total_ms': 0.0, 'timed': 0})
+        entry['runs'] += runs
+        entry['total_ms'] += total_ms or 0.0
+        entry['timed'] += timed
+
+    hot = []
+    for entry in merged.values():
+        if entry['runs'] < MATERIALIZE_MIN_RUNS or not entry['timed']:
+            continue
+        entry['avg_ms'] = round(entry.pop('total_ms') / entry.pop('timed'), 2)
+        if entry['avg_ms'] >= MATERIALIZE_MIN_MS:
+            hot.append(entry)
+    hot.sort(key=lambda e: e['runs'], reverse=True)
+    return hot[:limit or MATERIALIZE_TOP_N]
+
+def _hot_entries(db_name):
+    """DB의 현재 구체화 대상 {정규화 SQL: key} (HOT_SET_INTERVAL마다 히스토리에서 다시 선정)"""
+    with _lock:
+        cached = _hot.get(db_name)
+        if cached and time.monotonic() - cached['scanned_at'] < HOT_SET_INTERVAL:
+            return cached['entries']
+        # 다시 선정하는 동안 다른 요청은 이전 목록 사용
+        _hot[db_name] = {'scanned_at': time.monotonic(), 'entries': cached['entries'] if cached else {}}
+
+    entries = {q['normalized']: _key(db_name, q['normalized']) for q in find_hot_queries(db_name)}
+    previous = set(cached['entries'].values()) if cached else _catalog_keys(db_name)
+    with _lock:
+        _hot[db_name] = {'scanned_at': time.monotonic(), 'entries': entries}
+        for key in entries.values():
+            _skipped.pop(key, None)
+    _drop(previous - set(entries.values()))  # 대상에서 빠진 쿼리의 구체화 테이블 삭제
+    return entries
+
+def _catalog_keys(db_name):
+    conn = _cache_conn()
+    try:
+        return {row[0] for row in conn.execute("SELECT key FROM materializations WHERE db_name = ?", (db_name,))}
+    finally:
+        conn.close()
+
+# ========== 실행 ==========
+
+def execute_with_materialization(db_name, db_path, sql_query, profile=False, preview_rows=100):
+    """
+    자주 실행되는 무거운 쿼리는 구체화 결과에서, 나머지는 쿼리 실행기에서 실행
+
+    대상 쿼리(정규화 후 정확히 일치)의 구체화 결과가 최신이면(data_version 동일) 캐시 테이블을 읽고,
+    오래되었거나 아직 없으면 원래 DB에서 실행한 결과로 응답하면서 구체화 테이블을 갱신합니다.
+
+    Returns:
+        dict: run_query와 같은 형식 (+ 'materialized': True/False, 대상 쿼리일 때)
+    """
+    from utils.query_executor import run_query
+
+    run_original = lambda: run_query(db_path, sql_query, priority='interactive',
+                                     profile=profile, preview_rows=preview_rows)
+    if not _settings['enabled'] or not is_materializable(sql_query):
+        return run_original()
+
+    key = _hot_entries(db_name).get(normalize_sql(sql_query))
+    if key is None or key in _skipped:
+        return run_original()
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    version = _version(db_path)
+    with key_lock:
+        entry = _fresh_entry(key, db_path, version)
+        if entry is None:
+            # 결과를 만들기 전의 버전을 기록 (실행 중 변경이 있으면 다음 요청에서 다시 갱신)
+            file_signature = _file_signature(db_path)
+            start = time.perf_counter()
+            full = run_query(db_path, sql_query, priority='interactive')
+            query_ms = (time.perf_counter() - start) * 1000
+            if not full['success']:
+                return full
+            if len(full['rows']) > MATERIALIZE_MAX_ROWS:
+                _skipped[key] = f"결과 {len(full['rows'])}행 > {MATERIALIZE_MAX_ROWS}"
+                return run_original() if profile else dict(full, materialized=False)
+            metrics.increment('materialize.misses')
+            _store(key, db_name, sql_query, full, version, file_signature, query_ms)
+            if not profile:
+                return dict(full, materialized=False)
+            entry = _catalog_entry(key)
+        else:
+            metrics.increment('materialize.hits')
+
+    result = run_query(CACHE_DB, _select_sql(entry), priority='interactive',
+                       profile=profile, preview_rows=preview_rows)
+    result['materialized'] = True
+    return result
+
+def _fresh_entry(key, db_path, version):
+    """최신 구체화 카탈로그 항목 (없거나 오래되었으면 None)"""
+    with _lock:
+        known = _versions.get(key)
+    if known is not None:
+        return _catalog_entry(key) if known == version else None
+
+    # 서버 재시작 후: 구체화 당시와 DB 파일이 같으면 재사용
+    entry = _catalog_entry(key)
+    if entry is None or entry['file_signature'] != _file_signature(db_path):
+        return None
+    with _lock:
+        _versions[key] = version
+    return entry
+
+# ========== 관리 ==========
+
+def configure_materializer(enabled=None):
+    """구체화 사용 여부 변경 (벤치마크/테스트용, 대상 목록 초기화)"""
+    if enabled is not None:
+        _settings['enabled'] = enabled
+    with _lock:
+        _hot.clear()
+        _skipped.clear()
+
+def clear_materializations(db_name=None):
+    """구체화 결과 삭제 (db_name이 None이면 전체)"""
+    if not os.path.exists(CACHE_DB):
+        return
+    conn = _cache_conn()
+    try:
+        query = "SELECT key FROM materializations" + (" WHERE db_name = ?" if db_name else "")
+        keys = {row[0] for row in conn.execute(query, (db_name,) if db_name else ())}
+    finally:
+        conn.close()
+    _drop(keys)
+    with _lock:
+        if db_name:
+            _hot.pop(db_name, None)
+        else:
+            _hot.clear()
+
+def materializer_status(db_name=None):
+    """
+    구체화 현황
+
+    Returns:
+        dict: {
+            'hits', 'misses', 'hit_rate': 대상 쿼리 중 구체화 결과로 응답한 비율,
+            'refreshes', 'refresh_ms_p50', 'refresh_ms_p95',
+            'entries': [{'db_name', 'sql', 'row_count', 'refreshed_at', 'refresh_ms'}]
+        }
+    """
+    hits = metrics.counter('materialize.hits')
+    misses = metrics.counter('materialize.misses')
+    p50 = metrics.percentile('materialize.refresh_s', 50)
+    p95 = metrics.percentile('materialize.refresh_s', 95)
+
+    entries = []
+    if os.path.exists(CACHE_DB):
+        conn = _cache_conn()
+        try:
+            query = ("SELECT db_name, sql_query, row_count, refreshed_at, refresh_ms FROM materializations"
+                     + (" WHERE db_name = ?" if db_name else "") + " ORDER BY db_name, refreshed_at DESC")
+            entries = [
+                {'db_name': r[0], 'sql': r[1], 'row_count': r[2], 'refreshed_at': r[3], 'refresh_ms': r[4]}
+                for r in conn.execute(query, (db_name,) if db_name else ())
+            ]
+        finally:
+            conn.close()
+
+    return {
+        'hits': int(hits),
+        'misses': int(misses),
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        'refreshes': int(metrics.counter('materialize.refreshes')),
+        'refresh_ms_p50': round(p50 * 1000, 2) if p50 is not None else None,
+        'refresh_ms_p95': round(p95 * 1000, 2) if p95 is not None else None,
+        'entries': entries,
+    }
@@ -0,0 +1,111 @@
+# utils/metrics.py
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# 지표별로 보관하는 최근 관측값 수 (백분위수 계산용)
+SAMPLE_WINDOW = 1000
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+_gauges = {}
+
+def increment(name, value=1):
+    """카운터 증가"""
+    with _lock:
+        _counters[name] += value
+
+def observe(name, value):
+    """관측값 기록 (지연 시간 등, 최근 SAMPLE_WINDOW개 유지)"""
+    with _lock:
+        _samples[name].append(value)
+
+@contextmanager
+def timed(name):
+    """
+    구간 실행 시간 기록 (공유 자원 사용량 집계용)
+
+    누적 카운터 '<name>.calls', '<name>.seconds'와 관측값 '<name>_s'를 남기므로
+    두 시점의 snapshot() 차이로 구간별 호출 수/총 소요 시간을 구할 수 있음
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _counters[f'{name}.calls'] += 1
+            _counters[f'{name}.seconds'] += elapsed
+            _samples[f'{name}_s'].append(elapsed)
+
+def set_gauge(name, value):
+    """현재값 지표 설정 (큐 길이 등)"""
+    with _lock:
+        _gauges[name] = value
+
+def counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+def percentile(name, p, default=None):
+    """
+    최근 관측값의 백분위수
+
+    Args:
+        p: 0~100
+        default: 관측값이 없을 때 반환값
+    """
+    with _lock:
+        values = sorted(_samples.get(name, ()))
+    if not values:
+        return default
+    k = min(len(values) - 1, max(0, int(round((len(values) - 1) * p / 100))))
+    return values[k]
+
+def sample_count(name):
+    with _lock:
+        return len(_samples.get(name, ()))
+
+def snapshot():
+    """
+    전체 지표 요약
+
+    Returns:
+        dict: {
+            'counters': {이름: 값},
+            'gauges': {이름: 값},
+            'observations': {이름: {count, p50, p95, p99, max}}
+        }
+    """
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        samples = {name: sorted(values) for name, values in _samples.items() if values}
+
+    def pick(values, p):
+        return values[min(len(values) - 1, int(round((len(values) - 1) * p / 100)))]
+
+    return {
+        'counters': counters,
+        'gauges': gauges,
+        'observations': {
+            name: {
+                'count': len(values),
+                'p50': pick(values, 50),
+                'p95': pick(values, 95),
+                'p99': pick(values, 99),
+                'max': values[-1],
+            }
+            for name, values in samples.items()
+        },
+    }
+
+def reset():
+    """전체 지표 초기화 (벤치마크용)"""
+    with _lock:
+        _counters.clear()
+        _samples.clear()
+        _gauges.clear()
@@ -0,0 +1,579 @@
+# utils/parallel_aggregate.py
+
+import math
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils import metrics
+from utils.sql_aggregates import (
+    parse_aggregate_query, replace_spans, same_name, scans_table, span_text, split_top_level, tokenize,
+    unquote_identifier,
+)
+
+# 분할 실행 전용 워커 프로세스 수 (2 미만이면 분할 실행 안 함)
+PARALLEL_WORKERS = int(os.getenv('PARALLEL_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# 워커당 rowid 구간 수 (구간별 비용이 고르지 않을 때 먼저 끝난 워커가 다음 구간을 가져감)
+PARTITIONS_PER_WORKER = 2
+
+# 분할 대상 테이블의 최소 rowid 범위 (이보다 작으면 직렬 실행이 더 빠름)
+PARALLEL_MIN_ROWS = int(os.getenv('PARALLEL_MIN_ROWS', '200000'))
+
+# 동시에 분할 실행하는 쿼리 수 (초과분은 직렬 실행, 한 쿼리가 워커를 모두 쓰므로 1)
+PARALLEL_MAX_QUERIES = 1
+
+# 부분 집계 상태로 나눌 수 있는 집계
+DECOMPOSABLE_FUNCTIONS = ('COUNT', 'SUM', 'TOTAL', 'AVG', 'MIN', 'MAX')
+
+# 합친 결과 위에서 다시 계산하는 식에 남아도 되는 단어 (열 이름이 아닌 것)
+_EXPRESSION_WORDS = {
+    'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'AND', 'OR', 'NOT', 'IS', 'NULL', 'IN', 'LIKE', 'GLOB',
+    'BETWEEN', 'ESCAPE', 'CAST', 'AS', 'TRUE', 'FALSE', 'INTEGER', 'REAL', 'TEXT', 'NUMERIC', 'BLOB',
+    'ASC', 'DESC', 'NULLS', 'FIRST', 'LAST',
+}
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# 이 크기까지의 정수는 double로 정확히 표현됨 (AVG/TOTAL은 정수도 double로 누적)
+_EXACT_DOUBLE_INT = 2 ** 53
+
+class InexactMerge(ArithmeticError):
+    """부분 집계를 합친 값이 직렬 실행 결과와 비트 단위로 같다고 보장할 수 없음 (실수 합계)"""
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PARALLEL_MAX_QUERIES)
+
+# ========== 계획 ==========
+
+def _normalized(text):
+    return ' '.join(token['upper'] if token['kind'] == 'word' else token['text'] for token in tokenize(text))
+
+def _same_column(a, b, single_table):
+    """두 열 참조가 같은지 (테이블이 하나면 한쪽에만 붙은 한정자 무시)"""
+    a_parts, b_parts = a.split('.'), b.split('.')
+    if len(a_parts) == len(b_parts) or not single_table:
+        return len(a_parts) == len(b_parts) and all(same_name(x, y) for x, y in zip(a_parts, b_parts))
+    return same_name(a_parts[-1], b_parts[-1])
+
+class _Rewriter:
+    """원래 SELECT/HAVING/ORDER BY 식 → 합친 부분 집계 테이블(__merged) 기준 식"""
+
+    def __init__(self, parsed):
+        self.sql = parsed['sql']
+        self.tokens = tokenize(self.sql)
+        self.group_by = parsed['group_by']
+        self.group_normalized = [_normalized(expr) for expr in self.group_by]
+        self.aliases = [item['alias'] for item in parsed['items'] if item['alias']]
+        self.single_table = len(parsed['tables']) == 1
+        self.calls = {}       # 집계 호출 정규화 텍스트 -> {'index', 'func', 'arg'}
+        self.call_at = {call['start']: call for call in parsed['aggregate_calls']}
+
+    def _call_column(self, call):
+        arg = span_text(self.sql, call['arg']) if call['arg'] else '*'
+        key = f"{call['func']}({'DISTINCT ' if call['distinct'] else ''}{_normalized(arg)})"
+        entry = self.calls.setdefault(key, {'index': len(self.calls), 'func': call['func'],
+                                            'arg': arg, 'distinct': call['distinct']})
+        return f"__a{entry['index']}"
+
+    def _group_column(self, text):
+        normalized = _normalized(text)
+        for i, (expr, expr_normalized) in enumerate(zip(self.group_by, self.group_normalized)):
+            if normalized == expr_normalized:
+                return f'__g{i}'
+            if all(t['kind'] in ('word', 'ident') or t['text'] == '.' for t in tokenize(expr)) \
+                    and all(t['kind'] in ('word', 'ident') or t['text'] == '.' for t in tokenize(text)) \
+                    and _same_column(expr.replace(' ', ''), text.replace(' ', ''), self.single_table):
+                return f'__g{i}'
+        return None
+
+    def rewrite(self, start, end):
+        """
+        SQL의 (start, end) 구간 식 다시 쓰기
+
+        그룹 식 → __g{i}, 집계 호출 → __a{k}, SELECT 별칭/리터럴/연산자/함수 이름은 그대로 둡니다.
+
+        Raises:
+            ValueError: 그룹 식도 집계 안도 아닌 열 참조가 있는 경우 (합친 결과로 계산할 수 없음)
+        """
+        text = self.sql[start:end]
+        column = self._group_column(text)
+        if column:
+            return column
+
+        tokens = [t for t in self.tokens if t['start'] >= start and t['end'] <= end]
+        replacements = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            call = self.call_at.get(token['start'])
+            if call:
+                if call['func'] not in DECOMPOSABLE_FUNCTIONS or (call['distinct'] and call['func'] not in ('MIN', 'MAX')):
+                    raise ValueError(f"{call['func']}(DISTINCT ...)는 부분 집계로 나눌 수 없습니다.")
+                replacements.append((call['start'] - start, call['end'] - start, self._call_column(call)))
+                while i < len(tokens) and tokens[i]['end'] <= call['end']:
+                    i += 1
+                continue
+            if token['kind'] == 'param':
+                raise ValueError('바인딩 파라미터는 지원하지 않습니다.')
+            if token['kind'] in ('word', 'ident'):
+                following = tokens[i + 1]['text'] if i + 1 < len(tokens) else None
+                if following == '(' or token['upper'] in _EXPRESSION_WORDS:
+                    i += 1
+                    continue
+                j = i + 1
+                while j + 1 < len(tokens) and tokens[j]['text'] == '.' and tokens[j + 1]['kind'] in ('word', 'ident'):
+                    j += 2
+                reference = self.sql[token['start']:tokens[j - 1]['end']]
+                column = self._group_column(reference)
+                if column:
+                    replacements.append((token['start'] - start, tokens[j - 1]['end'] - start, column))
+                elif j - i == 1 and any(same_name(alias, reference) for alias in self.aliases):
+                    pass  # SELECT 별칭은 합친 결과 쿼리에서도 같은 이름
+                else:
+                    raise ValueError(f'GROUP BY에 없는 열 참조: {reference}')
+                i = j
+                continue
+            i += 1
+        return replace_spans(text, replacements)
+
+def _column_name(item):
+    """SQLite가 붙이는 결과 컬럼 이름 (별칭 > 열 참조의 열 이름 > 식 원문)"""
+    if item['alias']:
+        return unquote_identifier(item['alias'])
+    tokens = tokenize(item['text'])
+    if all(t['kind'] in ('word', 'ident') or t['text'] == '.' for t in tokens):
+        return unquote_identifier(tokens[-1]['text'])
+    return item['text']
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def build_parallel_plan(sql_query):
+    """
+    분할 실행 계획 (부분 집계 쿼리 틀 + 합친 결과에서 원래 결과를 만드는 쿼리)
+
+    Returns:
+        dict: {
+            'parsed', 'partial_select': 그룹 키/부분 집계 SELECT 목록,
+            'calls': [{'func', 'arg', 'distinct'}] (부분 집계 컬럼 순서),
+            'final_sql': __merged 테이블(__g*, __a*)에서 원래 결과를 만드는 SQL,
+            'group_count'
+        }
+
+    Raises:
+        ValueError: 분할할 수 없는 쿼리 (메시지에 이유)
+    """
+    parsed = parse_aggregate_query(sql_query)
+    if not parsed['aggregate_calls']:
+        raise ValueError('집계 함수가 없는 쿼리입니다.')
+    if any(t['upper'] == 'COLLATE' for t in tokenize(parsed['sql'])):
+        raise ValueError('COLLATE가 있는 쿼리는 지원하지 않습니다.')
+
+    rewriter = _Rewriter(parsed)
+    select = []
+    for item in parsed['items']:
+        select.append(f"{rewriter.rewrite(item['start'], item['end'])} AS {_quote(_column_name(item))}")
+
+    final_sql = f"SELECT {', '.join(select)} FROM __merged"
+    clauses = parsed['clauses']
+    if 'having' in clauses:
+        final_sql += f" WHERE {rewriter.rewrite(*clauses['having'])}"
+    if 'order by' in clauses:
+        terms = []
+        order_tokens = [t for t in rewriter.tokens
+                        if t['start'] >= clauses['order by'][0] and t['end'] <= clauses['order by'][1]]
+        for part in split_top_level(order_tokens, 0):
+            expr = list(part)
+            suffix_start = len(expr)
+            while suffix_start > 0 and expr[suffix_start - 1]['upper'] in ('ASC', 'DESC', 'NULLS', 'FIRST', 'LAST'):
+                suffix_start -= 1
+            head, tail = expr[:suffix_start], expr[suffix_start:]
+            if len(head) == 1 and head[0]['kind'] == 'number':
+                term = head[0]['text']  # 순번은 합친 결과 쿼리의 같은 위치 컬럼
+            else:
+                term = rewriter.rewrite(head[0]['start'], head[-1]['end'])
+            terms.append(' '.join([term] + [t['text'] for t in tail]))
+        final_sql += f" ORDER BY {', '.join(terms)}"
+    elif parsed['group_by']:
+        # ORDER BY가 없으면 직렬 실행과 같이 그룹 키 순서
+        final_sql += f" ORDER BY {', '.join(f'__g{i}' for i in range(len(parsed['group_by'])))}"
+    if 'limit' in clauses:
+        limit = parsed['sql'][clauses['limit'][0]:clauses['limit'][1]]
+        if any(t['kind'] not in ('number', 'op') and t['upper'] != 'OFFSET' for t in tokenize(limit)):
+            raise ValueError('LIMIT에는 숫자만 지원합니다.')
+        final_sql += f' LIMIT {limit}'
+
+    partial_select = [f'{expr} AS __g{i}' for i, expr in enumerate(parsed['group_by'])]
+    calls = sorted(rewriter.calls.values(), key=lambda c: c['index'])
+    for call in calls:
+        k, arg, distinct = call['index'], call['arg'], 'DISTINCT ' if call['distinct'] else ''
+        if call['func'] in ('AVG', 'TOTAL'):
+            # 합계(정수인지 확인용 SUM) + 개수 + 최대 절댓값 (누적 중 double 정밀도를 넘지 않는지 확인)
+            partial_select.append(f'SUM({arg}) AS __a{k}_s, COUNT({arg}) AS __a{k}_n, MAX(ABS({arg})) AS __a{k}_m')
+        else:
+            partial_select.append(f"{call['func']}({distinct}{arg}) AS __a{k}")
+    return {
+        'parsed': parsed,
+        'partial_select': partial_select,
+        'calls': [{'func': c['func'], 'arg': c['arg'], 'distinct': c['distinct']} for c in calls],
+        'final_sql': final_sql,
+        'group_count': len(parsed['group_by']),
+    }
+
+def _choose_table(conn, parsed):
+    """
+    rowid 구간으로 나눌 테이블 (LEFT JOIN 오른쪽이 아닌 테이블 중 rowid 범위가 가장 큰 것)
+
+    Returns:
+        (table_index, lo, hi) 또는 None
+    """
+    best = None
+    for index, table in enumerate(parsed['tables']):
+        if table['join'] == 'left':
+            continue
+        try:
+            lo, hi = conn.execute(f"SELECT min(rowid), max(rowid) FROM {table['name']}").fetchone()
+        except sqlite3.OperationalError:
+            continue  # 뷰, WITHOUT ROWID 테이블
+        if lo is not None and (best is None or hi - lo > best[2] - best[1]):
+            best = (index, lo, hi)
+    return best
+
+def _declares_collation(conn, parsed):
+    """쿼리의 테이블에 COLLATE가 선언된 열이 있는지 (그룹 키/MIN/MAX를 파이썬에서 비교할 수 없음)"""
+    for table in parsed['tables']:
+        name = unquote_identifier(table['name'].split('.')[-1])
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE name = ? COLLATE NOCASE", (name,)).fetchone()
+        if row and row[0] and 'COLLATE' in row[0].upper():
+            return True
+    return False
+
+def _real_sum_argument(conn, plan):
+    """
+    SUM/TOTAL/AVG 인자 중 REAL 선언 열을 그대로 쓰는 것 (실행해 보기 전에 정확한 합치기가 불가능함을 앎)
+
+    Returns:
+        str | None: 해당 인자
+    """
+    real_columns = set()
+    for table in plan['parsed']['tables']:
+        name = unquote_identifier(table['name'].split('.')[-1])
+        for column in conn.execute(f"PRAGMA table_info({_quote(name)})"):
+            declared = (column[2] or '').upper()
+            if not any(t in declared for t in ('INT', 'CHAR', 'CLOB', 'TEXT', 'BLOB')) \
+                    and any(t in declared for t in ('REAL', 'FLOA', 'DOUB')):
+                real_columns.add(column[1].lower())
+    for call in plan['calls']:
+        if call['func'] not in ('SUM', 'TOTAL', 'AVG'):
+            continue
+        tokens = tokenize(call['arg'])
+        if all(t['kind'] in ('word', 'ident') or t['text'] == '.' for t in tokens) \
+                and unquote_identifier(tokens[-1]['text']).lower() in real_columns:
+            return call['arg']
+    return None
+
+def partition_queries(plan, table_index, lo, hi, partitions):
+    """
+    rowid 구간별 부분 집계 쿼리 목록
+
+    LIMIT -1은 서브쿼리 평탄화를 막아 각 구간이 rowid 범위 검색으로 읽히게 합니다.
+    """
+    parsed = plan['parsed']
+    sql_query = parsed['sql']
+    table = parsed['tables'][table_index]
+    alias = table['alias'] or table['name'].split('.')[-1]
+    from_start, from_end = parsed['clauses']['from']
+    where = parsed['clauses'].get('where')
+    group = f" GROUP BY {', '.join(str(i + 1) for i in range(plan['group_count']))}" if plan['group_count'] else ''
+
+    step = math.ceil((hi - lo + 1) / partitions)
+    queries = []
+    for start in range(lo, hi + 1, step):
+        end = min(start + step - 1, hi)
+        subquery = f"(SELECT * FROM {table['name']} WHERE rowid BETWEEN {start} AND {end} LIMIT -1) AS {alias}"
+        from_sql = replace_spans(sql_query[from_start:from_end],
+                                 [(table['start'] - from_start, table['end'] - from_start, subquery)])
+        queries.append(f"SELECT {', '.join(plan['partial_select'])} FROM {from_sql}"
+                       + (f" WHERE {sql_query[where[0]:where[1]]}" if where else '') + group)
+    return queries
+
+# ========== 워커 프로세스에서 실행되는 함수 ==========
+
+def _run_partition(db_path, sql_query, timeout):
+    """워커 프로세스에서 구간 하나의 부분 집계 실행"""
+    from utils.sqlite_tuning import connect
+
+    start = time.perf_counter()
+    try:
+        conn = connect(db_path, readonly=True)
+        deadline = start + timeout
+        conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000)
+        try:
+            rows = conn.execute(sql_query).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:
+        if str(e) == 'interrupted':
+            return {'success': False, 'timed_out': True, 'error': f'쿼리 실행 시간 초과 ({timeout:g}초)'}
+        return {'success': False, 'error': str(e)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+    return {'success': True, 'rows': rows}
+
+# ========== 부분 집계 합치기 ==========
+
+def _sqlite_order(value):
+    """SQLite 비교 순서 키 (NULL < 숫자 < 텍스트 < BLOB, 텍스트는 BINARY 정렬 = 코드 포인트 순)"""
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, bytes(value))
+
+def _merge_sum(values):
+    """
+    SUM 부분합 합치기 (정수 합)
+
+    SQLite는 실수 합계를 스캔 순서대로 double로 더하므로, 구간별로 나눠 더하면
+    마지막 자리가 달라질 수 있습니다. 그래서 부분합에 실수가 있으면 합치지 않습니다.
+
+    Raises:
+        InexactMerge: 부분합에 실수가 있음
+        OverflowError: 합이 64비트 정수 범위를 넘음 (직렬 실행은 integer overflow 오류)
+    """
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    if not all(isinstance(v, int) for v in values):
+        raise InexactMerge('실수 합계')
+    total = sum(values)
+    if not _INT64_MIN <= total <= _INT64_MAX:
+        raise OverflowError('integer overflow')
+    return total
+
+def _merge_double_sum(sums, counts, max_abs):
+    """
+    AVG/TOTAL용 합계 (SQLite는 정수 입력도 double로 누적)
+
+    모든 입력이 정수이고 (개수 × 최대 절댓값)이 2^53 이하면 누적 중 어느 시점의 합도
+    double로 정확하므로, 정수 합을 double로 바꾼 값이 직렬 실행 결과와 같습니다.
+
+    Returns:
+        tuple: (합계 또는 None, 개수)
+
+    Raises:
+        InexactMerge: 실수 입력이 있거나 double 정밀도를 넘을 수 있음
+    """
+    count = sum(counts)
+    total = _merge_sum(sums)
+    if total is None:
+        return None, count
+    largest = max((m for m in max_abs if m is not None), default=0)
+    if not isinstance(largest, int) or count * largest > _EXACT_DOUBLE_INT:
+        raise InexactMerge('double 정밀도 초과')
+    return float(total), count
+
+def merge_partials(plan, partial_rows):
+    """
+    구간별 부분 집계 행 → 그룹별로 합친 행 [__g..., __a...]
+
+    COUNT/SUM은 정수 합, AVG/TOTAL은 정수 합을 double로 바꾼 값(AVG는 개수로 나눔),
+    MIN/MAX는 SQLite 비교 순서로 합칩니다. 결과가 직렬 실행과 비트 단위로 같을 때만 합칩니다.
+
+    Raises:
+        InexactMerge: 실수 합계 등 같은 결과를 보장할 수 없음
+        OverflowError: 정수 합 오버플로
+    """
+    group_count = plan['group_count']
+    calls = plan['calls']
+    groups = {}
+    for row in partial_rows:
+        groups.setdefault(tuple(row[:group_count]), []).append(row[group_count:])
+    if not group_count and not groups:
+        groups[()] = []
+
+    merged = []
+    for key, states in groups.items():
+        out = list(key)
+        position = 0
+        for call in calls:
+            func = call['func']
+            if func in ('AVG', 'TOTAL'):
+                total, count = _merge_double_sum([s[position] for s in states], [s[position + 1] for s in states],
+                                                 [s[position + 2] for s in states])
+                if func == 'AVG':
+                    out.append(total / count if count else None)
+                else:
+                    out.append(total if total is not None else 0.0)
+                position += 3
+                continue
+            values = [s[position] for s in states]
+            if func == 'COUNT':
+                out.append(sum(values))
+            elif func == 'SUM':
+                out.append(_merge_sum(values))
+            else:
+                present = [v for v in values if v is not None]
+                pick = min if func == 'MIN' else max
+                out.append(pick(present, key=_sqlite_order) if present else None)
+            position += 1
+        merged.append(out)
+    return merged
+
+def finalize(plan, merged_rows):
+    """합친 행에서 원래 쿼리 결과 계산 (SELECT 식/HAVING/ORDER BY/LIMIT는 SQLite가 그대로 평가)"""
+    columns = [f'__g{i}' for i in range(plan['group_count'])] + [f'__a{k}' for k in range(len(plan['calls']))]
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.execute(f"CREATE TABLE __merged ({', '.join(columns)})")
+        conn.executemany(f"INSERT INTO __merged VALUES ({', '.join('?' * len(columns))})", merged_rows)
+        cursor = conn.execute(plan['final_sql'])
+        return [desc[0] for desc in cursor.description], cursor.fetchall()
+    finally:
+        conn.close()
+
+# ========== 실행 ==========
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: 멀티스레드 웹 서버에서 fork하지 않음 (쿼리 실행기 워커와 같은 방식)
+            _pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def configure_parallel(workers=None):
+    """분할 실행 워커 수 변경 (벤치마크/테스트용, 기존 풀 종료, 2 미만이면 분할 실행 안 함)"""
+    global PARALLEL_WORKERS
+    if workers is not None:
+        PARALLEL_WORKERS = workers
+    _reset_pool()
+
+def execute_parallel(db_path, sql_query, timeout):
+    """
+    분해 가능한 집계 쿼리를 rowid 구간으로 나눠 워커 프로세스에서 병렬 실행한 뒤 합침
+
+    결과는 직렬 실행과 비트 단위로 같을 때만 반환합니다 (정수 COUNT/SUM, MIN/MAX,
+    정수 입력의 AVG/TOTAL). 분할할 수 없거나(지원하지 않는 형태, 실수 합계, 작은 테이블,
+    인덱스로 일부만 읽는 쿼리), 다른 분할 실행이 진행 중이거나, 실행 중 DB가 바뀌었으면
+    None을 반환하므로 호출하는 쪽에서 직렬로 실행하면 됩니다.
+
+    Returns:
+        dict | None: run_query와 같은 형식 (+ 'parallel': {'table', 'partitions', 'workers'})
+    """
+    from utils.sqlite_tuning import connect
+
+    if PARALLEL_WORKERS < 2:
+        return None
+    try:
+        plan = build_parallel_plan(sql_query)
+    except ValueError:
+        metrics.increment('parallel.not_decomposable')
+        return None
+
+    # 구간 실행이 끝날 때까지 열어 두고 PRAGMA data_version으로 다른 연결의 쓰기 감지
+    # (파일 mtime/크기는 첫 연결이 -wal 파일을 만들기만 해도 바뀜)
+    conn = connect(db_path, readonly=True)
+    try:
+        try:
+            if _declares_collation(conn, plan['parsed']):
+                metrics.increment('parallel.not_decomposable')
+                return None
+            if _real_sum_argument(conn, plan):
+                metrics.increment('parallel.inexact')
+                return None
+            chosen = _choose_table(conn, plan['parsed'])
+            if chosen is None or chosen[2] - chosen[1] + 1 < PARALLEL_MIN_ROWS:
+                metrics.increment('parallel.small')
+                return None
+            table_index, lo, hi = chosen
+            table = plan['parsed']['tables'][table_index]
+            if not scans_table(conn, plan['parsed']['sql'], table['alias'] or table['name'].split('.')[-1]):
+                metrics.increment('parallel.index_search')
+                return None
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+        if not _slots.acquire(blocking=False):
+            metrics.increment('parallel.busy')
+            return None
+        start = time.perf_counter()
+        try:
+            queries = partition_queries(plan, table_index, lo, hi, PARALLEL_WORKERS * PARTITIONS_PER_WORKER)
+            try:
+                futures = [_get_pool().submit(_run_partition, db_path, q, timeout) for q in queries]
+                results = [f.result() for f in futures]
+            except BrokenProcessPool:
+                print("[PARALLEL] 워커 프로세스 비정상 종료 - 풀 재생성 후 직렬 실행")
+                _reset_pool()
+                return None
+        finally:
+            _slots.release()
+
+        failed = next((r for r in results if not r['success']), None)
+        if failed is not None:
+            if failed.get('timed_out'):
+                return failed
+            print(f"[PARALLEL] 구간 실행 실패, 직렬 실행: {failed['error']}")
+            metrics.increment('parallel.errors')
+            return None
+        if conn.execute("PRAGMA data_version").fetchone()[0] != data_version:
+            metrics.increment('parallel.changed')  # 구간마다 다른 시점을 읽었을 수 있음
+            return None
+    finally:
+        conn.close()
+
+    try:
+        merged = merge_partials(plan, [row for r in results for row in r['rows']])
+    except InexactMerge:
+        metrics.increment('parallel.inexact')  # 식 안의 실수 합계 등 (직렬 실행으로 같은 결과)
+        return None
+    except OverflowError:
+        metrics.increment('parallel.errors')
+        return None  # 직렬 실행이 SQLite의 integer overflow 오류를 그대로 보고
+    columns, rows = finalize(plan, merged)
+    elapsed = time.perf_counter() - start
+    metrics.increment('parallel.queries')
+    metrics.observe('parallel.latency_s', elapsed)
+    return {
+        'success': True,
+        'columns': columns,
+        'rows': rows,
+        'parallel': {
+            'table': unquote_identifier(table['name'].split('.')[-1]),
+            'partitions': len(queries),
+            'workers': PARALLEL_WORKERS,
+        },
+    }
+
+def parallel_status():
+    """
+    분할 병렬 실행 현황 (/api/metrics용)
+
+    Returns:
+        dict: {'workers', 'queries', 'latency_ms_p50', 'serial_fallbacks': {사유: 직렬 실행으로 돌린 수}}
+    """
+    p50 = metrics.percentile('parallel.latency_s', 50)
+    return {
+        'workers': PARALLEL_WORKERS,
+        'queries': int(metrics.counter('parallel.queries')),
+        'latency_ms_p50': round(p50 * 1000, 2) if p50 is not None else None,
+        'serial_fallbacks': {
+            reason: int(metrics.counter(f'parallel.{reason}'))
+            for reason in ('not_decomposable', 'inexact', 'small', 'index_search', 'busy', 'changed', 'errors')
+        },
+    }
@@ -0,0 +1,371 @@
+# utils/query_executor.py
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils import metrics
+
+# 워커 프로세스 수 (0이면 프로세스 풀 없이 요청 스레드에서 직접 실행)
+QUERY_WORKERS = int(os.getenv('QUERY_WORKERS', str(max(2, min(4, os.cpu_count() or 1)))))
+
+# DB 파일별 동시 실행 한도 (한 DB의 무거운 쿼리가 모든 워커를 차지하지 않도록)
+PER_DB_CONCURRENCY = int(os.getenv('QUERY_PER_DB_CONCURRENCY', '2'))
+
+# 우선순위 (숫자가 작을수록 먼저). export는 워커 1개를 항상 interactive용으로 남겨 둠
+PRIORITIES = {'interactive': 0, 'export': 1}
+
+# 우선순위별 실행 시간 한도 (초, 초과 시 SQLite 실행 중단)
+QUERY_TIMEOUTS = {
+    'interactive': float(os.getenv('QUERY_TIMEOUT', '60')),
+    'export': float(os.getenv('QUERY_EXPORT_TIMEOUT', '300')),
+}
+
+# 먼저 요청 스레드에서 이 시간(밀리초)만큼 실행해 보고, 넘기면 중단 후 워커 프로세스로 넘김
+# (가벼운 쿼리는 큐를 거치지 않고, 무거운 쿼리만 격리됨. 0이면 항상 워커에서 실행)
+INLINE_BUDGET_MS = float(os.getenv('QUERY_INLINE_BUDGET_MS', '200'))
+
+# progress handler 호출 간격 (SQLite VM 명령 수)
+PROGRESS_STEPS = 10_000
+
+# profile 모드 미리보기 최대 행 수 (요청의 preview_rows를 이 범위로 제한)
+PREVIEW_MAX_ROWS = int(os.getenv('QUERY_PREVIEW_MAX_ROWS', '10000'))
+
+def resolve_preview_rows(requested=None):
+    """
+    요청 미리보기 행 수를 [0, PREVIEW_MAX_ROWS] 범위로 제한
+
+    Raises:
+        ValueError: 정수로 해석할 수 없는 값
+    """
+    if requested is None:
+        return min(100, PREVIEW_MAX_ROWS)
+    try:
+        return max(0, min(int(requested), PREVIEW_MAX_ROWS))
+    except (TypeError, ValueError):
+        raise ValueError('preview_rows는 정수여야 합니다.')
+
+# ========== 워커 프로세스에서 실행되는 함수 ==========
+
+def _readonly_connect(db_path):
+    """읽기 전용 연결 (사용자 SQL이 DB를 수정할 수 없음, DB별 튜닝 프로필 적용)"""
+    from utils.sqlite_tuning import connect
+    return connect(db_path, readonly=True)
+
+def _run_in_worker(db_path, sql_query, timeout, profile, preview_rows):
+    """
+    워커 프로세스에서 SQL 실행 (execute_sql / profile_query와 같은 형식의 결과 반환)
+    """
+    start = time.perf_counter()
+    if profile:
+        from utils.result_profiler import profile_query
+        return profile_query(db_path, sql_query, preview_rows=preview_rows,
+                             connect=_readonly_connect, timeout=timeout)
+
+    try:
+        conn = _readonly_connect(db_path)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+    try:
+        return execute_with_timeout(conn, sql_query, timeout, start=start)
+    finally:
+        conn.close()
+
+def execute_with_timeout(conn, sql_query, timeout, start=None):
+    """
+    주어진 연결에서 실행 시간 한도를 걸고 SQL 실행 (연결은 닫지 않음)
+
+    Args:
+        conn: 읽기 전용 연결 (_readonly_connect)
+        timeout: 실행 시간 한도 (초, 초과 시 중단)
+        start: 한도 계산 기준 시각 (None이면 지금)
+
+    Returns:
+        dict: execute_sql과 같은 형식 (시간 초과 시 'timed_out': True)
+    """
+    deadline = (time.perf_counter() if start is None else start) + timeout
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline, PROGRESS_STEPS)
+    try:
+        cursor = conn.execute(sql_query)
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        rows = cursor.fetchall()
+    except sqlite3.OperationalError as e:
+        if str(e) == 'interrupted':
+            return {'success': False, 'timed_out': True, 'error': f'쿼리 실행 시간 초과 ({timeout:g}초)'}
+        return {'success': False, 'error': str(e)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+    finally:
+        conn.set_progress_handler(None, 0)
+
+    return {
+        'success': True,
+        'columns': columns,
+        'rows': rows
+    }
+
+def _warm_up():
+    """워커 기동 시 무거운 import를 미리 해 둠 (첫 쿼리가 기동 비용을 내지 않도록)"""
+    import utils.result_profiler  # noqa: F401  (numpy 포함)
+
+# ========== 웹 프로세스 측 스케줄러 ==========
+
+class QueryScheduler:
+    """
+    우선순위 큐 + DB별 동시 실행 한도를 적용해 프로세스 풀에 쿼리를 배분
+
+    별도 디스패처 스레드 없이 제출/완료 시점에 실행 가능한 작업을 꺼내 워커에 넘깁니다.
+    """
+
+    def __init__(self, workers, per_db_limit):
+        self.workers = workers
+        self.per_db_limit = per_db_limit
+        self._cond = threading.Condition()
+        self._queue = []              # (priority, seq, job)
+        self._seq = itertools.count()
+        self._running = Counter()     # priority 이름 -> 실행 중 수
+        self._running_by_db = Counter()
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        # spawn: 멀티스레드 웹 서버에서 fork하지 않음 (워커는 이 모듈만 import)
+        pool = ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+        # 워커 프로세스를 백그라운드에서 미리 기동
+        self._warming = [pool.submit(_warm_up) for _ in range(self.workers)]
+        return pool
+
+    def submit(self, db_path, sql_query, priority='interactive', profile=False, preview_rows=100):
+        """
+        쿼리 실행 예약
+
+        Returns:
+            concurrent.futures.Future: 결과 dict
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"알 수 없는 우선순위: {priority}")
+        return self.submit_task(db_path, _run_in_worker,
+                                (db_path, sql_query, QUERY_TIMEOUTS[priority], profile, preview_rows),
+                                priority)
+
+    def submit_task(self, db_path, fn, args, priority='export'):
+        """
+        임의의 워커 함수 실행 예약 (쿼리와 같은 우선순위/DB별 한도 적용)
+
+        Args:
+            db_path: DB별 동시 실행 한도를 적용할 DB 파일 (여러 DB를 읽는 작업은 경로 튜플, 모든 DB의 한도 적용)
+            fn: 워커 프로세스에서 실행할 모듈 수준 함수 (결과 dict 반환)
+            args: fn 인자 튜플
+
+        Returns:
+            concurrent.futures.Future: fn의 결과 dict
+        """
+        job = {
+            'db_paths': (db_path,) if isinstance(db_path, str) else tuple(db_path),
+            'fn': fn,
+            'args': args,
+            'priority': priority,
+            'future': Future(),
+            'queued_at': time.perf_counter(),
+        }
+        with self._cond:
+            heapq.heappush(self._queue, (PRIORITIES[priority], next(self._seq), job))
+            self._dispatch_locked()
+        return job['future']
+
+    def _can_start(self, job):
+        if sum(self._running.values()) >= self.workers:
+            return False
+        if any(self._running_by_db[path] >= self.per_db_limit for path in job['db_paths']):
+            return False
+        if job['priority'] == 'export' and self._running['export'] >= max(1, self.workers - 1):
+            return False
+        return True
+
+    def _dispatch_locked(self):
+        """큐를 우선순위 순으로 훑어 지금 실행 가능한 작업을 워커에 전달"""
+        deferred = []
+        while self._queue and sum(self._running.values()) < self.workers:
+            item = heapq.heappop(self._queue)
+            job = item[2]
+            if not self._can_start(job):
+                deferred.append(item)  # DB 한도/export 한도에 걸린 작업은 뒤 작업에 양보
+                continue
+
+            self._running[job['priority']] += 1
+            self._running_by_db.update(job['db_paths'])
+            metrics.observe(f"query.wait_s.{job['priority']}", time.perf_counter() - job['queued_at'])
+            job['started_at'] = time.perf_counter()
+            try:
+                pool_future = self._pool.submit(job['fn'], *job['args'])
+            except BrokenProcessPool:
+                self._replace_pool_locked(self._pool)
+                pool_future = self._pool.submit(job['fn'], *job['args'])
+            job['pool'] = self._pool
+            pool_future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+
+        for item in deferred:
+            heapq.heappush(self._queue, item)
+        self._update_gauges_locked()
+
+    def _replace_pool_locked(self, broken):
+        """
+        깨진 풀을 종료하고 새 풀 생성
+
+        같은 풀에서 실행 중이던 작업들이 모두 BrokenProcessPool로 끝나므로,
+        아직 현재 풀이 깨진 그 풀일 때만 한 번 교체합니다.
+        """
+        if self._pool is not broken:
+            return
+        print("[QUERY POOL] 워커 프로세스 비정상 종료 - 풀 재생성")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+
+    def _on_done(self, job, pool_future):
+        with self._cond:
+            self._running[job['priority']] -= 1
+            self._running_by_db.subtract(job['db_paths'])
+            if isinstance(pool_future.exception(), BrokenProcessPool):
+                self._replace_pool_locked(job['pool'])
+            self._dispatch_locked()
+
+        metrics.observe(f"query.run_s.{job['priority']}", time.perf_counter() - job['started_at'])
+        error = pool_future.exception()
+        if error is not None:
+            metrics.increment('query.worker_errors')
+            job['future'].set_result({'success': False, 'error': f'쿼리 워커 오류: {error}'})
+        else:
+            job['future'].set_result(pool_future.result())
+
+    def _update_gauges_locked(self):
+        depth = Counter(job['priority'] for _, _, job in self._queue)
+        metrics.set_gauge('query.queue_depth', len(self._queue))
+        for name in PRIORITIES:
+            metrics.set_gauge(f'query.queue_depth.{name}', depth[name])
+            metrics.set_gauge(f'query.running.{name}', self._running[name])
+
+    def status(self):
+        """대기/실행 현황"""
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'per_db_limit': self.per_db_limit,
+                'queued': len(self._queue),
+                'running': dict(self._running),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def _get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = QueryScheduler(QUERY_WORKERS, PER_DB_CONCURRENCY)
+        return _scheduler
+
+def start_executor(wait=False):
+    """
+    워커 프로세스를 미리 기동 (서버 시작 시 호출, 첫 쿼리 지연 방지)
+
+    Args:
+        wait: True면 모든 워커가 준비될 때까지 대기
+    """
+    if QUERY_WORKERS <= 0:
+        return
+    scheduler = _get_scheduler()
+    if wait:
+        for future in scheduler._warming:
+            future.result()
+
+def configure_executor(workers=None, per_db_limit=None):
+    """
+    실행기 설정 변경 (벤치마크/테스트용, 기존 워커 풀 종료)
+
+    Args:
+        workers: 워커 프로세스 수 (0이면 요청 스레드에서 직접 실행)
+        per_db_limit: DB별 동시 실행 한도
+    """
+    global _scheduler, QUERY_WORKERS, PER_DB_CONCURRENCY
+    with _scheduler_lock:
+        if workers is not None:
+            QUERY_WORKERS = workers
+        if per_db_limit is not None:
+            PER_DB_CONCURRENCY = per_db_limit
+        if _scheduler is not None:
+            _scheduler.shutdown()
+            _scheduler = None
+
+def run_query(db_path, sql_query, priority='interactive', profile=False, preview_rows=100):
+    """
+    사용자 SQL을 읽기 전용으로 실행
+
+    interactive 쿼리는 먼저 요청 스레드에서 INLINE_BUDGET_MS만큼 실행해 보고,
+    그 안에 끝나지 않으면 중단한 뒤 워커 프로세스에서 다시 실행합니다.
+    이때 큰 테이블의 분해 가능한 집계(SUM/COUNT/MIN/MAX/AVG + GROUP BY)는
+    rowid 구간별 부분 집계로 나눠 병렬 실행한 뒤 합칩니다 (utils.parallel_aggregate).
+    (가벼운 쿼리는 대기열을 거치지 않고, 무거운 쿼리는 웹 프로세스의 GIL/스레드를 점유하지 않음)
+    export 쿼리는 바로 워커 프로세스로 보냅니다.
+
+    Args:
+        db_path: DB 파일 경로
+        sql_query: 실행할 SQL
+        priority: 'interactive' (대시보드 실행) 또는 'export' (내보내기)
+        profile: True면 profile_query 결과 (미리보기 + 컬럼 프로파일)
+        preview_rows: profile 모드 미리보기 행 수
+
+    Returns:
+        dict: execute_sql / profile_query와 같은 형식
+    """
+    if QUERY_WORKERS <= 0:
+        return _run_in_worker(db_path, sql_query, QUERY_TIMEOUTS[priority], profile, preview_rows)
+
+    scheduler = _get_scheduler()  # 첫 호출 시 워커 기동 시작 (인라인 실행과 병행)
+    if priority == 'interactive' and INLINE_BUDGET_MS > 0:
+        result = _run_in_worker(db_path, sql_query, INLINE_BUDGET_MS / 1000, profile, preview_rows)
+        if not result.get('timed_out'):
+            metrics.increment('query.inline')
+            return result
+        metrics.increment('query.escalated')  # 예산 초과 → 워커에서 처음부터 다시 실행
+
+    if priority == 'interactive' and not profile:
+        # 큰 테이블의 분해 가능한 집계는 rowid 구간으로 나눠 병렬 실행 (해당 없으면 None → 직렬)
+        from utils.parallel_aggregate import execute_parallel
+        result = execute_parallel(db_path, sql_query, QUERY_TIMEOUTS[priority])
+        if result is not None:
+            return result
+
+    return scheduler.submit(db_path, sql_query, priority, profile, preview_rows).result()
+
+def submit_task(db_path, fn, args, priority='export'):
+    """
+    워커 프로세스에서 fn(*args) 실행 예약 (내보내기 작업 등, QueryScheduler.submit_task 참고)
+
+    Returns:
+        concurrent.futures.Future: fn의 결과 dict (QUERY_WORKERS=0이면 스레드에서 실행)
+    """
+    if QUERY_WORKERS <= 0:
+        future = Future()
+        def run():
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_result({'success': False, 'error': str(e)})
+        threading.Thread(target=run, daemon=True).start()
+        return future
+    return _get_scheduler().submit_task(db_path, fn, args, priority)
+
+def executor_status():
+    """실행기 현황 (/api/metrics용)"""
+    if QUERY_WORKERS <= 0 or _scheduler is None:
+        return {'workers': QUERY_WORKERS, 'per_db_limit': PER_DB_CONCURRENCY, 'queued': 0, 'running': {}}
+    return _scheduler.status()
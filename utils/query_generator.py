@@ -1,34 +1,23 @@
 # utils/query_generator.py
 
+import asyncio
 import re
-from utils.gemini_client import ask_gemini
+from utils import metrics
+from utils.gemini_client import ask_gemini, ask_gemini_async
 from utils.schema_analyzer import get_database_schema
+from utils.suggestions import invalidate_suggestions
 
-def generate_sql_from_question(db_path, user_question, model_name='gemini-2.0-flash'):
+def build_sql_prefix(schema_text):
     """
-    자연어 질문을 SQL 쿼리로 변환
-    
-    Args:
-        db_path: DB 파일 경로
-        user_question: 사용자의 자연어 질문
-        model_name: 사용할 LLM 모델
+    SQL 생성 프롬프트의 고정 접두부 (역할 + 스키마 + 응답 형식 + 규칙)
     
-    Returns:
-        dict: {
-            'reasoning': 'AI의 사고 과정',
-            'sql': '생성된 SQL 쿼리'
-        }
+    같은 DB에 대한 모든 질문에서 동일하므로 컨텍스트 캐시에 한 번만 등록합니다.
     """
-    schema_info = get_database_schema(db_path)
-    
-    prompt = f"""
+    return f"""
 당신은 SQLite 전문가입니다. 사용자의 질문을 SQL 쿼리로 변환해주세요.
 
 <데이터베이스 스키마>
-{schema_info['schema_text']}
-
-<사용자 질문>
-{user_question}
+{schema_text}
 
 응답 형식을 **반드시** 아래와 같이 작성하세요:
 
@@ -46,10 +35,55 @@ FROM ...
 - SQL은 실행 가능한 완전한 쿼리여야 합니다
 - SQLite 문법을 사용하세요
 """
+
+def build_sql_suffix(user_question, stats_text=''):
+    """
+    SQL 생성 프롬프트의 질문별 부분
+
+    데이터가 바뀔 때마다 달라지는 테이블 통계(stats_text)는 접두부 캐시가
+    무효화되지 않도록 접두부 대신 여기에 붙입니다.
+    """
+    stats = f"\n{stats_text}" if stats_text else ''
+    return f"""{stats}
+<사용자 질문>
+{user_question}
+"""
+
+def build_sql_prompt(schema_text, user_question, stats_text=''):
+    """SQL 생성 프롬프트 전체 (접두부 + 질문)"""
+    return build_sql_prefix(schema_text) + build_sql_suffix(user_question, stats_text)
+
+def compact_schema_text(schema_text):
+    """CREATE 구문의 들여쓰기/연속 공백 제거 (프롬프트 토큰 절약, -- 주석이 있는 구문은 줄바꿈 유지)"""
+    statements = [s for s in schema_text.split(';\n') if s.strip()]
+    compacted = []
+    for statement in statements:
+        if '--' in statement:
+            compacted.append('\n'.join(line.strip() for line in statement.splitlines() if line.strip()))
+        else:
+            compacted.append(re.sub(r'\s+', ' ', statement).strip())
+    return ';\n'.join(compacted) + ';\n'
+
+def build_db_sql_prompt_parts(schema_info):
+    """
+    DB 스키마 정보(get_database_schema)로 SQL 생성 프롬프트의 (접두부, 통계) 구성
+
+    접두부는 CREATE 구문만 담아 스키마가 바뀔 때만 달라지므로, 단건/일괄 생성이
+    같은 컨텍스트 캐시를 공유하고 데이터 쓰기로는 무효화되지 않습니다.
+    통계는 build_sql_suffix의 stats_text로 전달합니다.
+
+    Returns:
+        tuple: (prefix, stats_text)
+    """
+    return build_sql_prefix(compact_schema_text(schema_info['schema_text'])), schema_info['stats_text']
+
+def parse_sql_response(response):
+    """
+    LLM 응답에서 reasoning과 sql 파싱
     
-    response = ask_gemini(prompt, model_name=model_name)  # 모델명 전달
-    
-    # reasoning과 sql 파싱
+    Returns:
+        dict: {'reasoning': ..., 'sql': ...}
+    """
     reasoning_match = re.search(r'<reasoning>(.*?)</reasoning>', response, re.DOTALL)
     sql_match = re.search(r'<sql>(.*?)</sql>', response, re.DOTALL)
     
@@ -60,10 +94,84 @@ FROM ...
         'reasoning': reasoning,
         'sql': sql
     }
-def execute_sql(db_path, sql_query):
+
+def has_sql_block(response):
+    """응답에 비어있지 않은 <sql> 블록이 있는지 확인 (헤징 승자 판정용)"""
+    match = re.search(r'<sql>(.*?)</sql>', response, re.DOTALL)
+    return bool(match and match.group(1).strip())
+
+def generate_sql_from_schema(schema_text, user_question, model_name='gemini-2.0-flash', hedge=False,
+                             cache_scope=None, stats_text='', prefix=None):
+    """
+    스키마 텍스트를 직접 받아 자연어 질문을 SQL로 변환
+    (여러 DB를 ATTACH한 연합 스키마 등 파일 하나로 표현되지 않는 경우)
+    
+    스키마가 담긴 접두부는 컨텍스트 캐시로 재사용하고 질문 부분(+ 통계)만 전송합니다.
+    cache_scope(DB 경로 등)가 같은데 스키마가 바뀌면 이전 캐시를 삭제합니다.
+    prefix를 주면 schema_text 대신 그대로 접두부로 사용합니다 (build_db_sql_prompt_parts).
+    """
+    prefix = prefix or build_sql_prefix(schema_text)
+    suffix = build_sql_suffix(user_question, stats_text)
+    
+    if hedge:
+        from utils.llm_hedging import ask_hedged
+        hedged = ask_hedged(suffix, model_name, is_valid=has_sql_block,
+                            cache_prefix=prefix, cache_scope=cache_scope)
+        result = parse_sql_response(hedged['text'])
+        result['model'] = hedged['model']
+        result['hedged'] = hedged['hedged']
+        return result
+    
+    response = ask_gemini(suffix, model_name=model_name, cache_prefix=prefix, cache_scope=cache_scope)
+    return parse_sql_response(response)
+
+def generate_sql_from_question(db_path, user_question, model_name='gemini-2.0-flash', hedge=False):
+    """
+    자연어 질문을 SQL 쿼리로 변환
+    
+    Args:
+        db_path: DB 파일 경로
+        user_question: 사용자의 자연어 질문
+        model_name: 사용할 LLM 모델
+        hedge: True면 주 모델이 지연 시간 기한(p95)을 넘길 때 더 빠른 모델에도 요청
+    
+    Returns:
+        dict: {
+            'reasoning': 'AI의 사고 과정',
+            'sql': '생성된 SQL 쿼리',
+            'model': 응답한 모델 (hedge=True일 때),
+            'hedged': 헤지 요청 여부 (hedge=True일 때)
+        }
+    """
+    prefix, stats_text = build_db_sql_prompt_parts(get_database_schema(db_path))
+    return generate_sql_from_schema(None, user_question, model_name, hedge=hedge, cache_scope=db_path,
+                                    stats_text=stats_text, prefix=prefix)
+
+async def generate_sql_from_question_async(db_path, user_question, model_name='gemini-2.0-flash', hedge=False):
+    """
+    generate_sql_from_question의 비동기 버전 (ASGI 서버용)
+    
+    스키마 조회는 스레드 풀에서, LLM 호출은 이벤트 루프에서 대기합니다.
+    헤징은 스레드 기반(ask_hedged)이므로 hedge=True면 전체를 스레드에서 실행합니다.
+    """
+    if hedge:
+        return await asyncio.to_thread(generate_sql_from_question, db_path, user_question, model_name, hedge=True)
+    
+    schema_info = await asyncio.to_thread(get_database_schema, db_path)
+    prefix, stats_text = build_db_sql_prompt_parts(schema_info)
+    response = await ask_gemini_async(build_sql_suffix(user_question, stats_text), model_name=model_name,
+                                      cache_prefix=prefix, cache_scope=db_path)
+    return parse_sql_response(response)
+
+def execute_sql(db_path, sql_query, conn=None):
     """
     SQL 쿼리를 실행하고 결과 반환
     
+    Args:
+        db_path: DB 파일 경로
+        sql_query: 실행할 SQL
+        conn: 재사용할 sqlite3 연결 (None이면 새로 열고 닫음)
+    
     Returns:
         dict: {
             'success': bool,
@@ -72,10 +180,13 @@ def execute_sql(db_path, sql_query):
             'error': 에러 메시지 (실패 시)
         }
     """
-    import sqlite3
+    from utils.sqlite_tuning import connect
+    
+    owns_conn = conn is None
     
     try:
-        conn = sqlite3.connect(db_path)
+        if owns_conn:
+            conn = connect(db_path)
         cursor = conn.cursor()
         
         cursor.execute(sql_query)
@@ -86,7 +197,8 @@ def execute_sql(db_path, sql_query):
         # 데이터 fetch
         rows = cursor.fetchall()
         
-        conn.close()
+        if owns_conn:
+            conn.close()
         
         return {
             'success': True,
@@ -99,7 +211,23 @@ def execute_sql(db_path, sql_query):
             'success': False,
             'error': str(e)
         }
-def save_to_history(db_name, question, sql_query, result_rows=0):
+
+_history_migrated = False
+
+def connect_history():
+    """히스토리 DB 연결 (프로세스당 한 번 스키마 마이그레이션 적용)"""
+    global _history_migrated
+    from config import HISTORY_DB
+    from utils.sqlite_tuning import connect
+    
+    conn = connect(HISTORY_DB)
+    if not _history_migrated:
+        from database.init_history import migrate_history_db
+        migrate_history_db(conn)
+        _history_migrated = True
+    return conn
+
+def save_to_history(db_name, question, sql_query, result_rows=0, elapsed_ms=None):
     """
     쿼리 히스토리 저장
     
@@ -108,23 +236,24 @@ def save_to_history(db_name, question, sql_query, result_rows=0):
         question: 사용자 질문
         sql_query: 생성된 SQL
         result_rows: 결과 행 개수
+        elapsed_ms: 실행 시간 (밀리초, 자동 구체화 대상 판별에 사용)
     """
-    from config import HISTORY_DB
-    import sqlite3
-    
     try:
-        conn = sqlite3.connect(HISTORY_DB)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO query_history (db_name, question, sql_query, result_rows)
-            VALUES (?, ?, ?, ?)
-        ''', (db_name, question, sql_query, result_rows))
-        
-        conn.commit()
-        conn.close()
+        with metrics.timed('shared.history_write'):
+            conn = connect_history()
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO query_history (db_name, question, sql_query, result_rows, elapsed_ms)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (db_name, question, sql_query, result_rows, elapsed_ms))
+            
+            conn.commit()
+            conn.close()
+        invalidate_suggestions(db_name)
         return True
     except Exception as e:
+        metrics.increment('shared.history_write.errors')
         print(f"히스토리 저장 실패: {e}")
         return False
 
@@ -139,31 +268,29 @@ def get_history(db_name=None, limit=50):
     Returns:
         list: 히스토리 리스트
     """
-    from config import HISTORY_DB
-    import sqlite3
-    
     try:
-        conn = sqlite3.connect(HISTORY_DB)
-        cursor = conn.cursor()
+        with metrics.timed('shared.history_read'):
+            conn = connect_history()
+            cursor = conn.cursor()
         
-        if db_name:
-            cursor.execute('''
-                SELECT id, db_name, question, sql_query, executed_at, is_bookmarked, result_rows
-                FROM query_history
-                WHERE db_name = ?
-                ORDER BY executed_at DESC
-                LIMIT ?
-            ''', (db_name, limit))
-        else:
-            cursor.execute('''
-                SELECT id, db_name, question, sql_query, executed_at, is_bookmarked, result_rows
-                FROM query_history
-                ORDER BY executed_at DESC
-                LIMIT ?
-            ''', (limit,))
+            if db_name:
+                cursor.execute('''
+                    SELECT id, db_name, question, sql_query, executed_at, is_bookmarked, result_rows
+                    FROM query_history
+                    WHERE db_name = ?
+                    ORDER BY executed_at DESC
+                    LIMIT ?
+                ''', (db_name, limit))
+            else:
+                cursor.execute('''
+                    SELECT id, db_name, question, sql_query, executed_at, is_bookmarked, result_rows
+                    FROM query_history
+                    ORDER BY executed_at DESC
+                    LIMIT ?
+                ''', (limit,))
         
-        history = cursor.fetchall()
-        conn.close()
+            history = cursor.fetchall()
+            conn.close()
         
         return [
             {
@@ -178,27 +305,28 @@ def get_history(db_name=None, limit=50):
             for row in history
         ]
     except Exception as e:
+        metrics.increment('shared.history_read.errors')
         print(f"히스토리 조회 실패: {e}")
         return []
 
 def toggle_bookmark(history_id):
     """북마크 토글"""
-    from config import HISTORY_DB
-    import sqlite3
-    
     try:
-        conn = sqlite3.connect(HISTORY_DB)
-        cursor = conn.cursor()
+        with metrics.timed('shared.history_write'):
+            conn = connect_history()
+            cursor = conn.cursor()
         
-        cursor.execute('''
-            UPDATE query_history
-            SET is_bookmarked = CASE WHEN is_bookmarked = 0 THEN 1 ELSE 0 END
-            WHERE id = ?
-        ''', (history_id,))
+            cursor.execute('''
+                UPDATE query_history
+                SET is_bookmarked = CASE WHEN is_bookmarked = 0 THEN 1 ELSE 0 END
+                WHERE id = ?
+            ''', (history_id,))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
+            conn.close()
+        invalidate_suggestions()
         return True
     except Exception as e:
+        metrics.increment('shared.history_write.errors')
         print(f"북마크 토글 실패: {e}")
         return False
\ No newline at end of file
@@ -0,0 +1,191 @@
+# utils/result_encoding.py
+
+import gzip
+import json
+import zlib
+from flask import Response
+
+# 지원하는 결과 포맷
+#   rows     : 기존 형식 {'columns': [...], 'rows': [[...], ...]}
+#   columnar : 컬럼별 배열 + 저카디널리티 텍스트 컬럼 사전(dictionary) 인코딩
+#   arrow    : Apache Arrow IPC 스트림 (pyarrow 설치 시)
+SUPPORTED_FORMATS = ('rows', 'columnar', 'arrow')
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# 사전 인코딩 대상: 고유값 수가 이 값 이하이고, 행 수의 절반 이하인 텍스트 컬럼
+DICT_MAX_DISTINCT = 256
+
+# 이 크기(바이트) 미만의 응답은 압축하지 않음
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 1  # 속도 우선: 레벨 6 대비 크기는 약간 크지만 인코딩 시간이 절반 수준
+
+def negotiate_format(requested=None, accept_header=''):
+    """
+    응답 포맷 결정 (요청 본문의 format 값 우선, 없으면 Accept 헤더)
+
+    Returns:
+        str: SUPPORTED_FORMATS 중 하나
+
+    Raises:
+        ValueError: 지원하지 않는 포맷
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in SUPPORTED_FORMATS:
+            raise ValueError(f"지원하지 않는 포맷입니다: {requested} (가능: {', '.join(SUPPORTED_FORMATS)})")
+        return requested
+
+    if accept_header and ARROW_MIMETYPE in accept_header:
+        return 'arrow'
+    return 'rows'
+
+def _is_low_cardinality_text(values):
+    """사전 인코딩할 가치가 있는 텍스트 컬럼인지 판단"""
+    distinct = set()
+    non_null = 0
+    for v in values:
+        if v is None:
+            continue
+        if not isinstance(v, str):
+            return False
+        non_null += 1
+        distinct.add(v)
+        if len(distinct) > DICT_MAX_DISTINCT:
+            return False
+    return non_null > 0 and len(distinct) * 2 <= non_null
+
+def _dictionary_encode(values):
+    """값 리스트를 (사전, 코드 리스트)로 변환 (None은 None 유지)"""
+    dictionary = []
+    index = {}
+    codes = []
+    for v in values:
+        if v is None:
+            codes.append(None)
+            continue
+        code = index.get(v)
+        if code is None:
+            code = index[v] = len(dictionary)
+            dictionary.append(v)
+        codes.append(code)
+    return dictionary, codes
+
+def encode_columnar(columns, rows):
+    """
+    행 단위 결과를 컬럼 단위로 변환
+
+    Returns:
+        dict: {
+            'columns': [컬럼명],
+            'row_count': 행 수,
+            'data': [[컬럼1 값들], [컬럼2 값들], ...],
+            'dictionaries': {컬럼명: [고유값들]}  # 해당 컬럼의 data는 사전 인덱스
+        }
+    """
+    data = [list(col) for col in zip(*rows)] if rows else [[] for _ in columns]
+    dictionaries = {}
+
+    for i, name in enumerate(columns):
+        if _is_low_cardinality_text(data[i]):
+            dictionary, codes = _dictionary_encode(data[i])
+            dictionaries[name] = dictionary
+            data[i] = codes
+
+    return {
+        'columns': columns,
+        'row_count': len(rows),
+        'data': data,
+        'dictionaries': dictionaries,
+    }
+
+def encode_arrow(columns, rows):
+    """
+    결과를 Arrow IPC 스트림 바이트로 변환 (저카디널리티 텍스트는 dictionary 타입)
+
+    Raises:
+        RuntimeError: pyarrow 미설치
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError("arrow 포맷을 사용하려면 pyarrow를 설치해야 합니다. (pip install pyarrow)")
+
+    data = [list(col) for col in zip(*rows)] if rows else [[] for _ in columns]
+    arrays = []
+    for values in data:
+        try:
+            array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            # SQLite는 컬럼 타입이 섞일 수 있으므로 문자열로 통일
+            array = pa.array([None if v is None else str(v) for v in values])
+        if pa.types.is_string(array.type) and _is_low_cardinality_text(values):
+            array = array.dictionary_encode()
+        arrays.append(array)
+
+    table = pa.Table.from_arrays(arrays, names=list(columns))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def encode_result(result, fmt):
+    """
+    execute_sql 결과를 지정 포맷의 바이트로 인코딩
+
+    Returns:
+        tuple: (body 바이트, mimetype)
+    """
+    if fmt == 'arrow':
+        return encode_arrow(result['columns'], result['rows']), ARROW_MIMETYPE
+
+    if fmt == 'columnar':
+        # columns/rows 외의 부가 정보 (profile 등)는 그대로 유지
+        payload = {k: v for k, v in result.items() if k not in ('columns', 'rows')}
+        payload['format'] = 'columnar'
+        payload.update(encode_columnar(result['columns'], result['rows']))
+    else:
+        payload = result
+
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str)
+    return body.encode('utf-8'), 'application/json'
+
+def choose_content_encoding(accept_encodings):
+    """
+    클라이언트 Accept-Encoding에서 사용할 압축 방식 선택
+
+    Args:
+        accept_encodings: werkzeug request.accept_encodings
+
+    Returns:
+        str | None: 'gzip', 'deflate' 또는 None
+    """
+    return accept_encodings.best_match(['gzip', 'deflate'])
+
+def compress_body(body, encoding):
+    """gzip/deflate 압축 (encoding이 None이거나 작은 응답이면 그대로 반환)"""
+    if not encoding or len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0), 'gzip'
+    if encoding == 'deflate':
+        return zlib.compress(body, COMPRESS_LEVEL), 'deflate'
+    return body, None
+
+def encoded_response(result, fmt, accept_encodings=None):
+    """
+    포맷 인코딩 + 압축이 적용된 Flask Response 생성
+
+    Args:
+        result: execute_sql 결과 (success=True)
+        fmt: SUPPORTED_FORMATS 중 하나
+        accept_encodings: werkzeug request.accept_encodings (None이면 압축 안 함)
+    """
+    body, mimetype = encode_result(result, fmt)
+    encoding = choose_content_encoding(accept_encodings) if accept_encodings is not None else None
+    body, applied = compress_body(body, encoding)
+
+    response = Response(body, mimetype=mimetype)
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    if applied:
+        response.headers['Content-Encoding'] = applied
+    return response
@@ -0,0 +1,225 @@
+# utils/result_profiler.py
+
+import sqlite3
+import time
+from collections import Counter
+import numpy as np
+
+# cursor.fetchmany 단위 (한 번에 메모리에 올리는 최대 행 수)
+CHUNK_SIZE = 10_000
+
+# 수치 컬럼 분위수 계산용 저장소 크기 (이보다 많으면 샘플 기반 근사)
+QUANTILE_RESERVOIR = 20_000
+
+# 텍스트 컬럼 빈도 카운터 최대 크기 (초과 시 하위 빈도 항목 정리)
+TOPK_CAPACITY = 2_000
+
+QUANTILES = (0.25, 0.5, 0.75, 0.95)
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+class _ColumnProfile:
+    """단일 컬럼의 누적 통계 (청크 단위로 갱신)"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.count = 0
+        self.nulls = 0
+        self.numeric_count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = None
+        self.max = None
+        self.reservoir = np.empty(0, dtype=np.float64)
+        self.text_counts = Counter()
+        self.text_count = 0
+
+    def update(self, values):
+        self.count += len(values)
+        first = next((v for v in values if v is not None), None)
+
+        if first is None:
+            self.nulls += len(values)
+            return
+
+        nums = None
+        if _is_number(first):
+            # 빠른 경로: 수치 컬럼 전체를 float 배열로 변환 (NULL은 NaN)
+            try:
+                arr = np.array(values, dtype=np.float64)
+                mask = np.isnan(arr)
+                nums = arr[~mask]
+                texts = []
+                self.nulls += int(mask.sum())
+            except (TypeError, ValueError):
+                nums = None
+
+        if nums is None:
+            non_null = [v for v in values if v is not None]
+            self.nulls += len(values) - len(non_null)
+            if isinstance(first, str) and all(isinstance(v, str) for v in non_null):
+                nums = np.empty(0, dtype=np.float64)
+                texts = non_null
+            else:
+                # 타입이 섞인 컬럼 (SQLite 동적 타입)
+                nums = np.fromiter((v for v in non_null if _is_number(v)), dtype=np.float64)
+                texts = [v for v in non_null if not _is_number(v)]
+
+        if len(nums):
+            self._update_numeric(nums)
+        if texts:
+            self._update_text(texts)
+
+    def _update_numeric(self, nums):
+        chunk_min = float(nums.min())
+        chunk_max = float(nums.max())
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+        self.total += float(nums.sum())
+        self.total_sq += float(np.dot(nums, nums))
+
+        # 분위수용 저장소 (청크 단위 reservoir sampling)
+        seen_before = self.numeric_count
+        self.numeric_count += len(nums)
+        room = QUANTILE_RESERVOIR - len(self.reservoir)
+        if room > 0:
+            self.reservoir = np.concatenate([self.reservoir, nums[:room]])
+            nums = nums[room:]
+            seen_before += room
+        if len(nums):
+            # i번째 원소(전체 순번 t)는 QUANTILE_RESERVOIR / t 확률로 저장소에 들어감
+            positions = np.arange(seen_before + 1, seen_before + len(nums) + 1)
+            slots = (self.rng.random(len(nums)) * positions).astype(np.int64)
+            keep = slots < QUANTILE_RESERVOIR
+            self.reservoir[slots[keep]] = nums[keep]
+
+    def _update_text(self, texts):
+        self.text_count += len(texts)
+        values, counts = np.unique(np.array(texts, dtype=object).astype(str), return_counts=True)
+        self.text_counts.update(dict(zip(values.tolist(), counts.tolist())))
+        if len(self.text_counts) > TOPK_CAPACITY:
+            # 메모리 상한 유지: 상위 절반만 남김 (하위 빈도는 근사)
+            self.text_counts = Counter(dict(self.text_counts.most_common(TOPK_CAPACITY // 2)))
+
+    def result(self, top_k):
+        profile = {
+            'count': self.count,
+            'nulls': self.nulls,
+            'null_fraction': round(self.nulls / self.count, 6) if self.count else 0.0,
+        }
+
+        if self.numeric_count and self.numeric_count >= self.text_count:
+            mean = self.total / self.numeric_count
+            variance = max(self.total_sq / self.numeric_count - mean * mean, 0.0)
+            profile.update({
+                'kind': 'numeric',
+                'min': self.min,
+                'max': self.max,
+                'mean': mean,
+                'std': variance ** 0.5,
+                'quantiles': {
+                    f"p{int(q * 100)}": float(v)
+                    for q, v in zip(QUANTILES, np.quantile(self.reservoir, QUANTILES))
+                },
+                'quantiles_exact': self.numeric_count <= QUANTILE_RESERVOIR,
+            })
+        elif self.text_count:
+            profile.update({
+                'kind': 'text',
+                'distinct_estimate': len(self.text_counts),
+                'top_values': [
+                    {'value': v, 'count': c} for v, c in self.text_counts.most_common(top_k)
+                ],
+                'top_values_exact': len(self.text_counts) < TOPK_CAPACITY // 2,
+            })
+        else:
+            profile['kind'] = 'empty'
+
+        return profile
+
+def profile_query(db_path, sql_query, preview_rows=100, top_k=5, chunk_size=CHUNK_SIZE, seed=None,
+                  connect=sqlite3.connect, timeout=None):
+    """
+    SQL 결과 전체를 한 번 순회하며 컬럼 프로파일과 미리보기 샘플을 계산
+    (모든 행을 메모리에 올리지 않고 chunk_size 단위로 처리)
+
+    Args:
+        db_path: DB 파일 경로
+        sql_query: 실행할 SQL
+        preview_rows: 미리보기로 반환할 행 수 (reservoir sampling)
+        top_k: 텍스트 컬럼별 상위 빈도 값 개수
+        chunk_size: fetchmany 단위
+        seed: 샘플링 시드 (재현용)
+        connect: 연결 생성 함수 (쿼리 실행기의 읽기 전용 연결 등)
+        timeout: 실행 시간 한도 (초, None이면 무제한)
+
+    Returns:
+        dict: {
+            'success': bool,
+            'columns': [컬럼명],
+            'rows': [미리보기 행들 (원래 순서 유지)],
+            'row_count': 전체 행 수,
+            'profile': {컬럼명: 통계},
+            'profiled': True,
+            'error': 에러 메시지 (실패 시)
+        }
+    """
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+
+    try:
+        conn = connect(db_path)
+        if timeout:
+            deadline = start + timeout
+            conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000)
+        cursor = conn.cursor()
+        cursor.execute(sql_query)
+
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        profiles = [_ColumnProfile(rng) for _ in columns]
+        preview = []  # (행 번호, 행) - 원래 순서 복원용
+        row_count = 0
+
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+
+            # 미리보기 reservoir sampling (Algorithm R, 청크 단위 벡터화)
+            fill = max(0, min(preview_rows - row_count, len(chunk)))
+            for offset in range(fill):
+                preview.append((row_count + offset, chunk[offset]))
+            if fill < len(chunk) and preview_rows > 0:
+                positions = np.arange(row_count + fill, row_count + len(chunk))
+                slots = (rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+                for offset in np.nonzero(slots < preview_rows)[0]:
+                    preview[slots[offset]] = (int(positions[offset]), chunk[fill + offset])
+
+            for profile, values in zip(profiles, zip(*chunk)):
+                profile.update(values)
+
+            row_count += len(chunk)
+
+        conn.close()
+    except sqlite3.OperationalError as e:
+        if str(e) == 'interrupted':
+            return {'success': False, 'timed_out': True, 'error': f'쿼리 실행 시간 초과 ({timeout:g}초)'}
+        return {'success': False, 'error': str(e)}
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+    preview.sort(key=lambda item: item[0])
+
+    return {
+        'success': True,
+        'columns': columns,
+        'rows': [row for _, row in preview],
+        'row_count': row_count,
+        'profile': {name: p.result(top_k) for name, p in zip(columns, profiles)},
+        'profiled': True,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
@@ -1,10 +1,15 @@
 # utils/schema_analyzer.py
 
-import sqlite3
+import asyncio
+import hashlib
 import json
 import os
+import threading
 from datetime import datetime
-from utils.gemini_client import ask_gemini
+from utils import metrics
+from utils.gemini_client import ask_gemini, ask_gemini_async
+from utils.column_stats import format_stats_for_prompt, get_column_stats
+from utils.sqlite_tuning import connect, db_mtime
 
 # 캐시 파일 경로
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database')
@@ -14,37 +19,48 @@ def _load_cache():
     """캐시 파일 로드"""
     if os.path.exists(CACHE_FILE):
         try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            with metrics.timed('shared.schema_cache_read'), open(CACHE_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except:
+            metrics.increment('shared.schema_cache_read.errors')
             return {}
     return {}
 
 def _save_cache(cache):
     """캐시 파일 저장"""
-    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+    with metrics.timed('shared.schema_cache_write'), open(CACHE_FILE, 'w', encoding='utf-8') as f:
         json.dump(cache, f, ensure_ascii=False, indent=2)
 
 def _get_db_modified_time(db_path):
-    """DB 파일 수정 시간"""
-    return os.path.getmtime(db_path)
+    """
+    LLM 결과 캐시 버전용 DB 파일 수정 시간 (WAL 파일 포함)
+    (통계 갱신 시의 ANALYZE도 파일을 수정하므로 먼저 통계를 최신화한 뒤 읽음,
+    통계가 필요 없는 곳은 sqlite_tuning.db_mtime을 직접 사용)
+    """
+    get_column_stats(db_path)
+    return db_mtime(db_path)
 
 def get_database_schema(db_path):
     """
     SQLite DB의 전체 스키마 정보를 추출
+    (행 수/값 분포는 매번 스캔하지 않고 사전 계산된 컬럼 통계 사용)
     
     Returns:
         dict: {
             'tables': [테이블명 리스트],
             'schema_text': 'CREATE TABLE 구문들',
-            'table_info': {테이블명: {columns: [...], sample_data: [...]}}
+            'stats_text': '테이블별 행 수/범주형 값/값 범위 주석 (프롬프트용)',
+            'table_info': {테이블명: {columns: [...], row_count: int | None, column_stats: {...}}}
         }
     """
-    conn = sqlite3.connect(db_path)
+    stats = get_column_stats(db_path)
+    
+    conn = connect(db_path)
     cursor = conn.cursor()
     
     # 모든 테이블 목록
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    # (ANALYZE가 만드는 sqlite_stat* 테이블은 제외)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_stat%'")
     tables = [row[0] for row in cursor.fetchall()]
     
     # 각 테이블의 CREATE 구문
@@ -61,13 +77,13 @@ def get_database_schema(db_path):
         cursor.execute(f"PRAGMA table_info({table})")
         columns = cursor.fetchall()
         
-        # 샘플 데이터 (최대 3개)
-        cursor.execute(f"SELECT * FROM {table} LIMIT 3")
-        sample_data = cursor.fetchall()
+        # 사전 계산된 통계 (sqlite_sequence 등 내부 테이블은 없음)
+        table_stats = stats['tables'].get(table, {})
         
         table_info[table] = {
             'columns': columns,
-            'sample_data': sample_data
+            'row_count': table_stats.get('row_count'),
+            'column_stats': table_stats.get('columns', {})
         }
     
     conn.close()
@@ -75,38 +91,58 @@ def get_database_schema(db_path):
     return {
         'tables': tables,
         'schema_text': schema_text,
+        'stats_text': format_stats_for_prompt(stats),
         'table_info': table_info
     }
 
-def analyze_schema_with_llm(db_path, model_name='gemini-2.0-flash'):
+def _schema_version(db_path):
+    """스키마 정의(CREATE 구문) 해시 - 데이터만 바뀌면 그대로"""
+    conn = connect(db_path, readonly=True)
+    try:
+        rows = conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+        ).fetchall()
+    finally:
+        conn.close()
+    return 'schema:' + hashlib.sha1(repr(rows).encode('utf-8')).hexdigest()[:16]
+
+def _cached_llm_result(db_path, cache_key, field, model_name, label, version_fn=None):
     """
-    LLM을 사용해 DB 스키마를 분석하고 설명 생성 (캐싱 적용)
-    
+    LLM 결과 캐시 조회 (버전이 같고 같은 모델이면 적중)
+
+    Args:
+        version_fn: db_path → 캐시 버전 (기본: DB 파일 수정 시간, 데이터가 바뀌어도 무효화)
+
     Returns:
-        str: DB 구조에 대한 자연어 설명
+        tuple: (캐시된 값 또는 None, 현재 버전)
     """
-    # 캐시 로드
     cache = _load_cache()
-    db_name = os.path.basename(db_path)
-    db_mtime = _get_db_modified_time(db_path)
-    
-    # 캐시 확인
-    if db_name in cache:
-        cached_data = cache[db_name]
-        # DB 파일이 수정되지 않았고, 같은 모델이면 캐시 사용
-        if cached_data.get('mtime') == db_mtime and cached_data.get('model') == model_name:
-            print(f"[CACHE HIT] {db_name} 스키마 분석 캐시 사용")
-            return cached_data['analysis']
-    
-    # 캐시 미스 - LLM 호출
-    print(f"[CACHE MISS] {db_name} 스키마 분석 중... (LLM 호출)")
-    schema_info = get_database_schema(db_path)
-    
-    prompt = f"""
+    version = (version_fn or _get_db_modified_time)(db_path)
+    cached_data = cache.get(cache_key)
+    if cached_data and cached_data.get('version') == version and cached_data.get('model') == model_name:
+        print(f"[CACHE HIT] {os.path.basename(db_path)} {label} 캐시 사용")
+        return cached_data[field], version
+    print(f"[CACHE MISS] {os.path.basename(db_path)} {label} 생성 중... (LLM 호출)")
+    return None, version
+
+def _store_llm_result(cache_key, field, value, version, model_name):
+    """LLM 결과 캐시 저장"""
+    cache = _load_cache()
+    cache[cache_key] = {
+        field: value,
+        'version': version,
+        'model': model_name,
+        'cached_at': datetime.now().isoformat()
+    }
+    _save_cache(cache)
+
+def build_analysis_prompt(schema_info):
+    """스키마 분석 프롬프트 구성"""
+    return f"""
 당신은 데이터베이스 전문가입니다. 아래 SQLite 데이터베이스의 구조를 분석하고 사용자가 이해하기 쉽게 설명해주세요.
 
 <데이터베이스 스키마>
-{schema_info['schema_text']}
+{schema_info['schema_text']}{schema_info['stats_text']}
 
 다음 형식으로 설명해주세요:
 1. 이 데이터베이스가 다루는 도메인/주제
@@ -115,49 +151,14 @@ def analyze_schema_with_llm(db_path, model_name='gemini-2.0-flash'):
 
 간결하고 명확하게 작성해주세요.
 """
-    
-    analysis = ask_gemini(prompt, model_name=model_name)
-    
-    # 캐시 저장
-    cache[db_name] = {
-        'analysis': analysis,
-        'mtime': db_mtime,
-        'model': model_name,
-        'cached_at': datetime.now().isoformat()
-    }
-    _save_cache(cache)
-    
-    return analysis
 
-def suggest_queries_with_llm(db_path, model_name='gemini-2.0-flash'):
-    """
-    LLM을 사용해 이 DB에서 할 수 있는 유용한 질문 예시 생성 (캐싱 적용)
-    
-    Returns:
-        list: 추천 질문 리스트 (최대 5개)
-    """
-    # 캐시 로드
-    cache = _load_cache()
-    db_name = os.path.basename(db_path)
-    db_mtime = _get_db_modified_time(db_path)
-    
-    # 캐시 확인
-    cache_key = f"{db_name}_queries"
-    if cache_key in cache:
-        cached_data = cache[cache_key]
-        if cached_data.get('mtime') == db_mtime and cached_data.get('model') == model_name:
-            print(f"[CACHE HIT] {db_name} 추천 질문 캐시 사용")
-            return cached_data['queries']
-    
-    # 캐시 미스 - LLM 호출
-    print(f"[CACHE MISS] {db_name} 추천 질문 생성 중... (LLM 호출)")
-    schema_info = get_database_schema(db_path)
-    
-    prompt = f"""
+def build_suggest_prompt(schema_info):
+    """추천 질문 프롬프트 구성"""
+    return f"""
 당신은 데이터 분석가입니다. 아래 데이터베이스를 보고, 사용자가 물어볼 만한 **유용하고 구체적인 질문 5개**를 제안해주세요.
 
 <데이터베이스 스키마>
-{schema_info['schema_text']}
+{schema_info['schema_text']}{schema_info['stats_text']}
 
 조건:
 - 실제 비즈니스 인사이트를 얻을 수 있는 질문
@@ -173,10 +174,9 @@ def suggest_queries_with_llm(db_path, model_name='gemini-2.0-flash'):
 
 번호와 질문만 작성하고, 추가 설명은 불필요합니다.
 """
-    
-    response = ask_gemini(prompt, model_name=model_name)
-    
-    # 응답을 리스트로 파싱
+
+def parse_suggested_queries(response):
+    """추천 질문 응답을 리스트로 파싱 (최대 5개)"""
     lines = response.strip().split('\n')
     queries = []
     for line in lines:
@@ -186,86 +186,262 @@ def suggest_queries_with_llm(db_path, model_name='gemini-2.0-flash'):
             query = line.split('.', 1)[-1].strip() if '.' in line else line.lstrip('-').strip()
             queries.append(query)
     
-    queries = queries[:5]  # 최대 5개
+    return queries[:5]  # 최대 5개
+
+def _record_suggest_call(prompt, response):
+    """추천 질문 LLM 호출 비용 기록 (호출 수, 입출력 토큰 추정치)"""
+    from utils.llm_provider import estimate_tokens
     
-    # 캐시 저장
-    cache[cache_key] = {
-        'queries': queries,
-        'mtime': db_mtime,
-        'model': model_name,
-        'cached_at': datetime.now().isoformat()
-    }
-    _save_cache(cache)
+    metrics.increment('suggestions.llm_calls')
+    metrics.increment('suggestions.llm_tokens', estimate_tokens(prompt) + estimate_tokens(response))
+
+def analyze_schema_with_llm(db_path, model_name='gemini-2.0-flash'):
+    """
+    LLM을 사용해 DB 스키마를 분석하고 설명 생성 (캐싱 적용)
     
+    Returns:
+        str: DB 구조에 대한 자연어 설명
+    """
+    cache_key = os.path.basename(db_path)
+    analysis, version = _cached_llm_result(db_path, cache_key, 'analysis', model_name, '스키마 분석')
+    if analysis is not None:
+        return analysis
+    
+    schema_info = get_database_schema(db_path)
+    analysis = ask_gemini(build_analysis_prompt(schema_info), model_name=model_name)
+    
+    _store_llm_result(cache_key, 'analysis', analysis, version, model_name)
+    return analysis
+
+def suggest_queries_with_llm(db_path, model_name='gemini-2.0-flash'):
+    """
+    LLM을 사용해 이 DB에서 할 수 있는 유용한 질문 예시 생성 (캐싱 적용)
+    
+    추천 질문은 스키마에만 의존하므로 데이터가 바뀌어도 캐시를 유지하고,
+    테이블/컬럼 정의가 바뀔 때만 다시 생성합니다.
+    
+    Returns:
+        list: 추천 질문 리스트 (최대 5개)
+    """
+    cache_key = f"{os.path.basename(db_path)}_queries"
+    queries, version = _cached_llm_result(db_path, cache_key, 'queries', model_name, '추천 질문',
+                                          version_fn=_schema_version)
+    if queries is not None:
+        return queries
+    
+    schema_info = get_database_schema(db_path)
+    prompt = build_suggest_prompt(schema_info)
+    response = ask_gemini(prompt, model_name=model_name)
+    queries = parse_suggested_queries(response)
+    _record_suggest_call(prompt, response)
+    
+    _store_llm_result(cache_key, 'queries', queries, version, model_name)
     return queries
 
-def generate_schema_diagram(db_path):
+async def analyze_schema_with_llm_async(db_path, model_name='gemini-2.0-flash'):
     """
-    DB 스키마를 Mermaid ER 다이어그램으로 변환 (캐싱 적용)
+    analyze_schema_with_llm의 비동기 버전 (ASGI 서버용)
+    캐시/스키마 조회(SQLite, 파일 I/O)는 스레드 풀에서, LLM 호출은 이벤트 루프에서 대기
+    """
+    cache_key = os.path.basename(db_path)
+    analysis, version = await asyncio.to_thread(
+        _cached_llm_result, db_path, cache_key, 'analysis', model_name, '스키마 분석'
+    )
+    if analysis is not None:
+        return analysis
+    
+    schema_info = await asyncio.to_thread(get_database_schema, db_path)
+    analysis = await ask_gemini_async(build_analysis_prompt(schema_info), model_name=model_name)
+    
+    await asyncio.to_thread(_store_llm_result, cache_key, 'analysis', analysis, version, model_name)
+    return analysis
+
+async def suggest_queries_with_llm_async(db_path, model_name='gemini-2.0-flash'):
+    """suggest_queries_with_llm의 비동기 버전 (ASGI 서버용)"""
+    cache_key = f"{os.path.basename(db_path)}_queries"
+    queries, version = await asyncio.to_thread(
+        _cached_llm_result, db_path, cache_key, 'queries', model_name, '추천 질문', _schema_version
+    )
+    if queries is not None:
+        return queries
+    
+    schema_info = await asyncio.to_thread(get_database_schema, db_path)
+    prompt = build_suggest_prompt(schema_info)
+    response = await ask_gemini_async(prompt, model_name=model_name)
+    queries = parse_suggested_queries(response)
+    _record_suggest_call(prompt, response)
+    
+    await asyncio.to_thread(_store_llm_result, cache_key, 'queries', queries, version, model_name)
+    return queries
+
+# 다이어그램 조각 메모리 캐시: db_name -> {'mtime', 'fragments': {테이블명: {'hash', 'entity', 'refs'}}}
+_diagram_fragments = {}
+_diagram_lock = threading.Lock()
+
+# 부분 다이어그램 기본/최대 FK 홉 수
+DIAGRAM_DEFAULT_HOPS = 1
+DIAGRAM_MAX_HOPS = 3
+
+# 전체 다이어그램 최대 테이블 수 (초과 시 FK가 가장 많은 테이블 중심의 부분 다이어그램)
+DIAGRAM_MAX_FULL_TABLES = 50
+
+def _definition_hash(create_sql):
+    """테이블 정의(CREATE 구문) 해시 - 컬럼/FK가 바뀐 테이블만 조각 재생성"""
+    return hashlib.sha1((create_sql or '').encode('utf-8')).hexdigest()[:16]
+
+def _build_fragment(cursor, table_name):
+    """
+    테이블 1개의 Mermaid 엔티티 조각과 FK 참조 테이블 목록 생성
     
     Returns:
-        str: Mermaid 문법의 ER 다이어그램 코드
+        dict: {'entity': '    T {...}\n', 'refs': [참조 테이블들]}
+    """
+    quoted = '"' + table_name.replace('"', '""') + '"'
+    
+    lines = [f"    {table_name} {{"]
+    for col in cursor.execute(f"PRAGMA table_info({quoted})").fetchall():
+        col_name = col[1]
+        col_type = col[2] or 'ANY'  # 타입 없는 컬럼은 Mermaid 문법 오류 방지
+        pk_marker = " PK" if col[5] else ""
+        lines.append(f"        {col_type} {col_name}{pk_marker}")
+    lines.append("    }")
+    
+    # 복합 FK는 여러 행으로 나오므로 참조 테이블 기준 중복 제거
+    refs = []
+    for fk in cursor.execute(f"PRAGMA foreign_key_list({quoted})").fetchall():
+        if fk[2] not in refs:
+            refs.append(fk[2])
+    
+    return {'entity': '\n'.join(lines) + '\n', 'refs': refs}
+
+def _load_diagram_fragments(db_path):
+    """
+    모든 테이블의 다이어그램 조각 (정의 해시가 같은 테이블은 캐시 재사용)
+    
+    파일이 그대로면 메모리 캐시를 바로 쓰고, 파일이 바뀌었으면 sqlite_master 1회 조회로
+    정의 해시를 비교해 테이블이 추가/변경된 경우에만 해당 테이블의 PRAGMA를 다시 실행합니다.
+    (데이터만 바뀐 경우에는 조각을 다시 만들지 않음)
+    
+    Returns:
+        dict: {테이블명: {'hash', 'entity', 'refs'}} (sqlite_master 순서)
     """
-    # 캐시 로드
-    cache = _load_cache()
     db_name = os.path.basename(db_path)
-    db_mtime = _get_db_modified_time(db_path)
-    
-    # 캐시 확인
-    cache_key = f"{db_name}_diagram"
-    if cache_key in cache:
-        cached_data = cache[cache_key]
-        if cached_data.get('mtime') == db_mtime:
-            print(f"[CACHE HIT] {db_name} 다이어그램 캐시 사용")
-            return cached_data['diagram']
-    
-    # 캐시 미스 - 다이어그램 생성
-    print(f"[CACHE MISS] {db_name} 다이어그램 생성 중...")
-    schema_info = get_database_schema(db_path)
+    # 통계 갱신(ANALYZE/전체 스캔)이 필요 없으므로 파일 수정 시간만 확인
+    mtime = db_mtime(db_path)
     
-    mermaid = "erDiagram\n"
+    with _diagram_lock:
+        entry = _diagram_fragments.get(db_name)
+        if entry and entry['mtime'] == mtime:
+            return entry['fragments']
     
-    # 각 테이블의 컬럼 정의
-    for table_name, table_data in schema_info['table_info'].items():
-        columns = table_data['columns']
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    try:
+        definitions = cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
         
-        # 테이블 정의
-        mermaid += f"    {table_name} {{\n"
-        for col in columns:
-            col_id = col[0]  # column id
-            col_name = col[1]  # column name
-            col_type = col[2]  # data type
-            is_pk = col[5]  # primary key (1 or 0)
+        with _diagram_lock:
+            cached = entry['fragments'] if entry else None
+            if cached is None:
+                # 서버 재시작 후에는 파일 캐시에서 복원
+                cached = _load_cache().get(f"{db_name}_diagram_fragments", {})
             
-            # PK 표시
-            pk_marker = "PK" if is_pk else ""
-            mermaid += f"        {col_type} {col_name} {pk_marker}\n"
-        
-        mermaid += "    }\n"
+            fragments = {}
+            rebuilt = 0
+            for table_name, create_sql in definitions:
+                definition_hash = _definition_hash(create_sql)
+                fragment = cached.get(table_name)
+                if fragment is None or fragment['hash'] != definition_hash:
+                    fragment = _build_fragment(cursor, table_name)
+                    fragment['hash'] = definition_hash
+                    rebuilt += 1
+                fragments[table_name] = fragment
+            
+            _diagram_fragments[db_name] = {'mtime': mtime, 'fragments': fragments}
+            if rebuilt or len(fragments) != len(cached):
+                print(f"[DIAGRAM] {db_name} {rebuilt}/{len(fragments)}개 테이블 조각 재생성")
+                cache = _load_cache()
+                cache[f"{db_name}_diagram_fragments"] = fragments
+                _save_cache(cache)
+    finally:
+        conn.close()
+    
+    return fragments
+
+def _fk_neighbours(fragments):
+    """FK 관계를 양방향 인접 목록으로 변환"""
+    neighbours = {name: set() for name in fragments}
+    for name, fragment in fragments.items():
+        for ref in fragment['refs']:
+            if ref in neighbours and ref != name:
+                neighbours[name].add(ref)
+                neighbours[ref].add(name)
+    return neighbours
+
+def _select_subgraph(neighbours, focus_table, hops):
+    """focus_table에서 FK(양방향) hops단계 이내의 테이블 (BFS)"""
+    selected = {focus_table}
+    frontier = [focus_table]
+    for _ in range(hops):
+        frontier = [n for table in frontier for n in neighbours[table] if n not in selected]
+        selected.update(frontier)
+    return selected
+
+def generate_schema_diagram(db_path, table=None, hops=DIAGRAM_DEFAULT_HOPS, max_tables=None):
+    """
+    DB 스키마를 Mermaid ER 다이어그램으로 변환 (테이블별 조각 캐싱)
     
-    # FK 관계 추출
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    Args:
+        db_path: DB 파일 경로
+        table: 지정하면 이 테이블과 FK로 hops단계 이내의 테이블만 포함 (부분 다이어그램)
+        hops: FK 이웃 단계 수 (0~DIAGRAM_MAX_HOPS)
+        max_tables: table 없이 전체를 요청했는데 테이블이 이보다 많으면
+                    FK 연결이 가장 많은 테이블을 중심으로 한 부분 다이어그램 반환
     
-    for table_name in schema_info['tables']:
-        cursor.execute(f"PRAGMA foreign_key_list({table_name})")
-        fks = cursor.fetchall()
-        
-        for fk in fks:
-            ref_table = fk[2]  # 참조 테이블
-            mermaid += f'    {ref_table} ||--o{{ {table_name} : "has"\n'
+    Returns:
+        dict: {
+            'diagram': Mermaid 문법의 ER 다이어그램 코드,
+            'tables': 다이어그램에 포함된 테이블 목록,
+            'all_tables': 전체 테이블 목록 (부분 다이어그램 선택용),
+            'table_count': 전체 테이블 수,
+            'focus': 부분 다이어그램의 중심 테이블 (전체면 None)
+        }
     
-    conn.close()
+    Raises:
+        ValueError: 존재하지 않는 테이블
+    """
+    fragments = _load_diagram_fragments(db_path)
+    neighbours = _fk_neighbours(fragments)
     
-    # 캐시 저장
-    cache[cache_key] = {
-        'diagram': mermaid,
-        'mtime': db_mtime,
-        'cached_at': datetime.now().isoformat()
-    }
-    _save_cache(cache)
+    if table and table not in fragments:
+        raise ValueError(f"테이블을 찾을 수 없습니다: {table}")
+    if not table and max_tables and len(fragments) > max_tables:
+        table = max(fragments, key=lambda name: len(neighbours[name]))
+    
+    if table:
+        hops = max(0, min(int(hops), DIAGRAM_MAX_HOPS))
+        selected = _select_subgraph(neighbours, table, hops)
+    else:
+        selected = set(fragments)
+    
+    included = [name for name in fragments if name in selected]
+    parts = ["erDiagram\n"]
+    parts.extend(fragments[name]['entity'] for name in included)
+    parts.extend(
+        f'    {ref} ||--o{{ {name} : "has"\n'
+        for name in included
+        for ref in fragments[name]['refs']
+        if ref in selected
+    )
     
-    return mermaid
+    return {
+        'diagram': ''.join(parts),
+        'tables': included,
+        'all_tables': list(fragments),
+        'table_count': len(fragments),
+        'focus': table
+    }
 
 def clear_cache(db_name=None):
     """
@@ -276,6 +452,10 @@ def clear_cache(db_name=None):
     """
     cache = _load_cache()
     
+    with _diagram_lock:
+        for key in [k for k in _diagram_fragments if not db_name or k.startswith(db_name)]:
+            del _diagram_fragments[key]
+    
     if db_name:
         # 특정 DB 캐시만 삭제
         keys_to_delete = [k for k in cache.keys() if k.startswith(db_name)]
@@ -0,0 +1,330 @@
+# utils/sql_aggregates.py
+
+import re
+
+# 집계 쿼리 분석기 (근사 실행 / 분할 병렬 실행 공용)
+#
+# 전체 SQL 문법이 아니라 LLM이 만드는 단순 집계 쿼리 형태만 다룹니다:
+#   SELECT <그룹 키/집계 식> FROM <테이블 [JOIN ...]> [WHERE] [GROUP BY] [HAVING] [ORDER BY] [LIMIT]
+# 서브쿼리, CTE, 복합 쿼리(UNION 등), 윈도 함수, SELECT DISTINCT, SELECT *는 지원하지 않으며
+# parse_aggregate_query가 ValueError(이유)로 거절합니다.
+
+AGGREGATE_FUNCTIONS = ('COUNT', 'SUM', 'TOTAL', 'AVG', 'MIN', 'MAX')
+
+_TOKEN = re.compile(r"""
+      (?P<space>\s+|--[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^']|'')*')
+    | (?P<ident>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+    | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<param>[?:@$][A-Za-z0-9_]*)
+    | (?P<op>\|\||<=|>=|<>|!=|==|<<|>>|.)
+""", re.X | re.S)
+
+# 최상위 절 키워드 (등장 순서대로)
+_CLAUSES = ('select', 'from', 'where', 'group by', 'having', 'order by', 'limit')
+
+_JOIN_WORDS = {'JOIN', 'LEFT', 'RIGHT', 'FULL', 'INNER', 'CROSS', 'NATURAL', 'OUTER'}
+
+# 테이블 별칭이나 SELECT 항목 별칭이 될 수 없는 단어
+_RESERVED = _JOIN_WORDS | {
+    'ON', 'USING', 'WHERE', 'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'INDEXED', 'NOT', 'AS',
+    'END', 'NULL', 'AND', 'OR', 'IS', 'IN', 'LIKE', 'GLOB', 'BETWEEN', 'ELSE', 'THEN', 'WHEN',
+    'CASE', 'ESCAPE', 'COLLATE', 'ASC', 'DESC', 'OFFSET', 'WINDOW', 'UNION', 'EXCEPT', 'INTERSECT',
+}
+
+def tokenize(sql_query):
+    """
+    SQL 토큰 목록 (공백/주석 제외)
+
+    Returns:
+        list: [{'kind', 'text', 'upper', 'start', 'end', 'depth'}] (depth: 괄호 중첩 깊이)
+    """
+    tokens = []
+    depth = 0
+    for match in _TOKEN.finditer(sql_query):
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        text = match.group()
+        if text == ')':
+            depth -= 1
+        tokens.append({'kind': kind, 'text': text, 'upper': text.upper() if kind == 'word' else text,
+                       'start': match.start(), 'end': match.end(), 'depth': depth})
+        if text == '(':
+            depth += 1
+    return tokens
+
+def split_top_level(tokens, depth):
+    """depth 수준의 쉼표로 토큰 목록 분할"""
+    parts, current = [], []
+    for token in tokens:
+        if token['text'] == ',' and token['depth'] == depth:
+            parts.append(current)
+            current = []
+        else:
+            current.append(token)
+    if current:
+        parts.append(current)
+    return parts
+
+def span_text(sql_query, tokens):
+    return sql_query[tokens[0]['start']:tokens[-1]['end']]
+
+def find_aggregate_calls(tokens):
+    """
+    집계 함수 호출 위치
+
+    Returns:
+        list: [{'func', 'arg', 'distinct', 'start', 'end', 'arg_start', 'arg_end'}] (arg: 인자 토큰 목록)
+    """
+    calls = []
+    for i, token in enumerate(tokens[:-1]):
+        if token['kind'] != 'word' or token['upper'] not in AGGREGATE_FUNCTIONS or tokens[i + 1]['text'] != '(':
+            continue
+        inner_depth = tokens[i + 1]['depth'] + 1
+        j = i + 2
+        while j < len(tokens) and not (tokens[j]['text'] == ')' and tokens[j]['depth'] == inner_depth - 1):
+            j += 1
+        if j == len(tokens):
+            raise ValueError('괄호가 맞지 않습니다.')
+        arg = tokens[i + 2:j]
+        distinct = bool(arg) and arg[0]['upper'] == 'DISTINCT'
+        if distinct:
+            arg = arg[1:]
+        if token['upper'] in ('MIN', 'MAX') and len(split_top_level(arg, inner_depth)) > 1:
+            continue  # min(a, b)는 스칼라 함수
+        if any(t['upper'] == 'FILTER' for t in tokens[j + 1:j + 2]):
+            raise ValueError('FILTER 절이 있는 집계는 지원하지 않습니다.')
+        calls.append({'func': token['upper'], 'arg': arg, 'distinct': distinct,
+                      'start': token['start'], 'end': tokens[j]['end']})
+    return calls
+
+def _parse_item(sql_query, tokens):
+    """SELECT 항목 하나 → {'text', 'alias', 'aggregate', 'has_aggregate', 'start', 'end'} (start/end: 별칭 제외 식 위치)"""
+    alias = None
+    if len(tokens) >= 3 and tokens[-2]['upper'] == 'AS':
+        alias, tokens = tokens[-1], tokens[:-2]
+    elif (len(tokens) >= 2 and tokens[-1]['kind'] in ('word', 'ident') and tokens[-1]['upper'] not in _RESERVED
+          and tokens[-2]['text'] != '.' and (tokens[-2]['kind'] in ('word', 'ident', 'number', 'string')
+                                            or tokens[-2]['text'] == ')')):
+        alias, tokens = tokens[-1], tokens[:-1]
+    if tokens[-1]['text'] == '*':
+        raise ValueError('SELECT *는 지원하지 않습니다.')
+
+    calls = find_aggregate_calls(tokens)
+    bare = calls[0] if len(calls) == 1 and calls[0]['start'] == tokens[0]['start'] \
+        and calls[0]['end'] == tokens[-1]['end'] else None
+    return {
+        'text': span_text(sql_query, tokens),
+        'alias': alias['text'] if alias else None,
+        'aggregate': {
+            'func': bare['func'],
+            'arg': span_text(sql_query, bare['arg']) if bare['arg'] else '*',
+            'distinct': bare['distinct'],
+        } if bare else None,
+        'has_aggregate': bool(calls),
+        'start': tokens[0]['start'],
+        'end': tokens[-1]['end'],
+    }
+
+def _parse_tables(sql_query, tokens):
+    """
+    FROM 절의 테이블 참조
+
+    Returns:
+        list: [{'name', 'alias', 'start', 'end', 'join'}] (start/end: 이름과 별칭을 포함하는 SQL 위치,
+              join: 'from' | 'inner' | 'left' | 'cross' | ...)
+    """
+    tables = []
+    i, join = 0, 'from'
+    while i < len(tokens):
+        token = tokens[i]
+        if token['depth'] > 0:
+            i += 1
+            continue
+        if token['text'] == ',':
+            join = 'inner'
+            i += 1
+            continue
+        if token['upper'] in _JOIN_WORDS:
+            words = []
+            while i < len(tokens) and tokens[i]['upper'] in _JOIN_WORDS:
+                words.append(tokens[i]['upper'])
+                i += 1
+            if 'RIGHT' in words or 'FULL' in words:
+                raise ValueError('RIGHT/FULL JOIN은 지원하지 않습니다.')
+            join = 'left' if 'LEFT' in words else 'natural' if 'NATURAL' in words else \
+                'cross' if 'CROSS' in words else 'inner'
+            continue
+        if token['upper'] in ('ON', 'USING'):
+            # 조인 조건: 다음 조인/쉼표까지 건너뜀
+            i += 1
+            while i < len(tokens) and not (tokens[i]['depth'] == 0 and
+                                           (tokens[i]['text'] == ',' or tokens[i]['upper'] in _JOIN_WORDS)):
+                i += 1
+            continue
+        if token['text'] == '(':
+            raise ValueError('FROM 절의 서브쿼리/괄호 조인은 지원하지 않습니다.')
+        if token['kind'] not in ('word', 'ident'):
+            raise ValueError(f"FROM 절을 해석할 수 없습니다: {token['text']}")
+
+        start = i
+        name = token['text']
+        i += 1
+        if i + 1 < len(tokens) and tokens[i]['text'] == '.':
+            name = f"{name}.{tokens[i + 1]['text']}"
+            i += 2
+        if i < len(tokens) and tokens[i]['text'] == '(':
+            raise ValueError('테이블 값 함수는 지원하지 않습니다.')
+        alias = None
+        if i < len(tokens) and tokens[i]['upper'] == 'AS':
+            alias = tokens[i + 1]['text']
+            i += 2
+        elif i < len(tokens) and tokens[i]['kind'] in ('word', 'ident') and tokens[i]['upper'] not in _RESERVED:
+            alias = tokens[i]['text']
+            i += 1
+        if i < len(tokens) and tokens[i]['upper'] in ('INDEXED', 'NOT'):
+            raise ValueError('INDEXED BY는 지원하지 않습니다.')
+        tables.append({'name': name, 'alias': alias, 'start': tokens[start]['start'],
+                       'end': tokens[i - 1]['end'], 'join': join})
+    if not tables:
+        raise ValueError('FROM 절에 테이블이 없습니다.')
+    return tables
+
+def parse_aggregate_query(sql_query):
+    """
+    단순 집계 SELECT 분석
+
+    Args:
+        sql_query: SQL (끝 세미콜론 허용)
+
+    Returns:
+        dict: {
+            'sql': 세미콜론을 뗀 SQL,
+            'items': [{'text', 'alias', 'aggregate': {'func', 'arg', 'distinct'} | None, 'has_aggregate',
+                       'start', 'end'}],
+            'tables': [{'name', 'alias', 'start', 'end', 'join'}],
+            'group_by': [그룹 식 (SELECT 별칭/순번은 해당 항목 식으로 치환)],
+            'clauses': {절 이름: (시작, 끝) SQL 위치 (키워드 제외)},
+            'aggregate_calls': SELECT/HAVING/ORDER BY의 집계 함수 호출 목록 (find_aggregate_calls 형식)
+        }
+
+    Raises:
+        ValueError: 지원하지 않는 쿼리 (메시지에 이유)
+    """
+    sql_query = sql_query.strip().rstrip(';').strip()
+    tokens = tokenize(sql_query)
+    if not tokens or tokens[0]['upper'] != 'SELECT':
+        raise ValueError('SELECT 문만 지원합니다.')
+    if any(t['text'] == ';' for t in tokens):
+        raise ValueError('여러 문장은 지원하지 않습니다.')
+    if any(t['upper'] == 'SELECT' for t in tokens[1:]):
+        raise ValueError('서브쿼리는 지원하지 않습니다.')
+    if any(t['upper'] in ('OVER', 'WINDOW') for t in tokens):
+        raise ValueError('윈도 함수는 지원하지 않습니다.')
+    if any(t['upper'] in ('UNION', 'EXCEPT', 'INTERSECT') and t['depth'] == 0 for t in tokens):
+        raise ValueError('복합 쿼리(UNION 등)는 지원하지 않습니다.')
+    if tokens[1]['upper'] in ('DISTINCT', 'ALL'):
+        raise ValueError('SELECT DISTINCT는 지원하지 않습니다.')
+
+    # 최상위 절 경계
+    starts = []
+    for i, token in enumerate(tokens):
+        if token['depth'] != 0 or token['kind'] != 'word':
+            continue
+        name = token['upper'].lower()
+        if name in ('group', 'order') and i + 1 < len(tokens) and tokens[i + 1]['upper'] == 'BY':
+            starts.append((f'{name} by', i, i + 2))
+        elif name in ('select', 'from', 'where', 'having', 'limit'):
+            starts.append((name, i, i + 1))
+    names = [name for name, _, _ in starts]
+    if names != [c for c in _CLAUSES if c in names]:
+        raise ValueError('절 순서를 해석할 수 없습니다.')
+    if 'from' not in names:
+        raise ValueError('FROM 절이 없습니다.')
+
+    clause_tokens, clauses = {}, {}
+    for k, (name, _, body_start) in enumerate(starts):
+        body_end = starts[k + 1][1] if k + 1 < len(starts) else len(tokens)
+        body = tokens[body_start:body_end]
+        if not body:
+            raise ValueError(f'{name.upper()} 절이 비어 있습니다.')
+        clause_tokens[name] = body
+        clauses[name] = (body[0]['start'], body[-1]['end'])
+
+    items = [_parse_item(sql_query, part) for part in split_top_level(clause_tokens['select'], 0)]
+    tables = _parse_tables(sql_query, clause_tokens['from'])
+
+    if any(find_aggregate_calls(clause_tokens.get(name, [])) for name in ('from', 'where', 'group by')):
+        raise ValueError('FROM/WHERE/GROUP BY 절에 집계 함수가 있습니다.')
+
+    group_by = []
+    for part in split_top_level(clause_tokens.get('group by', []), 0):
+        text = span_text(sql_query, part)
+        if len(part) == 1 and part[0]['kind'] == 'number' and text.isdigit():
+            index = int(text) - 1
+            if not 0 <= index < len(items):
+                raise ValueError(f'GROUP BY 순번이 범위를 벗어났습니다: {text}')
+            text = items[index]['text']
+        else:
+            text = next((item['text'] for item in items
+                         if item['alias'] and len(part) == 1 and same_name(item['alias'], text)), text)
+        group_by.append(text)
+
+    calls = []
+    for name in ('select', 'having', 'order by'):
+        calls += find_aggregate_calls(clause_tokens.get(name, []))
+
+    return {
+        'sql': sql_query,
+        'items': items,
+        'tables': tables,
+        'group_by': group_by,
+        'clauses': clauses,
+        'aggregate_calls': calls,
+    }
+
+def same_name(a, b):
+    """따옴표를 뗀 식별자 비교 (SQLite처럼 대소문자 무시)"""
+    return a.strip('"`[]').lower() == b.strip('"`[]').lower()
+
+def unquote_identifier(name):
+    """"Orders" / [Orders] / `Orders` → Orders"""
+    if name[:1] in ('"', '`', '[') and len(name) >= 2:
+        return name[1:-1].replace('""', '"')
+    return name
+
+def replace_spans(sql_query, replacements):
+    """
+    SQL의 (시작, 끝) 구간들을 새 텍스트로 치환 (구간은 겹치지 않아야 함, 같은 위치 삽입은 목록 순서대로)
+
+    Args:
+        replacements: [(start, end, text)]
+    """
+    parts, last = [], 0
+    for start, end, text in sorted(replacements, key=lambda r: (r[0], r[1])):
+        parts.append(sql_query[last:start])
+        parts.append(text)
+        last = end
+    parts.append(sql_query[last:])
+    return ''.join(parts)
+
+def scans_table(conn, sql_query, label):
+    """
+    원래 쿼리가 테이블 대부분을 읽는지 (EXPLAIN QUERY PLAN 기준)
+
+    SCAN이면 전체를 훑고, 조인 안쪽 루프의 SEARCH도 바깥 테이블 행마다 반복되므로 읽는 것으로 봅니다.
+    가장 바깥 루프에서 SEARCH하면 인덱스로 일부만 읽으므로 테이블을 표본/rowid 구간으로 바꾸면 오히려 느립니다.
+
+    Args:
+        conn: 대상 DB 연결
+        label: 쿼리 계획에 나오는 테이블 이름 (별칭이 있으면 별칭)
+    """
+    label = unquote_identifier(label).lower()
+    details = [row[3].lower() for row in conn.execute(f'EXPLAIN QUERY PLAN {sql_query}')]
+    loops = [detail for detail in details if detail.startswith(('scan ', 'search '))]
+    for position, detail in enumerate(loops):
+        if detail.split(' ')[1] == label:
+            return detail.startswith('scan ') or position > 0
+    return True
@@ -0,0 +1,323 @@
+# utils/sqlite_tuning.py
+
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from utils import metrics
+
+# DB별 튜닝 프로필 기본값 (metadata.json의 "tuning" 항목으로 DB마다 덮어씀)
+#   journal_mode: WAL이면 쓰기 중에도 읽기가 막히지 않음 (파일에 유지되는 설정)
+#   synchronous: WAL에서는 NORMAL이면 충분 (커밋마다 fsync하지 않음)
+#   mmap_size: 바이트. 읽기를 read() 대신 메모리 매핑으로
+#   cache_size: 음수면 KB 단위 페이지 캐시 크기
+#   temp_store: 정렬/임시 테이블 위치 (default | file | memory)
+#               memory는 샘플 DB의 GROUP BY가 오히려 20% 느려져(bench_tuning) 기본값은 default
+#   mode: rw | ro (읽기 전용으로 열기) | immutable (파일이 절대 바뀌지 않음 - 잠금/변경 확인 생략)
+DEFAULT_PROFILE = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16000,
+    'temp_store': 'default',
+    'mode': 'rw',
+}
+
+PROFILE_CHOICES = {
+    'journal_mode': ('wal', 'delete', 'truncate', 'persist', 'memory'),
+    'synchronous': ('off', 'normal', 'full'),
+    'temp_store': ('default', 'file', 'memory'),
+    'mode': ('rw', 'ro', 'immutable'),
+}
+PROFILE_INTEGERS = ('mmap_size', 'cache_size')
+
+# 0이면 프로필을 적용하지 않고 SQLite 기본값으로 연결
+SQLITE_TUNING_ENABLED = os.getenv('SQLITE_TUNING', '1') != '0'
+
+# PRAGMA optimize 주기 (초). 통계(sqlite_stat1)가 없는 DB는 처음 한 번 ANALYZE
+OPTIMIZE_INTERVAL = int(os.getenv('SQLITE_OPTIMIZE_INTERVAL', '3600'))
+
+# 서버 시작 후 첫 optimize까지 대기 (초, 시작 직후 요청과 경쟁하지 않도록)
+OPTIMIZE_INITIAL_DELAY = 30
+
+# ANALYZE 시 인덱스당 검사할 최대 행 수
+ANALYSIS_LIMIT = 1000
+
+_metadata = {'mtime': None, 'profiles': {}}
+_metadata_lock = threading.Lock()
+_keepers = {}        # db_path -> {'conn', 'inode'} (WAL DB별로 열어 두는 연결)
+_keepers_lock = threading.Lock()
+_optimize_log = {}   # db_path -> {'at', 'ms', 'action', 'error'?}
+_optimizer = {'thread': None}
+_optimizer_lock = threading.Lock()
+
+def validate_profile(profile):
+    """
+    튜닝 프로필 검증
+
+    Returns:
+        str | None: 에러 메시지 (정상이면 None)
+    """
+    if not isinstance(profile, dict):
+        return 'tuning은 객체여야 합니다.'
+    for key, value in profile.items():
+        if key in PROFILE_CHOICES:
+            if str(value).lower() not in PROFILE_CHOICES[key]:
+                return f"{key}는 {', '.join(PROFILE_CHOICES[key])} 중 하나여야 합니다."
+        elif key in PROFILE_INTEGERS:
+            if isinstance(value, bool) or not isinstance(value, int):
+                return f'{key}는 정수여야 합니다.'
+        else:
+            return f'알 수 없는 튜닝 항목: {key}'
+    return None
+
+def _db_key(db_path):
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+def _load_profiles():
+    """metadata.json의 DB별 tuning 항목 (파일이 바뀔 때만 다시 읽음)"""
+    from config import METADATA_FILE
+
+    try:
+        mtime = os.path.getmtime(METADATA_FILE)
+    except OSError:
+        return {}
+    with _metadata_lock:
+        if _metadata['mtime'] != mtime:
+            try:
+                with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                metadata = {}
+            _metadata['profiles'] = {
+                key: value['tuning'] for key, value in metadata.items()
+                if isinstance(value, dict) and validate_profile(value.get('tuning', {})) is None
+                and value.get('tuning')
+            }
+            _metadata['mtime'] = mtime
+        return _metadata['profiles']
+
+def tuning_profile(db_path):
+    """DB 파일에 적용할 프로필 (기본값 + metadata.json의 DB별 설정, 비활성화 시 None)"""
+    if not SQLITE_TUNING_ENABLED:
+        return None
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(_load_profiles().get(_db_key(db_path), {}))
+    return {key: value.lower() if isinstance(value, str) else value for key, value in profile.items()}
+
+def apply_profile(conn, profile, schema=None, writable=True):
+    """
+    연결에 프로필 PRAGMA 적용
+
+    Args:
+        schema: ATTACH된 DB면 스키마 이름 (연결 전체 설정인 temp_store는 main일 때만)
+        writable: False면 파일을 바꾸는 journal_mode/synchronous는 건너뜀
+    """
+    prefix = f'"{schema}".' if schema else ''
+    conn.execute(f"PRAGMA {prefix}cache_size = {int(profile['cache_size'])}")
+    conn.execute(f"PRAGMA {prefix}mmap_size = {int(profile['mmap_size'])}")
+    if schema is None and profile['temp_store'] != 'default':
+        conn.execute(f"PRAGMA temp_store = {profile['temp_store']}")
+    if writable and profile['mode'] == 'rw':
+        try:
+            # 이미 같은 모드면 바로 반환. 다른 연결이 쓰는 중이라 바꾸지 못하면 다음 연결에서 재시도
+            conn.execute(f"PRAGMA {prefix}journal_mode = {profile['journal_mode']}")
+        except sqlite3.OperationalError:
+            pass
+        conn.execute(f"PRAGMA {prefix}synchronous = {profile['synchronous']}")
+
+def connect(db_path, readonly=False, **kwargs):
+    """
+    튜닝 프로필을 적용한 SQLite 연결 (서비스가 DB를 여는 모든 곳에서 사용)
+
+    Args:
+        db_path: DB 파일 경로
+        readonly: True면 읽기 전용(mode=ro)으로 열기 (프로필의 mode가 ro/immutable이면 항상 읽기 전용)
+        **kwargs: sqlite3.connect 인자 (timeout, check_same_thread, isolation_level 등)
+
+    Returns:
+        sqlite3.Connection
+    """
+    profile = tuning_profile(db_path)
+    mode = profile['mode'] if profile else 'rw'
+    if readonly or mode != 'rw':
+        uri = pathlib.Path(db_path).resolve().as_uri() + '?mode=ro'
+        if mode == 'immutable':
+            uri += '&immutable=1'
+        conn = sqlite3.connect(uri, uri=True, **kwargs)
+        writable = False
+    else:
+        conn = sqlite3.connect(db_path, **kwargs)
+        writable = True
+    if profile:
+        apply_profile(conn, profile, writable=writable)
+        if profile['journal_mode'] == 'wal' and mode != 'immutable':
+            _keep_open(db_path)
+    return conn
+
+def _keep_open(db_path):
+    """
+    WAL DB마다 프로세스당 연결 하나를 열어 둠
+
+    WAL 모드는 마지막 연결이 닫힐 때 -wal/-shm 파일을 정리하므로, 요청마다 연결을 여닫으면
+    매번 WAL 인덱스를 다시 만드는 비용(연결당 약 0.2ms)이 듭니다. 유휴 연결은 트랜잭션을 잡지 않으므로
+    체크포인트나 쓰기를 막지 않습니다.
+    """
+    try:
+        inode = os.stat(db_path).st_ino
+    except OSError:
+        return
+    with _keepers_lock:
+        keeper = _keepers.get(db_path)
+        if keeper is not None and keeper['inode'] == inode:
+            return
+        if keeper is not None:
+            keeper['conn'].close()
+        conn = sqlite3.connect(pathlib.Path(db_path).resolve().as_uri() + '?mode=ro', uri=True,
+                               check_same_thread=False)
+        conn.execute("PRAGMA schema_version").fetchone()  # 파일/WAL 인덱스 열기
+        _keepers[db_path] = {'conn': conn, 'inode': inode}
+
+def release(db_path):
+    """DB 파일 삭제 전 열어 둔 연결 닫기"""
+    with _keepers_lock:
+        keeper = _keepers.pop(db_path, None)
+    if keeper is not None:
+        keeper['conn'].close()
+
+def db_mtime(db_path):
+    """
+    DB 내용의 마지막 수정 시각
+    WAL 모드에서는 체크포인트 전까지 변경이 -wal 파일에만 쓰이므로 둘 중 최신 시각
+    """
+    mtime = os.path.getmtime(db_path)
+    try:
+        return max(mtime, os.path.getmtime(db_path + '-wal'))
+    except OSError:
+        return mtime
+
+def file_signature(db_path):
+    """서버 재시작 후 변경 여부 판별용 [DB mtime, 크기, WAL mtime, WAL 크기]"""
+    signature = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            stat = os.stat(path)
+            signature += [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            signature += [0, 0]
+    return signature
+
+def is_readonly(db_path):
+    """프로필상 읽기 전용 DB인지 (optimize/ANALYZE, 가져오기 대상 제외)"""
+    profile = tuning_profile(db_path)
+    return bool(profile) and profile['mode'] != 'rw'
+
+def save_tuning_profile(db_key, profile):
+    """
+    metadata.json의 DB 항목에 튜닝 프로필 저장 (None이면 삭제 → 기본값)
+
+    Raises:
+        ValueError: 잘못된 프로필
+    """
+    from config import METADATA_FILE
+
+    if profile is not None:
+        error = validate_profile(profile)
+        if error:
+            raise ValueError(error)
+
+    if os.path.exists(METADATA_FILE):
+        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    else:
+        metadata = {}
+
+    entry = metadata.setdefault(db_key, {
+        'name': db_key.replace('_', ' ').title(),
+        'description': 'No description',
+        'icon': '📁',
+    })
+    if profile:
+        entry['tuning'] = profile
+    else:
+        entry.pop('tuning', None)
+
+    with open(METADATA_FILE, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+# ========== 주기적 optimize ==========
+
+def run_optimize(db_path):
+    """
+    PRAGMA optimize 실행 (통계가 한 번도 없으면 ANALYZE)
+
+    Returns:
+        dict: {'at', 'ms', 'action': 'analyze' | 'optimize' | 'skipped'} (+ 'error')
+    """
+    start = time.perf_counter()
+    entry = {'at': datetime.now().isoformat(timespec='seconds')}
+    if is_readonly(db_path):
+        entry.update(action='skipped', ms=0.0)
+    else:
+        try:
+            conn = connect(db_path, timeout=30)
+            try:
+                conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+                has_stats = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+                ).fetchone()
+                entry['action'] = 'optimize' if has_stats else 'analyze'
+                conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            entry['error'] = str(e)
+            metrics.increment('sqlite.optimize_errors')
+        entry['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        metrics.observe('sqlite.optimize_s', entry['ms'] / 1000)
+    _optimize_log[db_path] = entry
+    return entry
+
+def optimize_all():
+    """등록된 모든 DB(쿼리 히스토리 포함)에 run_optimize"""
+    from config import load_databases
+
+    for info in load_databases().values():
+        entry = run_optimize(info['file'])
+        if entry.get('error'):
+            print(f"[SQLITE] {_db_key(info['file'])} {entry['action']} 실패: {entry['error']}")
+
+def _optimizer_loop():
+    time.sleep(OPTIMIZE_INITIAL_DELAY)
+    while True:
+        optimize_all()
+        time.sleep(OPTIMIZE_INTERVAL)
+
+def start_optimizer():
+    """optimize 스케줄러 시작 (서버 시작 시 한 번 호출, 중복 호출 무시)"""
+    if not SQLITE_TUNING_ENABLED or OPTIMIZE_INTERVAL <= 0:
+        return
+    with _optimizer_lock:
+        if _optimizer['thread'] is None:
+            _optimizer['thread'] = threading.Thread(target=_optimizer_loop, daemon=True, name='sqlite-optimizer')
+            _optimizer['thread'].start()
+
+def tuning_status(db_path=None):
+    """
+    프로필/최근 optimize 결과 (/api/tuning, /api/metrics용)
+
+    Returns:
+        dict: db_path가 있으면 {'profile', 'last_optimize'}, 없으면 {'enabled', 'interval_s', 'optimized'}
+    """
+    if db_path is not None:
+        return {'profile': tuning_profile(db_path), 'last_optimize': _optimize_log.get(db_path)}
+    return {
+        'enabled': SQLITE_TUNING_ENABLED,
+        'interval_s': OPTIMIZE_INTERVAL,
+        'scheduler_running': _optimizer['thread'] is not None,
+        'optimized': {_db_key(path): entry for path, entry in _optimize_log.items()},
+    }
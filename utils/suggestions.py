@@ -0,0 +1,221 @@
+# utils/suggestions.py
+
+import math
+import os
+import re
+import threading
+import time
+from utils import metrics
+
+# 추천 질문 수
+SUGGEST_COUNT = 5
+
+# 이 기간 안에 실행된 질문만 순위에 반영 (북마크한 질문은 기간과 무관)
+SUGGEST_WINDOW_DAYS = int(os.getenv('SUGGEST_WINDOW_DAYS', '90'))
+
+# 최근 실행일수록 가중치가 큼 (이 일수마다 절반)
+SUGGEST_HALF_LIFE_DAYS = float(os.getenv('SUGGEST_HALF_LIFE_DAYS', '14'))
+
+# 북마크 가중치 (결과가 있었던 실행 몇 번에 해당하는지)
+SUGGEST_BOOKMARK_WEIGHT = 3.0
+
+# 다른 프로세스의 히스토리 기록을 반영하기 위한 인덱스 최대 수명 (초)
+SUGGEST_INDEX_TTL = 60
+
+# 히스토리 추천이 SUGGEST_COUNT개보다 적을 때 LLM 추천으로 채울지
+SUGGEST_LLM_FILL = os.getenv('SUGGEST_LLM_FILL', '1') != '0'
+
+_index = {}        # db_name -> {'generation', 'built_at', 'ranked': [{'question', 'runs', 'bookmarked', 'score'}]}
+_generations = {}  # db_name -> 이 프로세스에서 히스토리가 바뀐 횟수 (None 키: 전체)
+_lock = threading.Lock()
+
+_SPACES = re.compile(r'\s+')
+
+# 벤치마크/부하 테스트가 히스토리에 남기는 질문 (추천에서 제외)
+_BENCHMARK_TAGS = ('[bench]', '[load]')
+
+def normalize_question(question):
+    """같은 질문 판별용 정규화 (공백 압축, 대소문자/끝 문장부호 무시)"""
+    return _SPACES.sub(' ', question).strip().rstrip('?.!？ ').lower()
+
+def invalidate_suggestions(db_name=None):
+    """히스토리 변경 알림 (db_name이 None이면 전체, 다음 요청에서 인덱스 재구성)"""
+    with _lock:
+        _generations[db_name] = _generations.get(db_name, 0) + 1
+
+def _generation(db_name):
+    return (_generations.get(db_name, 0), _generations.get(None, 0))
+
+# ========== 히스토리 순위 ==========
+
+def rank_history_questions(db_name):
+    """
+    히스토리에서 추천할 질문 순위 매기기
+
+    점수 = (결과가 있었던 실행 수 + 북마크 가중치) × 최근 실행 기준 반감기 감쇠
+    결과가 한 번도 없었던 질문, 질문 없이 실행한 SQL, 벤치마크가 남긴 질문은 제외합니다.
+
+    Returns:
+        list: [{'question', 'runs', 'bookmarked', 'score'}] (점수 내림차순)
+    """
+    from utils.query_generator import connect_history
+
+    conn = connect_history()
+    try:
+        rows = conn.execute('''
+            SELECT question, COUNT(*), SUM(result_rows > 0), MAX(is_bookmarked),
+                   julianday('now') - julianday(MAX(executed_at))
+            FROM query_history
+            WHERE db_name = ? AND question != ''
+              AND (executed_at >= datetime('now', ?) OR is_bookmarked = 1)
+            GROUP BY question
+        ''', (db_name, f'-{SUGGEST_WINDOW_DAYS} days')).fetchall()
+    finally:
+        conn.close()
+
+    # 공백/대소문자만 다른 질문은 하나로 합산 (표시는 가장 많이 실행된 표현, 같으면 최근 표현)
+    merged = {}
+    for question, runs, successes, bookmarked, age_days in rows:
+        key = normalize_question(question)
+        if not key or key.startswith(_BENCHMARK_TAGS):
+            continue
+        age_days = max(age_days or 0.0, 0.0)
+        entry = merged.setdefault(key, {'question': question, 'runs': 0, 'successes': 0, 'bookmarked': False,
+                                        'age_days': age_days, 'top': (runs, -age_days)})
+        if (runs, -age_days) > entry['top']:
+            entry['question'], entry['top'] = question, (runs, -age_days)
+        entry['runs'] += runs
+        entry['successes'] += successes or 0
+        entry['bookmarked'] = entry['bookmarked'] or bool(bookmarked)
+        entry['age_days'] = min(entry['age_days'], age_days)
+
+    ranked = []
+    for entry in merged.values():
+        if not entry['successes'] and not entry['bookmarked']:
+            continue
+        weight = entry['successes'] + (SUGGEST_BOOKMARK_WEIGHT if entry['bookmarked'] else 0)
+        decay = math.pow(0.5, entry['age_days'] / SUGGEST_HALF_LIFE_DAYS)
+        ranked.append({'question': entry['question'], 'runs': entry['runs'],
+                       'bookmarked': entry['bookmarked'], 'score': round(weight * decay, 4)})
+    ranked.sort(key=lambda e: (e['score'], e['runs']), reverse=True)
+    return ranked
+
+def _history_suggestions(db_name):
+    """DB별 인덱스에서 히스토리 추천 (히스토리가 바뀌었거나 TTL이 지났을 때만 재구성)"""
+    with metrics.timed('suggestions.history'):
+        with _lock:
+            generation = _generation(db_name)
+            cached = _index.get(db_name)
+            if cached and cached['generation'] == generation \
+                    and time.monotonic() - cached['built_at'] < SUGGEST_INDEX_TTL:
+                metrics.increment('suggestions.index_hits')
+                return cached['ranked']
+
+        try:
+            ranked = rank_history_questions(db_name)
+        except Exception as e:
+            print(f"[SUGGEST] {db_name} 히스토리 순위 계산 실패: {e}")
+            ranked = []
+        metrics.increment('suggestions.index_builds')
+        with _lock:
+            _index[db_name] = {'generation': generation, 'built_at': time.monotonic(), 'ranked': ranked}
+        return ranked
+
+# ========== 추천 ==========
+
+def _merge(history, llm_queries, count):
+    """히스토리 추천 + (부족하면) LLM 추천 - 중복 질문 제외"""
+    suggestions = [
+        {'question': e['question'], 'source': 'history', 'runs': e['runs'], 'bookmarked': e['bookmarked']}
+        for e in history[:count]
+    ]
+    seen = {normalize_question(s['question']) for s in suggestions}
+    for question in llm_queries or []:
+        if len(suggestions) >= count:
+            break
+        key = normalize_question(question)
+        if key and key not in seen:
+            seen.add(key)
+            suggestions.append({'question': question, 'source': 'llm'})
+    for s in suggestions:
+        metrics.increment(f"suggestions.served.{s['source']}")
+    metrics.increment('suggestions.requests')
+    return suggestions
+
+def suggest_questions(db_name, db_path, count=SUGGEST_COUNT):
+    """
+    추천 질문 (히스토리 우선, 부족할 때만 LLM으로 채움)
+
+    Returns:
+        list: [{'question', 'source': 'history' | 'llm', 'runs', 'bookmarked'}] (최대 count개)
+
+    Raises:
+        LLMError: 히스토리 추천이 하나도 없는데 LLM 호출이 실패한 경우
+    """
+    from utils.llm_provider import LLMError
+    from utils.schema_analyzer import suggest_queries_with_llm
+
+    history = _history_suggestions(db_name)
+    llm_queries = []
+    if len(history) < count and SUGGEST_LLM_FILL:
+        try:
+            with metrics.timed('suggestions.llm'):
+                llm_queries = suggest_queries_with_llm(db_path)
+        except LLMError as e:
+            if not history:
+                raise
+            print(f"[SUGGEST] {db_name} LLM 추천 실패, 히스토리 추천만 사용: {e}")
+    return _merge(history, llm_queries, count)
+
+async def suggest_questions_async(db_name, db_path, count=SUGGEST_COUNT):
+    """suggest_questions의 비동기 버전 (ASGI 서버용, 히스토리 조회는 스레드 풀에서)"""
+    import asyncio
+    from utils.llm_provider import LLMError
+    from utils.schema_analyzer import suggest_queries_with_llm_async
+
+    history = await asyncio.to_thread(_history_suggestions, db_name)
+    llm_queries = []
+    if len(history) < count and SUGGEST_LLM_FILL:
+        try:
+            with metrics.timed('suggestions.llm'):
+                llm_queries = await suggest_queries_with_llm_async(db_path)
+        except LLMError as e:
+            if not history:
+                raise
+            print(f"[SUGGEST] {db_name} LLM 추천 실패, 히스토리 추천만 사용: {e}")
+    return _merge(history, llm_queries, count)
+
+def suggestions_status():
+    """
+    추천 소스별 비용
+
+    Returns:
+        dict: {
+            'requests', 'served': {'history', 'llm'},
+            'history': {'lookups', 'index_hits', 'index_builds', 'avg_ms'},
+            'llm': {'lookups', 'calls': 캐시 미스로 실제 호출한 수, 'estimated_tokens', 'avg_ms'}
+        }
+    """
+    def avg_ms(name):
+        calls = metrics.counter(f'{name}.calls')
+        return round(metrics.counter(f'{name}.seconds') / calls * 1000, 2) if calls else None
+
+    return {
+        'requests': int(metrics.counter('suggestions.requests')),
+        'served': {
+            'history': int(metrics.counter('suggestions.served.history')),
+            'llm': int(metrics.counter('suggestions.served.llm')),
+        },
+        'history': {
+            'lookups': int(metrics.counter('suggestions.history.calls')),
+            'index_hits': int(metrics.counter('suggestions.index_hits')),
+            'index_builds': int(metrics.counter('suggestions.index_builds')),
+            'avg_ms': avg_ms('suggestions.history'),
+        },
+        'llm': {
+            'lookups': int(metrics.counter('suggestions.llm.calls')),
+            'calls': int(metrics.counter('suggestions.llm_calls')),
+            'estimated_tokens': int(metrics.counter('suggestions.llm_tokens')),
+            'avg_ms': avg_ms('suggestions.llm'),
+        },
+    }